@@ -6,6 +6,12 @@
 
 在项目根目录下运行：
 $ python bazi_cli.py <参数>
+
+批量计算（CSV / JSONL 输入，多进程，可断点续算）：
+$ python bazi_cli.py --input records.csv --output reports.jsonl
+
+通过常驻守护进程计算（先运行 python -m services.daemon）：
+$ python bazi_cli.py <参数> --daemon
 """
 
 import argparse
@@ -20,47 +26,80 @@ def ensure_path():
     # 获取脚本所在的目录（项目根目录）
     root_dir = os.path.dirname(script_path)
     
-    # 切换到项目根目录
-    if os.getcwd() != root_dir:
-        os.chdir(root_dir)
-        print(f"已切换到项目根目录: {root_dir}")
-    
-    # 将项目根目录添加到系统路径
+    # 将项目根目录添加到系统路径（不切换工作目录，输入输出路径按调用时的目录解析）
     if root_dir not in sys.path:
         sys.path.insert(0, root_dir)
 
 # 先确保路径正确
 ensure_path()
 
-# 然后导入模块
-from models.bazi.bazi_calculator import calculate_bazi, generate_bazi_report
+# 然后导入模块（计算模块在使用时导入，走守护进程时不加载）
+from models.bazi.bulk import DEFAULT_BATCH_SIZE, run_bulk
+
+def compute_report(record):
+    """在当前进程计算单条记录的报告"""
+    from models.bazi.bazi_calculator import calculate_bazi, generate_bazi_report
+    
+    bazi_result = calculate_bazi(
+        record['year'], record['month'], record['day'], record['hour'],
+        record['gender'], record['city']
+    )
+    return generate_bazi_report(bazi_result)
+
+def fetch_report(record, daemon=False, socket=None):
+    """计算报告：指定 daemon 时优先由守护进程计算，守护进程不可用时在本地计算"""
+    if daemon:
+        from services.daemon import DaemonUnavailable, call
+        try:
+            return call('bazi.report', record, path=socket)
+        except DaemonUnavailable as e:
+            print(f"{e}，改为本地计算", file=sys.stderr)
+    return compute_report(record)
 
 def main():
     """主函数"""
     # 创建命令行参数解析器
     parser = argparse.ArgumentParser(description='八字计算命令行工具')
-    parser.add_argument('year', type=int, help='出生年份')
-    parser.add_argument('month', type=int, help='出生月份')
-    parser.add_argument('day', type=int, help='出生日期')
-    parser.add_argument('hour', type=int, help='出生时辰（24小时制）')
+    parser.add_argument('year', type=int, nargs='?', help='出生年份')
+    parser.add_argument('month', type=int, nargs='?', help='出生月份')
+    parser.add_argument('day', type=int, nargs='?', help='出生日期')
+    parser.add_argument('hour', type=int, nargs='?', help='出生时辰（24小时制）')
     parser.add_argument('-g', '--gender', choices=['male', 'female'], default='male', 
                         help='性别（male男性/female女性，默认为male）')
     parser.add_argument('-c', '--city', type=str, default=None, 
                         help='出生城市（可选，默认根据IP定位）')
     parser.add_argument('-f', '--format', choices=['text', 'json'], default='text', 
                         help='输出格式（text文本/json JSON，默认为text）')
+    parser.add_argument('-i', '--input', type=str, default=None,
+                        help='批量模式：输入文件（.csv 带表头 / .jsonl），字段 id,year,month,day,hour,gender,city')
+    parser.add_argument('-o', '--output', type=str, default=None,
+                        help='批量模式：输出文件（.jsonl / .cbin 紧凑二进制，或 .parquet 目录），默认为输入文件名加 .reports.jsonl')
+    parser.add_argument('-w', '--workers', type=int, default=None,
+                        help='批量模式：进程数（默认为CPU核数）')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f'批量模式：每批记录数，每批写出后保存检查点（默认为{DEFAULT_BATCH_SIZE}）')
+    parser.add_argument('-D', '--daemon', action='store_true',
+                        help='通过守护进程计算（python -m services.daemon），未运行时在本地计算')
+    parser.add_argument('--socket', type=str, default=None,
+                        help='守护进程 socket 路径（默认取 CURECIPHER_SOCKET 环境变量）')
     
     # 解析命令行参数
     args = parser.parse_args()
     
-    # 计算八字
-    bazi_result = calculate_bazi(
-        args.year, args.month, args.day, args.hour, 
-        args.gender, args.city
-    )
+    if args.input:
+        # 批量模式：检查点存在时从上次中断处继续
+        output = args.output or os.path.splitext(args.input)[0] + '.reports.jsonl'
+        run_bulk(compute_report, args.input, output, workers=args.workers, batch_size=args.batch_size)
+        return
+    if None in (args.year, args.month, args.day, args.hour):
+        parser.error('需要提供 year month day hour，或使用 --input 批量计算')
     
-    # 生成报告
-    report = generate_bazi_report(bazi_result)
+    # 计算八字并生成报告
+    record = {
+        'year': args.year, 'month': args.month, 'day': args.day, 'hour': args.hour,
+        'gender': args.gender, 'city': args.city
+    }
+    report = fetch_report(record, daemon=args.daemon, socket=args.socket)
     
     # 输出结果
     if args.format == 'json':
@@ -0,0 +1,43 @@
+"""
+CureCipher 基准测试
+
+micro 组按计算阶段计时（四柱、十神、神煞、五行、大运、报告、六爻编译与渲染），
+macro 组通过进程内 ASGI 客户端请求各 API 路由。运行期间地理编码使用固定坐标、
+禁止对外网络连接，时钟固定在 FIXED_NOW，结果可离线复现。
+
+运行: python -m benchmarks [-k 'bazi.*'] [--output results.json] [--compare benchmarks/baseline.json]
+"""
+
+import contextlib
+import datetime
+
+from .core import (
+    DEFAULT_MIN_TIME, DEFAULT_ROUNDS, DEFAULT_THRESHOLD, REGISTRY, VARIANTS,
+    Benchmark, benchmark, clear_caches, compare, format_comparison, load, run, save, select,
+)
+from .offline import offline
+
+# 基准运行时的固定"当前时间"
+FIXED_NOW = datetime.datetime(2025, 6, 1, 12, 0)
+
+
+def load_benchmarks():
+    """导入 micro / macro 模块以注册全部基准"""
+    from . import macro, micro  # noqa: F401
+    return REGISTRY
+
+
+@contextlib.contextmanager
+def environment():
+    """基准运行环境：离线并固定时钟"""
+    from models import clock
+
+    with offline(), clock.use_clock(FIXED_NOW):
+        yield
+
+
+__all__ = [
+    'DEFAULT_MIN_TIME', 'DEFAULT_ROUNDS', 'DEFAULT_THRESHOLD', 'FIXED_NOW', 'REGISTRY', 'VARIANTS',
+    'Benchmark', 'benchmark', 'clear_caches', 'compare', 'environment', 'format_comparison',
+    'load', 'load_benchmarks', 'offline', 'run', 'save', 'select',
+]
@@ -0,0 +1,64 @@
+"""
+运行基准测试
+
+$ python -m benchmarks                                  # 全部基准
+$ python -m benchmarks -k 'bazi.*' -g micro --variant warm
+$ python -m benchmarks --output results.json --compare benchmarks/baseline.json
+$ python -m benchmarks --save-baseline                  # 更新基线
+"""
+
+import argparse
+import os
+import sys
+
+from . import (
+    DEFAULT_MIN_TIME, DEFAULT_ROUNDS, DEFAULT_THRESHOLD, VARIANTS,
+    compare, environment, format_comparison, load, load_benchmarks, run, save, select,
+)
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='CureCipher 基准测试')
+    parser.add_argument('-k', '--pattern', action='append', default=None, help='基准名称通配符，可重复指定')
+    parser.add_argument('-g', '--group', action='append', choices=['micro', 'macro'], default=None, help='基准分组')
+    parser.add_argument('--variant', action='append', choices=VARIANTS, default=None, help='运行方式（默认 warm 和 cold）')
+    parser.add_argument('-r', '--rounds', type=int, default=DEFAULT_ROUNDS, help=f'重复轮数（默认 {DEFAULT_ROUNDS}）')
+    parser.add_argument('--min-time', type=float, default=DEFAULT_MIN_TIME,
+                        help=f'warm 方式每轮最短时间，秒（默认 {DEFAULT_MIN_TIME}）')
+    parser.add_argument('-o', '--output', default=None, help='结果 JSON 输出路径')
+    parser.add_argument('--compare', default=None, help='与基线 JSON 对比，有退化时返回码为 1')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help=f'退化阈值，中位数变慢比例（默认 {DEFAULT_THRESHOLD}）')
+    parser.add_argument('--save-baseline', action='store_true', help=f'把结果写为基线 {BASELINE_PATH}')
+    parser.add_argument('-l', '--list', action='store_true', help='列出基准')
+    args = parser.parse_args(argv)
+
+    load_benchmarks()
+    benchmarks = select(args.pattern, args.group)
+    if args.list:
+        for bench in benchmarks:
+            print(f"{bench.name:<28} {bench.group:<6} {bench.description}")
+        return 0
+    if not benchmarks:
+        parser.error('没有匹配的基准')
+
+    with environment():
+        results = run(benchmarks, variants=args.variant or VARIANTS, rounds=args.rounds,
+                      min_time=args.min_time, progress=sys.stderr)
+
+    if args.output:
+        save(results, args.output)
+    if args.save_baseline:
+        save(results, BASELINE_PATH)
+    if args.compare:
+        rows = compare(results, load(args.compare), threshold=args.threshold)
+        print(format_comparison(rows))
+        if any(row['status'] == 'regression' for row in rows):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,256 @@
+"""
+基准测试框架 - 注册、计时、统计与基线对比
+
+每个基准由 setup（准备参数，不计时）和 func（被测函数）组成，可分别以
+warm（缓存已预热）和 cold（每次调用前清空 models 下全部 lru_cache）两种方式运行。
+每种方式重复多轮，每轮按 min_time 自动确定调用次数，输出每次调用耗时的统计量。
+"""
+
+import fnmatch
+import gc
+import json
+import math
+import platform
+import statistics
+import sys
+import time
+from dataclasses import dataclass
+from typing import Any, Callable
+
+# 已注册的基准，按注册顺序
+REGISTRY = {}
+
+VARIANTS = ("warm", "cold")
+
+# 默认重复轮数与每轮最短时间（秒）
+DEFAULT_ROUNDS = 7
+DEFAULT_MIN_TIME = 0.05
+
+# 与基线相比中位数变慢超过该比例视为退化
+DEFAULT_THRESHOLD = 0.25
+
+# 结果文件格式版本
+RESULT_VERSION = 1
+
+
+@dataclass
+class Benchmark:
+    """一个基准测试"""
+    name: str
+    func: Callable[[Any], Any]
+    setup: Callable[[], Any] = lambda: None
+    group: str = "micro"
+    variants: tuple = VARIANTS
+    description: str = ""
+
+
+def benchmark(name, group="micro", setup=None, variants=VARIANTS):
+    """
+    注册基准测试的装饰器
+
+    :param name: 基准名称，如 bazi.pillars
+    :param group: 分组（micro 单阶段 / macro API 路由）
+    :param setup: 返回被测函数参数的准备函数（不计时，每种方式调用一次）
+    :param variants: 运行方式，warm / cold
+    """
+    def register(func):
+        REGISTRY[name] = Benchmark(
+            name=name, func=func, setup=setup or (lambda: None), group=group,
+            variants=tuple(variants), description=(func.__doc__ or "").strip(),
+        )
+        return func
+    return register
+
+
+def clear_caches(prefix="models."):
+    """
+    清空指定包下所有模块级函数的 lru_cache
+
+    :param prefix: 模块名前缀
+    :return: 清空的缓存数
+    """
+    cleared = 0
+    for module_name, module in list(sys.modules.items()):
+        if module is None or not module_name.startswith(prefix):
+            continue
+        for value in list(vars(module).values()):
+            if callable(getattr(value, "cache_clear", None)) and getattr(value, "__module__", None) == module_name:
+                value.cache_clear()
+                cleared += 1
+    return cleared
+
+
+def _percentile(values, q):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(samples):
+    """
+    每次调用耗时（秒）的统计量，单位毫秒
+
+    :param samples: 各轮的每次调用耗时
+    :return: dict
+    """
+    to_ms = 1000.0
+    return {
+        "min": min(samples) * to_ms,
+        "median": statistics.median(samples) * to_ms,
+        "mean": statistics.fmean(samples) * to_ms,
+        "stdev": (statistics.stdev(samples) if len(samples) > 1 else 0.0) * to_ms,
+        "p95": _percentile(samples, 0.95) * to_ms,
+    }
+
+
+def _calibrate(func, arg, min_time):
+    # 逐步加倍调用次数，直到一轮耗时不少于 min_time
+    iterations = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(iterations):
+            func(arg)
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or iterations >= 1 << 20:
+            return iterations
+        iterations *= 2 if elapsed <= 0 else max(2, min(10, math.ceil(min_time / elapsed)))
+
+
+def measure(bench, variant, rounds=DEFAULT_ROUNDS, min_time=DEFAULT_MIN_TIME):
+    """
+    运行一个基准的一种方式
+
+    warm：先调用一次预热，再按校准的次数连续调用；
+    cold：每次调用前清空缓存（清空时间不计入），每轮调用一次。
+
+    :return: dict，包含统计量、轮数与每轮调用次数
+    """
+    arg = bench.setup()
+    gc_enabled = gc.isenabled()
+    gc.collect()
+    gc.disable()
+    try:
+        samples = []
+        if variant == "warm":
+            bench.func(arg)
+            iterations = _calibrate(bench.func, arg, min_time)
+            for _ in range(rounds):
+                start = time.perf_counter()
+                for _ in range(iterations):
+                    bench.func(arg)
+                samples.append((time.perf_counter() - start) / iterations)
+        else:
+            iterations = 1
+            for _ in range(rounds):
+                clear_caches()
+                start = time.perf_counter()
+                bench.func(arg)
+                samples.append(time.perf_counter() - start)
+    finally:
+        if gc_enabled:
+            gc.enable()
+    return dict(summarize(samples), rounds=rounds, iterations=iterations)
+
+
+def select(patterns=None, groups=None):
+    """
+    按名称通配符与分组筛选基准
+
+    :param patterns: 名称通配符列表，如 ["bazi.*"]
+    :param groups: 分组列表
+    :return: list[Benchmark]
+    """
+    selected = []
+    for bench in REGISTRY.values():
+        if groups and bench.group not in groups:
+            continue
+        if patterns and not any(fnmatch.fnmatch(bench.name, p) for p in patterns):
+            continue
+        selected.append(bench)
+    return selected
+
+
+def run(benchmarks, variants=VARIANTS, rounds=DEFAULT_ROUNDS, min_time=DEFAULT_MIN_TIME, progress=None):
+    """
+    运行一组基准
+
+    :param benchmarks: Benchmark 列表
+    :param variants: 运行方式
+    :param rounds: 每种方式的重复轮数
+    :param min_time: warm 方式每轮最短时间（秒）
+    :param progress: 进度输出流，None 时不输出
+    :return: 结果 dict（可直接写为 JSON）
+    """
+    results = {}
+    for bench in benchmarks:
+        for variant in variants:
+            if variant not in bench.variants:
+                continue
+            key = f"{bench.name}[{variant}]"
+            results[key] = dict(measure(bench, variant, rounds, min_time), group=bench.group)
+            if progress:
+                progress.write(f"{key:<40} 中位数 {results[key]['median']:9.3f} 毫秒"
+                               f"  (±{results[key]['stdev']:.3f}, {rounds}×{results[key]['iterations']})\n")
+                progress.flush()
+    return {
+        "version": RESULT_VERSION,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "machine": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+        },
+        "rounds": rounds,
+        "min_time": min_time,
+        "results": results,
+    }
+
+
+def save(results, path):
+    """写出结果 JSON"""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, ensure_ascii=False, indent=2, sort_keys=True)
+
+
+def load(path):
+    """读取结果 JSON"""
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare(current, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    与基线对比各基准的中位数
+
+    :param current: 本次结果
+    :param baseline: 基线结果
+    :param threshold: 允许的变慢比例
+    :return: list[dict]，每项包含 name / baseline / current / ratio / status
+             （status 为 regression / improved / ok / new）
+    """
+    rows = []
+    base_results = baseline.get("results", {})
+    for name, result in current.get("results", {}).items():
+        if name not in base_results:
+            rows.append({"name": name, "baseline": None, "current": result["median"], "ratio": None, "status": "new"})
+            continue
+        base = base_results[name]["median"]
+        ratio = result["median"] / base if base > 0 else math.inf
+        if ratio > 1 + threshold:
+            status = "regression"
+        elif ratio < 1 / (1 + threshold):
+            status = "improved"
+        else:
+            status = "ok"
+        rows.append({"name": name, "baseline": base, "current": result["median"], "ratio": ratio, "status": status})
+    return rows
+
+
+def format_comparison(rows):
+    """对比结果的文本表格"""
+    lines = [f"{'基准':<40} {'基线(毫秒)':>12} {'本次(毫秒)':>12} {'比值':>8}  状态"]
+    for row in rows:
+        base = f"{row['baseline']:.3f}" if row["baseline"] is not None else "-"
+        ratio = f"{row['ratio']:.2f}" if row["ratio"] is not None else "-"
+        lines.append(f"{row['name']:<40} {base:>12} {row['current']:>12.3f} {ratio:>8}  {row['status']}")
+    return "\n".join(lines)
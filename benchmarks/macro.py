@@ -0,0 +1,93 @@
+"""
+API 路由基准：通过进程内 ASGI 客户端（TestClient）请求各路由，包含序列化与校验开销
+"""
+
+import functools
+import os
+import tempfile
+
+from .core import benchmark
+
+BAZI_REQUEST = {
+    "birth_year": 1990, "birth_month": 5, "birth_day": 15, "birth_hour": 12,
+    "birth_minute": 0, "gender": "male", "city": "Beijing",
+}
+HEALTH_QUERY = {key: value for key, value in BAZI_REQUEST.items()}
+CAST_REQUEST = {"params": [2, 2, 1, 2, 4, 2], "date": "2024-03-15T10:30:00", "title": "健康"}
+BATCH_SIZE = 16
+
+
+@functools.lru_cache(maxsize=1)
+def client():
+    """进程内 API 客户端（FastAPI 应用只创建一次）"""
+    from fastapi.testclient import TestClient
+
+    from services.api import create_app
+    from services.api.routes import api_router
+
+    app = create_app()
+    app.include_router(api_router)
+    return TestClient(app, raise_server_exceptions=False)
+
+
+def request(method, url, **kwargs):
+    response = client().request(method, url, **kwargs)
+    # 读取完整响应体（含流式响应）
+    response.read()
+    if response.status_code >= 400:
+        raise RuntimeError(f"{method} {url} 返回 {response.status_code}: {response.text[:200]}")
+    return response.status_code
+
+
+@benchmark("api.bazi.calculate", group="macro")
+def bazi_calculate(_):
+    """POST /api/bazi/calculate"""
+    return request("POST", "/api/bazi/calculate", json=BAZI_REQUEST)
+
+
+@benchmark("api.bazi.summary", group="macro")
+def bazi_summary(_):
+    """POST /api/bazi/summary"""
+    return request("POST", "/api/bazi/summary", json=BAZI_REQUEST)
+
+
+@benchmark("api.bazi.health_advice", group="macro")
+def bazi_health_advice(_):
+    """GET /api/bazi/health_advice"""
+    return request("GET", "/api/bazi/health_advice", params=HEALTH_QUERY)
+
+
+@benchmark("api.bazi.report_stream", group="macro")
+def bazi_report_stream(_):
+    """POST /api/bazi/report/stream"""
+    return request("POST", "/api/bazi/report/stream", json=BAZI_REQUEST)
+
+
+@functools.lru_cache(maxsize=1)
+def job_client():
+    """提交任务用的客户端：任务写入临时目录中的独立队列，不会被正在运行的 worker 执行"""
+    from services.api.routes.job_routes import get_broker
+    from services.jobs import SQLiteBroker
+
+    broker = SQLiteBroker(os.path.join(tempfile.mkdtemp(prefix="curecipher-bench-"), "jobs.db"))
+    client().app.dependency_overrides[get_broker] = lambda: broker
+    return client()
+
+
+@benchmark("api.jobs.submit", group="macro")
+def jobs_submit(_):
+    """POST /api/jobs/bazi/report（只提交任务，与报告大小无关）"""
+    job_client()
+    return request("POST", "/api/jobs/bazi/report", json=BAZI_REQUEST)
+
+
+@benchmark("api.liuyao.cast", group="macro")
+def liuyao_cast(_):
+    """POST /api/liuyao/cast"""
+    return request("POST", "/api/liuyao/cast", json=CAST_REQUEST)
+
+
+@benchmark("api.liuyao.cast_batch", group="macro")
+def liuyao_cast_batch(_):
+    """POST /api/liuyao/cast_batch"""
+    return request("POST", "/api/liuyao/cast_batch", json={"items": [CAST_REQUEST] * BATCH_SIZE})
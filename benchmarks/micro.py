@@ -0,0 +1,148 @@
+"""
+单阶段基准：四柱换算、十神、干支关系、神煞、五行、大运时间轴、报告、结果编码、六爻编译与渲染
+"""
+
+import datetime
+import json
+
+from lunar_python import Solar
+
+from models.bazi import bazi_calculator, calculator, codec
+from models.bazi.bazi_visual import generate_html_grid
+from models.bazi.five_elements import analyze_five_elements
+from models.bazi.lunar_extension import LunarExtension
+from models.bazi.relations import find_relations
+from models.bazi.report import build_report, generate_bazi_report, render_report
+from models.bazi.report.chart import Chart
+from models.bazi.timeline import build_timeline
+from models.liuyao.diagnosis import diagnose_health
+from models.liuyao.najia import Najia
+
+from .core import benchmark
+
+BIRTH = (1990, 5, 15, 12, "male")
+CAST_PARAMS = [2, 2, 1, 2, 4, 2]
+CAST_DATE = datetime.datetime(2024, 3, 15, 10, 30)
+
+
+def bazi_result():
+    return bazi_calculator.calculate_bazi(*BIRTH, None)
+
+
+def bazi_report():
+    return generate_bazi_report(bazi_result())
+
+
+def natal():
+    result = bazi_result()["bazi"]
+    return result["day_master"], result["gans"], result["zhis"]
+
+
+@benchmark("bazi.pillars")
+def pillars(_):
+    """阳历换算农历并排四柱（lunar_python）"""
+    eight_char = Solar.fromYmdHms(1990, 5, 15, 12, 0, 0).getLunar().getEightChar()
+    return eight_char.getYear(), eight_char.getMonth(), eight_char.getDay(), eight_char.getTime()
+
+
+@benchmark("bazi.ten_gods", setup=natal)
+def ten_gods(args):
+    """十神与地支格局分析"""
+    return bazi_calculator.analyze_shens(*args)
+
+
+@benchmark("bazi.relations", setup=lambda: ["庚午", "辛巳", "庚辰", "壬午", "乙酉", "丙午"])
+def relations(pillars):
+    """四柱加大运、流年的干支关系"""
+    return find_relations(pillars)
+
+
+@benchmark("bazi.shensha", setup=lambda: Solar.fromYmdHms(1990, 5, 15, 12, 0, 0).getLunar())
+def shensha(lunar):
+    """神煞"""
+    return LunarExtension(lunar=lunar).get_shen_sha()
+
+
+@benchmark("bazi.five_elements", setup=lambda: calculator.calculate_bazi(*BIRTH)["result"])
+def five_elements(result):
+    """五行分析与调理建议"""
+    return analyze_five_elements(result)
+
+
+@benchmark("bazi.dayun", setup=bazi_report)
+def dayun(report):
+    """大运、流年、流月时间轴"""
+    return build_timeline(report)
+
+
+@benchmark("bazi.calculate")
+def calculate(_):
+    """完整八字计算（bazi_calculator.calculate_bazi）"""
+    return bazi_calculator.calculate_bazi(*BIRTH, None)
+
+
+@benchmark("bazi.calculate_cached")
+def calculate_cached(_):
+    """完整八字计算（calculator.calculate_bazi，按参数缓存）"""
+    return calculator.calculate_bazi(*BIRTH)
+
+
+@benchmark("bazi.report", setup=lambda: Chart.from_result(bazi_result()))
+def report(chart):
+    """结构化报告"""
+    return build_report(chart)
+
+
+@benchmark("bazi.report_text", setup=lambda: Chart.from_result(bazi_result()))
+def report_text(chart):
+    """文本报告渲染"""
+    return render_report(chart, format="text")
+
+
+@benchmark("bazi.grid_html", setup=bazi_report)
+def grid_html(report):
+    """命盘 HTML 表格"""
+    return generate_html_grid(report)
+
+
+@benchmark("bazi.encode_json", setup=bazi_result, variants=("warm",))
+def encode_json(result):
+    """计算结果序列化为 JSON（对照）"""
+    return json.dumps(result, ensure_ascii=False).encode("utf-8")
+
+
+@benchmark("bazi.decode_json", setup=lambda: json.dumps(bazi_result(), ensure_ascii=False).encode("utf-8"),
+           variants=("warm",))
+def decode_json(data):
+    """JSON 解析为计算结果（对照）"""
+    return json.loads(data)
+
+
+@benchmark("bazi.encode", setup=bazi_result, variants=("warm",))
+def encode(result):
+    """计算结果紧凑二进制编码"""
+    return codec.encode(result)
+
+
+@benchmark("bazi.decode", setup=lambda: codec.encode(bazi_result()), variants=("warm",))
+def decode(data):
+    """紧凑二进制解码为计算结果"""
+    return codec.decode(data)
+
+
+@benchmark("liuyao.compile")
+def liuyao_compile(_):
+    """六爻起卦编译"""
+    return Najia(2).compile(params=CAST_PARAMS, date=CAST_DATE)
+
+
+@benchmark("liuyao.render", setup=lambda: Najia(2).compile(params=CAST_PARAMS, date=CAST_DATE))
+def liuyao_render(najia):
+    """六爻排盘文本渲染"""
+    return najia.render()
+
+
+@benchmark("liuyao.diagnose")
+def liuyao_diagnose(_):
+    """六爻健康诊断"""
+    return diagnose_health(params=CAST_PARAMS, date=CAST_DATE)
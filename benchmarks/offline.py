@@ -0,0 +1,63 @@
+"""
+离线运行基准：替换地理编码并禁止对外网络连接，保证结果可复现
+"""
+
+import contextlib
+import socket
+from types import SimpleNamespace
+
+# 基准使用的城市坐标（纬度, 经度）
+CITY_COORDINATES = {
+    "Beijing": (39.9042, 116.4074),
+    "北京": (39.9042, 116.4074),
+    "Shanghai": (31.2304, 121.4737),
+    "上海": (31.2304, 121.4737),
+    "Guangzhou": (23.1291, 113.2644),
+    "广州": (23.1291, 113.2644),
+}
+
+
+def offline_geocode(city):
+    """
+    从固定坐标表查询城市，不访问网络
+
+    :param city: 城市名称
+    :return: 带 latitude / longitude 属性的对象，找不到时为 None
+    """
+    coords = CITY_COORDINATES.get(city)
+    if coords is None:
+        return None
+    return SimpleNamespace(latitude=coords[0], longitude=coords[1], address=city)
+
+
+class NetworkDisabled(OSError):
+    """基准运行期间尝试访问网络"""
+
+
+@contextlib.contextmanager
+def offline():
+    """
+    在上下文中替换 calculator.geocode_city，并禁止 IPv4 / IPv6 连接
+
+    Unix socket（如事件循环内部使用的 socketpair）不受影响。
+    """
+    from models.bazi import bazi_calculator, calculator
+
+    original_connect = socket.socket.connect
+
+    def guarded_connect(sock, address):
+        if sock.family in (socket.AF_INET, socket.AF_INET6):
+            raise NetworkDisabled(f"基准运行期间禁止网络连接: {address}")
+        return original_connect(sock, address)
+
+    patched = [(calculator, "geocode_city"), (bazi_calculator, "geocode_city")]
+    originals = [getattr(module, name) for module, name in patched]
+    for module, name in patched:
+        setattr(module, name, offline_geocode)
+    socket.socket.connect = guarded_connect
+    try:
+        yield
+    finally:
+        socket.socket.connect = original_connect
+        for (module, name), value in zip(patched, originals):
+            setattr(module, name, value)
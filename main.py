@@ -5,8 +5,6 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse, HTMLResponse
 
-# 配置日志
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
 # 导入API路由
@@ -16,26 +14,11 @@ from services.api.routes import api_router
 # 创建FastAPI应用
 app = create_app()
 
-# 确保前端目录存在
+# 前端目录
 frontend_dir = os.path.join(os.path.dirname(__file__), "frontend", "public")
-logger.debug(f"前端目录路径: {frontend_dir}")
 
-# 确保目录存在
-if not os.path.exists(frontend_dir):
-    logger.warning(f"前端目录不存在，创建目录: {frontend_dir}")
-    os.makedirs(frontend_dir, exist_ok=True)
-    
-    # 确保CSS和JS目录存在
-    css_dir = os.path.join(frontend_dir, "css")
-    js_dir = os.path.join(frontend_dir, "js")
-    os.makedirs(css_dir, exist_ok=True)
-    os.makedirs(js_dir, exist_ok=True)
-    
-    # 创建基本的index.html文件
-    index_html_path = os.path.join(frontend_dir, "index.html")
-    if not os.path.exists(index_html_path):
-        with open(index_html_path, 'w', encoding='utf-8') as f:
-            f.write("""<!DOCTYPE html>
+# 前端目录缺失时创建的默认页面
+DEFAULT_INDEX_HTML = """<!DOCTYPE html>
 <html lang="zh-CN">
 <head>
     <meta charset="UTF-8">
@@ -91,23 +74,57 @@ if not os.path.exists(frontend_dir):
     </div>
 </body>
 </html>
-""")
-        logger.info(f"创建了默认index.html: {index_html_path}")
-
-# 输出前端文件列表
-if os.path.exists(frontend_dir):
-    logger.debug("前端目录存在，列出文件:")
-    for root, dirs, files in os.walk(frontend_dir):
-        for file in files:
-            logger.debug(f"  - {os.path.join(root, file)}")
-else:
-    logger.error(f"前端目录仍然不存在: {frontend_dir}")
+"""
+
+
+def configure_logging():
+    """按环境变量 CURECIPHER_LOG_LEVEL 配置日志（默认 INFO），只在服务启动时调用"""
+    level = os.environ.get("CURECIPHER_LOG_LEVEL", "INFO").upper()
+    logging.basicConfig(level=getattr(logging, level, logging.INFO))
+
+
+def ensure_frontend_dir():
+    """确保前端目录存在（不存在时创建默认页面），只在服务启动时调用"""
+    logger.debug(f"前端目录路径: {frontend_dir}")
+
+    # 确保目录存在
+    if not os.path.exists(frontend_dir):
+        logger.warning(f"前端目录不存在，创建目录: {frontend_dir}")
+        os.makedirs(frontend_dir, exist_ok=True)
+    
+        # 确保CSS和JS目录存在
+        css_dir = os.path.join(frontend_dir, "css")
+        js_dir = os.path.join(frontend_dir, "js")
+        os.makedirs(css_dir, exist_ok=True)
+        os.makedirs(js_dir, exist_ok=True)
+    
+        # 创建基本的index.html文件
+        index_html_path = os.path.join(frontend_dir, "index.html")
+        if not os.path.exists(index_html_path):
+            with open(index_html_path, 'w', encoding='utf-8') as f:
+                f.write(DEFAULT_INDEX_HTML)
+            logger.info(f"创建了默认index.html: {index_html_path}")
+
+    # 输出前端文件列表
+    if os.path.exists(frontend_dir):
+        logger.debug("前端目录存在，列出文件:")
+        for root, dirs, files in os.walk(frontend_dir):
+            for file in files:
+                logger.debug(f"  - {os.path.join(root, file)}")
+    else:
+        logger.error(f"前端目录仍然不存在: {frontend_dir}")
+
+
+@app.on_event("startup")
+async def startup():
+    configure_logging()
+    ensure_frontend_dir()
 
 # 注册API路由
 app.include_router(api_router, prefix="")
 
 # 挂载静态文件
-app.mount("/static", StaticFiles(directory="frontend/public"), name="static")
+app.mount("/static", StaticFiles(directory="frontend/public", check_dir=False), name="static")
 
 # 根路径路由 - 这个必须在通配符路由之前定义
 @app.get("/")
@@ -155,7 +172,9 @@ async def api_info():
         "endpoints": [
             "/api/bazi/calculate",
             "/api/bazi/summary",
-            "/api/bazi/health_advice"
+            "/api/bazi/health_advice",
+            "/api/liuyao/cast",
+            "/api/liuyao/cast_batch"
         ]
     }
 
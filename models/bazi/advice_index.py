@@ -0,0 +1,502 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+五行建议索引模块
+健康、饮食、运动建议只取决于日主、最弱两行、最强两行、季节等有限组合，
+因此按语言一次性由参考数据构建索引，生成建议时直接查表，返回共享的只读结构
+"""
+
+import copy
+import functools
+import itertools
+import json
+import logging
+from pathlib import Path
+
+from models import clock
+from models.frozen import FrozenDict, freeze
+
+logger = logging.getLogger(__name__)
+
+# 五行顺序
+ELEMENTS = ("木", "火", "土", "金", "水")
+
+ELEMENT_ENGLISH = {
+    "木": "wood",
+    "火": "fire",
+    "土": "earth",
+    "金": "metal",
+    "水": "water"
+}
+
+SEASONS = ("spring", "summer", "autumn", "winter")
+
+DEFAULT_LOCALE = "zh"
+
+BASE_DIR = Path(__file__).parent.parent.parent
+DATA_DIR = BASE_DIR / "data"
+LOCALES_DIR = BASE_DIR / "locales"
+
+# 各语言文案在 locales/<语言>.json 中的键
+LOCALE_SECTION = "five_elements_advice"
+
+# 中文文案（其他语言缺少的条目回退到这里）
+ZH_TEXTS = {
+    "element_names": {element: element for element in ELEMENTS},
+    # 五行对应的身体系统和北美常见病
+    "body_systems": {
+        "木": {"systems": ["肝", "胆", "筋络", "眼睛"], "diseases": ["慢性疼痛", "焦虑抑郁"]},
+        "火": {"systems": ["心", "小肠", "血脉", "舌"], "diseases": ["高血压", "糖尿病并发心血管病"]},
+        "土": {"systems": ["脾", "胃", "肌肉", "口"], "diseases": ["肥胖", "脾虚"]},
+        "金": {"systems": ["肺", "大肠", "皮毛", "鼻"], "diseases": ["慢性疼痛", "疫苗后遗症疲劳"]},
+        "水": {"systems": ["肾", "膀胱", "骨髓", "耳"], "diseases": ["肾虚", "糖尿病并发肾病"]}
+    },
+    # 日主相关的健康建议
+    "day_master": {
+        "木": "注意保护肝脏，避免情绪激动，保持规律作息，适当进行舒展性运动。",
+        "火": "注意心脏健康，避免过度兴奋，保持情绪平和，适当进行有氧运动但避免过度。",
+        "土": "注意脾胃健康，定时规律饮食，避免过食生冷，加强肌肉锻炼。",
+        "金": "注意呼吸系统健康，避免接触烟尘环境，保持环境通风，注意皮肤保湿。",
+        "水": "注意肾脏和泌尿系统健康，保持充足的睡眠，避免过度劳累，补充足够水分。"
+    },
+    # 季节性建议
+    "seasonal": {
+        "spring": {
+            "木": "春季肝气旺盛，不宜过度滋补，以平和调理为主。",
+            "火": "春季注意心火上炎，保持心情平和，避免过度刺激。",
+            "土": "春季脾胃功能相对减弱，饮食宜温和，避免生冷。",
+            "金": "春季肺气相对偏弱，注意保暖，防止风邪入侵。",
+            "水": "春季肾水应养护，避免过度消耗，保持充足休息。"
+        },
+        "summer": {
+            "木": "夏季肝火易旺，注意清热解毒，避免过度疲劳。",
+            "火": "夏季心火最旺，注意清心降火，避免暴晒和情绪激动。",
+            "土": "夏季湿热影响脾胃，饮食宜清淡，避免重油腻食物。",
+            "金": "夏季肺气最弱，注意防暑降温，保持呼吸道湿润。",
+            "水": "夏季肾水易亏，注意补水养阴，避免过度出汗。"
+        },
+        "autumn": {
+            "木": "秋季肝气收敛，注意情志调养，避免抑郁。",
+            "火": "秋季心火渐弱，注意保持情绪稳定，防止虚火上浮。",
+            "土": "秋季脾胃功能逐渐恢复，饮食宜平和，补充纤维质。",
+            "金": "秋季肺气最旺，注意防燥润肺，避免辛辣刺激。",
+            "水": "秋季肾水需养护，注意保暖，防止寒邪入侵。"
+        },
+        "winter": {
+            "木": "冬季肝气闭藏，注意舒肝解郁，避免情绪压抑。",
+            "火": "冬季心火内敛，注意保持心阳，避免过度寒冷。",
+            "土": "冬季脾胃需温养，饮食宜温热，适当增加热量。",
+            "金": "冬季肺气偏弱，注意保暖防寒，避免呼吸道感染。",
+            "水": "冬季肾水当令，注意培补肾精，避免过度劳累。"
+        }
+    },
+    # 平衡状态描述
+    "balance": {
+        "非常平衡": "五行分布非常均衡，有利于整体健康。",
+        "较为平衡": "五行分布较为均衡，整体健康状况良好。",
+        "稍有不平衡": "{strongest}偏强，{weakest}偏弱，可能需要适当调整。",
+        "明显不平衡": "{strongest}明显过强，{weakest}明显不足，需要重点调整。",
+        "严重不平衡": "{strongest}极度过强，{weakest}极度不足，健康可能受到影响，需要及时调整。"
+    },
+    "list_separator": ", ",
+    "risk_types": {"excess": "过盛", "deficient": "不足"},
+    "risk_excess": "{element}过盛，可能导致{systems}功能亢进或炎症，易引发{diseases}",
+    "risk_deficient": "{element}不足，可能导致{systems}功能减弱，易引发{diseases}",
+    "specific_enhance": "增强{element}的相关功能",
+    "specific_control": "适当控制{element}的过度表现",
+    "reason_enhance": "增强{element}五行",
+    "reason_reduce": "降低过盛的{element}五行",
+    "reason_balance": "保持{element}五行平衡",
+    "diet_general": "根据五行平衡状态，调整饮食口味和成分，以达到调和阴阳、平衡五行的目的。",
+    "exercise_general": "根据五行平衡状态，选择适合的运动方式，以调节气血、平衡五行、增强体质。",
+    "exercise_frequency": "每周至少进行3-5次适度运动，每次30-60分钟，以达到最佳效果。"
+}
+
+
+def current_season(date=None):
+    """
+    获取季节代码
+
+    参数:
+        date: datetime / date / 'YYYY-MM-DD' 字符串，默认为当前时钟的日期
+
+    返回:
+        str: spring / summer / autumn / winter
+    """
+    month = clock.as_of(date, clock.MONTH).month
+    if 3 <= month <= 5:
+        return "spring"
+    elif 6 <= month <= 8:
+        return "summer"
+    elif 9 <= month <= 11:
+        return "autumn"
+    else:
+        return "winter"
+
+
+def load_json_data(filename, locale=None):
+    """
+    加载JSON数据文件，优先读取 data/<语言>/ 下的本地化版本
+
+    参数:
+        filename (str): JSON文件名
+        locale (str): 语言代码，默认为中文
+
+    返回:
+        dict: JSON数据
+    """
+    try:
+        data_file = DATA_DIR / filename
+        if locale and locale != DEFAULT_LOCALE and (DATA_DIR / locale / filename).exists():
+            data_file = DATA_DIR / locale / filename
+
+        with open(data_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception as e:
+        logger.warning(f"加载JSON文件{filename}出错: {e}")
+        # 返回空字典作为默认值
+        if filename == "five_elements_flavors.json":
+            return create_default_flavors()
+        elif filename == "five_elements_exercises.json":
+            return create_default_exercises()
+        elif filename == "diet_recipes.json":
+            return create_default_recipes()
+        else:
+            return {}
+
+
+def load_texts(locale=DEFAULT_LOCALE, section=LOCALE_SECTION, base=None):
+    """
+    加载文案，缺少的条目回退到中文
+
+    参数:
+        locale (str): 语言代码
+        section (str): locales/<语言>.json 中的键
+        base (dict, optional): 中文文案，默认为五行建议文案
+
+    返回:
+        dict: 文案
+    """
+    texts = copy.deepcopy(ZH_TEXTS if base is None else base)
+    if locale == DEFAULT_LOCALE:
+        return texts
+
+    locale_file = LOCALES_DIR / f"{locale}.json"
+    if not str(locale).isalnum() or not locale_file.exists():
+        raise ValueError(f"不支持的语言: {locale}")
+    with open(locale_file, 'r', encoding='utf-8') as f:
+        overrides = json.load(f).get(section, {})
+
+    def merge(base, override):
+        for key, value in override.items():
+            if isinstance(value, dict) and isinstance(base.get(key), dict):
+                merge(base[key], value)
+            else:
+                base[key] = value
+
+    merge(texts, overrides)
+    return texts
+
+
+class AdviceIndex:
+    """
+    单一语言的建议索引
+
+    饮食建议按 (最弱两行, 最强两行, 季节)、运动建议按 (最弱两行, 居中一行) 预先全部生成；
+    健康建议由预先生成的日主、季节和风险条目组合，组合结果按键缓存。
+    """
+
+    def __init__(self, locale=DEFAULT_LOCALE):
+        self.locale = locale
+        self.texts = load_texts(locale)
+        flavors = load_json_data("five_elements_flavors.json", locale)
+        exercises = load_json_data("five_elements_exercises.json", locale)
+        recipes = load_json_data("diet_recipes.json", locale)
+
+        self.diet = self._build_diet(flavors, recipes)
+        self.exercise = self._build_exercise(exercises)
+        self.risks = self._build_risks()
+        self._health = {}
+
+    def _name(self, element):
+        return self.texts["element_names"].get(element, element)
+
+    def _build_diet(self, flavors, recipes):
+        texts = self.texts
+        index = {}
+        for order in itertools.permutations(ELEMENTS):
+            weakest, strongest = order[:2], order[3:]
+            weakest_en = {ELEMENT_ENGLISH[e] for e in weakest}
+
+            recommended_flavors = []
+            for element in weakest:
+                data = flavors.get(ELEMENT_ENGLISH[element])
+                if data:
+                    recommended_flavors.append({
+                        "element": element,
+                        "flavor": data["flavor"],
+                        "effect": data["effect"],
+                        "nutrients": data["nutrients"],
+                        "reason": texts["reason_enhance"].format(element=self._name(element))
+                    })
+
+            avoid_flavors = []
+            for element in strongest:
+                data = flavors.get(ELEMENT_ENGLISH[element])
+                if data:
+                    avoid_flavors.append({
+                        "element": element,
+                        "flavor": data["flavor"],
+                        "reason": texts["reason_reduce"].format(element=self._name(element))
+                    })
+
+            for season in SEASONS:
+                # 根据弱势五行选择合适的食谱，只推荐最多3个
+                seasonal_recipes = [
+                    {"name": recipe["name"], "ingredients": recipe["ingredients"], "effect": recipe["effect"]}
+                    for recipe in recipes.get(season, [])
+                    if weakest_en.intersection(recipe.get("suitable_elements", []))
+                ][:3]
+                index[(weakest, strongest, season)] = freeze({
+                    "recommended_flavors": recommended_flavors,
+                    "avoid_flavors": avoid_flavors,
+                    "seasonal_recipes": seasonal_recipes,
+                    "general_advice": texts["diet_general"]
+                })
+        return index
+
+    def _build_exercise(self, exercises):
+        texts = self.texts
+        index = {}
+        for order in itertools.permutations(ELEMENTS, 3):
+            recommended_exercises = []
+            for position, element in enumerate(order):
+                data = exercises.get(ELEMENT_ENGLISH[element])
+                if data:
+                    reason = "reason_enhance" if position < 2 else "reason_balance"
+                    recommended_exercises.append({
+                        "element": element,
+                        "exercise_types": data["exercise_types"],
+                        "effect": data["effect"],
+                        "reason": texts[reason].format(element=self._name(element))
+                    })
+            index[(order[:2], order[2])] = freeze({
+                "recommended_exercises": recommended_exercises,
+                "general_advice": texts["exercise_general"],
+                "frequency_advice": texts["exercise_frequency"]
+            })
+        return index
+
+    def _build_risks(self):
+        texts = self.texts
+        separator = texts["list_separator"]
+        risks = {}
+        for element in ELEMENTS:
+            body = texts["body_systems"][element]
+            for risk in ("excess", "deficient"):
+                risks[(element, risk)] = freeze({
+                    "element": element,
+                    "affected_systems": body["systems"],
+                    "diseases": body["diseases"],
+                    "risk_type": texts["risk_types"][risk],
+                    "description": texts[f"risk_{risk}"].format(
+                        element=self._name(element),
+                        systems=separator.join(body["systems"]),
+                        diseases=separator.join(body["diseases"])
+                    )
+                })
+        return risks
+
+    def balance_description(self, balance_state, strongest, weakest):
+        """
+        平衡状态描述
+
+        参数:
+            balance_state (str): 平衡状态
+            strongest (str): 最强五行
+            weakest (str): 最弱五行
+
+        返回:
+            str: 描述
+        """
+        return self.texts["balance"][balance_state].format(
+            strongest=self._name(strongest), weakest=self._name(weakest)
+        )
+
+    def health_advice(self, day_master, season, excess, deficient, balance_state, strongest, weakest):
+        """
+        查询健康建议
+
+        参数:
+            day_master (str): 日主五行
+            season (str): 季节代码
+            excess (tuple): 过盛的五行（百分比 > 25）
+            deficient (tuple): 不足的五行（百分比 < 10）
+            balance_state (str): 平衡状态
+            strongest (str): 最强五行
+            weakest (str): 最弱五行
+
+        返回:
+            FrozenDict: 健康建议
+        """
+        key = (day_master, season, excess, deficient, balance_state, strongest, weakest)
+        advice = self._health.get(key)
+        if advice is None:
+            texts = self.texts
+            advice = FrozenDict({
+                "general_advice": texts["day_master"][day_master],
+                "seasonal_advice": texts["seasonal"][season][day_master],
+                "health_risks": tuple(self.risks[(e, "excess")] for e in excess)
+                                + tuple(self.risks[(e, "deficient")] for e in deficient),
+                "balance_recommendation": self.balance_description(balance_state, strongest, weakest),
+                "specific_recommendations": (
+                    texts["specific_enhance"].format(element=self._name(weakest)),
+                    texts["specific_control"].format(element=self._name(strongest))
+                )
+            })
+            self._health[key] = advice
+        return advice
+
+    def diet_advice(self, weakest, strongest, season):
+        """
+        查询饮食建议
+
+        参数:
+            weakest (tuple): 最弱的两个五行（由弱到强）
+            strongest (tuple): 最强的两个五行（由弱到强）
+            season (str): 季节代码
+
+        返回:
+            FrozenDict: 饮食建议
+        """
+        return self.diet[(weakest, strongest, season)]
+
+    def exercise_advice(self, weakest, balanced):
+        """
+        查询运动建议
+
+        参数:
+            weakest (tuple): 最弱的两个五行（由弱到强）
+            balanced (str): 居中的五行
+
+        返回:
+            FrozenDict: 运动建议
+        """
+        return self.exercise[(weakest, balanced)]
+
+
+@functools.lru_cache(maxsize=8)
+def get_advice_index(locale=DEFAULT_LOCALE):
+    """
+    获取指定语言的建议索引（首次调用时构建）
+
+    参数:
+        locale (str): 语言代码，对应 locales/<语言>.json
+
+    返回:
+        AdviceIndex: 建议索引
+    """
+    return AdviceIndex(locale)
+
+
+def create_default_flavors():
+    """创建默认的五行口味数据"""
+    return {
+        "wood": {
+            "flavor": "酸",
+            "effect": "收敛、固涩",
+            "nutrients": ["维生素C"],
+            "foods": ["柠檬", "醋"]
+        },
+        "fire": {
+            "flavor": "苦",
+            "effect": "清热、泻火",
+            "nutrients": ["维生素B"],
+            "foods": ["苦瓜", "茶叶"]
+        },
+        "earth": {
+            "flavor": "甘",
+            "effect": "补益、和中",
+            "nutrients": ["碳水化合物"],
+            "foods": ["大米", "土豆"]
+        },
+        "metal": {
+            "flavor": "辛",
+            "effect": "发散、行气",
+            "nutrients": ["挥发油"],
+            "foods": ["姜", "葱"]
+        },
+        "water": {
+            "flavor": "咸",
+            "effect": "软坚、润下",
+            "nutrients": ["钠"],
+            "foods": ["盐", "海带"]
+        }
+    }
+
+def create_default_exercises():
+    """创建默认的五行运动数据"""
+    return {
+        "wood": {
+            "exercise_types": ["伸展运动", "太极"],
+            "effect": "舒展筋络，疏肝理气",
+            "frequency": "每周3-4次"
+        },
+        "fire": {
+            "exercise_types": ["有氧运动", "慢跑"],
+            "effect": "促进血液循环，调节心肺功能",
+            "frequency": "每周4-5次"
+        },
+        "earth": {
+            "exercise_types": ["健走", "徒步旅行"],
+            "effect": "增强肌肉力量，促进消化吸收",
+            "frequency": "每天45-60分钟"
+        },
+        "metal": {
+            "exercise_types": ["呼吸训练", "冥想"],
+            "effect": "增强肺活量，调节呼吸系统",
+            "frequency": "每天3-4次"
+        },
+        "water": {
+            "exercise_types": ["力量训练", "举重"],
+            "effect": "增强骨密度，强健肾脏功能",
+            "frequency": "每周2-3次"
+        }
+    }
+
+def create_default_recipes():
+    """创建默认的季节食谱数据"""
+    return {
+        "spring": [
+            {
+                "name": "春季养肝汤",
+                "ingredients": ["豆芽", "香菇", "胡萝卜"],
+                "effect": "疏肝理气，滋养肝血",
+                "suitable_elements": ["wood", "water"]
+            }
+        ],
+        "summer": [
+            {
+                "name": "清爽绿豆汤",
+                "ingredients": ["绿豆", "薏米", "冰糖"],
+                "effect": "清热解暑，消暑利湿",
+                "suitable_elements": ["fire", "water"]
+            }
+        ],
+        "autumn": [
+            {
+                "name": "秋梨银耳汤",
+                "ingredients": ["雪梨", "银耳", "冰糖"],
+                "effect": "滋阴润肺，生津止咳",
+                "suitable_elements": ["metal", "water"]
+            }
+        ],
+        "winter": [
+            {
+                "name": "羊肉萝卜汤",
+                "ingredients": ["羊肉", "白萝卜", "姜片"],
+                "effect": "温阳散寒，补肾强身",
+                "suitable_elements": ["water", "fire"]
+            }
+        ]
+    }
@@ -3,370 +3,18 @@
 使用lunar_python库计算八字、流年、流月、大运、小运和神煞
 """
 
-def generate_text_report(report):
-    """
-    生成文本形式的命盘解读
-    
-    参数:
-        report (dict): 命盘报告数据
-    
-    返回:
-        str: 文本形式的命盘解读
-    """
-    lines = []
-    
-    # 基本信息
-    lines.append("===== 八字命盘解读 =====\n")
-    lines.append("[基本信息]")
-    lines.append(f"四柱八字: {report['basic_info']['four_pillars']}")
-    lines.append(f"天干: {report['basic_info']['gans']}")
-    lines.append(f"地支: {report['basic_info']['zhis']}")
-    lines.append(f"日主: {report['basic_info']['day_master']}")
-    lines.append(f"阳历: {report['basic_info']['solar_date']}")
-    lines.append(f"阴历: {report['basic_info']['lunar_date']}")
-    lines.append("")
-    
-    # 命盘分析
-    lines.append("[命盘分析]")
-    lines.append(f"日主强度: {report['pattern_analysis']['day_master_strength']} ({report['pattern_analysis']['day_master_percentage']:.2f}%)")
-    lines.append(f"五行平衡: {report['pattern_analysis']['balance_state']}")
-    lines.append(f"备注: {report['pattern_analysis']['balance_description']}")
-    lines.append(f"最强五行: {report['pattern_analysis']['strongest_element']}")
-    lines.append(f"最弱五行: {report['pattern_analysis']['weakest_element']}")
-    lines.append(f"用神: {report['pattern_analysis']['yong_shen']}")
-    lines.append(f"用神说明: {report['pattern_analysis']['yong_shen_explanation']}")
-    lines.append(f"用神天干: {report['pattern_analysis']['yong_gan']}")
-    lines.append(f"用神地支: {report['pattern_analysis']['yong_zhi']}")
-    lines.append("")
-    
-    # 当前大运
-    lines.append("[当前大运]")
-    if report['current_dayun']:
-        current_dayun = report['current_dayun']
-        lines.append(f"大运: {current_dayun['ganzhi']} {current_dayun['gan_shen']}{current_dayun['zhi_shen']}")
-        lines.append(f"年龄范围: {current_dayun['age_range']} 岁")
-        lines.append(f"纳音五行: {current_dayun['nayin']}")
-        
-        # 增加大运详细分析
-        day_master = report['basic_info']['day_master'].split()[0]
-        day_master_element = report['basic_info']['day_master'].split('(')[1].strip(')')
-        dayun_element = current_dayun['element']
-        yong_shen = report['pattern_analysis']['yong_shen'].split()[0]
-        
-        lines.append("\n[大运详细分析]")
-        
-        # 大运与日主的关系
-        if current_dayun['gan_shen']:
-            dayun_shishen = current_dayun['gan_shen']
-            lines.append(f"大运天干为{current_dayun['gan']}，十神为{dayun_shishen}，{get_relationship_by_shishen(dayun_shishen)}")
-            
-        if dayun_element == day_master_element:
-            lines.append(f"当前大运五行与日主相同，为比劫运，有增强日主力量的作用。")
-        elif is_generating(dayun_element, day_master_element):
-            lines.append(f"当前大运五行{dayun_element}生助日主{day_master_element}，为印枭运，对日主有滋养作用。")
-        elif is_generated(dayun_element, day_master_element):
-            lines.append(f"当前大运五行{dayun_element}由日主{day_master_element}所生，为食伤运，日主有泄气现象。")
-        elif is_controlling(dayun_element, day_master_element):
-            lines.append(f"当前大运五行{dayun_element}克制日主{day_master_element}，为官杀运，对日主有制约作用。")
-        elif is_controlled(dayun_element, day_master_element):
-            lines.append(f"当前大运五行{dayun_element}被日主{day_master_element}所克，为财星运，有助日主发挥克制力。")
-        
-        # 大运对格局的影响
-        if dayun_element == yong_shen:
-            lines.append(f"当前大运五行{dayun_element}与用神相同，对命局有较大助力。")
-        elif is_generating(dayun_element, yong_shen):
-            lines.append(f"当前大运五行{dayun_element}生助用神{yong_shen}，间接有利于命局。")
-        elif is_controlling(dayun_element, yong_shen):
-            lines.append(f"当前大运五行{dayun_element}克制用神{yong_shen}，可能对命局造成不利影响。")
-    else:
-        lines.append("尚未进入大运")
-    lines.append("")
-    
-    # 流年流月流日
-    lines.append("[当前流年流月流日]")
-    lines.append(f"流年: {report['current_info']['liunian']['ganzhi']} 十神: {report['current_info']['liunian']['gan_shen']}/{report['current_info']['liunian']['zhi_shen']}")
-    lines.append(f"流月: {report['current_info']['liuyue']['ganzhi']} 十神: {report['current_info']['liuyue']['gan_shen']}/{report['current_info']['liuyue']['zhi_shen']}")
-    lines.append(f"流日: {report['current_info']['liuri']['ganzhi']} 十神: {report['current_info']['liuri']['gan_shen']}/{report['current_info']['liuri']['zhi_shen']}")
-    
-    # 增加流年流月详细分析
-    day_master = report['basic_info']['day_master'].split()[0]
-    day_master_element = report['basic_info']['day_master'].split('(')[1].strip(')')
-    yong_shen = report['pattern_analysis']['yong_shen'].split()[0]
-    
-    lines.append("\n[流年流月详细分析]")
-    
-    # 流年分析
-    liunian_gz = report['current_info']['liunian']['ganzhi']
-    liunian_gan = liunian_gz[0]  # 流年天干
-    liunian_gan_element = get_element(liunian_gan)
-    liunian_gan_shen = report['current_info']['liunian']['gan_shen']
-    
-    lines.append(f"流年天干{liunian_gan}十神为{liunian_gan_shen}，{get_relationship_by_shishen(liunian_gan_shen)}")
-    
-    if is_generating(liunian_gan_element, day_master_element):
-        lines.append(f"流年天干{liunian_gan}({liunian_gan_element})生助日主，为印枭格局，有滋养作用。")
-    elif is_generated(liunian_gan_element, day_master_element):
-        lines.append(f"流年天干{liunian_gan}({liunian_gan_element})被日主所生，为食伤格局，日主有泄气现象。")
-    elif is_controlling(liunian_gan_element, day_master_element):
-        lines.append(f"流年天干{liunian_gan}({liunian_gan_element})克制日主，为官杀格局，需注意克制力度。")
-    elif is_controlled(liunian_gan_element, day_master_element):
-        lines.append(f"流年天干{liunian_gan}({liunian_gan_element})被日主所克，为财星格局，日主有发挥余地。")
-    elif liunian_gan_element == day_master_element:
-        lines.append(f"流年天干{liunian_gan}({liunian_gan_element})与日主同五行，为比劫格局，增强日主力量。")
-        
-    # 流月分析
-    liuyue_gz = report['current_info']['liuyue']['ganzhi']
-    liuyue_gan = liuyue_gz[0]  # 流月天干
-    liuyue_gan_element = get_element(liuyue_gan)
-    liuyue_gan_shen = report['current_info']['liuyue']['gan_shen']
-    
-    lines.append(f"\n流月{liuyue_gz}十神为{liuyue_gan_shen}，{get_relationship_by_shishen(liuyue_gan_shen)}")
-    
-    if is_generating(liuyue_gan_element, day_master_element):
-        lines.append(f"流月天干{liuyue_gan}({liuyue_gan_element})生助日主，本月较为顺利，有助力。")
-    elif is_controlling(liuyue_gan_element, day_master_element):
-        lines.append(f"流月天干{liuyue_gan}({liuyue_gan_element})克制日主，本月可能有阻力，需谨慎应对。")
-    elif liuyue_gan_element == day_master_element:
-        lines.append(f"流月天干{liuyue_gan}({liuyue_gan_element})与日主同五行，本月力量增强，但需避免冲动。")
-    
-    # 流年与流月组合分析
-    lines.append("\n流年流月组合分析：")
-    if liunian_gan_element == liuyue_gan_element:
-        lines.append(f"流年与流月五行相同，都是{liunian_gan_element}，相互增强，影响更为明显。")
-    elif is_generating(liunian_gan_element, liuyue_gan_element):
-        lines.append(f"流年{liunian_gan_element}生助流月{liuyue_gan_element}，有利于长期计划在本月落实。")
-    elif is_controlling(liunian_gan_element, liuyue_gan_element):
-        lines.append(f"流年{liunian_gan_element}克制流月{liuyue_gan_element}，可能导致计划受阻，需灵活调整。")
-        
-    # 流年流月与用神关系分析
-    lines.append(f"\n流年流月与用神({yong_shen})的关系：")
-    
-    if liunian_gan_element == yong_shen:
-        lines.append(f"流年五行与用神相同，今年对命主较为有利。")
-    elif is_generating(liunian_gan_element, yong_shen):
-        lines.append(f"流年五行{liunian_gan_element}生助用神{yong_shen}，间接有利于命局发展。")
-    
-    if liuyue_gan_element == yong_shen:
-        lines.append(f"流月五行与用神相同，本月机会较多，可积极把握。")
-    elif is_controlling(liuyue_gan_element, yong_shen):
-        lines.append(f"流月五行{liuyue_gan_element}克制用神{yong_shen}，本月需谨慎行事，避免损耗。")
-    
-    lines.append("")
-    
-    # 神煞信息
-    lines.append("[神煞信息]")
-    if report['shensha_info']:
-        for shensha in report['shensha_info']:
-            lines.append(f"{shensha['name']}: {shensha['description']}")
-        
-        # 神煞分析增强
-        lines.append("\n[神煞详细分析]")
-        
-        # 分类收集神煞
-        ji_shen = []  # 吉神
-        xiong_shen = []  # 凶神
-        
-        for shensha in report['shensha_info']:
-            if shensha['name'] in ["天德", "月德", "福神", "喜神", "红艳"]:
-                ji_shen.append(shensha)
-            elif shensha['name'] in ["天羊", "天刚", "灾煞", "劫煞", "岂煞", "屿煞"]:
-                xiong_shen.append(shensha)
-        
-        # 吉神分析
-        if ji_shen:
-            lines.append("吉神分析：")
-            for shen in ji_shen:
-                lines.append(f"  - {shen['name']}在{shen['position']}柱: {shen['description']}")
-            if len(ji_shen) >= 2:
-                lines.append("  多个吉神同时存在，有利于提升命主运势。")
-        
-        # 凶神分析
-        if xiong_shen:
-            lines.append("凶神分析：")
-            for shen in xiong_shen:
-                lines.append(f"  - {shen['name']}在{shen['position']}柱: {shen['description']}")
-                
-            if len(xiong_shen) >= 2:
-                lines.append("  多个凶神同时存在，需谨慎应对可能的挑战。")
-                
-        # 吉凶神比较
-        if ji_shen and xiong_shen:
-            if len(ji_shen) > len(xiong_shen):
-                lines.append("吉神多于凶神，总体而言吉多于凶，命主运势较佳。")
-            elif len(ji_shen) < len(xiong_shen):
-                lines.append("凶神多于吉神，需谨慎行事，提高警惕。")
-            else:
-                lines.append("吉凶神数量相当，运势喜忧参半，宜谨慎中求发展。")
-                
-        # 神煞与日主年柱的关系
-        day_pillar_shensha = [shen for shen in report['shensha_info'] if shen['position'] == "日"]
-        year_pillar_shensha = [shen for shen in report['shensha_info'] if shen['position'] == "年"]
-        
-        if day_pillar_shensha:
-            lines.append("日柱神煞分析：")
-            day_ji_shen = [shen for shen in day_pillar_shensha if shen['name'] in ["天德", "月德", "福神", "喜神"]]
-            day_xiong_shen = [shen for shen in day_pillar_shensha if shen['name'] in ["天羊", "天刚", "灾煞", "劫煞"]]
-            
-            if day_ji_shen:
-                lines.append("  日柱吉神在人格上起到正面作用，表示人格积极向上。")
-            if day_xiong_shen:
-                lines.append("  日柱凶神影响个人性格发展，需注意自身修养。")
-                
-        if year_pillar_shensha:
-            lines.append("年柱神煞分析：")
-            year_ji_shen = [shen for shen in year_pillar_shensha if shen['name'] in ["天德", "月德", "福神", "喜神"]]
-            year_xiong_shen = [shen for shen in year_pillar_shensha if shen['name'] in ["天羊", "天刚", "灾煞", "劫煞"]]
-            
-            if year_ji_shen:
-                lines.append("  年柱吉神对祖辈运势或父母影响较为有利。")
-            if year_xiong_shen:
-                lines.append("  年柱凶神可能暗示和家族长辈关系有挑战。")
-    else:
-        lines.append("无神煞信息")
-    lines.append("")
-    
-    # 特殊格局
-    lines.append("[特殊格局分析]")
-    special_patterns = report['pattern_analysis'].get('special_patterns', {})
-    
-    # 三合格局
-    if special_patterns and 'san_he' in special_patterns and special_patterns['san_he']:
-        lines.append("三合格局：")
-        for pattern in special_patterns['san_he']:
-            lines.append(f"  - {pattern['name']}: {pattern['description']}")
-    
-    # 三会格局
-    if special_patterns and 'san_hui' in special_patterns and special_patterns['san_hui']:
-        lines.append("三会格局：")
-        for pattern in special_patterns['san_hui']:
-            lines.append(f"  - {pattern['name']}: {pattern['description']}")
-    
-    # 冠带格局
-    if special_patterns and 'guan_xin' in special_patterns and special_patterns['guan_xin']:
-        lines.append("冠带格局：")
-        for pattern in special_patterns['guan_xin']:
-            lines.append(f"  - {pattern['name']}: {pattern['description']}")
-            
-    if not special_patterns or (not special_patterns.get('san_he') and 
-                              not special_patterns.get('san_hui') and
-                              not special_patterns.get('guan_xin')):
-        lines.append("无特殊格局")
-    lines.append("")
-    
-    # 纳音五行
-    lines.append("[纳音五行]")
-    for position, nayin in report['nayin'].items():
-        lines.append(f"{position}: {nayin}")
-    lines.append("")
-    
-    # 特殊信息
-    lines.append("[特殊信息]")
-    lines.append(f"命宫: {report['special']['ming_gong']}")
-    lines.append(f"胎元: {report['special']['tai_yuan']}")
-    lines.append("")
-    
-    # 大运流年分析指导
-    lines.append("[命盘总体解读与指导]")
-    if report['pattern_analysis']['day_master_strength'] in ['旺', '偏旺']:
-        # 日主旺的年份
-        lines.append("日主过旺，适合濒身或耗身的运势：")
-        lines.append(f"1. 法子：可选择{report['pattern_analysis']['yong_shen']}的年份，帮助平衡日主。")
-        lines.append(f"2. 避免过于旺盛的日主({report['basic_info']['day_master'].split()[0]})年份。")
-        lines.append(f"3. 理想的大运流年应有充足的{report['pattern_analysis']['yong_shen']}手法强。")
-        lines.append(f"4. 当大运为{report['pattern_analysis']['yong_shen']}五行时，可找对应行业发展。")
-    elif report['pattern_analysis']['day_master_strength'] in ['弱', '偏弱']:
-        # 日主弱的年份
-        lines.append("日主过弱，适合滋身或扩张的运势：")
-        lines.append(f"1. 法子：可选择{report['pattern_analysis']['yong_shen']}的年份，提升日主力量。")
-        lines.append(f"2. 避免克法日主({report['basic_info']['day_master'].split()[0]})的年份。")
-        lines.append(f"3. 理想的大运流年应有充足的{report['pattern_analysis']['yong_shen']}手法。")
-        lines.append(f"4. 适合在{report['pattern_analysis']['yong_shen']}年份开始新的项目或事业。")
-    else:
-        # 日主中和
-        lines.append("日主强度适中，可选择平衡发展的运势：")
-        lines.append(f"1. 保持当前的平衡状态，不过分強调任何五行。")
-        lines.append("2. 可适当发展五行中较弱的部分。")
-        lines.append("3. 避免增强已经过强的五行。")
-        lines.append("4. 各类大运都能找到宝贵之处，关键是保持平衡而不破坏和谐。")
-        
-    # 可适合行业分析
-    elements_career = {
-        "木": ["教育", "出版", "文化", "艺术", "园林", "农业"],
-        "火": ["餐饮", "娱乐", "美容", "科技", "电子", "职业马拉松"],
-        "土": ["房地产", "建筑", "金融", "养殖", "保险", "物流"],
-        "金": ["机械", "计算机", "技术", "名牌集团", "法律", "额财经贸"],
-        "水": ["旅游", "运输", "船只", "鱼类", "文学", "策划", "咨询"]
-    }
-    
-    # 找出最弱的五行和用神五行，推荐行业
-    weakest_element = report['pattern_analysis']['weakest_element'].split()[0]
-    yong_shen_element = report['pattern_analysis']['yong_shen'].split()[0]
-    
-    lines.append("\n[行业建议]")
-    
-    # 根据日主强度推荐行业
-    if report['pattern_analysis']['day_master_strength'] in ['旺', '偏旺']:
-        # 日主旺，用克日主或泄日主的行业
-        if yong_shen_element in elements_career:
-            lines.append(f"日主过旺，适合的行业有：{', '.join(elements_career[yong_shen_element])}等。")
-    elif report['pattern_analysis']['day_master_strength'] in ['弱', '偏弱']:
-        # 日主弱，用生日主或按日主的行业
-        if yong_shen_element in elements_career:
-            lines.append(f"日主过弱，适合的行业有：{', '.join(elements_career[yong_shen_element])}等。")
-    else:
-        # 日主中和，推荐最弱五行的行业来平衡
-        if weakest_element in elements_career:
-            lines.append(f"日主较为中和，适合发展较弱的{weakest_element}行业，如：{', '.join(elements_career[weakest_element])}等。")
-    
-    # 增加个人发展建议
-    lines.append("\n[个人发展建议]")
-    day_master_element = report['basic_info']['day_master'].split('(')[1].strip(')')
-    
-    element_traits = {
-        "木": {
-            "优点": ["创意思考", "计划能力", "高瓶顶格局"],
-            "注意": ["避免激进", "避免因小失大", "保持思考开阔"]
-        },
-        "火": {
-            "优点": ["领导能力", "社交力", "高热情"],
-            "注意": ["避免过度燃烧", "基础性事务不要忽略", "控制情绪波动"]
-        },
-        "土": {
-            "优点": ["稳定可靠", "如意穷追不舍", "良好人际关系"],
-            "注意": ["避免心态保守", "逻辑思维", "要勇于创新"]
-        },
-        "金": {
-            "优点": ["细致分析力", "严格要求", "好的执行力"],
-            "注意": ["避免过于刃锋", "与人交错不能太生硬", "灵活应对变化"]
-        },
-        "水": {
-            "优点": ["智慧相通", "围魂破解", "好奇心强"],
-            "注意": ["避免心理上的迷失", "没有辰信力", "不要太过理想化"]
-        }
-    }
-    
-    if day_master_element in element_traits:
-        traits = element_traits[day_master_element]
-        lines.append(f"日主五行属性为{day_master_element}，有以下优势：")
-        for trait in traits["优点"]:
-            lines.append(f"  - {trait}")
-        lines.append(f"\n需要注意以下方面：")
-        for trait in traits["注意"]:
-            lines.append(f"  - {trait}")
-    
-    return "\n".join(lines)
-
-import datetime
+import itertools
 from collections import Counter
 from lunar_python import Solar, Lunar
 
 from .calculator import (
-    get_element, get_element_english, get_default_location
+    geocode_city, get_element, get_element_english, get_default_location, validate_birth_time
 )
 from .lunar_extension import LunarExtension
-from .lunar_extension import LunarExtension
-import requests
-from geopy.geocoders import Nominatim
+from .relations import GAN_BIT, duplicate_mask, find_relations, is_empty, mask_of, match_rules
+# 报告生成在 report 包中，这里保留旧的导入路径
+from .report import generate_bazi_report, generate_text_report
+from models import clock, errors, timing
 
 
 def get_empty(day_gz, zhi):
@@ -380,40 +28,7 @@ def get_empty(day_gz, zhi):
     返回:
         bool: 是否空亡
     """
-    # 天干地支对应的六十甲子序号
-    jiazi_index = {
-        "甲子": 1, "乙丑": 2, "丙寅": 3, "丁卯": 4, "戊辰": 5, "己巳": 6, "庚午": 7, "辛未": 8, "壬申": 9, "癸酉": 10,
-        "甲戌": 11, "乙亥": 12, "丙子": 13, "丁丑": 14, "戊寅": 15, "己卯": 16, "庚辰": 17, "辛巳": 18, "壬午": 19, "癸未": 20,
-        "甲申": 21, "乙酉": 22, "丙戌": 23, "丁亥": 24, "戊子": 25, "己丑": 26, "庚寅": 27, "辛卯": 28, "壬辰": 29, "癸巳": 30,
-        "甲午": 31, "乙未": 32, "丙申": 33, "丁酉": 34, "戊戌": 35, "己亥": 36, "庚子": 37, "辛丑": 38, "壬寅": 39, "癸卯": 40,
-        "甲辰": 41, "乙巳": 42, "丙午": 43, "丁未": 44, "戊申": 45, "己酉": 46, "庚戌": 47, "辛亥": 48, "壬子": 49, "癸丑": 50,
-        "甲寅": 51, "乙卯": 52, "丙辰": 53, "丁巳": 54, "戊午": 55, "己未": 56, "庚申": 57, "辛酉": 58, "壬戌": 59, "癸亥": 60
-    }
-    
-    # 计算空亡地支
-    if day_gz in jiazi_index:
-        index = jiazi_index[day_gz] % 10  # 取余确定所在旬
-        if index == 0:
-            index = 10
-        
-        # 旬空地支列表
-        xun_kong = {
-            1: ["戌", "亥"],  # 甲子旬
-            2: ["申", "酉"],  # 甲戌旬
-            3: ["午", "未"],  # 甲申旬
-            4: ["辰", "巳"],  # 甲午旬
-            5: ["寅", "卯"],  # 甲辰旬
-            6: ["子", "丑"],  # 甲寅旬
-            7: ["戌", "亥"],  # 甲子旬
-            8: ["申", "酉"],  # 甲戌旬
-            9: ["午", "未"],  # 甲申旬
-            10: ["辰", "巳"] # 甲午旬
-        }
-        
-        # 检查是否空亡
-        return zhi in xun_kong.get(index, [])
-    
-    return False
+    return is_empty(day_gz, zhi)
 
 
 def check_gan_he(gans):
@@ -427,44 +42,24 @@ def check_gan_he(gans):
         list: 合化信息列表
     """
     he_result = []
-    
-    # 天干合化规则
-    gan_he = {
-        ("甲", "己"): {"element": "土", "description": "中正之合"},
-        ("乙", "庚"): {"element": "金", "description": "仁义之合"},
-        ("丙", "辛"): {"element": "水", "description": "威制之合"},
-        ("丁", "壬"): {"element": "木", "description": "淫慝之合"},
-        ("戊", "癸"): {"element": "火", "description": "无情之合"}
-    }
-    
-    # 检查四柱中的天干合化
-    for i in range(len(gans)):
-        for j in range(i+1, len(gans)):
-            pair = (gans[i], gans[j])
-            if pair in gan_he:
-                he_info = gan_he[pair]
-                he_result.append({
-                    "gan1": gans[i],
-                    "gan2": gans[j],
-                    "position1": ["年", "月", "日", "时"][i],
-                    "position2": ["年", "月", "日", "时"][j],
-                    "element": he_info["element"],
-                    "description": he_info["description"]
-                })
-            # 检查反向合化
-            pair_reverse = (gans[j], gans[i])
-            if pair_reverse in gan_he:
-                he_info = gan_he[pair_reverse]
-                he_result.append({
-                    "gan1": gans[j],
-                    "gan2": gans[i],
-                    "position1": ["年", "月", "日", "时"][j],
-                    "position2": ["年", "月", "日", "时"][i],
-                    "element": he_info["element"],
-                    "description": he_info["description"]
-                })
-    
-    return he_result
+    positions = ["年", "月", "日", "时"]
+    
+    for rule, _ in match_rules(mask_of(gans, GAN_BIT), 0, kinds=("gan_he",)):
+        first, second = rule.members
+        for i, j in itertools.product(range(len(gans)), repeat=2):
+            if gans[i] == first and gans[j] == second:
+                he_result.append((min(i, j), max(i, j), {
+                    "gan1": first,
+                    "gan2": second,
+                    "position1": positions[i],
+                    "position2": positions[j],
+                    "element": rule.element,
+                    "description": rule.description
+                }))
+    
+    # 按柱位先后排列
+    he_result.sort(key=lambda item: item[:2])
+    return [item[2] for item in he_result]
 
 
 def determine_zhi_element(zhi):
@@ -856,27 +451,16 @@ def check_sanhe(zhis):
     返回:
         str: 三合局类型，没有则返回空字符串
     """
-    # 定义三合局
-    sanhe = {
-        "水": set(["申", "子", "辰"]),
-        "木": set(["亥", "卯", "未"]),
-        "火": set(["寅", "午", "戌"]),
-        "金": set(["巳", "酉", "丑"])
-    }
-    
-    # 将地支转为集合，检查是否包含三合局中的至少两个
-    zhis_set = set(zhis)
-    for element, zhi_set in sanhe.items():
-        common = zhis_set.intersection(zhi_set)
-        if len(common) >= 2:
-            return element
+    # 包含三合局中的至少两个地支即成立
+    for rule, _ in match_rules(0, mask_of(zhis), kinds=("san_he",)):
+        return rule.element
     
     return ""
 
 
 def analyze_special_patterns(zhis):
     """
-    分析特殊地支格局（三会、三合、冠带等）
+    分析特殊地支格局（三会、三合、六冲、六合、刑、害、冠带等）
     
     参数:
         zhis (list): 四柱地支
@@ -890,51 +474,24 @@ def analyze_special_patterns(zhis):
         "chong": [],    # 冲
         "hui": [],      # 会
         "he": [],       # 合
+        "xing": [],     # 刑
+        "hai": [],      # 害
         "guan_xin": []  # 冠心格局
     }
     
-    # 检查三合格局
-    san_he_patters = {
-        "水三合": ["子", "申", "辰"],
-        "木三合": ["亥", "卯", "未"],
-        "火三合": ["寅", "午", "戌"],
-        "金三合": ["巳", "酉", "丑"]
-    }
-    
-    for pattern_name, pattern_zhis in san_he_patters.items():
-        matched = [zhi for zhi in zhis if zhi in pattern_zhis]
-        if len(matched) >= 2:  # 至少匹配两个
-            element = pattern_name[0]  # 获取五行属性（第一个字）
-            result["san_he"].append({
-                "name": pattern_name,
-                "element": element,
-                "matched": matched,
-                "description": f"有{pattern_name}矩阵，产生{element}气形成灵动合力。"
-            })
-    
-    # 检查三会格局
-    san_hui_patterns = {
-        "东方三会": ["寅", "卯", "辰"],  # 东方木局
-        "南方三会": ["巳", "午", "未"],  # 南方火局
-        "西方三会": ["申", "酉", "戌"],  # 西方金局
-        "北方三会": ["亥", "子", "丑"]   # 北方水局
-    }
-    
-    for pattern_name, pattern_zhis in san_hui_patterns.items():
-        matched = [zhi for zhi in zhis if zhi in pattern_zhis]
-        if len(matched) >= 2:  # 至少匹配两个
-            element = "木" if pattern_name.startswith("东") else \
-                     "火" if pattern_name.startswith("南") else \
-                     "金" if pattern_name.startswith("西") else "水"
-            result["san_hui"].append({
-                "name": pattern_name,
-                "element": element,
-                "matched": matched,
-                "description": f"有{pattern_name}矩阵，产生{element}气彼此力量聚集。"
-            })
+    keys = {"san_he": "san_he", "san_hui": "san_hui", "liu_chong": "chong",
+            "liu_he": "he", "xing": "xing", "liu_hai": "hai"}
+    for rule, _ in match_rules(0, mask_of(zhis), duplicate_mask(zhis), kinds=keys):
+        matched = [zhi for zhi in zhis if zhi in rule.members]
+        result[keys[rule.kind]].append({
+            "name": rule.name,
+            "element": rule.element,
+            "matched": matched,
+            "description": rule.description
+        })
             
-    # 检查月柱冠带
-    if "东" in zhis and "辰" in zhis:
+    # 检查冠带（卯辰同见）
+    if "卯" in zhis and "辰" in zhis:
         result["guan_xin"].append({
             "name": "冠带格局",
             "positions": ["卯", "辰"],
@@ -1015,6 +572,7 @@ day_shens = {
 }
 
 
+@timing.timed("bazi.calculate")
 def calculate_bazi(birth_year, birth_month, birth_day, birth_hour, gender, city=None):
     """
     计算八字及相关信息
@@ -1028,41 +586,50 @@ def calculate_bazi(birth_year, birth_month, birth_day, birth_hour, gender, city=
         city (str, optional): 出生城市, 默认为None, 将通过IP获取当前位置
     
     返回:
-        dict: 包含八字、四柱五行、流年、流月、大运、小运、神煞的字典
+        dict: 包含八字、四柱五行、流年、流月、大运、小运、神煞的字典；issues 为计算中的
+            错误与警告（degraded 列出结果不完整的章节）。出生信息无效或整体计算失败时
+            返回包含 error / error_type / message / issues 的字典
     """
+    issues = errors.Issues()
     try:
-        # 获取位置信息
-        if city is None:
-            latitude, longitude = get_default_location()
-        else:
-            if isinstance(city, str):
-                geolocator = Nominatim(user_agent="curecipher")
-                location = geolocator.geocode(city)
-                if location:
-                    latitude, longitude = location.latitude, location.longitude
-                else:
-                    # 如果找不到城市，使用默认值
-                    print(f"找不到城市 {city}，使用默认值")
-                    latitude, longitude = get_default_location()
+        validate_birth_time(birth_year, birth_month, birth_day, birth_hour)
+
+        with timing.span("bazi.geocode"):
+            # 获取位置信息
+            if city is None:
+                latitude, longitude = get_default_location()
             else:
-                # 假设city是一个包含经纬度的元组或列表
-                latitude, longitude = city
+                if isinstance(city, str):
+                    # 找不到城市或地理编码服务不可用时使用默认位置
+                    location = None
+                    with issues.guard("location", errors.WARNING):
+                        location = geocode_city(city)
+                        if not location:
+                            issues.warn("location", f"找不到城市 {city}，使用默认位置", kind="CityNotFound", degraded=True)
+                    if location:
+                        latitude, longitude = location.latitude, location.longitude
+                    else:
+                        latitude, longitude = get_default_location()
+                else:
+                    # 假设city是一个包含经纬度的元组或列表
+                    latitude, longitude = city
         
-        # 创建Solar对象（阳历）
-        solar = Solar.fromYmdHms(birth_year, birth_month, birth_day, birth_hour, 0, 0)
-        # 注意: 新版lunar_python可能不支持设置经纬度
-        # solar.setLongitude(longitude)
-        # solar.setLatitude(latitude)
+        with timing.span("bazi.lunar"):
+            # 创建Solar对象（阳历）
+            solar = Solar.fromYmdHms(birth_year, birth_month, birth_day, birth_hour, 0, 0)
+            # 注意: 新版lunar_python可能不支持设置经纬度
+            # solar.setLongitude(longitude)
+            # solar.setLatitude(latitude)
         
-        # 转换为Lunar对象（阴历）
-        lunar = solar.getLunar()
+            # 转换为Lunar对象（阴历）
+            lunar = solar.getLunar()
         
-        # 获取八字
-        bazi = lunar.getEightChar()
-        year_gz = bazi.getYear()
-        month_gz = bazi.getMonth()
-        day_gz = bazi.getDay()
-        hour_gz = bazi.getTime()
+            # 获取八字
+            bazi = lunar.getEightChar()
+            year_gz = bazi.getYear()
+            month_gz = bazi.getMonth()
+            day_gz = bazi.getDay()
+            hour_gz = bazi.getTime()
         
         # 提取天干地支
         year_gan = year_gz[0]
@@ -1081,247 +648,249 @@ def calculate_bazi(birth_year, birth_month, birth_day, birth_hour, gender, city=
         # 日主
         me = day_gan
         
-        # 计算天干十神
-        gan_shens = []
-        for item in gans:
-            gan_shens.append(ten_deities[me][item])
+        with timing.span("bazi.ten_gods"):
+            # 计算天干十神
+            gan_shens = []
+            for item in gans:
+                gan_shens.append(ten_deities[me][item])
         
-        # 计算地支藏干十神
-        zhi_shens = []
-        for item in zhis:
-            hidden_gans = zhi5[item]
-            if hidden_gans:
-                max_energy_gan = max(hidden_gans, key=hidden_gans.get)
-                zhi_shens.append(ten_deities[me][max_energy_gan])
-            else:
-                zhi_shens.append("")
+            # 计算地支藏干十神
+            zhi_shens = []
+            for item in zhis:
+                hidden_gans = zhi5[item]
+                if hidden_gans:
+                    max_energy_gan = max(hidden_gans, key=hidden_gans.get)
+                    zhi_shens.append(ten_deities[me][max_energy_gan])
+                else:
+                    zhi_shens.append("")
         
-        # 计算地支全部藏干的十神
-        zhi_shens_all = []
-        for item in zhis:
-            hidden_shens = []
-            for gan, value in zhi5[item].items():
-                if value > 0:  # 只考虑权重大于0的天干
-                    hidden_shens.append(ten_deities[me][gan])
-            zhi_shens_all.append(hidden_shens)
+            # 计算地支全部藏干的十神
+            zhi_shens_all = []
+            for item in zhis:
+                hidden_shens = []
+                for gan, value in zhi5[item].items():
+                    if value > 0:  # 只考虑权重大于0的天干
+                        hidden_shens.append(ten_deities[me][gan])
+                zhi_shens_all.append(hidden_shens)
         
-        # 计算五行得分
-        scores = {"金": 0, "木": 0, "水": 0, "火": 0, "土": 0}
+            # 计算五行得分
+            scores = {"金": 0, "木": 0, "水": 0, "火": 0, "土": 0}
         
-        # 天干五行得分
-        for item in gans:
-            scores[gan5[item]] += 5
+            # 天干五行得分
+            for item in gans:
+                scores[gan5[item]] += 5
         
-        # 地支藏干五行得分
-        for item in zhis:
-            for gan, weight in zhi5[item].items():
-                scores[gan5[gan]] += weight / 20  # 归一化
+            # 地支藏干五行得分
+            for item in zhis:
+                for gan, weight in zhi5[item].items():
+                    scores[gan5[gan]] += weight / 20  # 归一化
         
-        # 检查空亡
-        empties = []
-        day_gz_str = day_gan + day_zhi
-        for zhi in zhis:
-            empty = get_empty(day_gz_str, zhi)
-            empties.append(empty)
+            # 检查空亡
+            empties = []
+            day_gz_str = day_gan + day_zhi
+            for zhi in zhis:
+                empty = get_empty(day_gz_str, zhi)
+                empties.append(empty)
         
-        # 检查天干合化
-        gan_hes = check_gan_he(gans)
+            # 检查天干合化
+            gan_hes = check_gan_he(gans)
         
-        # 计算大运
-        gender_code = 1 if gender.lower() == "male" else 0
-        try:
-            # 尝试使用新API
-            dayun_data = bazi.getDaYun(gender_code)
-        except AttributeError:
-            # 兼容处理：如果未找到getDaYun方法，创建一个空的大运列表
-            # 不输出警告，静默处理
-            dayun_data = []
+        with timing.span("bazi.dayun"):
+            # 计算大运
+            gender_code = 1 if gender.lower() == "male" else 0
+            try:
+                # 尝试使用新API
+                dayun_data = bazi.getDaYun(gender_code)
+            except AttributeError:
+                # 兼容处理：如果未找到getDaYun方法，创建一个空的大运列表
+                # 不输出警告，静默处理
+                dayun_data = []
         
-        # 使用LunarExtension计算大运
-        lunar_ext = LunarExtension(lunar=lunar)
+            # 使用LunarExtension计算大运
+            lunar_ext = LunarExtension(lunar=lunar)
         
-        # 计算起运年龄和时间
-        start_age = 0
-        start_year = datetime.datetime.now().year
+            # 计算起运年龄和时间
+            start_age = 0
+            start_year = clock.now().year
         
-        # 处理大运数据
-        dayuns = []
-        gender_code = 1 if gender.lower() == "male" else 0
+            # 处理大运数据
+            dayuns = []
+            gender_code = 1 if gender.lower() == "male" else 0
         
-        try:
-            # 使用lunar_extension计算大运
-            dayun_list = lunar_ext.get_day_un(gender_code=gender_code)
+            with issues.guard("dayun"):
+                # 使用lunar_extension计算大运
+                dayun_list = lunar_ext.get_day_un(gender_code=gender_code)
             
-            # 如果计算成功，处理大运数据
-            if dayun_list:
-                # 获取起运年龄
-                if dayun_list and len(dayun_list) > 0:
-                    start_age = dayun_list[0]['start_age']
-                    start_year = birth_year + start_age
+                # 如果计算成功，处理大运数据
+                if dayun_list:
+                    # 获取起运年龄
+                    if dayun_list and len(dayun_list) > 0:
+                        start_age = dayun_list[0]['start_age']
+                        start_year = birth_year + start_age
                 
-                # 处理大运数据
-                for i, yun in enumerate(dayun_list):
-                    dayun_gz = yun['gan_zhi']
-                    dayun_start_age = yun['start_age']
-                    dayun_end_age = yun['end_age']  # 结束年龄
+                    # 处理大运数据
+                    for i, yun in enumerate(dayun_list):
+                        dayun_gz = yun['gan_zhi']
+                        dayun_start_age = yun['start_age']
+                        dayun_end_age = yun['end_age']  # 结束年龄
                     
-                    # 大运天干地支
-                    dayun_gan = dayun_gz[0]
-                    dayun_zhi = dayun_gz[1]
+                        # 大运天干地支
+                        dayun_gan = dayun_gz[0]
+                        dayun_zhi = dayun_gz[1]
                     
-                    # 大运天干地支的十神
-                    dayun_gan_shen = ten_deities[me][dayun_gan]
+                        # 大运天干地支的十神
+                        dayun_gan_shen = ten_deities[me][dayun_gan]
                     
-                    # 地支藏干
-                    hidden_gans = zhi5[dayun_zhi]
-                    if hidden_gans:
-                        max_energy_gan = max(hidden_gans, key=hidden_gans.get)
-                        dayun_zhi_shen = ten_deities[me][max_energy_gan]
-                    else:
-                        dayun_zhi_shen = ""
+                        # 地支藏干
+                        hidden_gans = zhi5[dayun_zhi]
+                        if hidden_gans:
+                            max_energy_gan = max(hidden_gans, key=hidden_gans.get)
+                            dayun_zhi_shen = ten_deities[me][max_energy_gan]
+                        else:
+                            dayun_zhi_shen = ""
                     
-                    # 生克关系
-                    element_relation = gan5
+                        # 生克关系
+                        element_relation = gan5
                     
-                    dayuns.append({
-                        "ganzhi": dayun_gz,
-                        "gan": dayun_gan,
-                        "zhi": dayun_zhi,
-                        "gan_shen": dayun_gan_shen,
-                        "zhi_shen": dayun_zhi_shen,
-                        "start_age": dayun_start_age,
-                        "end_age": dayun_end_age,
-                        "element": gan5[dayun_gan],
-                        "nayin": nayin_wuxing.get(dayun_gz, "")
-                    })
-            
-        except Exception as e:
-            print(f"计算大运时出错: {e}")
-            # 静默处理，不输出警告
-            pass
+                        dayuns.append({
+                            "ganzhi": dayun_gz,
+                            "gan": dayun_gan,
+                            "zhi": dayun_zhi,
+                            "gan_shen": dayun_gan_shen,
+                            "zhi_shen": dayun_zhi_shen,
+                            "start_age": dayun_start_age,
+                            "end_age": dayun_end_age,
+                            "element": gan5[dayun_gan],
+                            "nayin": nayin_wuxing.get(dayun_gz, "")
+                        })
         
-        # 获取当前大运
-        current_age = datetime.datetime.now().year - birth_year
-        current_dayun = None
+            # 获取当前大运
+            current_age = clock.now().year - birth_year
+            current_dayun = None
         
-        if dayuns:  # 只有当大运列表非空时才进行处理
-            for i, yun in enumerate(dayuns):
-                if i < len(dayuns) - 1:
-                    if yun["start_age"] <= current_age < dayuns[i+1]["start_age"]:
-                        current_dayun = yun
-                        break
-                else:
-                    if yun["start_age"] <= current_age:
-                        current_dayun = yun
+            if dayuns:  # 只有当大运列表非空时才进行处理
+                for i, yun in enumerate(dayuns):
+                    if i < len(dayuns) - 1:
+                        if yun["start_age"] <= current_age < dayuns[i+1]["start_age"]:
+                            current_dayun = yun
+                            break
+                    else:
+                        if yun["start_age"] <= current_age:
+                            current_dayun = yun
         
-        # 当前年月日的流年流月流日
-        current_date = datetime.datetime.now()
-        current_year = current_date.year
-        current_month = current_date.month
-        current_day = current_date.day
+        with timing.span("bazi.liunian"):
+            # 当前年月日的流年流月流日
+            current_date = clock.now()
+            current_year = current_date.year
+            current_month = current_date.month
+            current_day = current_date.day
         
-        lunar_current = Lunar.fromYmd(current_year, current_month, current_day)
-        liunian_gz = lunar_current.getYearInGanZhi()
-        liuyue_gz = lunar_current.getMonthInGanZhi()
-        liuri_gz = lunar_current.getDayInGanZhi()
+            lunar_current = Lunar.fromYmd(current_year, current_month, current_day)
+            liunian_gz = lunar_current.getYearInGanZhi()
+            liuyue_gz = lunar_current.getMonthInGanZhi()
+            liuri_gz = lunar_current.getDayInGanZhi()
         
-        liunian_gan = liunian_gz[0]
-        liunian_zhi = liunian_gz[1]
-        liuyue_gan = liuyue_gz[0]
-        liuyue_zhi = liuyue_gz[1]
-        liuri_gan = liuri_gz[0]
-        liuri_zhi = liuri_gz[1]
+            liunian_gan = liunian_gz[0]
+            liunian_zhi = liunian_gz[1]
+            liuyue_gan = liuyue_gz[0]
+            liuyue_zhi = liuyue_gz[1]
+            liuri_gan = liuri_gz[0]
+            liuri_zhi = liuri_gz[1]
         
-        # 计算流年十神
-        liunian_gan_shen = ten_deities[me][liunian_gan]
-        liunian_zhi_shen = ten_deities[me][max(zhi5[liunian_zhi], key=zhi5[liunian_zhi].get)]
+            # 计算流年十神
+            liunian_gan_shen = ten_deities[me][liunian_gan]
+            liunian_zhi_shen = ten_deities[me][max(zhi5[liunian_zhi], key=zhi5[liunian_zhi].get)]
         
-        # 计算流月十神
-        liuyue_gan_shen = ten_deities[me][liuyue_gan]
-        liuyue_zhi_shen = ten_deities[me][max(zhi5[liuyue_zhi], key=zhi5[liuyue_zhi].get)]
+            # 计算流月十神
+            liuyue_gan_shen = ten_deities[me][liuyue_gan]
+            liuyue_zhi_shen = ten_deities[me][max(zhi5[liuyue_zhi], key=zhi5[liuyue_zhi].get)]
         
-        # 计算流日十神
-        liuri_gan_shen = ten_deities[me][liuri_gan]
-        liuri_zhi_shen = ten_deities[me][max(zhi5[liuri_zhi], key=zhi5[liuri_zhi].get)]
+            # 计算流日十神
+            liuri_gan_shen = ten_deities[me][liuri_gan]
+            liuri_zhi_shen = ten_deities[me][max(zhi5[liuri_zhi], key=zhi5[liuri_zhi].get)]
         
-        # 使用LunarExtension计算神煞
-        shenshas = []
-        try:
-            # 计算神煞
-            shensha_list = lunar_ext.get_shen_sha()
-            if shensha_list:
-                shenshas = shensha_list
-        except Exception as e:
-            print(f"计算神煞时出错: {e}")
-            # 静默处理，不输出警告
-            
-            # 如果LunarExtension计算失败，使用传统方法计算常见神煞
+        with timing.span("bazi.shensha"):
+            # 使用LunarExtension计算神煞
+            shenshas = []
             try:
-                # 年神煞
-                for shen_name, shen_dict in year_shens.items():
-                    if year_zhi in shen_dict:
-                        target = shen_dict[year_zhi]
-                        for i, zhi in enumerate(zhis):
-                            if zhi == target:
-                                shenshas.append({
-                                    "name": shen_name,
-                                    "position": ["年", "月", "日", "时"][i],
-                                    "description": f"{year_zhi}年{shen_name}{target}在{['年', '月', '日', '时'][i]}"
-                                })
-                                
-                # 月神煞
-                for shen_name, shen_dict in month_shens.items():
-                    if month_zhi in shen_dict:
-                        target = shen_dict[month_zhi]
-                        for i, gan in enumerate(gans):
-                            if gan == target:
-                                shenshas.append({
-                                    "name": shen_name,
-                                    "position": ["年", "月", "日", "时"][i],
-                                    "description": f"{month_zhi}月{shen_name}{target}在{['年', '月', '日', '时'][i]}"
-                                })
-                
-                # 日神煞
-                for shen_name, shen_dict in day_shens.items():
-                    if day_gan in shen_dict:
-                        targets = shen_dict[day_gan]
-                        for target in targets:
+                # 计算神煞
+                shensha_list = lunar_ext.get_shen_sha()
+                if shensha_list:
+                    shenshas = shensha_list
+            except Exception as e:
+                issues.capture("shensha", e, errors.WARNING)
+            
+                # 如果LunarExtension计算失败，使用传统方法计算常见神煞
+                with issues.guard("shensha"):
+                    # 年神煞
+                    for shen_name, shen_dict in year_shens.items():
+                        if year_zhi in shen_dict:
+                            target = shen_dict[year_zhi]
                             for i, zhi in enumerate(zhis):
                                 if zhi == target:
                                     shenshas.append({
                                         "name": shen_name,
                                         "position": ["年", "月", "日", "时"][i],
-                                        "description": f"{day_gan}日{shen_name}{target}在{['年', '月', '日', '时'][i]}"
+                                        "description": f"{year_zhi}年{shen_name}{target}在{['年', '月', '日', '时'][i]}"
+                                    })
+                                
+                    # 月神煞
+                    for shen_name, shen_dict in month_shens.items():
+                        if month_zhi in shen_dict:
+                            target = shen_dict[month_zhi]
+                            for i, gan in enumerate(gans):
+                                if gan == target:
+                                    shenshas.append({
+                                        "name": shen_name,
+                                        "position": ["年", "月", "日", "时"][i],
+                                        "description": f"{month_zhi}月{shen_name}{target}在{['年', '月', '日', '时'][i]}"
                                     })
-            except Exception:
-                # 如果传统方法也失败，则静默处理
-                pass
+                
+                    # 日神煞
+                    for shen_name, shen_dict in day_shens.items():
+                        if day_gan in shen_dict:
+                            targets = shen_dict[day_gan]
+                            for target in targets:
+                                for i, zhi in enumerate(zhis):
+                                    if zhi == target:
+                                        shenshas.append({
+                                            "name": shen_name,
+                                            "position": ["年", "月", "日", "时"][i],
+                                            "description": f"{day_gan}日{shen_name}{target}在{['年', '月', '日', '时'][i]}"
+                                        })
         
-        # 格局与用神分析
-        pattern_info = determine_pattern(me, gans, zhis, gan_shens, zhi_shens, scores)
+        with timing.span("bazi.pattern"):
+            # 格局与用神分析
+            pattern_info = determine_pattern(me, gans, zhis, gan_shens, zhi_shens, scores)
         
-        # 纳音五行
-        nayin = {
-            "year": nayin_wuxing.get(year_gz, "未知"),
-            "month": nayin_wuxing.get(month_gz, "未知"),
-            "day": nayin_wuxing.get(day_gz, "未知"),
-            "hour": nayin_wuxing.get(hour_gz, "未知")
-        }
+            # 纳音五行
+            nayin = {
+                "year": nayin_wuxing.get(year_gz, "未知"),
+                "month": nayin_wuxing.get(month_gz, "未知"),
+                "day": nayin_wuxing.get(day_gz, "未知"),
+                "hour": nayin_wuxing.get(hour_gz, "未知")
+            }
         
-        # 使用LunarExtension计算命宫和胎元
-        try:
-            # 计算命宫
-            ming_gong = lunar_ext.get_ming_gong()
-        except Exception as e:
-            print(f"计算命宫时出错: {e}")
+        with timing.span("bazi.special"):
+            # 使用LunarExtension计算命宫和胎元
             ming_gong = ""
+            with issues.guard("ming_gong"):
+                # 计算命宫
+                ming_gong = lunar_ext.get_ming_gong()
             
-        try:
-            # 计算胎元
-            tai_yuan = lunar_ext.get_tai_yuan()
-        except Exception as e:
-            print(f"计算胎元时出错: {e}")
             tai_yuan = ""
+            with issues.guard("tai_yuan"):
+                # 计算胎元
+                tai_yuan = lunar_ext.get_tai_yuan()
+        
+        with timing.span("bazi.relations"):
+            # 四柱与当前大运、流年之间的全部干支关系
+            flow_pillars = [("大运", current_dayun["ganzhi"])] if current_dayun else []
+            flow_pillars.append(("流年", liunian_gz))
+            pillar_relations = find_relations(
+                [year_gz, month_gz, day_gz, hour_gz] + [gz for _, gz in flow_pillars],
+                labels=("年", "月", "日", "时") + tuple(label for label, _ in flow_pillars)
+            )
         
         # 返回结果
         result = {
@@ -1349,7 +918,8 @@ def calculate_bazi(birth_year, birth_month, birth_day, birth_hour, gender, city=
             },
             "relations": {
                 "empties": empties,
-                "gan_hes": gan_hes
+                "gan_hes": gan_hes,
+                "pillars": pillar_relations
             },
             "nayin": nayin,
             "special": {
@@ -1437,244 +1007,12 @@ def calculate_bazi(birth_year, birth_month, birth_day, birth_hour, gender, city=
             "elements_balance": get_elements_balance(scores),
             "shenshas": shenshas_analysis
         }
-            
+
+        result["issues"] = issues.to_dict()
         return result
     
     except Exception as e:
-        print(f"计算八字时出错: {e}")
-        import traceback
-        traceback.print_exc()
-        return {
-            "error": str(e),
-            "message": "计算八字时出错，请检查输入参数和网络连接"
-        }
-
-
-def generate_text_report(report):
-    """
-    生成文本形式的命盘解读
-    
-    参数:
-        report (dict): 命盘报告数据
-    
-    返回:
-        str: 文本形式的命盘解读
-    """
-    lines = []
-    
-    # 基本信息
-    lines.append("===== 八字命盘解读 =====\n")
-    lines.append("[基本信息]")
-    lines.append(f"四柱八字: {report['basic_info']['four_pillars']}")
-    lines.append(f"天干: {report['basic_info']['gans']}")
-    lines.append(f"地支: {report['basic_info']['zhis']}")
-    lines.append(f"日主: {report['basic_info']['day_master']}")
-    lines.append(f"阳历: {report['basic_info']['solar_date']}")
-    lines.append(f"阴历: {report['basic_info']['lunar_date']}")
-    lines.append("")
-    
-    # 命盘分析
-    lines.append("[命盘分析]")
-    lines.append(f"日主强度: {report['pattern_analysis']['day_master_strength']} ({report['pattern_analysis']['day_master_percentage']:.2f}%)")
-    lines.append(f"五行平衡: {report['pattern_analysis']['balance_state']}")
-    lines.append(f"备注: {report['pattern_analysis']['balance_description']}")
-    lines.append(f"最强五行: {report['pattern_analysis']['strongest_element']}")
-    lines.append(f"最弱五行: {report['pattern_analysis']['weakest_element']}")
-    lines.append(f"用神: {report['pattern_analysis']['yong_shen']}")
-    lines.append(f"用神说明: {report['pattern_analysis']['yong_shen_explanation']}")
-    lines.append(f"用神天干: {report['pattern_analysis']['yong_gan']}")
-    lines.append(f"用神地支: {report['pattern_analysis']['yong_zhi']}")
-    lines.append("")
-    
-    # 当前大运
-    lines.append("[当前大运]")
-    if report['current_dayun']:
-        current_dayun = report['current_dayun']
-        lines.append(f"大运: {current_dayun['ganzhi']} {current_dayun['gan_shen']}{current_dayun['zhi_shen']}")
-        lines.append(f"年龄范围: {current_dayun['age_range']} 岁")
-        lines.append(f"纳音五行: {current_dayun['nayin']}")
-    else:
-        lines.append("尚未进入大运")
-    lines.append("")
-    
-    # 流年流月流日
-    lines.append("[当前流年流月流日]")
-    lines.append(f"流年: {report['current_info']['liunian']['ganzhi']} 十神: {report['current_info']['liunian']['gan_shen']}/{report['current_info']['liunian']['zhi_shen']}")
-    lines.append(f"流月: {report['current_info']['liuyue']['ganzhi']} 十神: {report['current_info']['liuyue']['gan_shen']}/{report['current_info']['liuyue']['zhi_shen']}")
-    lines.append(f"流日: {report['current_info']['liuri']['ganzhi']} 十神: {report['current_info']['liuri']['gan_shen']}/{report['current_info']['liuri']['zhi_shen']}")
-    lines.append("")
-    
-    # 神煞信息
-    lines.append("[神煞信息]")
-    if report['shensha_info']:
-        for shensha in report['shensha_info']:
-            lines.append(f"{shensha['name']}: {shensha['description']}")
-    else:
-        lines.append("无神煞信息")
-    lines.append("")
-    
-    # 纳音五行
-    lines.append("[纳音五行]")
-    for position, nayin in report['nayin'].items():
-        lines.append(f"{position}: {nayin}")
-    lines.append("")
-    
-    # 特殊信息
-    lines.append("[特殊信息]")
-    lines.append(f"命宫: {report['special']['ming_gong']}")
-    lines.append(f"胎元: {report['special']['tai_yuan']}")
-    lines.append("")
-    
-    # 大运流年分析指导
-    lines.append("[大运流年分析指导]")
-    if report['pattern_analysis']['day_master_strength'] in ['旺', '偏旺']:
-        # 日主旺的年份
-        lines.append("日主过旺，适合濒身或耗身的运势：")
-        lines.append(f"1. 法子：可选择{report['pattern_analysis']['yong_shen']}的年份，帮助平衡日主。")
-        lines.append(f"2. 避免过于旺盛的日主({report['basic_info']['day_master'].split()[0]})年份。")
-        lines.append(f"3. 理想的大运流年应有充足的{report['pattern_analysis']['yong_shen']}手法强。")
-    elif report['pattern_analysis']['day_master_strength'] in ['弱', '偏弱']:
-        # 日主弱的年份
-        lines.append("日主过弱，适合滋身或扩张的运势：")
-        lines.append(f"1. 法子：可选择{report['pattern_analysis']['yong_shen']}的年份，提升日主力量。")
-        lines.append(f"2. 避免克法日主({report['basic_info']['day_master'].split()[0]})的年份。")
-        lines.append(f"3. 理想的大运流年应有充足的{report['pattern_analysis']['yong_shen']}手法。")
-    else:
-        # 日主中和
-        lines.append("日主强度适中，可选择平衡发展的运势：")
-        lines.append(f"1. 保持当前的平衡状态，不过分強调任何五行。")
-        lines.append("2. 可适当发展五行中较弱的部分。")
-        lines.append("3. 避免增强已经过强的五行。")
-    
-    return "\n".join(lines)
-
-
-def generate_bazi_report(bazi_result):
-    """
-    生成八字命盘解读报告
-
-    参数:
-        bazi_result (dict): calculate_bazi函数的返回结果
-
-    返回:
-        dict: 格式化的命盘解读报告
-    """
-    # 提取基本信息
-    bazi = bazi_result['bazi']
-    solar = bazi_result['solar']
-    lunar = bazi_result['lunar']
-    ten_gods = bazi_result['ten_gods']
-    five_elements = bazi_result['five_elements']
-    pattern = bazi_result['pattern']
-    current = bazi_result['current']
-    dayuns = bazi_result['dayuns']
-    current_dayun = bazi_result['current_dayun']
-    analysis = bazi_result['analysis']
-    
-    # 基本八字信息
-    basic_info = {
-        "four_pillars": f"{bazi['year']} {bazi['month']} {bazi['day']} {bazi['hour']}",
-        "gans": ' '.join(bazi['gans']),
-        "zhis": ' '.join(bazi['zhis']),
-        "day_master": f"{bazi['day_master']} ({bazi['day_master_element']})",
-        "solar_date": f"{solar['year']}年{solar['month']}月{solar['day']}日 {solar['hour']}时",
-        "lunar_date": f"{lunar['year']}年{lunar['month']}月{lunar['day']}日"
-    }
-    
-    # 命盘分析
-    pattern_analysis = {
-        "day_master_strength": analysis['day_master_strength'],
-        "day_master_percentage": analysis['day_master_percentage'],
-        "strongest_element": f"{analysis['elements_balance']['strongest']} ({analysis['elements_balance']['strongest_percentage']}%)",
-        "weakest_element": f"{analysis['elements_balance']['weakest']} ({analysis['elements_balance']['weakest_percentage']}%)",
-        "balance_state": analysis['elements_balance']['balance_state'],
-        "balance_description": analysis['elements_balance']['description'],
-        "yong_shen": f"{pattern['yong_shen']} ({pattern['yong_shen_type']})",
-        "yong_shen_explanation": pattern['explanation'],
-        "yong_gan": ', '.join(pattern['yong_gan']),
-        "yong_zhi": ', '.join(pattern['yong_zhi']),
-        "special_patterns": pattern['special_patterns']
-    }
-    
-    # 大运分析
-    dayun_analysis = []
-    for dayun in dayuns:
-        dayun_analysis.append({
-            "ganzhi": dayun['ganzhi'],
-            "gan_shen": dayun['gan_shen'],
-            "zhi_shen": dayun['zhi_shen'],
-            "age_range": f"{dayun['start_age']}-{dayun['end_age']}",
-            "element": dayun['element'],
-            "nayin": dayun['nayin']
-        })
-
-    current_dayun_info = None
-    if current_dayun:
-        current_dayun_info = {
-            "ganzhi": current_dayun['ganzhi'],
-            "gan_shen": current_dayun['gan_shen'],
-            "zhi_shen": current_dayun['zhi_shen'],
-            "age_range": f"{current_dayun['start_age']}-{current_dayun['end_age']}",
-            "element": current_dayun['element'],
-            "nayin": current_dayun['nayin']
-        }
-
-    # 当前流年流月流日
-    current_info = {
-        "liunian": {
-            "ganzhi": current['liunian'],
-            "gan_shen": current['liunian_shen']['gan'],
-            "zhi_shen": current['liunian_shen']['zhi']
-        },
-        "liuyue": {
-            "ganzhi": current['liuyue'],
-            "gan_shen": current['liuyue_shen']['gan'],
-            "zhi_shen": current['liuyue_shen']['zhi']
-        },
-        "liuri": {
-            "ganzhi": current['liuri'],
-            "gan_shen": current['liuri_shen']['gan'],
-            "zhi_shen": current['liuri_shen']['zhi']
-        }
-    }
-
-    # 神煞分析
-    shensha_info = []
-    for shensha in bazi_result['shensha']:
-        shensha_info.append({
-            "name": shensha['name'],
-            "position": shensha['position'],
-            "description": shensha['description']
-        })
-
-    # 搭建解读报告
-    report = {
-        "basic_info": basic_info,
-        "five_elements": {
-            "scores": five_elements['scores'],
-            "year": five_elements['year'],
-            "month": five_elements['month'],
-            "day": five_elements['day'],
-            "hour": five_elements['hour']
-        },
-        "ten_gods": {
-            "gans": ten_gods['gans'],
-            "zhis": ten_gods['zhis']
-        },
-        "pattern_analysis": pattern_analysis,
-        "dayun_analysis": dayun_analysis,
-        "current_dayun": current_dayun_info,
-        "current_info": current_info,
-        "shensha_info": shensha_info,
-        "nayin": bazi_result['nayin'],
-        "special": bazi_result['special']
-    }
-
-    # 生成文本形式的命盘解读
-    text_report = generate_text_report(report)
-    report["text_report"] = text_report
-
-    return report
+        return errors.error_result(e, issues)
 
 
 if __name__ == "__main__":
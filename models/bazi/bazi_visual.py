@@ -2,345 +2,263 @@
 # -*- coding: utf-8 -*-
 """
 八字命盘可视化模块 - 将八字命盘数据转换为可视化表示
+
+文本、Markdown、HTML 命盘网格都由 templates/ 下预编译的 Jinja 模板渲染，
+HTML 共用 bazi_grid.css 样式。渲染结果按命盘内容与语言缓存；批量导出时
+模板只编译一次，逐个写入目录或 zip 文件。
 """
 
-def generate_text_grid(report):
+import functools
+import hashlib
+import json
+import zipfile
+from pathlib import Path
+
+from jinja2 import Environment
+from jinja2 import FileSystemBytecodeCache
+from jinja2 import FileSystemLoader
+from jinja2 import select_autoescape
+
+from .advice_index import DEFAULT_LOCALE, load_texts
+
+TEMPLATE_DIR = Path(__file__).parent / "templates"
+
+# 各格式的模板与导出文件扩展名
+TEMPLATES = {"text": "grid.txt", "markdown": "grid.md", "html": "grid.html"}
+EXTENSIONS = {"text": ".txt", "markdown": ".md", "html": ".html"}
+
+# 共享样式表
+CSS_NAME = "bazi_grid.css"
+
+# 中文文案（locales/<语言>.json 的 bazi_grid 键可覆盖）
+GRID_TEXTS = {
+    "title": "八字命盘",
+    "pillars": ["年柱", "月柱", "日柱", "时柱"],
+    "empty": "空亡",
+    "scores": "五行得分",
+    "colon": "：",
+    "day_master": "日主",
+    "yong_shen": "用神",
+    "special": "特殊信息",
+    "ming_gong": "命宫",
+    "tai_yuan": "胎元",
+    "element_names": {element: element for element in ("木", "火", "土", "金", "水")}
+}
+
+# 中文五行到 HTML 类名
+ELEMENT_CLASS = {'木': 'wood', '火': 'fire', '土': 'earth', '金': 'metal', '水': 'water'}
+
+_env = None
+
+
+def get_environment():
+    """
+    获取模块级模板环境（首次调用时创建）
+
+    返回:
+        jinja2.Environment: 模板环境
+    """
+    global _env
+
+    if _env is None:
+        _env = Environment(
+            loader=FileSystemLoader(str(TEMPLATE_DIR)),
+            bytecode_cache=FileSystemBytecodeCache(pattern='__bazi_%s.cache'),
+            autoescape=select_autoescape(enabled_extensions=('html',), default_for_string=False),
+            trim_blocks=True,
+            lstrip_blocks=True,
+            auto_reload=False,
+        )
+
+    return _env
+
+
+@functools.lru_cache(maxsize=None)
+def get_grid_texts(locale=DEFAULT_LOCALE):
+    """
+    获取命盘网格文案
+
+    参数:
+        locale (str): 语言代码
+
+    返回:
+        dict: 文案
+    """
+    return load_texts(locale, section="bazi_grid", base=GRID_TEXTS)
+
+
+def grid_view(report):
+    """
+    从报告中提取命盘网格所需的数据
+
+    参数:
+        report (dict): 八字报告数据
+
+    返回:
+        dict: 视图数据（可 JSON 序列化）
+    """
+    basic_info = report['basic_info']
+    ten_gods = report.get('ten_gods', {})
+    pattern = report['pattern_analysis']
+
+    def four(values):
+        values = list(values or [])
+        return [values[i] if i < len(values) and values[i] else "" for i in range(4)]
+
+    empties = [bool(empty) for empty in four(report.get('relations', {}).get('empties'))]
+    return {
+        "gans": basic_info['gans'].split(),
+        "zhis": basic_info['zhis'].split(),
+        "gan_shens": four(ten_gods.get('gans')),
+        "zhi_shens": four(ten_gods.get('zhis')),
+        "nayins": [report['nayin'][pos] for pos in ['year', 'month', 'day', 'hour']],
+        "empties": empties,
+        "has_empty": any(empties),
+        "scores": [
+            {"element": element, "value": score, "css_class": ELEMENT_CLASS.get(element, '')}
+            for element, score in report['five_elements']['scores'].items()
+        ],
+        "day_master": basic_info['day_master'],
+        "strength": pattern['day_master_strength'],
+        "percentage": pattern['day_master_percentage'],
+        "yong_shen": pattern['yong_shen'],
+        "ming_gong": report['special']['ming_gong'],
+        "tai_yuan": report['special']['tai_yuan']
+    }
+
+
+def _view_key(view):
+    """视图数据的规范化 JSON，作为渲染缓存键"""
+    return json.dumps(view, ensure_ascii=False, sort_keys=True)
+
+
+def chart_hash(report):
+    """
+    命盘内容哈希（同一命盘在不同进程中结果一致，可用作导出文件名）
+
+    参数:
+        report (dict): 八字报告数据
+
+    返回:
+        str: 十六进制 SHA-1
+    """
+    return hashlib.sha1(_view_key(grid_view(report)).encode('utf-8')).hexdigest()
+
+
+def _render_view(view, format, locale, css_url=None):
+    if format not in TEMPLATES:
+        raise ValueError(f"不支持的输出格式: {format}，可选: {', '.join(TEMPLATES)}")
+    template = get_environment().get_template(TEMPLATES[format])
+    return template.render(view, t=get_grid_texts(locale), css_url=css_url)
+
+
+@functools.lru_cache(maxsize=1024)
+def _render_cached(view_key, format, locale, css_url):
+    return _render_view(json.loads(view_key), format, locale, css_url)
+
+
+def generate_text_grid(report, locale=DEFAULT_LOCALE):
     """
     生成文本网格形式的八字命盘
     
     参数:
         report (dict): 八字报告数据
+        locale (str): 语言代码
     
     返回:
         str: 文本形式的命盘网格
     """
-    # 获取基本信息
-    bazi = report['basic_info']['four_pillars'].split()
-    gans = report['basic_info']['gans'].split()
-    zhis = report['basic_info']['zhis'].split()
-    
-    # 获取十神信息（如果有）
-    gan_shens = report.get('ten_gods', {}).get('gans', ['', '', '', ''])
-    zhi_shens = report.get('ten_gods', {}).get('zhis', ['', '', '', ''])
-    
-    # 获取纳音信息
-    nayins = [report['nayin'][pos] for pos in ['year', 'month', 'day', 'hour']]
-    
-    # 获取空亡信息（如果有）
-    empties = report.get('relations', {}).get('empties', ['', '', '', ''])
-    
-    # 生成表头
-    lines = []
-    lines.append("┏━━━━━━━━━━┳━━━━━━━━━━┳━━━━━━━━━━┳━━━━━━━━━━┓")
-    lines.append("┃   年柱   ┃   月柱   ┃   日柱   ┃   时柱   ┃")
-    lines.append("┣━━━━━━━━━━╋━━━━━━━━━━╋━━━━━━━━━━╋━━━━━━━━━━┫")
-    
-    # 天干行
-    gan_line = "┃"
-    for i in range(4):
-        gan = gans[i]
-        shen = gan_shens[i] if i < len(gan_shens) and gan_shens[i] else ""
-        shen_str = f"({shen})" if shen else "    "
-        gan_line += f" {gan}  {shen_str} ┃"
-    lines.append(gan_line)
-    
-    # 地支行
-    zhi_line = "┃"
-    for i in range(4):
-        zhi = zhis[i]
-        shen = zhi_shens[i] if i < len(zhi_shens) and zhi_shens[i] else ""
-        shen_str = f"({shen})" if shen else "    "
-        zhi_line += f" {zhi}  {shen_str} ┃"
-    lines.append(zhi_line)
-    
-    # 纳音行
-    nayin_line = "┃"
-    for i in range(4):
-        nayin = nayins[i] if i < len(nayins) else ""
-        nayin_line += f" {nayin[:4]}.. ┃" if len(nayin) > 4 else f" {nayin.ljust(8)} ┃"
-    lines.append(nayin_line)
-    
-    # 空亡行（如果有）
-    if any(empties):
-        empty_line = "┃"
-        for i in range(4):
-            empty = "空亡" if empties[i] else "    "
-            empty_line += f" {empty.ljust(8)} ┃"
-        lines.append(empty_line)
-    
-    # 表尾
-    lines.append("┗━━━━━━━━━━┻━━━━━━━━━━┻━━━━━━━━━━┻━━━━━━━━━━┛")
-    
-    # 添加五行得分
-    lines.append("\n五行得分：")
-    scores = report['five_elements']['scores']
-    score_line = "  ".join([f"{element}: {score:.1f}" for element, score in scores.items()])
-    lines.append(score_line)
-    
-    # 添加日主信息
-    lines.append(f"\n日主: {report['basic_info']['day_master']} ({report['pattern_analysis']['day_master_strength']} {report['pattern_analysis']['day_master_percentage']:.1f}%)")
-    
-    # 添加用神信息
-    lines.append(f"用神: {report['pattern_analysis']['yong_shen']}")
-    
-    # 添加特殊信息
-    lines.append(f"命宫: {report['special']['ming_gong']}   胎元: {report['special']['tai_yuan']}")
-    
-    return "\n".join(lines)
+    return generate_visual_report(report, 'text', locale)
 
-def generate_html_grid(report):
+def generate_html_grid(report, locale=DEFAULT_LOCALE, css_url=None):
     """
     生成HTML格式的八字命盘
     
     参数:
         report (dict): 八字报告数据
+        locale (str): 语言代码
+        css_url (str, optional): 样式表地址；为空时内嵌 bazi_grid.css
     
     返回:
         str: HTML格式的命盘网格
     """
-    # 获取基本信息
-    bazi = report['basic_info']['four_pillars'].split()
-    gans = report['basic_info']['gans'].split()
-    zhis = report['basic_info']['zhis'].split()
-    
-    # 获取十神信息（如果有）
-    gan_shens = report.get('ten_gods', {}).get('gans', ['', '', '', ''])
-    zhi_shens = report.get('ten_gods', {}).get('zhis', ['', '', '', ''])
-    
-    # 获取纳音信息
-    nayins = [report['nayin'][pos] for pos in ['year', 'month', 'day', 'hour']]
-    
-    # 获取空亡信息（如果有）
-    empties = report.get('relations', {}).get('empties', ['', '', '', ''])
-    
-    # 生成CSS样式
-    css = """
-    <style>
-        .bazi-table {
-            border-collapse: collapse;
-            font-family: "Microsoft YaHei", "宋体", sans-serif;
-            margin: 20px 0;
-            width: 100%;
-            max-width: 800px;
-        }
-        .bazi-table th, .bazi-table td {
-            border: 1px solid #ddd;
-            padding: 8px;
-            text-align: center;
-        }
-        .bazi-table th {
-            background-color: #f2f2f2;
-            font-weight: bold;
-        }
-        .bazi-table .gan {
-            background-color: #f9f9f9;
-        }
-        .bazi-table .zhi {
-            background-color: #f0f0f0;
-        }
-        .bazi-table .nayin {
-            background-color: #e9e9e9;
-            font-size: 0.9em;
-        }
-        .bazi-table .empty {
-            color: red;
-            font-size: 0.9em;
-        }
-        .bazi-info {
-            margin-top: 20px;
-            font-family: "Microsoft YaHei", "宋体", sans-serif;
-        }
-        .bazi-info p {
-            margin: 5px 0;
-        }
-        .scores {
-            display: flex;
-            justify-content: space-between;
-            max-width: 500px;
-            margin: 10px 0;
-        }
-        .score-item {
-            text-align: center;
-            padding: 5px;
-            border-radius: 4px;
-            min-width: 60px;
-        }
-        .score-item.wood {
-            background-color: #a5d6a7;
-        }
-        .score-item.fire {
-            background-color: #ffcdd2;
-        }
-        .score-item.earth {
-            background-color: #ffe0b2;
-        }
-        .score-item.metal {
-            background-color: #e1f5fe;
-        }
-        .score-item.water {
-            background-color: #d1c4e9;
-        }
-    </style>
-    """
-    
-    # 生成HTML表格
-    html = f"{css}\n<div class='bazi-container'>\n"
-    html += "<table class='bazi-table'>\n"
-    html += "  <tr><th>年柱</th><th>月柱</th><th>日柱</th><th>时柱</th></tr>\n"
-    
-    # 天干行
-    html += "  <tr class='gan'>\n"
-    for i in range(4):
-        gan = gans[i]
-        shen = gan_shens[i] if i < len(gan_shens) and gan_shens[i] else ""
-        shen_str = f"<small>({shen})</small>" if shen else ""
-        html += f"    <td>{gan} {shen_str}</td>\n"
-    html += "  </tr>\n"
-    
-    # 地支行
-    html += "  <tr class='zhi'>\n"
-    for i in range(4):
-        zhi = zhis[i]
-        shen = zhi_shens[i] if i < len(zhi_shens) and zhi_shens[i] else ""
-        shen_str = f"<small>({shen})</small>" if shen else ""
-        html += f"    <td>{zhi} {shen_str}</td>\n"
-    html += "  </tr>\n"
-    
-    # 纳音行
-    html += "  <tr class='nayin'>\n"
-    for i in range(4):
-        nayin = nayins[i] if i < len(nayins) else ""
-        html += f"    <td>{nayin}</td>\n"
-    html += "  </tr>\n"
-    
-    # 空亡行（如果有）
-    if any(empties):
-        html += "  <tr class='empty'>\n"
-        for i in range(4):
-            empty = "空亡" if empties[i] else ""
-            html += f"    <td>{empty}</td>\n"
-        html += "  </tr>\n"
-    
-    html += "</table>\n"
-    
-    # 添加五行得分
-    html += "<div class='bazi-info'>\n"
-    html += "  <div class='scores'>\n"
-    
-    # 映射中文五行到英文类名
-    element_class = {'木': 'wood', '火': 'fire', '土': 'earth', '金': 'metal', '水': 'water'}
-    
-    scores = report['five_elements']['scores']
-    for element, score in scores.items():
-        class_name = element_class.get(element, '')
-        html += f"    <div class='score-item {class_name}'>{element}: {score:.1f}</div>\n"
-    html += "  </div>\n"
-    
-    # 添加日主信息
-    html += f"  <p>日主: {report['basic_info']['day_master']} ({report['pattern_analysis']['day_master_strength']} {report['pattern_analysis']['day_master_percentage']:.1f}%)</p>\n"
-    
-    # 添加用神信息
-    html += f"  <p>用神: {report['pattern_analysis']['yong_shen']}</p>\n"
-    
-    # 添加特殊信息
-    html += f"  <p>命宫: {report['special']['ming_gong']}   胎元: {report['special']['tai_yuan']}</p>\n"
-    html += "</div>\n"
-    html += "</div>"
-    
-    return html
+    return generate_visual_report(report, 'html', locale, css_url)
 
-def generate_markdown_grid(report):
+def generate_markdown_grid(report, locale=DEFAULT_LOCALE):
     """
     生成Markdown格式的八字命盘
     
     参数:
         report (dict): 八字报告数据
+        locale (str): 语言代码
     
     返回:
         str: Markdown格式的命盘网格
     """
-    # 获取基本信息
-    bazi = report['basic_info']['four_pillars'].split()
-    gans = report['basic_info']['gans'].split()
-    zhis = report['basic_info']['zhis'].split()
-    
-    # 获取十神信息（如果有）
-    gan_shens = report.get('ten_gods', {}).get('gans', ['', '', '', ''])
-    zhi_shens = report.get('ten_gods', {}).get('zhis', ['', '', '', ''])
-    
-    # 获取纳音信息
-    nayins = [report['nayin'][pos] for pos in ['year', 'month', 'day', 'hour']]
-    
-    # 生成表格
-    lines = []
-    lines.append("## 八字命盘")
-    lines.append("")
-    lines.append("| 年柱 | 月柱 | 日柱 | 时柱 |")
-    lines.append("|------|------|------|------|")
-    
-    # 天干行
-    gan_line = "|"
-    for i in range(4):
-        gan = gans[i]
-        shen = gan_shens[i] if i < len(gan_shens) and gan_shens[i] else ""
-        shen_str = f"({shen})" if shen else ""
-        gan_line += f" {gan} {shen_str} |"
-    lines.append(gan_line)
-    
-    # 地支行
-    zhi_line = "|"
-    for i in range(4):
-        zhi = zhis[i]
-        shen = zhi_shens[i] if i < len(zhi_shens) and zhi_shens[i] else ""
-        shen_str = f"({shen})" if shen else ""
-        zhi_line += f" {zhi} {shen_str} |"
-    lines.append(zhi_line)
-    
-    # 纳音行
-    nayin_line = "|"
-    for i in range(4):
-        nayin = nayins[i] if i < len(nayins) else ""
-        nayin_line += f" {nayin} |"
-    lines.append(nayin_line)
-    
-    # 添加五行得分
-    lines.append("")
-    lines.append("### 五行得分")
-    scores = report['five_elements']['scores']
-    for element, score in scores.items():
-        lines.append(f"- {element}: {score:.1f}")
-    
-    # 添加日主信息
-    lines.append("")
-    lines.append(f"### 日主: {report['basic_info']['day_master']} ({report['pattern_analysis']['day_master_strength']} {report['pattern_analysis']['day_master_percentage']:.1f}%)")
-    
-    # 添加用神信息
-    lines.append(f"### 用神: {report['pattern_analysis']['yong_shen']}")
+    return generate_visual_report(report, 'markdown', locale)
+
+def generate_visual_report(report, format='text', locale=DEFAULT_LOCALE, css_url=None):
+    """
+    生成可视化的命盘报告（结果按命盘内容与语言缓存）
     
-    # 添加特殊信息
-    lines.append(f"### 特殊信息")
-    lines.append(f"- 命宫: {report['special']['ming_gong']}")
-    lines.append(f"- 胎元: {report['special']['tai_yuan']}")
+    参数:
+        report (dict): 八字报告数据
+        format (str): 输出格式，可选 'text', 'html', 'markdown'，其他值按 'text' 处理
+        locale (str): 语言代码
+        css_url (str, optional): HTML 样式表地址
     
-    return "\n".join(lines)
+    返回:
+        str: 指定格式的可视化报告
+    """
+    if format not in TEMPLATES:
+        format = 'text'
+    return _render_cached(_view_key(grid_view(report)), format, locale, css_url)
 
-def generate_visual_report(report, format='text'):
+def render_bulk(reports, target, format='html', locale=DEFAULT_LOCALE):
     """
-    生成可视化的命盘报告
+    批量渲染命盘网格并逐个写入目录或 zip 文件（不经过渲染缓存，内存占用恒定）
     
     参数:
-        report (dict): 八字报告数据
+        reports (iterable): 八字报告，或 (文件名, 报告) 对；未给出文件名时使用命盘哈希
+        target (str | Path): 目标目录，或以 .zip 结尾的压缩文件路径
         format (str): 输出格式，可选 'text', 'html', 'markdown'
+        locale (str): 语言代码
     
     返回:
-        str: 指定格式的可视化报告
+        list: 写入的文件名（HTML 格式时包含共享样式表）
     """
-    if format == 'html':
-        return generate_html_grid(report)
-    elif format == 'markdown':
-        return generate_markdown_grid(report)
-    else:  # 默认为text
-        return generate_text_grid(report)
+    if format not in TEMPLATES:
+        raise ValueError(f"不支持的输出格式: {format}，可选: {', '.join(TEMPLATES)}")
+    target = Path(target)
+    css_url = CSS_NAME if format == 'html' else None
+    names = []
+
+    if target.suffix == '.zip':
+        target.parent.mkdir(parents=True, exist_ok=True)
+        archive = zipfile.ZipFile(target, 'w', compression=zipfile.ZIP_DEFLATED)
+        write = archive.writestr
+    else:
+        archive = None
+        target.mkdir(parents=True, exist_ok=True)
+        write = lambda name, content: (target / name).write_text(content, encoding='utf-8')
+
+    try:
+        if css_url:
+            write(CSS_NAME, (TEMPLATE_DIR / CSS_NAME).read_text(encoding='utf-8'))
+            names.append(CSS_NAME)
+        for item in reports:
+            name, report = item if isinstance(item, tuple) else (None, item)
+            view = grid_view(report)
+            if name is None:
+                name = hashlib.sha1(_view_key(view).encode('utf-8')).hexdigest()[:16]
+            name = f"{name}{EXTENSIONS[format]}"
+            write(name, _render_view(view, format, locale, css_url))
+            names.append(name)
+    finally:
+        if archive is not None:
+            archive.close()
+
+    return names
 
 # 测试代码
 if __name__ == "__main__":
@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+八字批量计算模块 - 从 CSV / JSONL 流式读取出生信息，多进程计算并增量写出
+
+输出为 JSONL（每条一行）、紧凑二进制（.cbin，每条一帧，见 codec 模块）或 Parquet 数据集目录
+（每批一个分片文件，需要 pyarrow）。
+每写完一批就更新检查点文件，中断后以相同参数再次运行即从检查点继续。
+"""
+
+import csv
+import functools
+import itertools
+import json
+import logging
+import multiprocessing
+import os
+import sys
+import time
+from pathlib import Path
+
+from . import codec
+
+logger = logging.getLogger(__name__)
+
+# 输入记录字段
+INPUT_FIELDS = ("id", "year", "month", "day", "hour", "minute", "gender", "city")
+INT_FIELDS = ("year", "month", "day", "hour", "minute")
+
+# 每批记录数（每批写出后更新一次检查点）
+DEFAULT_BATCH_SIZE = 1000
+
+CHECKPOINT_SUFFIX = ".checkpoint"
+
+
+def normalize_record(raw, line_no):
+    """
+    规范化一条输入记录
+
+    参数:
+        raw (dict): CSV 行或 JSON 对象
+        line_no (int): 记录序号（从 1 开始），缺少 id 时用作 id
+
+    返回:
+        dict: 包含 INPUT_FIELDS 的记录
+    """
+    record = {"id": raw.get("id") or str(line_no)}
+    for name in INT_FIELDS:
+        value = raw.get(name)
+        if value in (None, ""):
+            if name == "minute":
+                value = 0
+            else:
+                raise ValueError(f"第 {line_no} 条记录缺少字段 {name}")
+        record[name] = int(value)
+    record["gender"] = raw.get("gender") or "male"
+    record["city"] = raw.get("city") or None
+    return record
+
+
+def read_records(path):
+    """
+    流式读取输入文件（.csv 带表头，或 .jsonl 每行一个对象）
+
+    参数:
+        path (str | Path): 输入文件路径
+
+    返回:
+        Iterator[dict]: 规范化后的记录；无法解析的记录为 {"id", "error"}，由 run_bulk 原样写出
+    """
+    path = Path(path)
+    suffix = path.suffix.lower()
+    if suffix not in (".csv", ".jsonl", ".ndjson"):
+        raise ValueError(f"不支持的输入格式: {path.suffix}（支持 .csv / .jsonl）")
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        if suffix == ".csv":
+            rows = csv.DictReader(f)
+        else:
+            rows = (line for line in f if line.strip())
+        for line_no, raw in enumerate(rows, 1):
+            # 单条记录格式错误不中断整个输入，错误写入输出行
+            try:
+                if isinstance(raw, str):
+                    raw = json.loads(raw)
+                    if not isinstance(raw, dict):
+                        raise ValueError(f"第 {line_no} 条记录不是 JSON 对象")
+                yield normalize_record(raw, line_no)
+            except ValueError as e:
+                record_id = raw.get("id") if isinstance(raw, dict) else None
+                yield {"id": record_id or str(line_no), "error": f"{type(e).__name__}: {e}"}
+
+
+class JsonlSink:
+    """JSONL 输出：追加写入，检查点记录已写出的字节数"""
+
+    def __init__(self, path, position=0):
+        self.path = Path(path)
+        self.file = open(self.path, "r+b" if position else "wb")
+        # 丢弃检查点之后未确认的部分
+        self.file.seek(position)
+        self.file.truncate()
+
+    def write(self, rows):
+        for row in rows:
+            self.file.write(json.dumps(row, ensure_ascii=False, default=str).encode("utf-8"))
+            self.file.write(b"\n")
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        return self.file.tell()
+
+    def close(self):
+        self.file.close()
+
+
+class EncodedSink(JsonlSink):
+    """紧凑二进制输出：每条一帧（长度 + codec 编码），检查点记录已写出的字节数"""
+
+    def write(self, rows):
+        for row in rows:
+            codec.dump(row, self.file, default=str)
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        return self.file.tell()
+
+
+class ParquetSink:
+    """Parquet 输出：目录下每批一个分片文件，检查点记录已写出的分片数"""
+
+    def __init__(self, path, position=0):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError as e:
+            raise RuntimeError("写出 Parquet 需要安装 pyarrow（pip install pyarrow）") from e
+        self.pa = pyarrow
+        self.pq = pyarrow.parquet
+        self.schema = pyarrow.schema([
+            ("id", pyarrow.string()), ("error", pyarrow.string()), ("result", pyarrow.string()),
+        ])
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.parts = position
+
+    def write(self, rows):
+        table = self.pa.Table.from_pylist([{
+            "id": str(row["id"]),
+            "error": row.get("error"),
+            "result": json.dumps(row["result"], ensure_ascii=False, default=str) if "result" in row else None,
+        } for row in rows], schema=self.schema)
+        self.pq.write_table(table, self.path / f"part-{self.parts:06d}.parquet")
+        self.parts += 1
+        return self.parts
+
+    def close(self):
+        pass
+
+
+SINKS = {".parquet": ParquetSink, ".cbin": EncodedSink}
+
+
+def open_sink(path, position=0):
+    """按输出路径后缀选择输出格式（.parquet 为 Parquet，.cbin 为紧凑二进制，其余为 JSONL）"""
+    sink = SINKS.get(Path(path).suffix.lower(), JsonlSink)
+    return sink(path, position)
+
+
+def read_results(path):
+    """
+    逐条读取批量计算的输出（.jsonl 或 .cbin）
+
+    参数:
+        path (str | Path): 输出文件路径
+
+    返回:
+        Iterator[dict]: 每条的 id 与 result / error
+    """
+    path = Path(path)
+    if path.suffix.lower() == ".cbin":
+        with open(path, "rb") as f:
+            yield from codec.iter_load(f)
+        return
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def load_checkpoint(output_path, input_path):
+    """
+    读取检查点
+
+    返回:
+        dict: {"input", "done", "position"}；没有检查点、输入文件不同或输出已被删除、截断时从头开始
+    """
+    checkpoint_path = Path(str(output_path) + CHECKPOINT_SUFFIX)
+    fresh = {"input": str(Path(input_path).resolve()), "done": 0, "position": 0}
+    if not checkpoint_path.exists():
+        return fresh
+    with open(checkpoint_path, "r", encoding="utf-8") as f:
+        checkpoint = json.load(f)
+    if checkpoint.get("input") != fresh["input"]:
+        return fresh
+    if not _output_covers(output_path, checkpoint["position"]):
+        logger.warning(f"输出 {output_path} 不存在或短于检查点记录的位置，从头重新计算")
+        return fresh
+    return checkpoint
+
+
+def _output_covers(output_path, position):
+    # 输出中是否仍包含检查点之前写出的部分（文件按字节数，Parquet 目录按分片数）
+    path = Path(output_path)
+    if position == 0:
+        return True
+    if SINKS.get(path.suffix.lower()) is ParquetSink:
+        return (path / f"part-{position - 1:06d}.parquet").exists()
+    return path.is_file() and path.stat().st_size >= position
+
+
+def save_checkpoint(output_path, checkpoint):
+    """原子写入检查点"""
+    checkpoint_path = Path(str(output_path) + CHECKPOINT_SUFFIX)
+    tmp_path = checkpoint_path.with_name(checkpoint_path.name + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(checkpoint, f, ensure_ascii=False)
+    os.replace(tmp_path, checkpoint_path)
+
+
+def _compute_row(compute, record):
+    # 单条记录出错不影响整批，错误写入输出行；读取时已出错的记录原样写出
+    if "error" in record:
+        return record
+    try:
+        return {"id": record["id"], "result": compute(record)}
+    except Exception as e:
+        return {"id": record["id"], "error": f"{type(e).__name__}: {e}"}
+
+
+def run_bulk(compute, input_path, output_path, workers=None, batch_size=DEFAULT_BATCH_SIZE, progress=sys.stderr):
+    """
+    批量计算
+
+    参数:
+        compute (Callable[[dict], object]): 单条记录的计算函数（需为模块级函数，以便传给子进程）
+        input_path (str | Path): 输入文件（.csv / .jsonl）
+        output_path (str | Path): 输出文件（.jsonl / .cbin）或 Parquet 目录（.parquet）
+        workers (int): 进程数，默认 CPU 核数；为 1 时在当前进程计算
+        batch_size (int): 每批记录数
+        progress (TextIO): 进度输出流，None 时不输出
+
+    返回:
+        int: 累计完成的记录数（含之前运行已完成的部分）
+    """
+    checkpoint = load_checkpoint(output_path, input_path)
+    done = skipped = checkpoint["done"]
+    records = itertools.islice(read_records(input_path), skipped, None)
+    task = functools.partial(_compute_row, compute)
+    workers = workers or os.cpu_count() or 1
+    pool = multiprocessing.Pool(workers) if workers > 1 else None
+    sink = open_sink(output_path, checkpoint["position"])
+    start = time.perf_counter()
+
+    try:
+        while True:
+            batch = list(itertools.islice(records, batch_size))
+            if not batch:
+                break
+            if pool:
+                rows = pool.map(task, batch, chunksize=max(1, len(batch) // (workers * 4)))
+            else:
+                rows = [task(record) for record in batch]
+            checkpoint["position"] = sink.write(rows)
+            done += len(batch)
+            checkpoint["done"] = done
+            save_checkpoint(output_path, checkpoint)
+            if progress:
+                rate = (done - skipped) / max(time.perf_counter() - start, 1e-9)
+                progress.write(f"\r已完成 {done} 条（{rate:.0f} 条/秒）")
+                progress.flush()
+    finally:
+        sink.close()
+        if pool:
+            # 正常结束时任务已全部完成；中断时直接结束子进程
+            pool.terminate()
+            pool.join()
+
+    if progress:
+        progress.write(f"\r已完成 {done} 条，结果写入 {output_path}\n")
+    return done
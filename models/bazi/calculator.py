@@ -5,18 +5,21 @@
 
 import datetime
 import json
+import logging
 import os
 import functools
 import math
-import requests
 import base64
-from cryptography.fernet import Fernet
-from geopy.geocoders import Nominatim
 from lunar_python import Solar, Lunar
 
-@functools.lru_cache(maxsize=128)
+from models import clock, errors, timing
+from . import codec
+
+logger = logging.getLogger(__name__)
+
+@timing.timed("chart.calculate")
 def calculate_bazi(birth_year, birth_month, birth_day, birth_hour, gender, 
-                  longitude=116.4074, latitude=39.9042, city=None):
+                  longitude=116.4074, latitude=39.9042, city=None, as_of=None):
     """
     计算八字及相关信息，支持真太阳时校正
     
@@ -29,77 +32,83 @@ def calculate_bazi(birth_year, birth_month, birth_day, birth_hour, gender,
         longitude (float): 经度，默认北京116.4074
         latitude (float): 纬度，默认北京39.9042
         city (str, optional): 出生城市. 默认为None，使用经纬度
+        as_of (datetime.date, optional): 流年、流月、大运、小运的参考时间，默认取当前时钟。
+            结果只依赖其年月，按月截断后作为缓存键的一部分
     
     返回:
         dict: 包含八字、四柱五行、流年、流月、大运、小运、神煞的字典
     """
-    # 经纬度转换
     try:
-        if city:
-            # 尝试使用内部位置转换模块
+        return _calculate_bazi(birth_year, birth_month, birth_day, birth_hour, gender,
+                               longitude, latitude, city, clock.as_of(as_of, clock.MONTH))
+    except _Uncached as e:
+        return e.value
+
+class _Uncached(Exception):
+    """携带不应缓存的计算结果（lru_cache 不缓存异常）"""
+
+    def __init__(self, value):
+        super().__init__()
+        self.value = value
+
+@functools.lru_cache(maxsize=128)
+def _calculate_bazi(birth_year, birth_month, birth_day, birth_hour, gender,
+                    longitude, latitude, city, as_of):
+    """
+    计算八字（按参数缓存，as_of 为按月截断的参考日期；地理编码服务出错时的结果不缓存）
+    """
+    issues = errors.Issues()
+    location_failed = False
+    try:
+        validate_birth_time(birth_year, birth_month, birth_day, birth_hour)
+
+        # 经纬度转换：找不到城市时记为警告并使用传入的默认经纬度；
+        # 地理编码服务出错（网络故障等）时同样使用默认经纬度，但记为错误，结果不缓存
+        with timing.span("chart.geocode"):
             try:
-                from .location_converter import city_to_coordinates
-                coords = city_to_coordinates(city)
-                if coords:
-                    latitude, longitude = coords
-                else:
-                    # 如果内部模块无法找到城市，尝试使用外部地理编码
-                    geolocator = Nominatim(user_agent="curecipher")
-                    location = geolocator.geocode(city)
-                    if location:
-                        latitude = location.latitude
-                        longitude = location.longitude
-                    else:
-                        # 如果仍然找不到，使用默认值
-                        print(f"找不到城市 {city}，使用默认值: 经度={longitude}, 纬度={latitude}")
-            except ImportError:
-                # 如果内部模块不可用，使用外部地理编码
-                geolocator = Nominatim(user_agent="curecipher")
-                location = geolocator.geocode(city)
-                if location:
-                    latitude = location.latitude
-                    longitude = location.longitude
-                else:
-                    # 如果找不到城市，使用默认值
-                    print(f"找不到城市 {city}，使用默认值: 经度={longitude}, 纬度={latitude}")
-            
-        # 真太阳时校正
-        solar = Solar.fromYmdHms(birth_year, birth_month, birth_day, birth_hour, 0, 0)
-        
-        # 计算真太阳时偏差
-        time_diff = calculate_true_solar_time_diff(longitude, birth_year, birth_month, birth_day)
-        
-        # 调整时间
-        adjusted_hour = birth_hour + time_diff / 60  # 转换为小时
-        adjusted_day = birth_day
-        
-        # 处理跨日问题
-        if adjusted_hour >= 24:
-            adjusted_hour -= 24
-            adjusted_day += 1
-        elif adjusted_hour < 0:
-            adjusted_hour += 24
-            adjusted_day -= 1
+                latitude, longitude = resolve_location(city, latitude, longitude, issues)
+            except Exception as e:
+                issues.capture("location", e)
+                location_failed = True
+
+        with timing.span("chart.lunar"):
+            # 真太阳时校正
+            solar = Solar.fromYmdHms(birth_year, birth_month, birth_day, birth_hour, 0, 0)
+        
+            # 计算真太阳时偏差
+            time_diff = calculate_true_solar_time_diff(longitude, birth_year, birth_month, birth_day)
+        
+            # 调整时间
+            adjusted_hour = birth_hour + time_diff / 60  # 转换为小时
+            adjusted_day = birth_day
+        
+            # 处理跨日问题
+            if adjusted_hour >= 24:
+                adjusted_hour -= 24
+                adjusted_day += 1
+            elif adjusted_hour < 0:
+                adjusted_hour += 24
+                adjusted_day -= 1
             
-        # 创建调整后的Solar对象
-        adjusted_solar = Solar.fromYmdHms(
-            birth_year, 
-            birth_month, 
-            adjusted_day, 
-            int(adjusted_hour), 
-            int((adjusted_hour - int(adjusted_hour)) * 60), 
-            0
-        )
+            # 创建调整后的Solar对象
+            adjusted_solar = Solar.fromYmdHms(
+                birth_year, 
+                birth_month, 
+                adjusted_day, 
+                int(adjusted_hour), 
+                int((adjusted_hour - int(adjusted_hour)) * 60), 
+                0
+            )
         
-        # 获取农历
-        lunar = adjusted_solar.getLunar()
+            # 获取农历
+            lunar = adjusted_solar.getLunar()
         
-        # 八字
-        bazi = lunar.getEightChar()
-        year_gz = bazi.getYear()
-        month_gz = bazi.getMonth()
-        day_gz = bazi.getDay()
-        hour_gz = bazi.getTime()
+            # 八字
+            bazi = lunar.getEightChar()
+            year_gz = bazi.getYear()
+            month_gz = bazi.getMonth()
+            day_gz = bazi.getDay()
+            hour_gz = bazi.getTime()
         
         # 获取天干和地支
         year_gan = year_gz[0]
@@ -111,188 +120,193 @@ def calculate_bazi(birth_year, birth_month, birth_day, birth_hour, gender,
         hour_gan = hour_gz[0]
         hour_zhi = hour_gz[1:]
         
-        # 获取五行属性
-        year_element = get_element(year_gan)
-        month_element = get_element(month_gan)
-        day_element = get_element(day_gan)
-        hour_element = get_element(hour_gan)
-        
-        # 计算五行比例
-        elements_count = {"木": 0, "火": 0, "土": 0, "金": 0, "水": 0}
-        
-        # 天干五行
-        elements_count[get_element(year_gan)] += 1
-        elements_count[get_element(month_gan)] += 1
-        elements_count[get_element(day_gan)] += 1
-        elements_count[get_element(hour_gan)] += 1
-        
-        # 地支藏干五行（简化处理）
-        zhi_to_elements = {
-            "子": {"水": 1.0},
-            "丑": {"土": 0.5, "金": 0.3, "水": 0.2},
-            "寅": {"木": 0.6, "火": 0.3, "土": 0.1},
-            "卯": {"木": 1.0},
-            "辰": {"土": 0.6, "木": 0.3, "水": 0.1},
-            "巳": {"火": 0.6, "土": 0.3, "金": 0.1},
-            "午": {"火": 0.7, "土": 0.3},
-            "未": {"土": 0.6, "火": 0.3, "木": 0.1},
-            "申": {"金": 0.6, "水": 0.3, "土": 0.1},
-            "酉": {"金": 1.0},
-            "戌": {"土": 0.6, "火": 0.2, "木": 0.2},
-            "亥": {"水": 0.7, "木": 0.3}
-        }
-        
-        for zhi, elements in zhi_to_elements.items():
-            if zhi == year_zhi:
-                for element, weight in elements.items():
-                    elements_count[element] += weight
-            if zhi == month_zhi:
-                for element, weight in elements.items():
-                    elements_count[element] += weight
-            if zhi == day_zhi:
-                for element, weight in elements.items():
-                    elements_count[element] += weight
-            if zhi == hour_zhi:
-                for element, weight in elements.items():
-                    elements_count[element] += weight
-        
-        # 计算百分比
-        total = sum(elements_count.values())
-        element_percentages = {k: round(v / total * 100, 1) for k, v in elements_count.items()}
-        
-        # 纳音五行
-        nayin = {
-            "year": bazi.getYearNaYin(),
-            "month": bazi.getMonthNaYin(),
-            "day": bazi.getDayNaYin(),
-            "hour": bazi.getTimeNaYin()
-        }
-        
-        # 计算日主强弱
-        day_master_element = get_element(day_gan)
-        day_master_score = elements_count[day_master_element]
-        
-        # 判断日主强弱
-        if day_master_score / total >= 0.3:
-            day_master_strength = "旺"
-            day_master_strength_en = "Strong"
-            day_master_strength_es = "Fuerte"
-        elif day_master_score / total <= 0.15:
-            day_master_strength = "弱"
-            day_master_strength_en = "Weak"
-            day_master_strength_es = "Débil"
-        else:
-            day_master_strength = "中和"
-            day_master_strength_en = "Balanced"
-            day_master_strength_es = "Equilibrado"
-        
-        # 用神分析（简化）
-        if day_master_strength == "旺":
-            # 日主过旺，用耗泄
-            yong_shen = get_controlled_element(day_master_element)
-            yong_shen_en = get_element_english(yong_shen)
-            yong_shen_es = get_element_spanish(yong_shen)
-        elif day_master_strength == "弱":
-            # 日主过弱，用生助
-            yong_shen = get_generating_element(day_master_element)
-            yong_shen_en = get_element_english(yong_shen)
-            yong_shen_es = get_element_spanish(yong_shen)
-        else:
-            # 日主中和，平衡五行
-            weakest_element = min(elements_count.items(), key=lambda x: x[1])[0]
-            yong_shen = weakest_element
-            yong_shen_en = get_element_english(yong_shen)
-            yong_shen_es = get_element_spanish(yong_shen)
-        
-        # 当前年月的流年流月
-        current_year = datetime.datetime.now().year
-        current_month = datetime.datetime.now().month
-        
-        # 计算流年干支
-        lunar_current = calculate_liunian_ganzhi(current_year)
-        
-        # 计算流月干支
-        liuyue = calculate_liuyue_ganzhi(current_year, current_month)
-        
-        # 计算大运
-        # gender参数: 1代表男，0代表女
-        gender_code = 1 if gender.lower() == "male" else 0
-        try:
-            # 尝试调用大运计算
-            dayun_list = bazi.getDaYun(gender_code)
-        except AttributeError:
-            # 兼容处理：如果方法不可用，使用空列表
-            # 静默处理，不输出警告
-            dayun_list = []
+        with timing.span("chart.strength"):
+            # 获取五行属性
+            year_element = get_element(year_gan)
+            month_element = get_element(month_gan)
+            day_element = get_element(day_gan)
+            hour_element = get_element(hour_gan)
+        
+            # 计算五行比例
+            elements_count = {"木": 0, "火": 0, "土": 0, "金": 0, "水": 0}
+        
+            # 天干五行
+            elements_count[get_element(year_gan)] += 1
+            elements_count[get_element(month_gan)] += 1
+            elements_count[get_element(day_gan)] += 1
+            elements_count[get_element(hour_gan)] += 1
+        
+            # 地支藏干五行（简化处理）
+            zhi_to_elements = {
+                "子": {"水": 1.0},
+                "丑": {"土": 0.5, "金": 0.3, "水": 0.2},
+                "寅": {"木": 0.6, "火": 0.3, "土": 0.1},
+                "卯": {"木": 1.0},
+                "辰": {"土": 0.6, "木": 0.3, "水": 0.1},
+                "巳": {"火": 0.6, "土": 0.3, "金": 0.1},
+                "午": {"火": 0.7, "土": 0.3},
+                "未": {"土": 0.6, "火": 0.3, "木": 0.1},
+                "申": {"金": 0.6, "水": 0.3, "土": 0.1},
+                "酉": {"金": 1.0},
+                "戌": {"土": 0.6, "火": 0.2, "木": 0.2},
+                "亥": {"水": 0.7, "木": 0.3}
+            }
         
-        # 获取当前大运
-        current_dayun = None
-        start_ages = []
+            for zhi, elements in zhi_to_elements.items():
+                if zhi == year_zhi:
+                    for element, weight in elements.items():
+                        elements_count[element] += weight
+                if zhi == month_zhi:
+                    for element, weight in elements.items():
+                        elements_count[element] += weight
+                if zhi == day_zhi:
+                    for element, weight in elements.items():
+                        elements_count[element] += weight
+                if zhi == hour_zhi:
+                    for element, weight in elements.items():
+                        elements_count[element] += weight
+        
+            # 计算百分比
+            total = sum(elements_count.values())
+            element_percentages = {k: round(v / total * 100, 1) for k, v in elements_count.items()}
+        
+            # 纳音五行
+            nayin = {
+                "year": bazi.getYearNaYin(),
+                "month": bazi.getMonthNaYin(),
+                "day": bazi.getDayNaYin(),
+                "hour": bazi.getTimeNaYin()
+            }
         
-        if dayun_list:
+            # 计算日主强弱
+            day_master_element = get_element(day_gan)
+            day_master_score = elements_count[day_master_element]
+        
+            # 判断日主强弱
+            if day_master_score / total >= 0.3:
+                day_master_strength = "旺"
+                day_master_strength_en = "Strong"
+                day_master_strength_es = "Fuerte"
+            elif day_master_score / total <= 0.15:
+                day_master_strength = "弱"
+                day_master_strength_en = "Weak"
+                day_master_strength_es = "Débil"
+            else:
+                day_master_strength = "中和"
+                day_master_strength_en = "Balanced"
+                day_master_strength_es = "Equilibrado"
+        
+            # 用神分析（简化）
+            if day_master_strength == "旺":
+                # 日主过旺，用耗泄
+                yong_shen = get_controlled_element(day_master_element)
+                yong_shen_en = get_element_english(yong_shen)
+                yong_shen_es = get_element_spanish(yong_shen)
+            elif day_master_strength == "弱":
+                # 日主过弱，用生助
+                yong_shen = get_generating_element(day_master_element)
+                yong_shen_en = get_element_english(yong_shen)
+                yong_shen_es = get_element_spanish(yong_shen)
+            else:
+                # 日主中和，平衡五行
+                weakest_element = min(elements_count.items(), key=lambda x: x[1])[0]
+                yong_shen = weakest_element
+                yong_shen_en = get_element_english(yong_shen)
+                yong_shen_es = get_element_spanish(yong_shen)
+        
+        with timing.span("chart.liunian"):
+            # 参考年月的流年流月
+            current_year = as_of.year
+            current_month = as_of.month
+        
+            # 计算流年干支
+            lunar_current = calculate_liunian_ganzhi(current_year)
+        
+            # 计算流月干支
+            liuyue = calculate_liuyue_ganzhi(current_year, current_month)
+        
+        with timing.span("chart.dayun"):
+            # 计算大运
+            # gender参数: 1代表男，0代表女
+            gender_code = 1 if gender.lower() == "male" else 0
             try:
-                for i, yun in enumerate(dayun_list):
-                    start_age = yun.getStartAge()
-                    start_ages.append(start_age)
-                    if i < len(dayun_list) - 1:
-                        next_start_age = dayun_list[i+1].getStartAge()
-                        current_age = current_year - birth_year
-                        if start_age <= current_age < next_start_age:
-                            current_dayun = yun
-                            break
-                    else:
-                        # 最后一个大运
-                        if start_age <= current_age:
-                            current_dayun = yun
-            except Exception as e:
-                print(f"警告: 获取大运信息时出错: {e}")
-        
-        # 如果找不到当前大运，使用空实例
-        if not current_dayun:
-            current_dayun = {"ganzhi": "", "element": "", "start_age": 0, "end_age": 0}
-        
-        # 小运计算
-        xiaoyun = None
-        try:
-            xiaoyun = lunar.getXiaoYun(current_year, gender_code, True)
-        except AttributeError:
-            # 静默处理，不输出警告
-            xiaoyun = {"ganzhi": "", "element": ""}
-        
-        # 神煞
-        shensha_list = []
-        try:
-            shensha_list = bazi.getShenSha()
-        except AttributeError:
-            # 静默处理，不输出警告
-            pass
+                # 尝试调用大运计算
+                dayun_list = bazi.getDaYun(gender_code)
+            except AttributeError:
+                # 兼容处理：如果方法不可用，使用空列表
+                # 静默处理，不输出警告
+                dayun_list = []
+        
+            # 获取当前大运
+            current_dayun = None
+            start_ages = []
+        
+            if dayun_list:
+                try:
+                    for i, yun in enumerate(dayun_list):
+                        start_age = yun.getStartAge()
+                        start_ages.append(start_age)
+                        if i < len(dayun_list) - 1:
+                            next_start_age = dayun_list[i+1].getStartAge()
+                            current_age = current_year - birth_year
+                            if start_age <= current_age < next_start_age:
+                                current_dayun = yun
+                                break
+                        else:
+                            # 最后一个大运
+                            if start_age <= current_age:
+                                current_dayun = yun
+                except Exception as e:
+                    issues.capture("dayun", e)
+        
+            # 如果找不到当前大运，使用空实例
+            if not current_dayun:
+                current_dayun = {"ganzhi": "", "element": "", "start_age": 0, "end_age": 0}
+        
+            # 小运计算
+            xiaoyun = None
+            try:
+                xiaoyun = lunar.getXiaoYun(current_year, gender_code, True)
+            except AttributeError:
+                # 静默处理，不输出警告
+                xiaoyun = {"ganzhi": "", "element": ""}
+        
+        with timing.span("chart.shensha"):
+            # 神煞
+            shensha_list = []
+            try:
+                shensha_list = bazi.getShenSha()
+            except AttributeError:
+                # 静默处理，不输出警告
+                pass
         
         # 日主天干
         day_master = day_gan
         day_master_element = get_element(day_master)
         
-        # 尝试从六爻模块获取卦象信息（如果存在）
-        liuyao_info = {}
-        try:
-            from models.liuyao.liuyao_analyzer import calculate_gua
-            liuyao_info = calculate_gua(
-                birth_year=birth_year,
-                birth_month=birth_month,
-                birth_day=birth_day,
-                birth_hour=birth_hour,
-                year_gz=year_gz,
-                month_gz=month_gz,
-                day_gz=day_gz,
-                hour_gz=hour_gz,
-                shensha_list=shensha_list
-            )
-        except (ImportError, ModuleNotFoundError):
-            # 如果六爻模块不存在，留空
-            liuyao_info = {
-                "name": "未知",
-                "description": "六爻模块未安装",
-                "note": "请安装 models.liuyao.liuyao_analyzer 模块以获取六爻信息"
-            }
+        with timing.span("chart.liuyao"):
+            # 尝试从六爻模块获取卦象信息（如果存在）
+            liuyao_info = {}
+            try:
+                from models.liuyao.liuyao_analyzer import calculate_gua
+                liuyao_info = calculate_gua(
+                    birth_year=birth_year,
+                    birth_month=birth_month,
+                    birth_day=birth_day,
+                    birth_hour=birth_hour,
+                    year_gz=year_gz,
+                    month_gz=month_gz,
+                    day_gz=day_gz,
+                    hour_gz=hour_gz,
+                    shensha_list=shensha_list
+                )
+            except (ImportError, ModuleNotFoundError):
+                # 如果六爻模块不存在，留空
+                liuyao_info = {
+                    "name": "未知",
+                    "description": "六爻模块未安装",
+                    "note": "请安装 models.liuyao.liuyao_analyzer 模块以获取六爻信息"
+                }
         
         # 构建结果
         result = {
@@ -324,6 +338,7 @@ def calculate_bazi(birth_year, birth_month, birth_day, birth_hour, gender,
             },
             "nayin": nayin,
             "current": {
+                "as_of": as_of.isoformat(),
                 "liunian": lunar_current,
                 "liunian_element": get_element(lunar_current[0]),
                 "liuyue": liuyue,
@@ -353,29 +368,85 @@ def calculate_bazi(birth_year, birth_month, birth_day, birth_hour, gender,
             }
         }
         
-        # 加密数据（HIPAA合规）
-        try:
-            encrypted_result = encrypt_data(result)
-            encryption_status = "success"
-        except Exception as e:
-            print(f"加密结果数据时出错: {e}")
-            encrypted_result = f"ERROR: {str(e)}"
-            encryption_status = "failed"
-        
-        return {
+        with timing.span("chart.encrypt"):
+            # 加密数据（HIPAA合规）
+            try:
+                encrypted_result = encrypt_data(result)
+                encryption_status = "success"
+                if encrypted_result.startswith("HASH:"):
+                    issues.warn("encryption", "加密失败，只保留数据哈希", kind="EncryptionFailed", degraded=True)
+            except Exception as e:
+                issues.capture("encryption", e)
+                encrypted_result = f"ERROR: {str(e)}"
+                encryption_status = "failed"
+
+        result["issues"] = issues.to_dict()
+        value = {
             "result": result,
             "encrypted": encrypted_result,
             "encryption_status": encryption_status
         }
     
     except Exception as e:
-        print(f"计算八字时出错: {e}")
-        import traceback
-        traceback.print_exc()
-        return {
-            "error": str(e),
-            "message": "计算八字时出错，请检查输入参数和网络连接"
-        }
+        value = errors.error_result(e, issues)
+
+    if location_failed:
+        # 地理编码服务的临时故障不进入缓存，下次请求重新查询
+        raise _Uncached(value)
+    return value
+
+def resolve_location(city, latitude, longitude, issues):
+    """
+    查询城市坐标，找不到城市时记为警告并返回传入的默认经纬度
+
+    参数:
+        city (str): 城市名称，为空时直接返回默认经纬度
+        latitude (float): 默认纬度
+        longitude (float): 默认经度
+        issues (errors.Issues): 问题记录
+
+    返回:
+        tuple: (纬度, 经度)
+
+    异常:
+        地理编码服务出错时向外抛出，由调用方决定降级方式
+    """
+    if not city:
+        return latitude, longitude
+    # 尝试使用内部位置转换模块
+    try:
+        from .location_converter import city_to_coordinates
+        coords = city_to_coordinates(city)
+    except ImportError:
+        # 如果内部模块不可用，使用外部地理编码
+        coords = None
+    if coords:
+        return coords
+    location = geocode_city(city)
+    if location:
+        return location.latitude, location.longitude
+    issues.warn("location", f"找不到城市 {city}，使用默认值: 经度={longitude}, 纬度={latitude}",
+                kind="CityNotFound", degraded=True)
+    return latitude, longitude
+
+def validate_birth_time(birth_year, birth_month, birth_day, birth_hour):
+    """
+    校验出生时间（lunar_python 不校验日期，2 月 30 日等会得到错误的八字）
+
+    参数:
+        birth_year (int): 出生年
+        birth_month (int): 出生月
+        birth_day (int): 出生日
+        birth_hour (int): 出生时（24小时制）
+
+    异常:
+        InvalidBirthData: 日期不存在或时辰越界
+    """
+    try:
+        datetime.datetime(int(birth_year), int(birth_month), int(birth_day), int(birth_hour))
+    except (TypeError, ValueError) as e:
+        raise errors.InvalidBirthData(
+            f"出生日期无效: {birth_year}-{birth_month}-{birth_day} {birth_hour}时（{e}）") from e
 
 def calculate_true_solar_time_diff(longitude, year, month, day):
     """
@@ -419,6 +490,21 @@ def calculate_true_solar_time_diff(longitude, year, month, day):
     # 总时差
     return eq_time + local_time_diff
 
+def geocode_city(city):
+    """
+    通过在线地理编码服务查询城市坐标（geopy 在首次使用时才导入）
+    
+    参数:
+        city (str): 城市名称
+    
+    返回:
+        geopy.location.Location: 查询结果，找不到时为 None
+    """
+    from geopy.geocoders import Nominatim
+
+    geolocator = Nominatim(user_agent="curecipher")
+    return geolocator.geocode(city)
+
 def get_default_location():
     """
     获取默认位置（北京）
@@ -553,16 +639,18 @@ def encrypt_data(data):
         data (dict): 要加密的数据
     
     返回:
-        str: 加密后的数据
+        str: 加密后的数据（加密内容为 codec 紧凑编码）
     """
     try:
         # 使用固定密钥进行简单加密（实际使用中应使用安全的密钥管理）
+        from cryptography.fernet import Fernet
+
         key = get_encryption_key()
         fernet = Fernet(key)
-        encrypted = fernet.encrypt(json.dumps(data, ensure_ascii=False).encode())
+        encrypted = fernet.encrypt(codec.encode(data))
         return encrypted.decode()
     except Exception as e:
-        print(f"加密数据时出错: {e}")
+        logger.warning(f"加密数据时出错: {e}")
         # 在加密失败时返回原始数据的哈希值作为替代标识
         import hashlib
         data_str = json.dumps(data, ensure_ascii=False)
@@ -583,12 +671,17 @@ def decrypt_data(encrypted_data):
         if isinstance(encrypted_data, str) and encrypted_data.startswith("HASH:"):
             return {"status": "hash_only", "hash": encrypted_data[5:]}
         
+        from cryptography.fernet import Fernet
+
         key = get_encryption_key()
         fernet = Fernet(key)
         decrypted = fernet.decrypt(encrypted_data.encode())
+        # 兼容加密内容为 JSON 的旧数据
+        if codec.is_encoded(decrypted):
+            return codec.decode(decrypted)
         return json.loads(decrypted.decode())
     except Exception as e:
-        print(f"解密数据时出错: {e}")
+        logger.warning(f"解密数据时出错: {e}")
         return {"error": str(e), "status": "decryption_failed"}
 
 def calculate_liunian_ganzhi(year):
@@ -636,7 +729,7 @@ def calculate_liuyue_ganzhi(year, month):
 
 # 创建默认位置配置文件（如果不存在）
 def create_default_location_config():
-    """创建默认位置配置文件（如果不存在）"""
+    """创建默认位置配置文件（如果不存在），需显式调用，导入模块时不会写文件"""
     config_dir = os.path.dirname(os.path.abspath(__file__))
     config_path = os.path.join(config_dir, "location_config.json")
     
@@ -656,9 +749,6 @@ def create_default_location_config():
         except Exception as e:
             print(f"创建默认位置配置文件时出错: {e}")
 
-# 初始化配置文件
-create_default_location_config()
-
 if __name__ == "__main__":
     # 测试代码
     test_result = calculate_bazi(1990, 5, 15, 8, "male", longitude=116.4074, latitude=39.9042)
@@ -2,11 +2,12 @@
 八字计算模块（适配当前lunar_python版本）
 """
 
-import datetime
 import requests
 from geopy.geocoders import Nominatim
 from lunar_python import Solar, Lunar
 
+from models import clock
+
 def calculate_bazi(birth_year, birth_month, birth_day, birth_hour, gender, city=None):
     """
     计算八字及相关信息
@@ -76,8 +77,9 @@ def calculate_bazi(birth_year, birth_month, birth_day, birth_hour, gender, city=
         }
         
         # 当前年月的流年流月
-        current_year = datetime.datetime.now().year
-        current_month = datetime.datetime.now().month
+        current_date = clock.now()
+        current_year = current_date.year
+        current_month = current_date.month
         
         lunar_current = Lunar.fromYmd(current_year, current_month, 1)
         liunian = lunar_current.getYearInGanZhi()
@@ -3,10 +3,11 @@
 不依赖geopy，使用固定经纬度进行计算
 """
 
-import datetime
 import requests
 from lunar_python import Solar, Lunar, Gan, Zhi
 
+from models import clock
+
 def calculate_bazi(birth_year, birth_month, birth_day, birth_hour, gender, city=None):
     """
     计算八字及相关信息（简化版）
@@ -68,8 +69,9 @@ def calculate_bazi(birth_year, birth_month, birth_day, birth_hour, gender, city=
         }
         
         # 当前年月的流年流月
-        current_year = datetime.datetime.now().year
-        current_month = datetime.datetime.now().month
+        current_date = clock.now()
+        current_year = current_date.year
+        current_month = current_date.month
         
         lunar_current = Lunar.fromYmd(current_year, current_month, 1)
         liunian = lunar_current.getYearInGanZhi()
@@ -0,0 +1,402 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+命盘紧凑二进制编码
+
+计算结果是大量重复短字符串（干支、五行、十神、字段名）组成的嵌套字典，JSON 每次都要
+重复写出这些字符串。本模块按固定词表编码：词表中的字符串写为词表序号（常用的字段名、
+五行 0~4、天干、地支、十神 0~9、六十甲子等前 192 项只占 1 字节），词表外的字符串
+在同一份数据中首次出现时写出原文，之后只写引用序号；整数为变长编码，小数按四位定点
+编码。解码得到与编码前相同结构的字典（tuple 解码为 list，与 JSON 一致）。
+
+格式：MAGIC + VERSION，随后是一个值。每个值以一个字节开头：
+    0x00~0xBF  词表前 192 项
+    0xC0~0xCA  类型标记，见 T_* 常量
+    0xD0~0xFF  整数 0~47
+"""
+
+import math
+import struct
+
+MAGIC = b"CCB"
+VERSION = 1
+
+# 编码结果的媒体类型
+MEDIA_TYPE = "application/x-curecipher-chart"
+
+ELEMENTS = ("木", "火", "土", "金", "水")
+GANS = ("甲", "乙", "丙", "丁", "戊", "己", "庚", "辛", "壬", "癸")
+ZHIS = ("子", "丑", "寅", "卯", "辰", "巳", "午", "未", "申", "酉", "戌", "亥")
+TEN_GODS = ("比肩", "劫财", "食神", "伤官", "偏财", "正财", "七杀", "正官", "偏印", "正印")
+PILLARS = ("年", "月", "日", "时")
+
+# 六十甲子，序号 0~59
+GANZHI = tuple(GANS[i % 10] + ZHIS[i % 12] for i in range(60))
+
+# 计算结果中出现的字段名，按出现频率排序
+KEYS = (
+    "element", "name", "description", "positions", "gan", "zhi", "nayin", "ganzhi", "gan_shen", "zhi_shen",
+    "start_age", "end_age", "type", "members", "position", "year", "month", "day", "hour", "descriptions",
+    "influences", "matched", "gans", "zhis", "day_master", "day_master_element", "san_he", "san_hui", "xing",
+    "special", "impact", "issues", "errors", "warnings", "degraded", "bazi", "ten_gods", "zhis_all",
+    "five_elements", "scores", "relations", "empties", "gan_hes", "pillars", "gan_he", "liu_he", "liu_chong",
+    "liu_hai", "kong_wang", "ming_gong", "tai_yuan", "pattern", "strength", "strongest_element",
+    "weakest_element", "yong_shen", "yong_shen_type", "yong_gan", "yong_zhi", "shens_analysis", "positive",
+    "negative", "special_patterns", "chong", "hui", "he", "hai", "guan_xin", "explanation", "dayuns",
+    "current_dayun", "current", "liunian", "liunian_shen", "liuyue", "liuyue_shen", "liuri", "liuri_shen",
+    "shensha", "solar", "lunar", "location", "city", "latitude", "longitude", "analysis",
+    "day_master_strength", "day_master_percentage", "elements_balance", "balance_state", "std_deviation",
+    "strongest", "strongest_percentage", "weakest", "weakest_percentage", "shenshas", "gan1", "gan2",
+    "position1", "position2", "section", "kind", "severity", "message", "error", "error_type", "result",
+    "formatted", "elements", "percentages", "status", "as_of", "liunian_element", "liuyue_element", "dayun",
+    "xiaoyun", "liuyao", "note", "true_solar_time", "original", "adjusted", "diff_minutes", "encrypted",
+    "encryption_status", "element_counts", "element_percentages", "balance_analysis", "balance_code",
+    "day_master_analysis", "strength_state", "health_status", "health_advice", "diet_advice",
+    "exercise_advice", "relationships", "key_relations", "detailed_relations", "overall_analysis", "ranks",
+    "positive_impacts", "negative_impacts", "positive_count", "negative_count", "health", "remedy",
+    "advice", "effect", "percentage", "input", "bazi_result", "elements_result", "shensha_result",
+)
+
+# 纳音（含本项目纳音表与通行写法的不同用字）
+NAYIN = (
+    "海中金", "炉中火", "大林木", "路旁土", "剑锋金", "山头火", "涧下水", "城头土", "白蜡金", "杨柳木",
+    "泉中水", "屋上土", "霹雳火", "松柏木", "长流水", "砂石金", "山下火", "平地木", "壁上土", "金薄金",
+    "覆灯火", "天河水", "大驿土", "钗环金", "桑柘木", "大溪水", "沙中土", "天上火", "石榴木", "大海水",
+    "沙中金", "金箔金", "钗钏金",
+)
+
+SHENSHA = (
+    "太岁", "劫煞", "灾煞", "岁煞", "天德", "月德", "日德", "福神", "喜神", "天乙贵人", "太极贵人",
+    "福星贵人", "国印贵人", "文昌", "驿马", "桃花", "华盖", "金舆", "天医", "亡神", "飞刃", "吊客", "白虎",
+    "羊刃", "空亡",
+)
+
+# 其他常见取值（旺衰、用神类型、合冲刑害名称等）
+TERMS = (
+    "旺", "偏旺", "中和", "偏弱", "弱", "未知", "泄身", "耗身", "扶身", "生身", "非常平衡", "较为平衡",
+    "大运", "流年", "流月", "冠带格局", "error", "warning", "male", "female", "Beijing",
+    "水三合", "木三合", "火三合", "金三合", "东方三会", "南方三会", "西方三会", "北方三会",
+    "中正之合", "仁义之合", "威制之合", "淫慝之合", "无情之合", "无恩之刑", "恃势之刑", "无礼之刑",
+    "甲己合", "乙庚合", "丙辛合", "丁壬合", "戊癸合",
+    "子丑合", "寅亥合", "卯戌合", "辰酉合", "巳申合", "午未合",
+    "子午冲", "丑未冲", "寅申冲", "卯酉冲", "辰戌冲", "巳亥冲",
+    "子未害", "丑午害", "寅巳害", "卯辰害", "申亥害", "酉戌害",
+    "子未相害", "丑午相害", "寅巳相害", "卯辰相害", "申亥相害", "酉戌相害",
+    "辰自刑", "午自刑", "酉自刑", "亥自刑", "辰辰自刑", "午午自刑", "酉酉自刑", "亥亥自刑",
+)
+
+# 词表是编码格式的一部分：已有条目的顺序不能改变，新词条只能追加在末尾（TERMS 之后），
+# 这样旧数据仍可解码
+VOCABULARY = tuple(dict.fromkeys(ELEMENTS + GANS + ZHIS + TEN_GODS + PILLARS + ("",) + KEYS + GANZHI
+                                 + NAYIN + SHENSHA + TERMS))
+_INDEX = {word: index for index, word in enumerate(VOCABULARY)}
+
+# 小于 DIRECT 的首字节直接表示词表序号
+DIRECT = 0xC0
+
+T_NONE = 0xC0
+T_FALSE = 0xC1
+T_TRUE = 0xC2
+T_VOCAB = 0xC3    # 词表序号 - DIRECT（变长）
+T_INT = 0xC4      # zigzag 变长整数
+T_DECIMAL = 0xC5  # 小数 × SCALE 的 zigzag 变长整数
+T_FLOAT = 0xC6    # 8 字节双精度
+T_STR = 0xC7      # 长度 + UTF-8 原文
+T_REF = 0xC8      # 本份数据中第 n 个原文字符串
+T_LIST = 0xC9     # 长度 + 各项
+T_DICT = 0xCA     # 长度 + 各键值对
+
+# 0xD0~0xFF 表示整数 0~47
+SMALL_INT = 0xD0
+SMALL_INT_MAX = 0xFF - SMALL_INT
+
+# 定点小数的倍数（四位小数以内的数值按整数编码）
+SCALE = 10000
+_DECIMAL_LIMIT = 2 ** 53 / SCALE
+
+_DOUBLE = struct.Struct("<d")
+
+
+def _write_uint(out, value):
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _write_sint(out, value):
+    _write_uint(out, value << 1 if value >= 0 else (-value << 1) - 1)
+
+
+def _write(out, value, strings, default):
+    # 长度绝大多数小于 0x80，单字节的情况直接写出
+    kind = type(value)
+    if kind is str:
+        index = _INDEX.get(value)
+        if index is not None:
+            if index < DIRECT:
+                out.append(index)
+            else:
+                out.append(T_VOCAB)
+                _write_uint(out, index - DIRECT)
+            return
+        ref = strings.get(value)
+        if ref is not None:
+            out.append(T_REF)
+            _write_uint(out, ref)
+            return
+        strings[value] = len(strings)
+        data = value.encode("utf-8")
+        if len(data) < 0x80:
+            out.append(T_STR)
+            out.append(len(data))
+        else:
+            out.append(T_STR)
+            _write_uint(out, len(data))
+        out += data
+    elif kind is dict:
+        out.append(T_DICT)
+        if len(value) < 0x80:
+            out.append(len(value))
+        else:
+            _write_uint(out, len(value))
+        for key, item in value.items():
+            _write(out, key, strings, default)
+            _write(out, item, strings, default)
+    elif kind is list or kind is tuple:
+        out.append(T_LIST)
+        if len(value) < 0x80:
+            out.append(len(value))
+        else:
+            _write_uint(out, len(value))
+        for item in value:
+            _write(out, item, strings, default)
+    elif kind is int:
+        if 0 <= value <= SMALL_INT_MAX:
+            out.append(SMALL_INT + value)
+        else:
+            out.append(T_INT)
+            _write_sint(out, value)
+    elif kind is float:
+        if math.isfinite(value) and abs(value) < _DECIMAL_LIMIT:
+            scaled = round(value * SCALE)
+            if scaled / SCALE == value:
+                out.append(T_DECIMAL)
+                _write_sint(out, scaled)
+                return
+        out.append(T_FLOAT)
+        out += _DOUBLE.pack(value)
+    elif value is None:
+        out.append(T_NONE)
+    elif value is True:
+        out.append(T_TRUE)
+    elif value is False:
+        out.append(T_FALSE)
+    # 子类（如 FrozenDict、枚举）按基本类型编码
+    elif isinstance(value, str):
+        _write(out, str(value), strings, default)
+    elif isinstance(value, int):
+        _write(out, int(value), strings, default)
+    elif isinstance(value, float):
+        _write(out, float(value), strings, default)
+    elif isinstance(value, dict) or hasattr(value, "items"):
+        _write(out, dict(value.items()), strings, default)
+    elif isinstance(value, (list, tuple)):
+        _write(out, list(value), strings, default)
+    elif default is not None:
+        _write(out, default(value), strings, None)
+    else:
+        raise TypeError(f"无法编码的类型: {type(value).__name__}")
+
+
+def encode(value, default=None):
+    """
+    编码计算结果
+
+    参数:
+        value: 由 dict / list / tuple / str / int / float / bool / None 组成的数据
+        default (Callable, optional): 把其他类型转换为可编码的值（同 json.dumps 的 default）
+
+    返回:
+        bytes: 编码结果
+
+    异常:
+        TypeError: 包含无法编码的类型
+    """
+    out = bytearray(MAGIC)
+    out.append(VERSION)
+    _write(out, value, {}, default)
+    return bytes(out)
+
+
+def _read_uint(data, pos):
+    result = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+
+def _read_sint(data, pos):
+    value, pos = _read_uint(data, pos)
+    return (value >> 1) if not value & 1 else -((value + 1) >> 1), pos
+
+
+def _read(data, pos, strings):
+    tag = data[pos]
+    pos += 1
+    if tag < DIRECT:
+        return VOCABULARY[tag], pos
+    if tag == T_STR:
+        size = data[pos]
+        if size < 0x80:
+            pos += 1
+        else:
+            size, pos = _read_uint(data, pos)
+        end = pos + size
+        if end > len(data):
+            raise IndexError(pos)
+        value = data[pos:end].decode("utf-8")
+        strings.append(value)
+        return value, end
+    if tag == T_DICT:
+        size = data[pos]
+        if size < 0x80:
+            pos += 1
+        else:
+            size, pos = _read_uint(data, pos)
+        result = {}
+        for _ in range(size):
+            key, pos = _read(data, pos, strings)
+            result[key], pos = _read(data, pos, strings)
+        return result, pos
+    if tag >= SMALL_INT:
+        return tag - SMALL_INT, pos
+    if tag == T_LIST:
+        size = data[pos]
+        if size < 0x80:
+            pos += 1
+        else:
+            size, pos = _read_uint(data, pos)
+        result = [None] * size
+        for index in range(size):
+            result[index], pos = _read(data, pos, strings)
+        return result, pos
+    if tag == T_REF:
+        index, pos = _read_uint(data, pos)
+        return strings[index], pos
+    if tag == T_VOCAB:
+        index, pos = _read_uint(data, pos)
+        return VOCABULARY[index + DIRECT], pos
+    if tag == T_DECIMAL:
+        value, pos = _read_sint(data, pos)
+        return value / SCALE, pos
+    if tag == T_INT:
+        return _read_sint(data, pos)
+    if tag == T_FLOAT:
+        if pos + _DOUBLE.size > len(data):
+            raise IndexError(pos)
+        return _DOUBLE.unpack_from(data, pos)[0], pos + _DOUBLE.size
+    if tag == T_NONE:
+        return None, pos
+    if tag == T_TRUE:
+        return True, pos
+    if tag == T_FALSE:
+        return False, pos
+    raise ValueError(f"未知的类型标记: 0x{tag:02X}")
+
+
+def is_encoded(data):
+    """
+    数据是否为本模块的编码结果
+
+    参数:
+        data (bytes | bytearray | memoryview): 数据
+
+    返回:
+        bool: 以 MAGIC 开头时为 True
+    """
+    return isinstance(data, (bytes, bytearray, memoryview)) and bytes(data[:len(MAGIC)]) == MAGIC
+
+
+def decode(data):
+    """
+    解码 encode 的结果
+
+    参数:
+        data (bytes | bytearray | memoryview): 编码结果
+
+    返回:
+        编码前的数据（tuple 解码为 list）
+
+    异常:
+        ValueError: 不是编码结果、版本不支持或数据不完整
+    """
+    if not is_encoded(data):
+        raise ValueError("不是命盘编码数据")
+    # 字符串按切片解码，memoryview 没有 decode 方法；对 bytes 不会复制
+    data = bytes(data)
+    header = len(MAGIC) + 1
+    if len(data) < header or data[len(MAGIC)] > VERSION:
+        raise ValueError(f"不支持的命盘编码版本: {data[len(MAGIC)] if len(data) >= header else '缺失'}")
+    try:
+        value, pos = _read(data, header, [])
+    except (IndexError, RecursionError) as e:
+        raise ValueError("命盘编码数据不完整") from e
+    except UnicodeDecodeError as e:
+        raise ValueError("命盘编码数据损坏") from e
+    if pos != len(data):
+        raise ValueError(f"命盘编码数据末尾有多余的 {len(data) - pos} 字节")
+    return value
+
+
+def dump(value, file, default=None):
+    """
+    把编码结果以“长度 + 数据”的帧写入二进制文件，可连续写入多条
+
+    参数:
+        value: 要编码的数据
+        file: 以二进制模式打开的文件
+        default (Callable, optional): 同 encode
+    """
+    data = encode(value, default)
+    size = bytearray()
+    _write_uint(size, len(data))
+    file.write(size)
+    file.write(data)
+
+
+def iter_load(file):
+    """
+    逐条读取 dump 写入的数据
+
+    参数:
+        file: 以二进制模式打开的文件
+
+    返回:
+        Iterator: 解码后的各条数据
+
+    异常:
+        ValueError: 文件末尾的帧不完整
+    """
+    while True:
+        size = 0
+        shift = 0
+        while True:
+            byte = file.read(1)
+            if not byte:
+                if shift:
+                    raise ValueError("命盘编码文件末尾不完整")
+                return
+            size |= (byte[0] & 0x7F) << shift
+            shift += 7
+            if byte[0] < 0x80:
+                break
+        data = file.read(size)
+        if len(data) < size:
+            raise ValueError("命盘编码文件末尾不完整")
+        yield decode(data)
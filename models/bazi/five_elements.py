@@ -6,17 +6,38 @@
 提供健康建议
 """
 
-import json
-import os
-import datetime
-from pathlib import Path
+import numpy as np
 
-def analyze_five_elements(bazi_result):
+from models import timing
+
+from .advice_index import DEFAULT_LOCALE
+from .advice_index import ELEMENTS
+from .advice_index import current_season
+from .advice_index import get_advice_index
+
+# 五行序号（ELEMENTS 与各结果字典的键顺序一致）
+ELEMENT_INDEX = {element: index for index, element in enumerate(ELEMENTS)}
+
+# 各来源的五行权重
+PILLAR_WEIGHT = 1.0
+NAYIN_WEIGHT = 0.5
+CURRENT_WEIGHT = 1.5
+DAYUN_WEIGHT = 2.0
+XIAOYUN_WEIGHT = 1.0
+
+# 平衡状态（按标准差分档）
+BALANCE_THRESHOLDS = (5, 10, 15, 20)
+BALANCE_STATES = ("非常平衡", "较为平衡", "稍有不平衡", "明显不平衡", "严重不平衡")
+
+@timing.timed("bazi.five_elements")
+def analyze_five_elements(bazi_result, locale=DEFAULT_LOCALE, as_of=None):
     """
     分析八字中的五行比例和健康影响
     
     参数:
         bazi_result (dict): calculate_bazi 函数的返回结果
+        locale (str): 建议文案的语言代码
+        as_of: 季节建议的参考日期，默认取八字结果的 current.as_of，其次为当前时钟
     
     返回:
         dict: 五行分析结果，包括五行比例和健康建议
@@ -37,19 +58,19 @@ def analyze_five_elements(bazi_result):
     elements[bazi_result["elements"]["hour"]] += 1
     
     # 纳音五行（权重较低）
-    nayin_weight = 0.5
+    nayin_weight = NAYIN_WEIGHT
     nayin_elements = extract_elements_from_nayin(bazi_result["nayin"])
     for element, count in nayin_elements.items():
         elements[element] += count * nayin_weight
     
     # 当前流年流月的五行（权重较高）
-    current_weight = 1.5
+    current_weight = CURRENT_WEIGHT
     elements[bazi_result["current"]["liunian_element"]] += current_weight
     elements[bazi_result["current"]["liuyue_element"]] += current_weight
     
     # 大运小运的五行（权重较高）
-    dayun_weight = 2.0
-    xiaoyun_weight = 1.0
+    dayun_weight = DAYUN_WEIGHT
+    xiaoyun_weight = XIAOYUN_WEIGHT
     
     # 安全处理大运小运的元素
     if "dayun" in bazi_result and bazi_result["dayun"].get("element", ""):
@@ -58,6 +79,28 @@ def analyze_five_elements(bazi_result):
     if "xiaoyun" in bazi_result and bazi_result["xiaoyun"].get("element", ""):
         elements[bazi_result["xiaoyun"]["element"]] += xiaoyun_weight
     
+    season = current_season(_chart_as_of(bazi_result, as_of))
+    return _analyze_counts(bazi_result["bazi"]["day_master_element"], elements, season, locale)
+
+def _chart_as_of(bazi_result, as_of=None):
+    """八字结果的参考日期：显式参数优先，其次为 current.as_of"""
+    if as_of is None:
+        as_of = bazi_result.get("current", {}).get("as_of")
+    return as_of
+
+def _analyze_counts(day_master, elements, season, locale=DEFAULT_LOCALE):
+    """
+    根据五行权重计数生成完整的五行分析
+
+    参数:
+        day_master (str): 日主五行
+        elements (dict): 五行权重计数
+        season (str): 季节代码
+        locale (str): 建议文案的语言代码
+
+    返回:
+        dict: 五行分析结果，结构同 analyze_five_elements
+    """
     # 计算总权重
     total_weight = sum(elements.values())
     
@@ -65,21 +108,20 @@ def analyze_five_elements(bazi_result):
     element_percentages = {element: (count / total_weight) * 100 for element, count in elements.items()}
     
     # 分析五行平衡状态
-    balance_analysis = analyze_balance(element_percentages)
+    balance_analysis = analyze_balance(element_percentages, locale)
     
     # 根据日主分析旺衰
-    day_master = bazi_result["bazi"]["day_master_element"]
     day_master_analysis = analyze_day_master(day_master, element_percentages)
     
     # 生克关系分析
     relations_analysis = analyze_relations(day_master, element_percentages)
     
-    # 健康建议
-    health_advice = generate_health_advice(day_master, element_percentages, balance_analysis)
+    # 健康建议（查建议索引）
+    health_advice = generate_health_advice(day_master, element_percentages, balance_analysis, season, locale)
     
     # 整合饮食和运动建议
-    diet_advice = generate_diet_advice(element_percentages)
-    exercise_advice = generate_exercise_advice(element_percentages)
+    diet_advice = generate_diet_advice(element_percentages, season, locale)
+    exercise_advice = generate_exercise_advice(element_percentages, locale)
     
     return {
         "element_counts": elements,
@@ -92,6 +134,139 @@ def analyze_five_elements(bazi_result):
         "exercise_advice": exercise_advice
     }
 
+def _nayin_index(value):
+    """纳音取最后一个字作为五行，返回五行序号，无法识别时返回 -1"""
+    return ELEMENT_INDEX.get(value[-1:], -1) if value else -1
+
+def element_weight_matrix(charts):
+    """
+    构建多个八字的五行权重矩阵
+
+    各列顺序为 ELEMENTS（木火土金水），权重与 analyze_five_elements 相同：
+    四柱各 1，纳音各 0.5，流年流月各 1.5，大运 2，小运 1。
+
+    参数:
+        charts (list): calculate_bazi 函数的返回结果列表
+
+    返回:
+        numpy.ndarray: 形状为 (N, 5) 的权重矩阵
+    """
+    rows, columns, weights = [], [], []
+    
+    def add(row, element_index, weight):
+        rows.append(row)
+        columns.append(element_index)
+        weights.append(weight)
+    
+    for row, chart in enumerate(charts):
+        pillars = chart["elements"]
+        for key in ("year", "month", "day", "hour"):
+            add(row, ELEMENT_INDEX[pillars[key]], PILLAR_WEIGHT)
+        
+        for value in chart["nayin"].values():
+            element_index = _nayin_index(value)
+            if element_index >= 0:
+                add(row, element_index, NAYIN_WEIGHT)
+        
+        current = chart["current"]
+        add(row, ELEMENT_INDEX[current["liunian_element"]], CURRENT_WEIGHT)
+        add(row, ELEMENT_INDEX[current["liuyue_element"]], CURRENT_WEIGHT)
+        
+        if chart.get("dayun", {}).get("element", ""):
+            add(row, ELEMENT_INDEX[chart["dayun"]["element"]], DAYUN_WEIGHT)
+        if chart.get("xiaoyun", {}).get("element", ""):
+            add(row, ELEMENT_INDEX[chart["xiaoyun"]["element"]], XIAOYUN_WEIGHT)
+    
+    matrix = np.zeros((len(charts), len(ELEMENTS)), dtype=np.float64)
+    # 权重均为 0.5 的倍数，累加顺序不影响结果，与逐个计算完全一致
+    np.add.at(matrix, (np.asarray(rows, dtype=np.intp), np.asarray(columns, dtype=np.intp)),
+              np.asarray(weights, dtype=np.float64))
+    return matrix
+
+def _advice_rows(with_advice, count):
+    """将 with_advice 参数转换为需要生成建议的行号列表"""
+    if with_advice is None or with_advice is False:
+        return []
+    if with_advice is True:
+        return list(range(count))
+    mask = np.asarray(with_advice)
+    if mask.dtype == np.bool_:
+        if mask.shape != (count,):
+            raise ValueError(f"with_advice 掩码长度应为 {count}")
+        return np.flatnonzero(mask).tolist()
+    rows = [int(row) for row in mask.ravel()]
+    for row in rows:
+        if not -count <= row < count:
+            raise IndexError(f"行号超出范围: {row}")
+    return [row % count for row in rows]
+
+def analyze_five_elements_batch(charts, with_advice=None, locale=DEFAULT_LOCALE, as_of=None):
+    """
+    批量分析多个八字的五行比例（列式结果）
+
+    百分比、标准差、平衡状态、最强最弱五行和强弱排序均以数组运算完成；
+    建议文本只为 with_advice 指定的行生成，结果与 analyze_five_elements 一致。
+
+    参数:
+        charts (list): calculate_bazi 函数的返回结果列表
+        with_advice: 需要生成完整分析与建议的行，None/False 为不生成，
+            True 为全部，也可以是行号列表或长度为 N 的布尔掩码
+        locale (str): 建议文案的语言代码
+        as_of: 季节建议的参考日期，默认取各八字结果的 current.as_of，其次为当前时钟
+
+    返回:
+        dict: 列式分析结果
+            elements: 五行顺序 ELEMENTS
+            element_counts: (N, 5) 五行权重
+            element_percentages: (N, 5) 五行百分比
+            std_deviation: (N,) 百分比标准差
+            balance_code: (N,) 平衡状态序号，对应 BALANCE_STATES
+            balance_state: (N,) 平衡状态名称
+            strongest / weakest: (N,) 最强 / 最弱五行序号
+            ranks: (N, 5) 五行序号按百分比由弱到强排列
+            advice: {行号: analyze_five_elements 结构的完整结果}
+    """
+    charts = list(charts)
+    counts = element_weight_matrix(charts)
+    
+    totals = counts.sum(axis=1, keepdims=True)
+    percentages = counts / totals * 100
+    
+    # 与 analyze_balance 相同的逐项累加顺序，保证分档边界一致
+    columns = [percentages[:, i] for i in range(len(ELEMENTS))]
+    avg = sum(columns) / 5
+    variance = sum((column - avg) ** 2 for column in columns) / 5
+    std_dev = np.sqrt(variance)
+    
+    balance_code = np.searchsorted(np.asarray(BALANCE_THRESHOLDS, dtype=np.float64), std_dev, side="right")
+    
+    # argmax/argmin 取第一个极值，与 max()/min() 在并列时的结果一致；
+    # 稳定排序与 sorted() 一致
+    strongest = np.argmax(percentages, axis=1)
+    weakest = np.argmin(percentages, axis=1)
+    ranks = np.argsort(percentages, axis=1, kind="stable")
+    
+    advice = {}
+    for row in _advice_rows(with_advice, len(charts)):
+        if row in advice:
+            continue
+        elements = {element: counts[row, i].item() for i, element in enumerate(ELEMENTS)}
+        season = current_season(_chart_as_of(charts[row], as_of))
+        advice[row] = _analyze_counts(charts[row]["bazi"]["day_master_element"], elements, season, locale)
+    
+    return {
+        "elements": ELEMENTS,
+        "element_counts": counts,
+        "element_percentages": percentages,
+        "std_deviation": std_dev,
+        "balance_code": balance_code,
+        "balance_state": np.asarray(BALANCE_STATES)[balance_code],
+        "strongest": strongest,
+        "weakest": weakest,
+        "ranks": ranks,
+        "advice": advice
+    }
+
 def extract_elements_from_nayin(nayin_dict):
     """
     从纳音五行中提取五行元素
@@ -125,12 +300,13 @@ def extract_elements_from_nayin(nayin_dict):
     
     return elements
 
-def analyze_balance(element_percentages):
+def analyze_balance(element_percentages, locale=DEFAULT_LOCALE):
     """
     分析五行平衡状态
     
     参数:
         element_percentages (dict): 五行百分比
+        locale (str): 描述文案的语言代码
     
     返回:
         dict: 平衡分析结果
@@ -147,19 +323,15 @@ def analyze_balance(element_percentages):
     # 分析平衡状态
     if std_dev < 5:
         balance_state = "非常平衡"
-        description = "五行分布非常均衡，有利于整体健康。"
     elif std_dev < 10:
         balance_state = "较为平衡"
-        description = "五行分布较为均衡，整体健康状况良好。"
     elif std_dev < 15:
         balance_state = "稍有不平衡"
-        description = f"{strongest[0]}偏强，{weakest[0]}偏弱，可能需要适当调整。"
     elif std_dev < 20:
         balance_state = "明显不平衡"
-        description = f"{strongest[0]}明显过强，{weakest[0]}明显不足，需要重点调整。"
     else:
         balance_state = "严重不平衡"
-        description = f"{strongest[0]}极度过强，{weakest[0]}极度不足，健康可能受到影响，需要及时调整。"
+    description = get_advice_index(locale).balance_description(balance_state, strongest[0], weakest[0])
     
     return {
         "balance_state": balance_state,
@@ -297,7 +469,7 @@ def analyze_relations(day_master, element_percentages):
         "key_relations": key_relations
     }
 
-def generate_health_advice(day_master, element_percentages, balance_analysis):
+def generate_health_advice(day_master, element_percentages, balance_analysis, season=None, locale=DEFAULT_LOCALE):
     """
     根据五行分析生成健康建议
     
@@ -305,381 +477,55 @@ def generate_health_advice(day_master, element_percentages, balance_analysis):
         day_master (str): 日主五行
         element_percentages (dict): 五行百分比
         balance_analysis (dict): 平衡分析结果
+        season (str): 季节代码（spring/summer/autumn/winter），默认为当前季节
+        locale (str): 语言代码
     
     返回:
-        dict: 健康建议
-    """
-    # 五行对应的身体系统和北美常见病
-    element_body_systems = {
-        "木": {"systems": ["肝", "胆", "筋络", "眼睛"], "diseases": ["慢性疼痛", "焦虑抑郁"]},
-        "火": {"systems": ["心", "小肠", "血脉", "舌"], "diseases": ["高血压", "糖尿病并发心血管病"]},
-        "土": {"systems": ["脾", "胃", "肌肉", "口"], "diseases": ["肥胖", "脾虚"]},
-        "金": {"systems": ["肺", "大肠", "皮毛", "鼻"], "diseases": ["慢性疼痛", "疫苗后遗症疲劳"]},
-        "水": {"systems": ["肾", "膀胱", "骨髓", "耳"], "diseases": ["肾虚", "糖尿病并发肾病"]}
-    }
-    
+        dict: 健康建议（共享的只读结构）
+    """
     # 过强和过弱的五行
-    excess_elements = [e for e, p in element_percentages.items() if p > 25]
-    deficient_elements = [e for e, p in element_percentages.items() if p < 10]
-    
-    # 健康风险
-    health_risks = []
-    for element in excess_elements:
-        health_risks.append({
-            "element": element,
-            "affected_systems": element_body_systems[element]["systems"],
-            "diseases": element_body_systems[element]["diseases"],
-            "risk_type": "过盛",
-            "description": f"{element}过盛，可能导致{', '.join(element_body_systems[element]['systems'])}功能亢进或炎症，易引发{', '.join(element_body_systems[element]['diseases'])}"
-        })
-    
-    for element in deficient_elements:
-        health_risks.append({
-            "element": element,
-            "affected_systems": element_body_systems[element]["systems"],
-            "diseases": element_body_systems[element]["diseases"],
-            "risk_type": "不足",
-            "description": f"{element}不足，可能导致{', '.join(element_body_systems[element]['systems'])}功能减弱，易引发{', '.join(element_body_systems[element]['diseases'])}"
-        })
+    excess_elements = tuple(e for e, p in element_percentages.items() if p > 25)
+    deficient_elements = tuple(e for e, p in element_percentages.items() if p < 10)
     
-    # 日主相关的健康建议
-    day_master_advice = {
-        "木": "注意保护肝脏，避免情绪激动，保持规律作息，适当进行舒展性运动。",
-        "火": "注意心脏健康，避免过度兴奋，保持情绪平和，适当进行有氧运动但避免过度。",
-        "土": "注意脾胃健康，定时规律饮食，避免过食生冷，加强肌肉锻炼。",
-        "金": "注意呼吸系统健康，避免接触烟尘环境，保持环境通风，注意皮肤保湿。",
-        "水": "注意肾脏和泌尿系统健康，保持充足的睡眠，避免过度劳累，补充足够水分。"
-    }
-    
-    # 季节性建议
-    seasonal_advice = {
-        "春季": {
-            "木": "春季肝气旺盛，不宜过度滋补，以平和调理为主。",
-            "火": "春季注意心火上炎，保持心情平和，避免过度刺激。",
-            "土": "春季脾胃功能相对减弱，饮食宜温和，避免生冷。",
-            "金": "春季肺气相对偏弱，注意保暖，防止风邪入侵。",
-            "水": "春季肾水应养护，避免过度消耗，保持充足休息。"
-        },
-        "夏季": {
-            "木": "夏季肝火易旺，注意清热解毒，避免过度疲劳。",
-            "火": "夏季心火最旺，注意清心降火，避免暴晒和情绪激动。",
-            "土": "夏季湿热影响脾胃，饮食宜清淡，避免重油腻食物。",
-            "金": "夏季肺气最弱，注意防暑降温，保持呼吸道湿润。",
-            "水": "夏季肾水易亏，注意补水养阴，避免过度出汗。"
-        },
-        "秋季": {
-            "木": "秋季肝气收敛，注意情志调养，避免抑郁。",
-            "火": "秋季心火渐弱，注意保持情绪稳定，防止虚火上浮。",
-            "土": "秋季脾胃功能逐渐恢复，饮食宜平和，补充纤维质。",
-            "金": "秋季肺气最旺，注意防燥润肺，避免辛辣刺激。",
-            "水": "秋季肾水需养护，注意保暖，防止寒邪入侵。"
-        },
-        "冬季": {
-            "木": "冬季肝气闭藏，注意舒肝解郁，避免情绪压抑。",
-            "火": "冬季心火内敛，注意保持心阳，避免过度寒冷。",
-            "土": "冬季脾胃需温养，饮食宜温热，适当增加热量。",
-            "金": "冬季肺气偏弱，注意保暖防寒，避免呼吸道感染。",
-            "水": "冬季肾水当令，注意培补肾精，避免过度劳累。"
-        }
-    }
-    
-    # 确定当前季节
-    month = datetime.datetime.now().month
-    season = ""
-    if 3 <= month <= 5:
-        season = "春季"
-    elif 6 <= month <= 8:
-        season = "夏季"
-    elif 9 <= month <= 11:
-        season = "秋季"
-    else:
-        season = "冬季"
-    
-    return {
-        "general_advice": day_master_advice[day_master],
-        "seasonal_advice": seasonal_advice[season][day_master],
-        "health_risks": health_risks,
-        "balance_recommendation": balance_analysis["description"],
-        "specific_recommendations": [
-            f"增强{balance_analysis['weakest']}的相关功能",
-            f"适当控制{balance_analysis['strongest']}的过度表现"
-        ]
-    }
+    return get_advice_index(locale).health_advice(
+        day_master, season or current_season(), excess_elements, deficient_elements,
+        balance_analysis["balance_state"], balance_analysis["strongest"], balance_analysis["weakest"]
+    )
 
-def generate_diet_advice(element_percentages):
+def generate_diet_advice(element_percentages, season=None, locale=DEFAULT_LOCALE):
     """
     根据五行分析生成饮食建议
     
     参数:
         element_percentages (dict): 五行百分比
+        season (str): 季节代码（spring/summer/autumn/winter），默认为当前季节
+        locale (str): 语言代码
     
     返回:
-        dict: 饮食建议
+        dict: 饮食建议（共享的只读结构）
     """
-    # 加载五行口味数据
-    flavors_data = load_json_data("five_elements_flavors.json")
-    
     # 确定需要增强和减弱的五行
-    sorted_elements = sorted(element_percentages.items(), key=lambda x: x[1])
-    weakest_elements = sorted_elements[:2]  # 最弱的两个五行
-    strongest_elements = sorted_elements[-2:]  # 最强的两个五行
-    
-    # 根据五行转换为英文
-    weakest_elements_en = [(get_element_english(e), p) for e, p in weakest_elements]
-    strongest_elements_en = [(get_element_english(e), p) for e, p in strongest_elements]
-    
-    # 根据五行生成饮食建议
-    recommended_flavors = []
-    for element, _ in weakest_elements:
-        element_en = get_element_english(element)
-        if element_en in flavors_data:
-            flavor = flavors_data[element_en]["flavor"]
-            effect = flavors_data[element_en]["effect"]
-            nutrients = flavors_data[element_en]["nutrients"]
-            
-            recommended_flavors.append({
-                "element": element,
-                "flavor": flavor,
-                "effect": effect,
-                "nutrients": nutrients,
-                "reason": f"增强{element}五行"
-            })
-    
-    avoid_flavors = []
-    for element, _ in strongest_elements:
-        element_en = get_element_english(element)
-        if element_en in flavors_data:
-            flavor = flavors_data[element_en]["flavor"]
-            
-            avoid_flavors.append({
-                "element": element,
-                "flavor": flavor,
-                "reason": f"降低过盛的{element}五行"
-            })
-    
-    # 从diet_recipes.json加载季节食谱
-    recipes_data = load_json_data("diet_recipes.json")
-    
-    # 确定当前季节
-    month = datetime.datetime.now().month
-    if 3 <= month <= 5:
-        season = "spring"
-    elif 6 <= month <= 8:
-        season = "summer"
-    elif 9 <= month <= 11:
-        season = "autumn"
-    else:
-        season = "winter"
-    
-    # 获取当前季节的食谱
-    seasonal_recipes = recipes_data.get(season, [])
-    
-    # 根据弱势五行选择合适的食谱
-    recommended_recipes = []
-    weakest_elements_set = {e for e, _ in weakest_elements_en}
-    
-    for recipe in seasonal_recipes:
-        suitable_elements_set = set(recipe.get("suitable_elements", []))
-        if weakest_elements_set.intersection(suitable_elements_set):
-            recommended_recipes.append({
-                "name": recipe["name"],
-                "ingredients": recipe["ingredients"],
-                "effect": recipe["effect"]
-            })
+    sorted_elements = [e for e, _ in sorted(element_percentages.items(), key=lambda x: x[1])]
     
-    return {
-        "recommended_flavors": recommended_flavors,
-        "avoid_flavors": avoid_flavors,
-        "seasonal_recipes": recommended_recipes[:3],  # 只推荐最多3个食谱
-        "general_advice": "根据五行平衡状态，调整饮食口味和成分，以达到调和阴阳、平衡五行的目的。"
-    }
+    return get_advice_index(locale).diet_advice(
+        tuple(sorted_elements[:2]), tuple(sorted_elements[-2:]), season or current_season()
+    )
 
-def generate_exercise_advice(element_percentages):
+def generate_exercise_advice(element_percentages, locale=DEFAULT_LOCALE):
     """
     根据五行分析生成运动建议
     
     参数:
         element_percentages (dict): 五行百分比
+        locale (str): 语言代码
     
     返回:
-        dict: 运动建议
+        dict: 运动建议（共享的只读结构）
     """
-    # 加载五行运动数据
-    exercises_data = load_json_data("five_elements_exercises.json")
-    
-    # 确定需要增强和减弱的五行
-    sorted_elements = sorted(element_percentages.items(), key=lambda x: x[1])
-    weakest_elements = sorted_elements[:2]  # 最弱的两个五行
-    balanced_elements = sorted_elements[2:3]  # 居中的一个五行
-    
-    # 根据五行转换为英文
-    weakest_elements_en = [(get_element_english(e), p) for e, p in weakest_elements]
-    balanced_elements_en = [(get_element_english(e), p) for e, p in balanced_elements]
-    
-    # 根据五行生成运动建议
-    recommended_exercises = []
-    for element, _ in weakest_elements:
-        element_en = get_element_english(element)
-        if element_en in exercises_data:
-            exercise_types = exercises_data[element_en]["exercise_types"]
-            effect = exercises_data[element_en]["effect"]
-            
-            recommended_exercises.append({
-                "element": element,
-                "exercise_types": exercise_types,
-                "effect": effect,
-                "reason": f"增强{element}五行"
-            })
-    
-    for element, _ in balanced_elements:
-        element_en = get_element_english(element)
-        if element_en in exercises_data:
-            exercise_types = exercises_data[element_en]["exercise_types"]
-            effect = exercises_data[element_en]["effect"]
-            
-            recommended_exercises.append({
-                "element": element,
-                "exercise_types": exercise_types,
-                "effect": effect,
-                "reason": f"保持{element}五行平衡"
-            })
-    
-    return {
-        "recommended_exercises": recommended_exercises,
-        "general_advice": "根据五行平衡状态，选择适合的运动方式，以调节气血、平衡五行、增强体质。",
-        "frequency_advice": "每周至少进行3-5次适度运动，每次30-60分钟，以达到最佳效果。"
-    }
-
-def load_json_data(filename):
-    """
-    加载JSON数据文件
-    
-    参数:
-        filename (str): JSON文件名
+    # 最弱的两个五行和居中的一个五行
+    sorted_elements = [e for e, _ in sorted(element_percentages.items(), key=lambda x: x[1])]
     
-    返回:
-        dict: JSON数据
-    """
-    try:
-        # 定位到项目根目录的data文件夹
-        base_dir = Path(__file__).parent.parent.parent
-        data_file = base_dir / "data" / filename
-        
-        with open(data_file, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except Exception as e:
-        print(f"加载JSON文件{filename}出错: {e}")
-        # 返回空字典作为默认值
-        if filename == "five_elements_flavors.json":
-            return create_default_flavors()
-        elif filename == "five_elements_exercises.json":
-            return create_default_exercises()
-        elif filename == "diet_recipes.json":
-            return create_default_recipes()
-        else:
-            return {}
-
-def create_default_flavors():
-    """创建默认的五行口味数据"""
-    return {
-        "wood": {
-            "flavor": "酸",
-            "effect": "收敛、固涩",
-            "nutrients": ["维生素C"],
-            "foods": ["柠檬", "醋"]
-        },
-        "fire": {
-            "flavor": "苦",
-            "effect": "清热、泻火",
-            "nutrients": ["维生素B"],
-            "foods": ["苦瓜", "茶叶"]
-        },
-        "earth": {
-            "flavor": "甘",
-            "effect": "补益、和中",
-            "nutrients": ["碳水化合物"],
-            "foods": ["大米", "土豆"]
-        },
-        "metal": {
-            "flavor": "辛",
-            "effect": "发散、行气",
-            "nutrients": ["挥发油"],
-            "foods": ["姜", "葱"]
-        },
-        "water": {
-            "flavor": "咸",
-            "effect": "软坚、润下",
-            "nutrients": ["钠"],
-            "foods": ["盐", "海带"]
-        }
-    }
-
-def create_default_exercises():
-    """创建默认的五行运动数据"""
-    return {
-        "wood": {
-            "exercise_types": ["伸展运动", "太极"],
-            "effect": "舒展筋络，疏肝理气",
-            "frequency": "每周3-4次"
-        },
-        "fire": {
-            "exercise_types": ["有氧运动", "慢跑"],
-            "effect": "促进血液循环，调节心肺功能",
-            "frequency": "每周4-5次"
-        },
-        "earth": {
-            "exercise_types": ["健走", "徒步旅行"],
-            "effect": "增强肌肉力量，促进消化吸收",
-            "frequency": "每天45-60分钟"
-        },
-        "metal": {
-            "exercise_types": ["呼吸训练", "冥想"],
-            "effect": "增强肺活量，调节呼吸系统",
-            "frequency": "每天3-4次"
-        },
-        "water": {
-            "exercise_types": ["力量训练", "举重"],
-            "effect": "增强骨密度，强健肾脏功能",
-            "frequency": "每周2-3次"
-        }
-    }
-
-def create_default_recipes():
-    """创建默认的季节食谱数据"""
-    return {
-        "spring": [
-            {
-                "name": "春季养肝汤",
-                "ingredients": ["豆芽", "香菇", "胡萝卜"],
-                "effect": "疏肝理气，滋养肝血",
-                "suitable_elements": ["wood", "water"]
-            }
-        ],
-        "summer": [
-            {
-                "name": "清爽绿豆汤",
-                "ingredients": ["绿豆", "薏米", "冰糖"],
-                "effect": "清热解暑，消暑利湿",
-                "suitable_elements": ["fire", "water"]
-            }
-        ],
-        "autumn": [
-            {
-                "name": "秋梨银耳汤",
-                "ingredients": ["雪梨", "银耳", "冰糖"],
-                "effect": "滋阴润肺，生津止咳",
-                "suitable_elements": ["metal", "water"]
-            }
-        ],
-        "winter": [
-            {
-                "name": "羊肉萝卜汤",
-                "ingredients": ["羊肉", "白萝卜", "姜片"],
-                "effect": "温阳散寒，补肾强身",
-                "suitable_elements": ["water", "fire"]
-            }
-        ]
-    }
+    return get_advice_index(locale).exercise_advice(tuple(sorted_elements[:2]), sorted_elements[2])
 
 def get_generating_element(element):
     """
@@ -4,9 +4,25 @@
 流年分析模块 - 提供详细的流年运势分析，包括健康影响
 """
 
-from datetime import datetime
+import datetime
+import functools
+
+from lunar_python import Lunar
+
+from models import clock
 from .calculator import get_element  # 假设calculator.py有get_element函数
 
+# 十二节气月的起始节气（寅月至丑月），丑月的小寒与下一年立春在农历表中以拼音为键
+JIE_NAMES = ("立春", "惊蛰", "清明", "立夏", "芒种", "小暑", "立秋", "白露", "寒露", "立冬", "大雪", "小寒")
+NEXT_YEAR_KEYS = {"小寒": "XIAO_HAN", "立春": "LI_CHUN"}
+
+# 五行中文名与 analyze_relation 使用的英文名
+ELEMENT_KEYS = {"木": "wood", "火": "fire", "土": "earth", "金": "metal", "水": "water"}
+
+# 关键时期阈值，与 translate_score_to_luck 的分级一致：高于 60 为吉，不高于 40 为凶
+PEAK_THRESHOLD = 60
+LOW_THRESHOLD = 40
+
 def analyze_liunian(report, year=None, details_level=1):
     """
     分析指定年份或当前年份的流年运势
@@ -24,7 +40,7 @@ def analyze_liunian(report, year=None, details_level=1):
     
     # 使用指定年份或当前年份
     if year is None:
-        year = datetime.now().year
+        year = clock.now().year
     
     # 基本信息
     day_master = report['basic_info']['day_master'].split()[0]  # 日主天干
@@ -32,8 +48,18 @@ def analyze_liunian(report, year=None, details_level=1):
     day_master_strength = report['pattern_analysis']['day_master_strength']  # 日主强度
     yong_shen = report['pattern_analysis'].get('yong_shen', '').split()[0]  # 用神
     
-    # 获取当前大运信息
-    current_dayun = report.get('current_dayun', None)
+    # 能构建运势时间轴（报告含出生年份与大运）时，评分与流月取自时间轴，与 stream_liuyue 一致；
+    # 否则按报告中的当前大运逐项计算
+    from .timeline import build_timeline
+
+    try:
+        timeline = build_timeline(report, start_year=year, years=1)
+    except (KeyError, ValueError):
+        timeline = None
+    if timeline is not None:
+        dayun_ganzhi = timeline.year(year)['dayun'] or None
+    else:
+        dayun_ganzhi = (report.get('current_dayun') or {}).get('ganzhi')
     
     # 获取流年干支信息
     liunian_ganzhi = calculate_liunian_ganzhi(year)
@@ -55,19 +81,21 @@ def analyze_liunian(report, year=None, details_level=1):
     
     # 分析大运与流年的关系
     dayun_liunian_relation = ""
-    if current_dayun:
-        dayun_gan = current_dayun['ganzhi'][0]
-        dayun_element = get_element(dayun_gan)
+    if dayun_ganzhi:
+        dayun_element = get_element(dayun_ganzhi[0])
         dayun_liunian_relation = analyze_relation(dayun_element, liunian_element)
     
     # 计算流年运势评分
-    score = calculate_liunian_score(
-        relation_with_day_master, 
-        relation_with_yong_shen, 
-        dayun_liunian_relation,
-        day_master_strength, 
-        gan_shen
-    )
+    if timeline is not None:
+        score = int(timeline.year_scores[0])
+    else:
+        score = calculate_liunian_score(
+            relation_with_day_master, 
+            relation_with_yong_shen, 
+            dayun_liunian_relation,
+            day_master_strength, 
+            gan_shen
+        )
     
     # 分析流年的生活领域影响（含健康）
     impacts = analyze_liunian_impacts(liunian_gan, liunian_zhi, gan_shen, score)
@@ -82,11 +110,14 @@ def analyze_liunian(report, year=None, details_level=1):
         score, impacts, relation_with_day_master, relation_with_yong_shen, day_master_strength, details_level
     )
     
-    # 分析流月运势
-    months_analysis = []
-    if details_level >= 2:
+    # 分析流月运势（计算量很小，始终计算以便识别关键时期）
+    if timeline is not None:
+        months_analysis = _liuyue_entries(year, timeline.month_pillars[0].tolist(),
+                                          timeline.month_scores[0].tolist(), day_master)
+    else:
         months_analysis = analyze_liuyue(
-            year, liunian_ganzhi, day_master, day_master_element, yong_shen, score
+            year, liunian_ganzhi, day_master, day_master_element, yong_shen, score,
+            dayun_ganzhi=dayun_ganzhi, strength=day_master_strength
         )
     
     # 分析重要时期
@@ -171,7 +202,7 @@ def calculate_shishen(day_master, char):
     return shi_shen_table.get(day_master, {}).get(char, "未知")
 
 def analyze_relation(element1, element2):
-    """分析两个五行之间的生克关系"""
+    """分析两个五行之间的生克关系（五行名称可为中文或英文）"""
     relations = {
         "wood": {"wood": "比助", "fire": "生", "earth": "克", "metal": "被克", "water": "被生"},
         "fire": {"wood": "被生", "fire": "比助", "earth": "生", "metal": "克", "water": "被克"},
@@ -179,6 +210,8 @@ def analyze_relation(element1, element2):
         "metal": {"wood": "克", "fire": "被克", "earth": "被生", "metal": "比助", "water": "生"},
         "water": {"wood": "生", "fire": "克", "earth": "被克", "metal": "被生", "water": "比助"}
     }
+    element1 = ELEMENT_KEYS.get(element1, element1)
+    element2 = ELEMENT_KEYS.get(element2, element2)
     return relations.get(element1, {}).get(element2, "未知")
 
 def calculate_liunian_score(relation_dm, relation_ys, relation_dy, strength, gan_shen):
@@ -232,13 +265,146 @@ def generate_liunian_advice(score, impacts, relation_dm, relation_ys, strength,
         advice.append("流年顺利，保持现状即可")
     return advice
 
-def analyze_liuyue(year, liunian_ganzhi, day_master, day_master_element, yong_shen, score):
-    """简易流月分析"""
-    return [{"month": i, "description": f"{year}年{i}月运势平稳"} for i in range(1, 13)]
+@functools.lru_cache(maxsize=512)
+def jieqi_month_bounds(year):
+    """
+    指定年份十二节气月的交节日期
+
+    参数:
+        year (int): 公历年份（以立春为年界）
+
+    返回:
+        tuple: 13 个 datetime.date，依次为寅月至丑月的起始日期及下一年立春
+    """
+    table = Lunar.fromYmd(year, 1, 1).getJieQiTable()
+    bounds = []
+    for i, name in enumerate(JIE_NAMES + ("立春",)):
+        solar = table[NEXT_YEAR_KEYS[name] if i >= 11 else name]
+        bounds.append(datetime.date(solar.getYear(), solar.getMonth(), solar.getDay()))
+    return tuple(bounds)
+
+def _liuyue_entries(year, pillars, scores, day_master):
+    """把一年的流月干支序号与评分展开为流月列表"""
+    from .timeline import ELEMENTS, JIAZI, JIAZI_ELEMENT
+
+    bounds = jieqi_month_bounds(year)
+    months = []
+    for i, (pillar, score) in enumerate(zip(pillars, scores)):
+        ganzhi = JIAZI[pillar]
+        gan_shen = calculate_shishen(day_master, ganzhi[0])
+        zhi_shen = calculate_shishen(day_master, ganzhi[1])
+        months.append({
+            "month": i + 1,
+            "ganzhi": ganzhi,
+            "jieqi": JIE_NAMES[i],
+            "start_date": bounds[i].isoformat(),
+            "end_date": bounds[i + 1].isoformat(),
+            "gan_shen": gan_shen,
+            "zhi_shen": zhi_shen,
+            "element": ELEMENTS[JIAZI_ELEMENT[pillar]],
+            "score": score,
+            "luck_level": translate_score_to_luck(score),
+            "description": f"{year}年{ganzhi}月（{JIE_NAMES[i]}起），天干十神为{gan_shen}，地支十神为{zhi_shen}"
+        })
+    return months
+
+def analyze_liuyue(year, liunian_ganzhi, day_master, day_master_element, yong_shen, score,
+                   dayun_ganzhi=None, strength=None):
+    """
+    流月分析：一次计算全年 12 个节气月的干支与评分
+
+    参数:
+        year (int): 公历年份
+        liunian_ganzhi (str): 流年干支
+        day_master (str): 日主天干
+        day_master_element (str): 日主五行（中文或英文）
+        yong_shen (str): 用神五行（中文或英文）
+        score (int): 流年评分
+        dayun_ganzhi (str, optional): 当前大运干支
+        strength (str, optional): 日主强弱
+
+    返回:
+        list: 寅月至丑月的流月信息，评分为流月自身评分与流年评分的平均
+    """
+    from .timeline import ELEMENT_INDEX, GANS, JIAZI_ELEMENT, JIAZI_INDEX, flow_scores, month_pillars
+
+    if day_master not in GANS:
+        return []
+    dm_element = ELEMENT_INDEX.get(day_master_element, -1)
+    if dm_element < 0:
+        return []
+    dayun_element = JIAZI_ELEMENT[JIAZI_INDEX[dayun_ganzhi]] if dayun_ganzhi in JIAZI_INDEX else -1
+
+    pillars = month_pillars([year])[0]
+    own = flow_scores(pillars, dm_element, ELEMENT_INDEX.get(yong_shen, -1), dayun_element,
+                      strength, GANS.index(day_master))
+    scores = (own + score) // 2
+    return _liuyue_entries(year, pillars.tolist(), scores.tolist(), day_master)
 
 def identify_key_periods(year, liunian_ganzhi, day_master, impacts, score, months_analysis):
-    """识别流年关键时期"""
-    return {"peak": f"{year}年中期", "low": f"{year}年下半年"}
+    """
+    识别流年关键时期：评分高于 PEAK_THRESHOLD 的连续流月为高峰，不高于 LOW_THRESHOLD 的为低谷
+
+    返回:
+        list: 关键时期，每项含起止月份、日期、类型与描述
+    """
+    periods = []
+    current = None
+    for month in months_analysis:
+        if month['score'] > PEAK_THRESHOLD:
+            kind = "高峰"
+        elif month['score'] <= LOW_THRESHOLD:
+            kind = "低谷"
+        else:
+            kind = None
+        if current and kind == current['type'] and month['month'] == current['end_month'] + 1:
+            current['end_month'] = month['month']
+            current['end_date'] = month['end_date']
+            current['months'].append(month['ganzhi'])
+            continue
+        current = None
+        if kind:
+            current = {"type": kind, "start_month": month['month'], "end_month": month['month'],
+                       "start_date": month['start_date'], "end_date": month['end_date'],
+                       "months": [month['ganzhi']]}
+            periods.append(current)
+
+    for period in periods:
+        period['description'] = (f"{period['start_date']}至{period['end_date']}"
+                                 f"（{'、'.join(period['months'])}月）运势{period['type']}")
+    return periods
+
+def stream_liuyue(report, start_year, end_year=None):
+    """
+    逐年生成一段年份的流月分析，评分基于运势时间轴一次计算
+
+    参数:
+        report (dict): 八字命盘报告（需含出生年份与大运信息）
+        start_year (int): 起始年份
+        end_year (int, optional): 结束年份（含），默认只分析起始年份
+
+    返回:
+        generator: 每年一项，含流年干支、评分、流月与关键时期
+    """
+    from .timeline import JIAZI, build_timeline
+
+    end_year = start_year if end_year is None else end_year
+    if end_year < start_year:
+        return
+    timeline = build_timeline(report, start_year=start_year, years=end_year - start_year + 1)
+    for row, year in enumerate(timeline.years.tolist()):
+        ganzhi = JIAZI[timeline.year_pillars[row]]
+        score = int(timeline.year_scores[row])
+        months = _liuyue_entries(year, timeline.month_pillars[row].tolist(),
+                                 timeline.month_scores[row].tolist(), timeline.day_master)
+        yield {
+            "year": year,
+            "ganzhi": ganzhi,
+            "score": score,
+            "luck_level": translate_score_to_luck(score),
+            "months": months,
+            "key_periods": identify_key_periods(year, ganzhi, timeline.day_master, None, score, months)
+        }
 
 def translate_score_to_luck(score):
     """将评分转换为运势等级"""
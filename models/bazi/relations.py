@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+干支关系模块 - 基于位掩码的合、会、冲、刑、害、空亡判断
+
+地支用 12 位掩码、天干用 10 位掩码表示，每条规则预先编码为掩码，
+判断一条规则只需一次按位与。四柱之外可以追加大运、流年、流月等柱，
+一次得到全部柱之间的关系。
+"""
+
+from typing import NamedTuple
+
+GANS = "甲乙丙丁戊己庚辛壬癸"
+ZHIS = "子丑寅卯辰巳午未申酉戌亥"
+
+GAN_BIT = {gan: 1 << i for i, gan in enumerate(GANS)}
+ZHI_BIT = {zhi: 1 << i for i, zhi in enumerate(ZHIS)}
+
+# 默认柱位名称：四柱之后依次为大运、流年、流月
+PILLAR_LABELS = ("年", "月", "日", "时", "大运", "流年", "流月")
+
+# 日柱位置（空亡以日柱所在旬为准）
+DAY_INDEX = 2
+
+
+class Rule(NamedTuple):
+    """一条干支关系规则"""
+    kind: str
+    name: str
+    members: str
+    element: str
+    description: str
+    # 至少命中的成员数（三合、三会、三刑两支即成立）
+    min_count: int = 2
+    # 是否为天干规则
+    gan: bool = False
+    # 是否为同支自刑（需同一地支出现两次）
+    self_xing: bool = False
+
+    @property
+    def mask(self):
+        bits = GAN_BIT if self.gan else ZHI_BIT
+        mask = 0
+        for member in self.members:
+            mask |= bits[member]
+        return mask
+
+
+# 关系类型及输出顺序
+RELATION_TYPES = ("gan_he", "liu_he", "san_he", "san_hui", "liu_chong", "xing", "liu_hai", "kong_wang")
+
+RULES = (
+    # 天干五合
+    Rule("gan_he", "甲己合", "甲己", "土", "中正之合", gan=True),
+    Rule("gan_he", "乙庚合", "乙庚", "金", "仁义之合", gan=True),
+    Rule("gan_he", "丙辛合", "丙辛", "水", "威制之合", gan=True),
+    Rule("gan_he", "丁壬合", "丁壬", "木", "淫慝之合", gan=True),
+    Rule("gan_he", "戊癸合", "戊癸", "火", "无情之合", gan=True),
+    # 地支六合
+    Rule("liu_he", "子丑合", "子丑", "土", "子丑相合化土"),
+    Rule("liu_he", "寅亥合", "寅亥", "木", "寅亥相合化木"),
+    Rule("liu_he", "卯戌合", "卯戌", "火", "卯戌相合化火"),
+    Rule("liu_he", "辰酉合", "辰酉", "金", "辰酉相合化金"),
+    Rule("liu_he", "巳申合", "巳申", "水", "巳申相合化水"),
+    Rule("liu_he", "午未合", "午未", "火", "午未相合化火"),
+    # 三合局（顺序与成员排列沿用 analyze_special_patterns）
+    Rule("san_he", "水三合", "子申辰", "水", "有水三合矩阵，产生水气形成灵动合力。"),
+    Rule("san_he", "木三合", "亥卯未", "木", "有木三合矩阵，产生木气形成灵动合力。"),
+    Rule("san_he", "火三合", "寅午戌", "火", "有火三合矩阵，产生火气形成灵动合力。"),
+    Rule("san_he", "金三合", "巳酉丑", "金", "有金三合矩阵，产生金气形成灵动合力。"),
+    # 三会局
+    Rule("san_hui", "东方三会", "寅卯辰", "木", "有东方三会矩阵，产生木气彼此力量聚集。"),
+    Rule("san_hui", "南方三会", "巳午未", "火", "有南方三会矩阵，产生火气彼此力量聚集。"),
+    Rule("san_hui", "西方三会", "申酉戌", "金", "有西方三会矩阵，产生金气彼此力量聚集。"),
+    Rule("san_hui", "北方三会", "亥子丑", "水", "有北方三会矩阵，产生水气彼此力量聚集。"),
+    # 地支六冲
+    Rule("liu_chong", "子午冲", "子午", "", "子午相冲，水火交战"),
+    Rule("liu_chong", "丑未冲", "丑未", "", "丑未相冲，土气动摇"),
+    Rule("liu_chong", "寅申冲", "寅申", "", "寅申相冲，金木交战"),
+    Rule("liu_chong", "卯酉冲", "卯酉", "", "卯酉相冲，金木交战"),
+    Rule("liu_chong", "辰戌冲", "辰戌", "", "辰戌相冲，土气动摇"),
+    Rule("liu_chong", "巳亥冲", "巳亥", "", "巳亥相冲，水火交战"),
+    # 地支三刑与自刑
+    Rule("xing", "无恩之刑", "寅巳申", "", "寅巳申相刑，为无恩之刑"),
+    Rule("xing", "恃势之刑", "丑戌未", "", "丑戌未相刑，为恃势之刑"),
+    Rule("xing", "无礼之刑", "子卯", "", "子卯相刑，为无礼之刑"),
+    Rule("xing", "辰自刑", "辰", "", "辰辰自刑", min_count=1, self_xing=True),
+    Rule("xing", "午自刑", "午", "", "午午自刑", min_count=1, self_xing=True),
+    Rule("xing", "酉自刑", "酉", "", "酉酉自刑", min_count=1, self_xing=True),
+    Rule("xing", "亥自刑", "亥", "", "亥亥自刑", min_count=1, self_xing=True),
+    # 地支六害
+    Rule("liu_hai", "子未害", "子未", "", "子未相害"),
+    Rule("liu_hai", "丑午害", "丑午", "", "丑午相害"),
+    Rule("liu_hai", "寅巳害", "寅巳", "", "寅巳相害"),
+    Rule("liu_hai", "卯辰害", "卯辰", "", "卯辰相害"),
+    Rule("liu_hai", "申亥害", "申亥", "", "申亥相害"),
+    Rule("liu_hai", "酉戌害", "酉戌", "", "酉戌相害"),
+)
+
+# 预先编码的规则：(规则, 掩码)
+_COMPILED = tuple((rule, rule.mask) for rule in RULES)
+
+
+def _build_empty_masks():
+    # 日柱所在旬的最后两个地支为空亡，如甲子旬空戌亥
+    masks = {}
+    for n in range(60):
+        start = n - n % 10
+        masks[GANS[n % 10] + ZHIS[n % 12]] = ZHI_BIT[ZHIS[(start + 10) % 12]] | ZHI_BIT[ZHIS[(start + 11) % 12]]
+    return masks
+
+
+# 六十甲子日柱对应的空亡地支掩码
+EMPTY_MASKS = _build_empty_masks()
+
+
+def popcount(mask):
+    """掩码中置位的个数"""
+    return bin(mask).count("1")
+
+
+def mask_of(chars, bits=ZHI_BIT):
+    """
+    计算干或支序列的掩码
+
+    参数:
+        chars (Iterable[str]): 天干或地支序列
+        bits (dict): GAN_BIT 或 ZHI_BIT
+
+    返回:
+        int: 掩码（无法识别的字符忽略）
+    """
+    mask = 0
+    for char in chars:
+        mask |= bits.get(char, 0)
+    return mask
+
+
+def duplicate_mask(zhis):
+    """
+    出现两次及以上的地支掩码
+
+    参数:
+        zhis (Iterable[str]): 地支序列
+
+    返回:
+        int: 掩码
+    """
+    seen = dup = 0
+    for zhi in zhis:
+        bit = ZHI_BIT.get(zhi, 0)
+        dup |= seen & bit
+        seen |= bit
+    return dup
+
+
+def is_empty(day_gz, zhi):
+    """
+    判断地支是否落在日柱所在旬的空亡中
+
+    参数:
+        day_gz (str): 日柱干支
+        zhi (str): 地支
+
+    返回:
+        bool: 是否空亡
+    """
+    return bool(EMPTY_MASKS.get(day_gz, 0) & ZHI_BIT.get(zhi, 0))
+
+
+def match_rules(gan_mask, zhi_mask, dup_mask=0, kinds=None):
+    """
+    按掩码匹配规则
+
+    参数:
+        gan_mask (int): 天干掩码
+        zhi_mask (int): 地支掩码
+        dup_mask (int): 重复地支掩码（用于自刑）
+        kinds (Container[str]): 只匹配这些关系类型，默认全部
+
+    返回:
+        list: [(规则, 命中掩码), ...]，按 RULES 顺序
+    """
+    matched = []
+    for rule, mask in _COMPILED:
+        if kinds is not None and rule.kind not in kinds:
+            continue
+        source = gan_mask if rule.gan else dup_mask if rule.self_xing else zhi_mask
+        hit = source & mask
+        if hit and popcount(hit) >= rule.min_count:
+            matched.append((rule, hit))
+    return matched
+
+
+def find_relations(pillars, labels=PILLAR_LABELS, involving=None):
+    """
+    一次计算各柱之间的全部干支关系
+
+    参数:
+        pillars (Sequence[str]): 干支序列，依次为年、月、日、时柱，可追加大运、流年、流月柱
+        labels (Sequence[str]): 各柱名称
+        involving (Iterable[int]): 只保留涉及这些柱（下标）的关系，默认全部；
+            用于在固定四柱上逐一叠加流年、流月
+
+    返回:
+        dict: {关系类型: [{"type", "name", "element", "members", "positions", "description"}, ...]}
+    """
+    gans = [pillar[0] for pillar in pillars]
+    zhis = [pillar[1] for pillar in pillars]
+    gan_bits = [GAN_BIT.get(gan, 0) for gan in gans]
+    zhi_bits = [ZHI_BIT.get(zhi, 0) for zhi in zhis]
+    focus = None if involving is None else set(involving)
+
+    result = {kind: [] for kind in RELATION_TYPES}
+    for rule, hit in match_rules(mask_of(gans, GAN_BIT), mask_of(zhis), duplicate_mask(zhis)):
+        bits = gan_bits if rule.gan else zhi_bits
+        indexes = [i for i, bit in enumerate(bits) if bit & hit]
+        if focus is not None and focus.isdisjoint(indexes):
+            continue
+        result[rule.kind].append({
+            "type": rule.kind,
+            "name": rule.name,
+            "element": rule.element,
+            "members": [member for member in rule.members if (GAN_BIT if rule.gan else ZHI_BIT)[member] & hit],
+            "positions": [labels[i] for i in indexes],
+            "description": rule.description,
+        })
+
+    if len(pillars) > DAY_INDEX:
+        empty = EMPTY_MASKS.get(pillars[DAY_INDEX], 0)
+        for i, bit in enumerate(zhi_bits):
+            if bit & empty and (focus is None or i in focus):
+                result["kong_wang"].append({
+                    "type": "kong_wang",
+                    "name": "空亡",
+                    "element": "",
+                    "members": [zhis[i]],
+                    "positions": [labels[i]],
+                    "description": f"{labels[i]}支{zhis[i]}落{pillars[DAY_INDEX]}旬空亡",
+                })
+    return result
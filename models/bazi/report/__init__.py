@@ -0,0 +1,15 @@
+"""
+八字命盘报告包
+
+由只读的命盘对象（Chart）构建报告字典、文本解读以及流式的文本/Markdown/HTML
+报告，构建与渲染结果按命盘哈希（及格式、语言）缓存。
+"""
+
+from .builder import (
+    REPORT_KEYS, TEXT_REPORT_TITLE, build_report, build_text_report,
+    generate_bazi_report, generate_text_report, iter_report, text_sections
+)
+from .chart import Chart, as_chart
+from .stream import (
+    MEDIA_TYPES, health_sections, render_report, stream_report, timeline_sections, write_report
+)
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+命盘报告构建 - 由命盘对象逐章生成报告字典与文本解读
+"""
+
+import functools
+
+from models import timing
+from models.frozen import freeze, thaw
+
+from .chart import as_chart
+
+# 报告字典的键顺序（与 generate_bazi_report 的结果一致）
+REPORT_KEYS = (
+    "basic_info", "five_elements", "ten_gods", "pattern_analysis", "dayun_analysis",
+    "current_dayun", "current_info", "shensha_info", "nayin", "special"
+)
+
+TEXT_REPORT_TITLE = "===== 八字命盘解读 =====\n"
+
+
+def _basic_info(bazi_result):
+    bazi = bazi_result['bazi']
+    solar = bazi_result['solar']
+    lunar = bazi_result['lunar']
+    return {
+        "four_pillars": f"{bazi['year']} {bazi['month']} {bazi['day']} {bazi['hour']}",
+        "gans": ' '.join(bazi['gans']),
+        "zhis": ' '.join(bazi['zhis']),
+        "day_master": f"{bazi['day_master']} ({bazi['day_master_element']})",
+        "solar_date": f"{solar['year']}年{solar['month']}月{solar['day']}日 {solar['hour']}时",
+        "lunar_date": f"{lunar['year']}年{lunar['month']}月{lunar['day']}日"
+    }
+
+
+def _five_elements(bazi_result):
+    five_elements = bazi_result['five_elements']
+    return {
+        "scores": five_elements['scores'],
+        "year": five_elements['year'],
+        "month": five_elements['month'],
+        "day": five_elements['day'],
+        "hour": five_elements['hour']
+    }
+
+
+def _ten_gods(bazi_result):
+    ten_gods = bazi_result['ten_gods']
+    return {
+        "gans": ten_gods['gans'],
+        "zhis": ten_gods['zhis']
+    }
+
+
+def _pattern_analysis(bazi_result):
+    pattern = bazi_result['pattern']
+    analysis = bazi_result['analysis']
+    return {
+        "day_master_strength": analysis['day_master_strength'],
+        "day_master_percentage": analysis['day_master_percentage'],
+        "strongest_element": f"{analysis['elements_balance']['strongest']} ({analysis['elements_balance']['strongest_percentage']}%)",
+        "weakest_element": f"{analysis['elements_balance']['weakest']} ({analysis['elements_balance']['weakest_percentage']}%)",
+        "balance_state": analysis['elements_balance']['balance_state'],
+        "balance_description": analysis['elements_balance']['description'],
+        "yong_shen": f"{pattern['yong_shen']} ({pattern['yong_shen_type']})",
+        "yong_shen_explanation": pattern['explanation'],
+        "yong_gan": ', '.join(pattern['yong_gan']),
+        "yong_zhi": ', '.join(pattern['yong_zhi']),
+        "special_patterns": pattern['special_patterns']
+    }
+
+
+def _dayun_info(dayun):
+    return {
+        "ganzhi": dayun['ganzhi'],
+        "gan_shen": dayun['gan_shen'],
+        "zhi_shen": dayun['zhi_shen'],
+        "age_range": f"{dayun['start_age']}-{dayun['end_age']}",
+        "element": dayun['element'],
+        "nayin": dayun['nayin']
+    }
+
+
+def _dayun_analysis(bazi_result):
+    return [_dayun_info(dayun) for dayun in bazi_result['dayuns']]
+
+
+def _current_dayun(bazi_result):
+    current_dayun = bazi_result['current_dayun']
+    return _dayun_info(current_dayun) if current_dayun else None
+
+
+def _current_info(bazi_result):
+    current = bazi_result['current']
+    return {
+        name: {
+            "ganzhi": current[name],
+            "gan_shen": current[f'{name}_shen']['gan'],
+            "zhi_shen": current[f'{name}_shen']['zhi']
+        }
+        for name in ("liunian", "liuyue", "liuri")
+    }
+
+
+def _shensha_info(bazi_result):
+    return [
+        {"name": shensha['name'], "position": shensha['position'], "description": shensha['description']}
+        for shensha in bazi_result['shensha']
+    ]
+
+
+_SECTION_BUILDERS = {
+    "basic_info": _basic_info,
+    "five_elements": _five_elements,
+    "ten_gods": _ten_gods,
+    "pattern_analysis": _pattern_analysis,
+    "dayun_analysis": _dayun_analysis,
+    "current_dayun": _current_dayun,
+    "current_info": _current_info,
+    "shensha_info": _shensha_info,
+    "nayin": lambda bazi_result: bazi_result['nayin'],
+    "special": lambda bazi_result: bazi_result['special']
+}
+
+
+def iter_report(bazi_result, keys=REPORT_KEYS):
+    """
+    逐个生成命盘报告的章节
+
+    参数:
+        bazi_result (dict | Chart): bazi_calculator.calculate_bazi 的返回结果或命盘对象
+        keys (tuple): 要生成的章节及顺序
+
+    返回:
+        generator: (章节名, 章节数据)
+    """
+    for key in keys:
+        yield key, _SECTION_BUILDERS[key](bazi_result)
+
+
+def text_sections(report):
+    """
+    逐个生成文本解读的章节
+
+    参数:
+        report (dict): 命盘报告数据
+
+    返回:
+        generator: (章节标题, 文本行列表)
+    """
+    basic_info = report['basic_info']
+    yield "基本信息", [
+        f"四柱八字: {basic_info['four_pillars']}",
+        f"天干: {basic_info['gans']}",
+        f"地支: {basic_info['zhis']}",
+        f"日主: {basic_info['day_master']}",
+        f"阳历: {basic_info['solar_date']}",
+        f"阴历: {basic_info['lunar_date']}"
+    ]
+
+    pattern = report['pattern_analysis']
+    yield "命盘分析", [
+        f"日主强度: {pattern['day_master_strength']} ({pattern['day_master_percentage']:.2f}%)",
+        f"五行平衡: {pattern['balance_state']}",
+        f"备注: {pattern['balance_description']}",
+        f"最强五行: {pattern['strongest_element']}",
+        f"最弱五行: {pattern['weakest_element']}",
+        f"用神: {pattern['yong_shen']}",
+        f"用神说明: {pattern['yong_shen_explanation']}",
+        f"用神天干: {pattern['yong_gan']}",
+        f"用神地支: {pattern['yong_zhi']}"
+    ]
+
+    current_dayun = report['current_dayun']
+    if current_dayun:
+        yield "当前大运", [
+            f"大运: {current_dayun['ganzhi']} {current_dayun['gan_shen']}{current_dayun['zhi_shen']}",
+            f"年龄范围: {current_dayun['age_range']} 岁",
+            f"纳音五行: {current_dayun['nayin']}"
+        ]
+    else:
+        yield "当前大运", ["尚未进入大运"]
+
+    yield "当前流年流月流日", [
+        f"{label}: {info['ganzhi']} 十神: {info['gan_shen']}/{info['zhi_shen']}"
+        for label, info in zip(("流年", "流月", "流日"), (report['current_info'][name] for name in ("liunian", "liuyue", "liuri")))
+    ]
+
+    if report['shensha_info']:
+        yield "神煞信息", [f"{shensha['name']}: {shensha['description']}" for shensha in report['shensha_info']]
+    else:
+        yield "神煞信息", ["无神煞信息"]
+
+    yield "纳音五行", [f"{position}: {nayin}" for position, nayin in report['nayin'].items()]
+
+    yield "特殊信息", [
+        f"命宫: {report['special']['ming_gong']}",
+        f"胎元: {report['special']['tai_yuan']}"
+    ]
+
+    strength = pattern['day_master_strength']
+    yong_shen = pattern['yong_shen']
+    day_master = basic_info['day_master'].split()[0]
+    if strength in ['旺', '偏旺']:
+        lines = [
+            "日主过旺，适合濒身或耗身的运势：",
+            f"1. 法子：可选择{yong_shen}的年份，帮助平衡日主。",
+            f"2. 避免过于旺盛的日主({day_master})年份。",
+            f"3. 理想的大运流年应有充足的{yong_shen}手法强。"
+        ]
+    elif strength in ['弱', '偏弱']:
+        lines = [
+            "日主过弱，适合滋身或扩张的运势：",
+            f"1. 法子：可选择{yong_shen}的年份，提升日主力量。",
+            f"2. 避免克法日主({day_master})的年份。",
+            f"3. 理想的大运流年应有充足的{yong_shen}手法。"
+        ]
+    else:
+        lines = [
+            "日主强度适中，可选择平衡发展的运势：",
+            "1. 保持当前的平衡状态，不过分強调任何五行。",
+            "2. 可适当发展五行中较弱的部分。",
+            "3. 避免增强已经过强的五行。"
+        ]
+    yield "大运流年分析指导", lines
+
+
+def generate_text_report(report):
+    """
+    生成文本形式的命盘解读
+
+    参数:
+        report (dict): 命盘报告数据
+
+    返回:
+        str: 文本形式的命盘解读
+    """
+    lines = [TEXT_REPORT_TITLE]
+    for title, section in text_sections(report):
+        if len(lines) > 1:
+            lines.append("")
+        lines.append(f"[{title}]")
+        lines.extend(section)
+    return "\n".join(lines)
+
+
+@functools.lru_cache(maxsize=1024)
+def build_report(chart):
+    """
+    构建命盘报告（按命盘哈希缓存，返回共享的只读结构）
+
+    参数:
+        chart (Chart): 命盘
+
+    返回:
+        FrozenDict: 命盘报告（不含 text_report）
+    """
+    return freeze(dict(iter_report(chart)))
+
+
+@functools.lru_cache(maxsize=1024)
+def build_text_report(chart):
+    """
+    生成命盘的文本解读（按命盘哈希缓存）
+
+    参数:
+        chart (Chart): 命盘
+
+    返回:
+        str: 文本形式的命盘解读
+    """
+    return generate_text_report(build_report(chart))
+
+
+@timing.timed("bazi.report")
+def generate_bazi_report(bazi_result):
+    """
+    生成八字命盘解读报告
+
+    参数:
+        bazi_result (dict | Chart): calculate_bazi 函数的返回结果或命盘对象
+
+    返回:
+        dict: 格式化的命盘解读报告（可修改的副本）
+    """
+    chart = as_chart(bazi_result)
+    report = thaw(build_report(chart))
+
+    # 生成文本形式的命盘解读
+    report["text_report"] = build_text_report(chart)
+
+    return report
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+命盘对象 - 报告生成所需的八字计算结果（只读）
+"""
+
+import hashlib
+import json
+from dataclasses import MISSING, dataclass, field, fields
+from typing import Mapping, Optional, Tuple
+
+from models.frozen import FrozenDict, freeze, thaw
+
+
+@dataclass(frozen=True, eq=False)
+class Chart:
+    """
+    八字命盘
+
+    由 bazi_calculator.calculate_bazi 的结果构建，嵌套结构均为只读（FrozenDict / tuple）。
+    相等性与哈希取决于命盘内容哈希 chart_hash，可直接作为缓存键；同时支持
+    chart['bazi'] 形式的下标访问，以兼容按字典读取计算结果的代码。
+    """
+
+    bazi: Mapping
+    solar: Mapping
+    lunar: Mapping
+    ten_gods: Mapping
+    five_elements: Mapping
+    pattern: Mapping
+    analysis: Mapping
+    dayuns: Tuple[Mapping, ...]
+    current_dayun: Optional[Mapping]
+    current: Mapping
+    shensha: Tuple[Mapping, ...]
+    nayin: Mapping
+    special: Mapping
+    relations: Mapping = field(default_factory=FrozenDict)
+    chart_hash: str = field(init=False, repr=False)
+
+    def __post_init__(self):
+        content = json.dumps(self.to_dict(), ensure_ascii=False, sort_keys=True, default=str)
+        object.__setattr__(self, 'chart_hash', hashlib.sha1(content.encode('utf-8')).hexdigest())
+
+    @classmethod
+    def from_result(cls, bazi_result):
+        """
+        由八字计算结果构建命盘
+
+        参数:
+            bazi_result (dict): bazi_calculator.calculate_bazi 的返回结果
+
+        返回:
+            Chart: 命盘
+        """
+        if 'error' in bazi_result:
+            raise ValueError(bazi_result.get('message', bazi_result['error']))
+        values = {}
+        for item in fields(cls):
+            if not item.init:
+                continue
+            if item.name in bazi_result:
+                values[item.name] = freeze(bazi_result[item.name])
+            elif item.default is MISSING and item.default_factory is MISSING:
+                raise KeyError(item.name)
+        return cls(**values)
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __eq__(self, other):
+        return isinstance(other, Chart) and other.chart_hash == self.chart_hash
+
+    def __hash__(self):
+        return hash(self.chart_hash)
+
+    def to_dict(self):
+        """
+        转换为可修改的字典
+
+        返回:
+            dict: 与计算结果相同结构的字典
+        """
+        return {item.name: thaw(getattr(self, item.name)) for item in fields(self) if item.init}
+
+
+def as_chart(value):
+    """
+    把八字计算结果转换为命盘对象（已是 Chart 时原样返回）
+
+    参数:
+        value (dict | Chart): 八字计算结果或命盘
+
+    返回:
+        Chart: 命盘
+    """
+    return value if isinstance(value, Chart) else Chart.from_result(value)
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+流式命盘报告 - 按章节逐段输出八字命盘报告
+
+报告先输出四柱命盘网格，再依次输出命盘分析、大运、流年等章节。大运评分与
+流年流月章节在前面的片段被消费后才计算，调用方（API 的 StreamingResponse、
+批量导出任务）可以边生成边发送或写入文件，无需在内存中拼出完整报告。
+"""
+
+import functools
+import html
+
+from models import clock
+from ..advice_index import DEFAULT_LOCALE
+from .builder import build_report, text_sections
+from .chart import as_chart
+
+# 支持的输出格式及对应的 MIME 类型
+MEDIA_TYPES = {
+    "text": "text/plain; charset=utf-8",
+    "markdown": "text/markdown; charset=utf-8",
+    "html": "text/html; charset=utf-8"
+}
+
+def timeline_sections(report, as_of=None):
+    """
+    逐个生成大运评分与流年流月章节（计算量较大，放在报告末尾）
+
+    参数:
+        report (dict): 命盘报告数据
+        as_of (date, optional): 参考日期，决定分析的流年，默认为当前时间
+
+    返回:
+        generator: (章节标题, 文本行列表)
+    """
+    from ..liunian_analysis import analyze_liunian
+    from ..timeline import build_timeline
+
+    timeline = build_timeline(report)
+    yield "大运评分", [
+        f"{dayun['age_range']}岁 {dayun['description']}运势{dayun['luck_level']}。"
+        for dayun in (timeline.dayun(i) for i in range(len(timeline.dayun_pillars)))
+    ]
+
+    year = clock.as_of(as_of).year
+    liunian = analyze_liunian(report, year=year, details_level=2)
+    lines = [f"{liunian['description']} 运势{liunian['luck_level']}。"]
+    lines.extend(
+        f"{month['start_date']} {month['ganzhi']}月: 评分{month['score']}，{month['luck_level']}"
+        for month in liunian['months']
+    )
+    lines.extend(f"关键时期: {period['description']}" for period in liunian['key_periods'])
+    yield f"{year}年流年流月", lines
+
+
+def health_sections(elements_result):
+    """
+    饮食与运动调养章节
+
+    参数:
+        elements_result (dict): five_elements.analyze_five_elements 的返回结果
+
+    返回:
+        generator: (章节标题, 文本行列表)
+    """
+    diet = elements_result['diet_advice']
+    lines = [f"宜{flavor['flavor']}（{flavor['element']}）: {flavor['effect']}" for flavor in diet['recommended_flavors']]
+    lines.extend(f"忌{flavor['flavor']}（{flavor['element']}）: {flavor['reason']}" for flavor in diet['avoid_flavors'])
+    lines.extend(
+        f"{recipe['name']}: {'、'.join(recipe['ingredients'])}，{recipe['effect']}" for recipe in diet['seasonal_recipes']
+    )
+    lines.append(diet['general_advice'])
+    yield "饮食调养", lines
+
+    exercise = elements_result['exercise_advice']
+    lines = [
+        f"{'、'.join(item['exercise_types'])}: {item['effect']}" for item in exercise['recommended_exercises']
+    ]
+    lines.extend([exercise['general_advice'], exercise['frequency_advice']])
+    yield "运动调养", lines
+
+
+def _render_section(title, lines, format):
+    """按输出格式渲染一个章节"""
+    if format == 'html':
+        body = "".join(f"  <p>{html.escape(line)}</p>\n" for line in lines)
+        return f"<section>\n  <h3>{html.escape(title)}</h3>\n{body}</section>\n"
+    elif format == 'markdown':
+        body = "".join(f"- {line}\n" for line in lines)
+        return f"### {title}\n\n{body}\n"
+    return f"[{title}]\n" + "".join(f"{line}\n" for line in lines) + "\n"
+
+
+def stream_report(bazi_result, format='text', as_of=None, timeline=True, locale=DEFAULT_LOCALE, health=None):
+    """
+    流式生成命盘报告：先输出命盘网格，再逐章输出解读
+
+    参数:
+        bazi_result (dict | Chart): bazi_calculator.calculate_bazi 的返回结果或命盘对象
+        format (str): 输出格式，可选 'text', 'html', 'markdown'
+        as_of (date, optional): 流年分析的参考日期
+        timeline (bool): 是否包含大运评分与流年流月章节
+        locale (str): 命盘网格的语言
+        health (dict, optional): five_elements.analyze_five_elements 的返回结果，
+            提供时在末尾输出饮食与运动调养章节
+
+    返回:
+        generator: 报告文本片段
+    """
+    from ..bazi_visual import generate_visual_report
+
+    if format not in MEDIA_TYPES:
+        raise ValueError(f"不支持的报告格式: {format}")
+
+    report = build_report(as_chart(bazi_result))
+    if format == 'html':
+        yield "<!DOCTYPE html>\n<html lang=\"zh-CN\">\n<head><meta charset=\"UTF-8\"><title>八字命盘报告</title></head>\n<body>\n"
+    yield generate_visual_report(report, format=format, locale=locale) + "\n\n"
+
+    for title, lines in text_sections(report):
+        if title != "基本信息":
+            yield _render_section(title, lines, format)
+
+    if timeline:
+        for title, lines in timeline_sections(report, as_of=as_of):
+            yield _render_section(title, lines, format)
+
+    if health is not None:
+        for title, lines in health_sections(health):
+            yield _render_section(title, lines, format)
+
+    if format == 'html':
+        yield "</body>\n</html>\n"
+
+
+def write_report(bazi_result, fp, format='text', as_of=None, timeline=True, locale=DEFAULT_LOCALE):
+    """
+    把流式报告逐段写入文件对象（用于批量导出，内存占用与报告长度无关）
+
+    参数:
+        bazi_result (dict | Chart): bazi_calculator.calculate_bazi 的返回结果或命盘对象
+        fp: 可写的文本文件对象
+        format (str): 输出格式
+        as_of (date, optional): 流年分析的参考日期
+        timeline (bool): 是否包含大运评分与流年流月章节
+        locale (str): 命盘网格的语言
+
+    返回:
+        int: 写入的字符数
+    """
+    written = 0
+    for chunk in stream_report(bazi_result, format=format, as_of=as_of, timeline=timeline, locale=locale):
+        written += fp.write(chunk)
+    return written
+
+
+@functools.lru_cache(maxsize=1024)
+def render_report(chart, format='text', locale=DEFAULT_LOCALE):
+    """
+    渲染完整的命盘报告（命盘网格与解读，不含随参考时间变化的大运流年章节），
+    按 (命盘哈希, 格式, 语言) 缓存
+
+    参数:
+        chart (Chart): 命盘
+        format (str): 输出格式，可选 'text', 'html', 'markdown'
+        locale (str): 命盘网格的语言
+
+    返回:
+        str: 报告
+    """
+    return "".join(stream_report(chart, format=format, timeline=False, locale=locale))
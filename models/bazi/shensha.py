@@ -1,6 +1,8 @@
 import json
 from pathlib import Path
 
+from models import timing
+
 # 五行生克关系
 WUXING_RELATIONS = {
     "金": {"generates": "水", "restricts": "木"},
@@ -158,6 +160,7 @@ def calculate_shensha_zhi(shensha_name, day_gan, day_zhi):
         return diaoke.get(day_zhi, [])
     return []
 
+@timing.timed("bazi.shensha_analysis")
 def analyze_shensha(shensha_list, gua_element, day_master_strength="neutral", flow_year_element="金", mode="liuyao", najia_data=None):
     shensha_data = load_shensha_data()
     positive_impacts = []
@@ -0,0 +1,408 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+运势时间轴模块 - 一次性计算全部大运、流年、流月
+
+基于预先生成的六十甲子表（十神、五行、生克关系），用数组运算一次得到
+(大运 × 流年 × 流月) 的完整评分网格。结果为只读数组，描述文本按需生成。
+评分规则与 dayun_analysis / liunian_analysis 中的逐项计算一致。
+"""
+
+import functools
+import re
+from dataclasses import dataclass
+
+import numpy as np
+
+from .dayun_analysis import translate_score_to_luck as translate_dayun_luck
+from .liunian_analysis import calculate_shishen
+from .liunian_analysis import translate_score_to_luck as translate_liunian_luck
+
+GANS = "甲乙丙丁戊己庚辛壬癸"
+ZHIS = "子丑寅卯辰巳午未申酉戌亥"
+
+# 六十甲子
+JIAZI = tuple(GANS[i % 10] + ZHIS[i % 12] for i in range(60))
+JIAZI_INDEX = {gz: i for i, gz in enumerate(JIAZI)}
+
+# 五行顺序与中英文名称
+ELEMENTS = ("木", "火", "土", "金", "水")
+ELEMENTS_EN = ("wood", "fire", "earth", "metal", "water")
+ELEMENT_INDEX = {name: i for names in (ELEMENTS, ELEMENTS_EN) for i, name in enumerate(names)}
+
+# 十神顺序
+SHISHEN = ("比肩", "劫财", "食神", "伤官", "偏财", "正财", "七杀", "正官", "偏印", "正印")
+SHISHEN_INDEX = {name: i for i, name in enumerate(SHISHEN)}
+
+# 生克关系代码（与 analyze_relation 的取值一一对应）
+RELATIONS = ("比助", "生", "克", "被克", "被生")
+
+# 流年干支以 1984 甲子年为基准
+BASE_YEAR = 1984
+
+# 流月从寅月（立春）开始，共 12 个节气月
+MONTHS = 12
+
+# 默认时间轴长度（年）
+DEFAULT_YEARS = 80
+
+
+def _build_tables():
+    gan_element = np.array([i // 2 for i in range(10)], dtype=np.int8)
+    jiazi_gan = np.array([i % 10 for i in range(60)], dtype=np.int8)
+    jiazi_zhi = np.array([i % 12 for i in range(60)], dtype=np.int8)
+    # 五行生克关系：relation[a, b] 为 a 对 b 的关系
+    # 按木火土金水排列时，相差 1 为生、2 为克、3 为被克、4 为被生
+    relation = np.array([[(b - a) % 5 for b in range(5)] for a in range(5)], dtype=np.int8)
+    # 十神表：gan_shen[日主天干, 甲子] / zhi_shen[日主天干, 甲子]
+    gan_shen = np.array([[SHISHEN_INDEX[calculate_shishen(GANS[dm], JIAZI[j][0])] for j in range(60)]
+                         for dm in range(10)], dtype=np.int8)
+    zhi_shen = np.array([[SHISHEN_INDEX.get(calculate_shishen(GANS[dm], JIAZI[j][1]), -1) for j in range(60)]
+                         for dm in range(10)], dtype=np.int8)
+    for table in (gan_element, jiazi_gan, jiazi_zhi, relation, gan_shen, zhi_shen):
+        table.flags.writeable = False
+    return gan_element, jiazi_gan, jiazi_zhi, relation, gan_shen, zhi_shen
+
+
+GAN_ELEMENT, JIAZI_GAN, JIAZI_ZHI, RELATION, GAN_SHEN, ZHI_SHEN = _build_tables()
+
+# 甲子对应的天干五行
+JIAZI_ELEMENT = GAN_ELEMENT[JIAZI_GAN]
+
+
+def year_pillars(years):
+    """
+    流年干支序号
+
+    参数:
+        years (array-like): 公历年份（以立春为年界）
+
+    返回:
+        numpy.ndarray: 六十甲子序号
+    """
+    return (np.asarray(years) - BASE_YEAR) % 60
+
+
+def month_pillars(years):
+    """
+    各年 12 个节气月（寅月至丑月）的干支序号，按五虎遁起月
+
+    参数:
+        years (array-like): 公历年份（以立春为年界）
+
+    返回:
+        numpy.ndarray: 形状为 (N, 12) 的六十甲子序号
+    """
+    year_gan = JIAZI_GAN[year_pillars(years)].astype(np.int64)
+    # 甲己之年丙作首：寅月天干 = (年干 % 5) * 2 + 2
+    month_gan = ((year_gan % 5) * 2 + 2)[:, None] + np.arange(MONTHS)
+    month_zhi = (2 + np.arange(MONTHS))[None, :].repeat(len(year_gan), axis=0)
+    # 由天干、地支序号求甲子序号（两者奇偶一致）
+    return (6 * (month_gan % 10) - 5 * month_zhi) % 60
+
+
+def _relation_bonus(relation, positive, negative):
+    """关系为生/比助时加分，为克时减分，未知（-1）不计分"""
+    favorable = (relation == 0) | (relation == 1)
+    return np.where(favorable, positive, np.where(relation == 2, -negative, 0))
+
+
+def flow_scores(pillars, dm_element, ys_element, dayun_element, strength, dm_gan):
+    """
+    流年/流月评分，规则同 liunian_analysis.calculate_liunian_score（analyze_liuyue 也使用本函数）
+
+    参数:
+        pillars (numpy.ndarray): 流年或流月的甲子序号
+        dm_element (int): 日主五行序号
+        ys_element (int): 用神五行序号，-1 表示未知
+        dayun_element (numpy.ndarray): 对应大运的五行序号，-1 表示无大运
+        strength (str): 日主强弱
+        dm_gan (int): 日主天干序号
+    """
+    element = JIAZI_ELEMENT[pillars]
+    score = np.full(pillars.shape, 50, dtype=np.int16)
+    score += _relation_bonus(RELATION[element, dm_element], 20, 20)
+    if ys_element >= 0:
+        score += _relation_bonus(RELATION[element, ys_element], 15, 15)
+    relation_dy = np.where(dayun_element >= 0, RELATION[np.maximum(dayun_element, 0), element], -1)
+    score += _relation_bonus(relation_dy, 10, 0)
+    if strength == "旺":
+        score += 10
+    elif strength == "弱":
+        score -= 10
+    gan_shen = GAN_SHEN[dm_gan, pillars]
+    score -= np.where((gan_shen == SHISHEN_INDEX["正官"]) | (gan_shen == SHISHEN_INDEX["七杀"]), 10, 0)
+    return np.clip(score, 0, 100)
+
+
+def _dayun_scores(pillars, dm_element, ys_element, strength, dm_gan):
+    """大运评分，规则同 dayun_analysis.calculate_dayun_score（不含流年加成）"""
+    weak = strength in ("弱", "偏弱")
+    element = JIAZI_ELEMENT[pillars]
+    score = np.zeros(pillars.shape, dtype=np.int16)
+    relation_dm = RELATION[element, dm_element]
+    score += np.where((relation_dm == 0) | (relation_dm == 1), 3 if weak else 1, 0)
+    # 原规则：被日主克时，日主弱减 3，否则加 1
+    score += np.where(relation_dm == 2, -3 if weak else 1, 0)
+    if ys_element >= 0:
+        score += _relation_bonus(RELATION[element, ys_element], 2, 2)
+    gan_shen = GAN_SHEN[dm_gan, pillars]
+    guan_sha = (gan_shen == SHISHEN_INDEX["正官"]) | (gan_shen == SHISHEN_INDEX["七杀"])
+    yin = (gan_shen == SHISHEN_INDEX["正印"]) | (gan_shen == SHISHEN_INDEX["偏印"])
+    score += np.where(guan_sha, -2 if weak else -1, 0)
+    score += np.where(yin, 2 if weak else 1, 0)
+    return np.clip(score, -5, 5)
+
+
+def _readonly(*arrays):
+    for array in arrays:
+        array.flags.writeable = False
+    return arrays
+
+
+@dataclass(frozen=True, eq=False)
+class Timeline:
+    """
+    运势时间轴（只读数组结构）
+
+    years / year_pillars / year_scores / dayun_of_year 形状为 (Y,)，
+    month_pillars / month_scores 形状为 (Y, 12)，dayun_* 形状为 (D,)。
+    dayun_of_year 为 -1 表示该年尚未起运。
+    """
+
+    birth_year: int
+    day_master: str
+    day_master_strength: str
+    years: np.ndarray
+    year_pillars: np.ndarray
+    year_scores: np.ndarray
+    dayun_of_year: np.ndarray
+    month_pillars: np.ndarray
+    month_scores: np.ndarray
+    dayun_pillars: np.ndarray
+    dayun_start_ages: np.ndarray
+    dayun_end_ages: np.ndarray
+    dayun_scores: np.ndarray
+
+    def __len__(self):
+        return len(self.years)
+
+    def index(self, year):
+        """年份在时间轴中的行号"""
+        row = int(year) - int(self.years[0])
+        if not 0 <= row < len(self.years):
+            raise KeyError(f"年份不在时间轴范围内: {year}")
+        return row
+
+    def _shishen(self, pillar):
+        dm_gan = GANS.index(self.day_master)
+        zhi_shen = ZHI_SHEN[dm_gan, pillar]
+        return SHISHEN[GAN_SHEN[dm_gan, pillar]], SHISHEN[zhi_shen] if zhi_shen >= 0 else "未知"
+
+    def dayun(self, i):
+        """
+        第 i 个大运的详细信息（按需生成文本）
+
+        参数:
+            i (int): 大运序号
+
+        返回:
+            dict: 大运信息
+        """
+        pillar = int(self.dayun_pillars[i])
+        gan_shen, zhi_shen = self._shishen(pillar)
+        score = int(self.dayun_scores[i])
+        age_range = f"{self.dayun_start_ages[i]}-{self.dayun_end_ages[i]}"
+        element = ELEMENTS[JIAZI_ELEMENT[pillar]]
+        return {
+            "ganzhi": JIAZI[pillar],
+            "age_range": age_range,
+            "gan_shen": gan_shen,
+            "zhi_shen": zhi_shen,
+            "element": element,
+            "score": score,
+            "luck_level": translate_dayun_luck(score),
+            "description": f"{JIAZI[pillar]}大运，五行{element}，天干十神{gan_shen}，地支十神{zhi_shen}，评分{score}。"
+        }
+
+    def year(self, year):
+        """
+        某一流年的详细信息（按需生成文本）
+
+        参数:
+            year (int): 公历年份
+
+        返回:
+            dict: 流年信息
+        """
+        row = self.index(year)
+        pillar = int(self.year_pillars[row])
+        gan_shen, zhi_shen = self._shishen(pillar)
+        score = int(self.year_scores[row])
+        dayun = int(self.dayun_of_year[row])
+        return {
+            "year": int(year),
+            "age": int(year) - self.birth_year,
+            "ganzhi": JIAZI[pillar],
+            "gan_shen": gan_shen,
+            "zhi_shen": zhi_shen,
+            "element": ELEMENTS[JIAZI_ELEMENT[pillar]],
+            "score": score,
+            "luck_level": translate_liunian_luck(score),
+            "dayun": JIAZI[self.dayun_pillars[dayun]] if dayun >= 0 else "",
+            "description": f"{year}年{JIAZI[pillar]}，天干十神为{gan_shen}，地支十神为{zhi_shen}，"
+                           f"五行{ELEMENTS[JIAZI_ELEMENT[pillar]]}。"
+        }
+
+    def month(self, year, month):
+        """
+        某一流月的详细信息（按需生成文本）
+
+        参数:
+            year (int): 公历年份
+            month (int): 节气月序号，1 为寅月（立春起），12 为丑月
+
+        返回:
+            dict: 流月信息
+        """
+        row = self.index(year)
+        if not 1 <= month <= MONTHS:
+            raise KeyError(f"无效的节气月: {month}")
+        pillar = int(self.month_pillars[row, month - 1])
+        gan_shen, zhi_shen = self._shishen(pillar)
+        score = int(self.month_scores[row, month - 1])
+        return {
+            "year": int(year),
+            "month": month,
+            "ganzhi": JIAZI[pillar],
+            "gan_shen": gan_shen,
+            "zhi_shen": zhi_shen,
+            "element": ELEMENTS[JIAZI_ELEMENT[pillar]],
+            "score": score,
+            "luck_level": translate_liunian_luck(score)
+        }
+
+    def to_dict(self, months=False):
+        """
+        展开为嵌套字典（生成全部文本，较慢，仅用于导出）
+
+        参数:
+            months (bool): 是否包含流月
+
+        返回:
+            dict: 时间轴
+        """
+        years = []
+        for year in self.years.tolist():
+            item = self.year(year)
+            if months:
+                item["months"] = [self.month(year, m) for m in range(1, MONTHS + 1)]
+            years.append(item)
+        return {
+            "birth_year": self.birth_year,
+            "dayuns": [self.dayun(i) for i in range(len(self.dayun_pillars))],
+            "years": years
+        }
+
+
+def _parse_report(report):
+    """从命盘报告中提取时间轴所需的信息"""
+    basic_info = report['basic_info']
+    pattern = report['pattern_analysis']
+    day_master = basic_info['day_master'].split()[0]
+    strength = pattern['day_master_strength']
+    yong_shen = (pattern.get('yong_shen', '') or '').split()
+    yong_shen = yong_shen[0] if yong_shen else ''
+
+    dayuns = []
+    for dayun in report.get('dayun_analysis', []) or []:
+        start, _, end = str(dayun['age_range']).partition('-')
+        dayuns.append((dayun['ganzhi'], int(start), int(end or start)))
+
+    match = re.match(r'\s*(\d+)年', basic_info.get('solar_date', ''))
+    birth_year = int(match.group(1)) if match else None
+    return day_master, strength, yong_shen, tuple(dayuns), birth_year
+
+
+def build_timeline(report, birth_year=None, years=DEFAULT_YEARS, start_year=None):
+    """
+    由命盘报告构建完整的运势时间轴
+
+    参数:
+        report (dict): 八字命盘报告（generate_bazi_report 的结果）
+        birth_year (int, optional): 出生年份，默认取报告中的阳历日期
+        years (int): 时间轴年数
+        start_year (int, optional): 起始年份，默认为出生年份
+
+    返回:
+        Timeline: 时间轴
+    """
+    day_master, strength, yong_shen, dayuns, report_year = _parse_report(report)
+    birth_year = birth_year or report_year
+    if birth_year is None:
+        raise ValueError("缺少出生年份")
+    return compute_timeline(day_master, strength, yong_shen, dayuns, int(birth_year),
+                            int(start_year or birth_year), int(years))
+
+
+@functools.lru_cache(maxsize=256)
+def compute_timeline(day_master, strength, yong_shen, dayuns, birth_year, start_year, years):
+    """
+    计算运势时间轴（按参数缓存，返回共享的只读结构）
+
+    参数:
+        day_master (str): 日主天干
+        strength (str): 日主强弱
+        yong_shen (str): 用神五行（中文或英文），未知时为空字符串
+        dayuns (tuple): ((干支, 起运年龄, 结束年龄), ...)，按起运年龄排序
+        birth_year (int): 出生年份
+        start_year (int): 起始年份
+        years (int): 年数
+
+    返回:
+        Timeline: 时间轴
+    """
+    if day_master not in GANS:
+        raise ValueError(f"无效的日主天干: {day_master}")
+    dm_gan = GANS.index(day_master)
+    dm_element = int(GAN_ELEMENT[dm_gan])
+    ys_element = ELEMENT_INDEX.get(yong_shen, -1)
+
+    dayun_pillars = np.array([JIAZI_INDEX[gz] for gz, _, _ in dayuns], dtype=np.int64)
+    dayun_start_ages = np.array([start for _, start, _ in dayuns], dtype=np.int64)
+    dayun_end_ages = np.array([end for _, _, end in dayuns], dtype=np.int64)
+    dayun_scores = _dayun_scores(dayun_pillars, dm_element, ys_element, strength, dm_gan)
+
+    year_values = np.arange(start_year, start_year + years, dtype=np.int64)
+    ages = year_values - birth_year
+    # 所在大运：起运年龄不大于当年年龄的最后一个大运
+    dayun_of_year = np.searchsorted(dayun_start_ages, ages, side='right') - 1
+    dayun_element = np.where(dayun_of_year >= 0,
+                             JIAZI_ELEMENT[dayun_pillars[np.maximum(dayun_of_year, 0)]] if len(dayuns) else -1,
+                             -1)
+
+    year_pillar_values = year_pillars(year_values)
+    year_scores = flow_scores(year_pillar_values, dm_element, ys_element, dayun_element, strength, dm_gan)
+
+    # 流月评分：流月自身评分与所在流年评分的平均
+    month_pillar_values = month_pillars(year_values)
+    month_own = flow_scores(month_pillar_values, dm_element, ys_element, dayun_element[:, None], strength, dm_gan)
+    month_scores = (month_own + year_scores[:, None]) // 2
+
+    _readonly(dayun_pillars, dayun_start_ages, dayun_end_ages, dayun_scores, year_values,
+              year_pillar_values, year_scores, dayun_of_year, month_pillar_values, month_scores)
+    return Timeline(
+        birth_year=birth_year,
+        day_master=day_master,
+        day_master_strength=strength,
+        years=year_values,
+        year_pillars=year_pillar_values,
+        year_scores=year_scores,
+        dayun_of_year=dayun_of_year,
+        month_pillars=month_pillar_values,
+        month_scores=month_scores,
+        dayun_pillars=dayun_pillars,
+        dayun_start_ages=dayun_start_ages,
+        dayun_end_ages=dayun_end_ages,
+        dayun_scores=dayun_scores
+    )
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+时钟模块
+引擎中所有"当前时间"都从这里读取。默认使用系统时间，可通过 use_clock 在当前
+上下文中替换为固定时钟；需要缓存的计算应先用 as_of 把时间截断到所依赖的粒度，
+再把结果作为参数（缓存键）传入。
+"""
+
+import contextlib
+import contextvars
+import datetime
+from dataclasses import dataclass
+
+# 时间粒度
+DAY = "day"
+MONTH = "month"
+YEAR = "year"
+
+
+class SystemClock:
+    """系统时钟"""
+
+    def now(self):
+        return datetime.datetime.now()
+
+
+@dataclass(frozen=True)
+class FixedClock:
+    """固定时钟，始终返回同一时间"""
+
+    at: datetime.datetime
+
+    def now(self):
+        return self.at
+
+
+_clock = contextvars.ContextVar("clock", default=SystemClock())
+
+
+def get_clock():
+    """
+    获取当前上下文的时钟
+
+    返回:
+        SystemClock / FixedClock: 时钟对象
+    """
+    return _clock.get()
+
+
+@contextlib.contextmanager
+def use_clock(clock):
+    """
+    在上下文中使用指定时钟
+
+    参数:
+        clock: 具有 now() 方法的时钟对象，或 datetime（视为固定时钟）
+    """
+    if isinstance(clock, datetime.datetime):
+        clock = FixedClock(clock)
+    token = _clock.set(clock)
+    try:
+        yield clock
+    finally:
+        _clock.reset(token)
+
+
+def now():
+    """
+    当前时间
+
+    返回:
+        datetime.datetime: 当前上下文时钟的时间
+    """
+    return _clock.get().now()
+
+
+def as_of(value=None, granularity=DAY):
+    """
+    把时间点截断到指定粒度，结果可作为缓存键
+
+    参数:
+        value: datetime / date / 'YYYY-MM-DD' 字符串，默认为当前时间
+        granularity (str): DAY / MONTH / YEAR
+
+    返回:
+        datetime.date: 截断后的日期（月粒度为当月1日，年粒度为当年1月1日）
+    """
+    if value is None:
+        value = now()
+    elif isinstance(value, str):
+        value = datetime.date.fromisoformat(value[:10])
+
+    if granularity == DAY:
+        return datetime.date(value.year, value.month, value.day)
+    elif granularity == MONTH:
+        return datetime.date(value.year, value.month, 1)
+    elif granularity == YEAR:
+        return datetime.date(value.year, 1, 1)
+    raise ValueError(f"不支持的时间粒度: {granularity}")
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+错误与警告通道
+计算流程中某个章节失败时不再打印到控制台，而是记录为结构化的问题（Issue）随结果
+返回（result["issues"]），结果中其余章节照常计算，失败的章节列入 degraded；
+各问题按 (章节, 类型, 级别) 计数，可导出为 Prometheus 文本格式。
+"""
+
+import collections
+import contextlib
+import logging
+import threading
+from dataclasses import dataclass
+
+logger = logging.getLogger(__name__)
+
+# 问题级别
+ERROR = "error"
+WARNING = "warning"
+
+# Prometheus 指标名
+METRIC_ISSUES = "curecipher_chart_issues_total"
+
+# 计算失败时返回给调用方的默认提示
+DEFAULT_MESSAGE = "计算八字时出错，请检查输入参数和网络连接"
+
+_lock = threading.Lock()
+_counts = collections.Counter()
+
+
+class ChartError(Exception):
+    """命盘计算错误基类"""
+
+
+class InvalidBirthData(ChartError, ValueError):
+    """出生信息无效（日期不存在、时辰越界等）"""
+
+
+@dataclass(frozen=True)
+class Issue:
+    """一条错误或警告"""
+    section: str
+    kind: str
+    message: str
+    severity: str = ERROR
+
+    def to_dict(self):
+        return {"section": self.section, "kind": self.kind, "message": self.message, "severity": self.severity}
+
+
+def count(section, kind, severity):
+    """
+    问题计数加一
+
+    参数:
+        section (str): 章节，如 dayun
+        kind (str): 问题类型，通常为异常类名
+        severity (str): 级别，error / warning
+    """
+    with _lock:
+        _counts[(section, kind, severity)] += 1
+
+
+def counts():
+    """
+    各问题计数的副本
+
+    返回:
+        dict: (章节, 类型, 级别) -> 次数
+    """
+    with _lock:
+        return dict(_counts)
+
+
+def reset_counts():
+    """清空问题计数"""
+    with _lock:
+        _counts.clear()
+
+
+class Issues:
+    """单次计算收集的错误与警告"""
+
+    def __init__(self):
+        self.items = []
+        self.degraded = []
+
+    def __bool__(self):
+        return bool(self.items)
+
+    def add(self, section, kind, message, severity=WARNING, degraded=False):
+        """
+        记录一条问题
+
+        参数:
+            section (str): 章节
+            kind (str): 问题类型
+            message (str): 说明
+            severity (str): 级别
+            degraded (bool): 该章节结果是否不完整（为空或使用了默认值）
+
+        返回:
+            Issue: 记录的问题
+        """
+        issue = Issue(section, kind, message, severity)
+        self.items.append(issue)
+        if degraded and section not in self.degraded:
+            self.degraded.append(section)
+        count(section, kind, severity)
+        return issue
+
+    def warn(self, section, message, kind="warning", degraded=False):
+        """记录警告"""
+        return self.add(section, kind, message, WARNING, degraded)
+
+    def capture(self, section, exc, severity=ERROR):
+        """
+        记录章节计算中的异常，该章节标记为不完整
+
+        参数:
+            section (str): 章节
+            exc (BaseException): 异常
+            severity (str): 级别，有降级方案时使用 warning
+        """
+        logger.debug(f"章节 {section} 计算失败: {exc}", exc_info=exc)
+        return self.add(section, type(exc).__name__, str(exc), severity, degraded=True)
+
+    @contextlib.contextmanager
+    def guard(self, section, severity=ERROR):
+        """
+        在上下文中计算一个章节，异常记录后继续（不会向外抛出）
+
+            with issues.guard("dayun"):
+                ...
+        """
+        try:
+            yield
+        except Exception as e:
+            self.capture(section, e, severity)
+
+    def to_dict(self):
+        """
+        返回:
+            dict: errors / warnings 列表与 degraded 章节
+        """
+        return {
+            "errors": [issue.to_dict() for issue in self.items if issue.severity == ERROR],
+            "warnings": [issue.to_dict() for issue in self.items if issue.severity == WARNING],
+            "degraded": list(self.degraded),
+        }
+
+
+def error_result(exc, issues=None, section="chart"):
+    """
+    整体计算失败时返回的错误字典（保持原有 error / message 字段）
+
+    参数:
+        exc (Exception): 异常
+        issues (Issues, optional): 失败前已收集的问题
+        section (str): 记录异常的章节
+
+    返回:
+        dict: 包含 error / error_type / message / issues
+    """
+    issues = Issues() if issues is None else issues
+    issues.capture(section, exc)
+    return {
+        "error": str(exc),
+        "error_type": type(exc).__name__,
+        "message": str(exc) if isinstance(exc, ChartError) else DEFAULT_MESSAGE,
+        "issues": issues.to_dict(),
+    }
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def render_metrics():
+    """
+    以 Prometheus 文本格式导出问题计数
+
+    返回:
+        str: 指标文本
+    """
+    lines = [
+        f"# HELP {METRIC_ISSUES} 命盘计算中记录的错误与警告次数",
+        f"# TYPE {METRIC_ISSUES} counter",
+    ]
+    for (section, kind, severity), value in sorted(counts().items()):
+        lines.append(f'{METRIC_ISSUES}{{section="{_label(section)}",kind="{_label(kind)}",'
+                     f'severity="{_label(severity)}"}} {value}')
+    return "\n".join(lines) + "\n"
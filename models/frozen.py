@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+只读结构
+缓存中的结果以 FrozenDict / tuple 的形式共享给各调用方，调用方无法修改共享部分；
+需要修改时用 thaw 得到可修改的副本。八字与六爻引擎共用。
+"""
+
+
+class FrozenDict(dict):
+    """只读字典，可直接 JSON 序列化，修改时抛出 TypeError"""
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("结果为共享的只读结构，请先复制再修改")
+
+    __setitem__ = __delitem__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def __reduce__(self):
+        return FrozenDict, (dict(self),)
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def thaw(self):
+        """返回可修改的深拷贝（字典与列表）"""
+        return thaw(self)
+
+
+def freeze(value):
+    """
+    将字典/列表递归转换为只读结构
+
+    参数:
+        value: 字典、列表或其他值
+
+    返回:
+        FrozenDict / tuple / 原值
+    """
+    # FrozenDict 只由本函数构建，其中的取值已是只读结构
+    if isinstance(value, FrozenDict):
+        return value
+    if isinstance(value, dict):
+        return FrozenDict((key, freeze(item)) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def thaw(value):
+    """
+    将只读结构递归转换回可修改的字典/列表
+
+    参数:
+        value: FrozenDict、tuple 或其他值
+
+    返回:
+        dict / list / 原值
+    """
+    if isinstance(value, dict):
+        return {key: thaw(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [thaw(item) for item in value]
+    return value
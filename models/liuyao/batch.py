@@ -0,0 +1,199 @@
+"""
+六爻批量起卦
+
+单次起卦与批量起卦都返回结构化结果（不输出到控制台）。批量请求按日课
+（起卦小时 + 经度分桶）分组，同组共享一次日课换算，组内相同卦象只计算一次；
+卦象与诊断部分优先查预计算表，未命中时使用实时引擎。批量较大时按分组切分
+到进程池并行计算，各进程通过 mmap 共享同一份预计算表。
+"""
+
+import datetime
+import logging
+import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+from models import clock, timing
+from models.frozen import freeze
+
+from .diagnosis import YAO_POSITIONS
+from .diagnosis import calculate_flow_year_element
+from .najia import LONGITUDE_BUCKET
+from .najia import Najia
+from .outcomes import cast_index
+from .outcomes import lookup_outcome
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LONGITUDE = 116.4074
+DEFAULT_LATITUDE = 39.9042
+
+# 批量数量达到该值时使用进程池
+PROCESS_THRESHOLD = 2000
+
+# 单个进程任务包含的最少起卦数
+CHUNK_SIZE = 500
+
+_executor = None
+
+
+def _parse_date(date):
+    if date is None:
+        return clock.now()
+    if isinstance(date, str):
+        return datetime.datetime.strptime(date, '%Y-%m-%d %H:%M')
+    return date
+
+
+def _daily_key(date, longitude):
+    return date.year, date.month, date.day, date.hour, round(longitude / LONGITUDE_BUCKET)
+
+
+@timing.timed("liuyao.cast")
+def cast(params, date=None, longitude=DEFAULT_LONGITUDE, latitude=DEFAULT_LATITUDE, title=None, render=None,
+         day_master_strength='neutral', flow_year_element=None, _daily=None, _outcomes=None):
+    """
+    起卦并返回结构化的排盘与健康诊断结果
+
+    :param params: 六爻参数，如 [2, 2, 1, 2, 4, 2]
+    :param date: 起卦时间，datetime 或 'YYYY-MM-DD HH:MM'，默认当前时间
+    :param longitude: 经度
+    :param latitude: 纬度
+    :param title: 标题
+    :param render: 附带排盘文本的格式，None / text / html
+    :param day_master_strength: 日主强弱
+    :param flow_year_element: 流年五行，默认按起卦年份计算
+    :return: dict，lunar / gua / god6 / diagnosis 下的取值为缓存中共享的只读结构（FrozenDict / tuple），
+        修改前需先复制（models.frozen.thaw）
+    """
+    params = [int(p) for p in params]
+    cast_index(params)
+    date = _parse_date(date)
+    lunar = _daily if _daily is not None else freeze(Najia._daily(date, longitude, latitude))
+    day_gz = lunar['gz']['day']
+    if flow_year_element is None:
+        flow_year_element = calculate_flow_year_element(date.year)
+
+    key = (tuple(params), day_gz, day_master_strength, flow_year_element)
+    outcome = _outcomes.get(key) if _outcomes is not None else None
+    if outcome is None:
+        outcome = lookup_outcome(params, day_gz, day_master_strength, flow_year_element)
+        if _outcomes is not None:
+            _outcomes[key] = outcome
+
+    result = {
+        'params': params,
+        'solar': date.isoformat(),
+        'lunar': lunar,
+        'title': title or '',
+        'gua': outcome['gua'],
+        'god6': outcome['god6'],
+        'diagnosis': {
+            'gua_element': outcome['gua_element'],
+            'bian_gua_element': outcome['bian_gua_element'],
+            'shensha': outcome['shensha'],
+            'health_impacts': outcome['health_impacts'],
+            'remedies': outcome['remedies'],
+            'shensha_analysis': outcome['shensha_analysis'],
+        },
+    }
+    if render:
+        najia = Najia(2).compile(params=params, date=date, title=title, longitude=longitude, latitude=latitude)
+        result['render'] = najia.render(fmt=render, fast=True, yao_names=YAO_POSITIONS)
+    return result
+
+
+def _cast_groups(groups):
+    """
+    计算若干日课分组，返回 [(序号, 结果), ...]
+
+    :param groups: [[(序号, 请求), ...], ...]
+    :return: list
+    """
+    results = []
+    for group in groups:
+        _, first = group[0]
+        date = _parse_date(first.get('date'))
+        lunar = freeze(Najia._daily(date, first.get('longitude', DEFAULT_LONGITUDE),
+                                    first.get('latitude', DEFAULT_LATITUDE)))
+        outcomes = {}
+        for index, item in group:
+            results.append((index, cast(_daily=lunar, _outcomes=outcomes, **item)))
+    return results
+
+
+def group_by_day(items):
+    """
+    按日课分组，组内保留原始序号
+
+    :param items: 起卦请求列表，每项为 cast() 的关键字参数
+    :return: [[(序号, 请求), ...], ...]
+    """
+    groups = OrderedDict()
+    for index, item in enumerate(items):
+        item = dict(item)
+        item['date'] = _parse_date(item.get('date'))
+        key = _daily_key(item['date'], item.get('longitude', DEFAULT_LONGITUDE))
+        groups.setdefault(key, []).append((index, item))
+    return list(groups.values())
+
+
+def _chunks(groups, size):
+    chunk, count = [], 0
+    for group in groups:
+        chunk.append(group)
+        count += len(group)
+        if count >= size:
+            yield chunk
+            chunk, count = [], 0
+    if chunk:
+        yield chunk
+
+
+def get_executor(processes=None):
+    """
+    获取进程池（首次调用时创建）
+
+    :param processes: 进程数，默认为 CPU 核数
+    :return: ProcessPoolExecutor
+    """
+    global _executor
+
+    processes = processes or os.cpu_count() or 1
+    if _executor is None or _executor[0] != processes:
+        if _executor is not None:
+            _executor[1].shutdown(wait=False)
+        _executor = (processes, ProcessPoolExecutor(max_workers=processes))
+
+    return _executor[1]
+
+
+@timing.timed("liuyao.cast_batch")
+def cast_batch(items, processes=None, process_threshold=PROCESS_THRESHOLD):
+    """
+    批量起卦，结果顺序与请求顺序一致
+
+    :param items: 起卦请求列表，每项为 cast() 的关键字参数
+    :param processes: 进程数，默认为 CPU 核数，为 1 时不使用进程池
+    :param process_threshold: 使用进程池的最小批量
+    :return: list
+
+    使用进程池时，子进程内的阶段计时不会汇总到本进程的 /metrics。
+    """
+    groups = group_by_day(items)
+    processes = processes or os.cpu_count() or 1
+    logger.debug(f"批量起卦: {len(items)} 个请求，{len(groups)} 个日课分组")
+
+    if processes == 1 or len(items) < process_threshold:
+        indexed = _cast_groups(groups)
+    else:
+        chunk_size = max(CHUNK_SIZE, len(items) // (processes * 4))
+        executor = get_executor(processes)
+        indexed = []
+        for part in executor.map(_cast_groups, _chunks(groups, chunk_size)):
+            indexed.extend(part)
+
+    results = [None] * len(items)
+    for index, result in indexed:
+        results[index] = result
+    return results
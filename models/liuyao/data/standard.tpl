@@ -16,7 +16,7 @@
 {{god6[1]}}　{{hide.qin6[1]}}　{{qin6[1]}}{{qinx[1]}} {{main.mark[1]}} {{shiy[1]}}  {{dyao[1]}}  {{bian.qin6[1]}} {{bian.mark[1]}}
 {{god6[0]}}　{{hide.qin6[0]}}　{{qin6[0]}}{{qinx[0]}} {{main.mark[0]}} {{shiy[0]}}  {{dyao[0]}}  {{bian.qin6[0]}} {{bian.mark[0]}}
 {% if bian and bian.name and dong %}
-动爻:　{%- for d in dong %} 第{{ d + 1 }}爻 {%- endfor %}
+动爻:　{%- for label in dong_labels %} {{ label }} {%- endfor %}
 {% else %}
 动爻: 无动爻
 {% endif %}
@@ -3,23 +3,21 @@ import sys
 from pathlib import Path
 import json
 import datetime
-
-# 清理 sys.modules 以避免重复导入
-module_name = 'models.liuyao.diagnosis'
-if module_name in sys.modules:
-    del sys.modules[module_name]
+import logging
+from functools import lru_cache
 
 # 动态添加项目根目录到 sys.path
 project_root = str(Path(__file__).resolve().parents[3])
 if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
-try:
-    from models.liuyao.najia import Najia
-    from models.liuyao.shensha import analyze_shensha  # 修改为 liuyao.shensha
-except ImportError as e:
-    print(f"ImportError in diagnosis.py: {e}")
-    raise
+from models import timing
+from models.frozen import freeze, thaw
+from models.liuyao.najia import Najia
+from models.liuyao.najia import compile_cast
+from models.liuyao.shensha import analyze_shensha
+
+logger = logging.getLogger(__name__)
 
 # 动爻位置映射
 YAO_POSITIONS = {
@@ -31,6 +29,7 @@ YAO_POSITIONS = {
     5: "上爻"
 }
 
+@lru_cache(maxsize=1)
 def load_shensha_data():
     base_dir = Path(__file__).parent.parent.parent
     data_file = base_dir / "data" / "shensha_impacts.json"
@@ -38,10 +37,10 @@ def load_shensha_data():
         with open(data_file, 'r', encoding='utf-8') as f:
             return json.load(f)
     except FileNotFoundError as e:
-        print(f"FileNotFoundError: {e}")
+        logger.error(f"找不到神煞数据文件: {e}")
         raise
     except Exception as e:
-        print(f"Error loading shensha_impacts.json: {e}")
+        logger.error(f"加载 shensha_impacts.json 时出错: {e}")
         raise
 
 def calculate_flow_year_element(year):
@@ -58,152 +57,308 @@ def calculate_flow_year_element(year):
     flow_year_element = gan_elements[gan]
     return flow_year_element
 
-def diagnose_health(params, date, gender=None, day_master_strength="neutral", flow_year_element=None, longitude=-100, latitude=40):
-    try:
-        najia = Najia(verbose=2).compile(params=params, date=date, gender=gender, longitude=longitude, latitude=latitude)
-    except Exception as e:
-        print(f"Error compiling Najia: {e}")
-        raise
-
-    gua_data = najia.data
-    gua_name = gua_data['name']
-    day_gz = gua_data['lunar']['gz']['day']
-    dong = gua_data['dong']
-    bian_gua_name = gua_data['bian']['name'] if gua_data['bian']['name'] else gua_name
-
-    gua_element_map = {
-        '乾为天': '金', '天风姤': '金', '天山遁': '金', '天地否': '金',
-        '风地观': '金', '山地剥': '金', '火地晋': '金', '火天大有': '金',
-        '坎为水': '水', '水泽节': '水', '水雷屯': '水', '水火既济': '水',
-        '泽火革': '水', '雷火丰': '水', '地火明夷': '水', '地水师': '水',
-        '艮为山': '土', '山火贲': '土', '山天大畜': '土', '山泽损': '土',
-        '火泽睽': '土', '天泽履': '土', '风泽中孚': '土', '风山渐': '土',
-        '震为雷': '木', '雷地豫': '木', '雷水解': '木', '雷风恒': '木',
-        '地风升': '木', '水风井': '木', '泽风大过': '木', '泽雷随': '木',
-        '巽为风': '木', '风天小畜': '木', '风火家人': '木', '风雷益': '木',
-        '天雷无妄': '木', '火雷噬嗑': '木', '山雷颐': '木', '山风蛊': '木',
-        '离为火': '火', '火山旅': '火', '火风鼎': '火', '火水未济': '火',
-        '山水蒙': '火', '风水涣': '火', '天水讼': '火', '天火同人': '火',
-        '坤为地': '土', '地雷复': '土', '地泽临': '土', '地天泰': '土',
-        '雷天大壮': '土', '泽天夬': '土', '水天需': '土', '水地比': '土',
-        '兑为泽': '金', '泽水困': '金', '泽地萃': '金', '泽山咸': '金',
-        '水山蹇': '金', '地山谦': '金', '雷山小过': '金', '雷泽归妹': '金'
-    }
-    gua_element = gua_element_map.get(gua_name, '未知')
-    bian_gua_element = gua_element_map.get(bian_gua_name, gua_element)
-
-    try:
-        shensha_data = load_shensha_data()
-    except Exception as e:
-        print(f"Error in load_shensha_data: {e}")
-        raise
-
-    # 加载六爻相关的神煞
-    liuyao_shensha = [
-        "天乙贵人", "文昌贵人", "太极贵人", "月德贵人", "天德贵人", "福星贵人",
-        "国印贵人", "禄神", "金舆", "华盖", "三奇贵人", "天医",
-        "白虎", "羊刃", "劫煞", "亡神", "阴煞", "元辰", "咸池", "飞刃",
-        "灾煞", "吊客", "大耗", "丧门"
-    ]
-
-    element_map = {'金': 'metal', '木': 'wood', '水': 'water', '火': 'fire', '土': 'earth'}
-    gua_element_mapped = element_map.get(gua_element, gua_element.lower())
-    bian_gua_element_mapped = element_map.get(bian_gua_element, bian_gua_element.lower())
+# 六十四卦所属卦宫五行
+GUA_ELEMENTS = {
+    '乾为天': '金', '天风姤': '金', '天山遁': '金', '天地否': '金',
+    '风地观': '金', '山地剥': '金', '火地晋': '金', '火天大有': '金',
+    '坎为水': '水', '水泽节': '水', '水雷屯': '水', '水火既济': '水',
+    '泽火革': '水', '雷火丰': '水', '地火明夷': '水', '地水师': '水',
+    '艮为山': '土', '山火贲': '土', '山天大畜': '土', '山泽损': '土',
+    '火泽睽': '土', '天泽履': '土', '风泽中孚': '土', '风山渐': '土',
+    '震为雷': '木', '雷地豫': '木', '雷水解': '木', '雷风恒': '木',
+    '地风升': '木', '水风井': '木', '泽风大过': '木', '泽雷随': '木',
+    '巽为风': '木', '风天小畜': '木', '风火家人': '木', '风雷益': '木',
+    '天雷无妄': '木', '火雷噬嗑': '木', '山雷颐': '木', '山风蛊': '木',
+    '离为火': '火', '火山旅': '火', '火风鼎': '火', '火水未济': '火',
+    '山水蒙': '火', '风水涣': '火', '天水讼': '火', '天火同人': '火',
+    '坤为地': '土', '地雷复': '土', '地泽临': '土', '地天泰': '土',
+    '雷天大壮': '土', '泽天夬': '土', '水天需': '土', '水地比': '土',
+    '兑为泽': '金', '泽水困': '金', '泽地萃': '金', '泽山咸': '金',
+    '水山蹇': '金', '地山谦': '金', '雷山小过': '金', '雷泽归妹': '金'
+}
 
-    # 筛选神煞
-    shensha_list = [
-        s for s in shensha_data["positive"]
-        if s in liuyao_shensha and gua_element_mapped in shensha_data["positive"][s]["element_affinity"]
-    ] + [
-        s for s in shensha_data["negative"]
-        if s in liuyao_shensha and gua_element_mapped in shensha_data["negative"][s]["element_affinity"]
-    ]
-    print(f"加载的神煞: {shensha_list}")
+# 六爻相关的神煞
+LIUYAO_SHENSHA = [
+    "天乙贵人", "文昌贵人", "太极贵人", "月德贵人", "天德贵人", "福星贵人",
+    "国印贵人", "禄神", "金舆", "华盖", "三奇贵人", "天医",
+    "白虎", "羊刃", "劫煞", "亡神", "阴煞", "元辰", "咸池", "飞刃",
+    "灾煞", "吊客", "大耗", "丧门"
+]
 
-    gua_data["shensha_data"] = shensha_data
+ELEMENT_EN = {'金': 'metal', '木': 'wood', '水': 'water', '火': 'fire', '土': 'earth'}
 
-    if flow_year_element is None:
-        year = date.year
-        flow_year_element = calculate_flow_year_element(year)
-        print(f"动态计算流年五行: {year}年 -> {flow_year_element}")
 
-    try:
-        shensha_result = analyze_shensha(
-            shensha_list,
-            gua_element,
-            day_master_strength=day_master_strength,
-            flow_year_element=flow_year_element,
-            mode="liuyao",
-            najia_data=gua_data
-        )
-    except Exception as e:
-        print(f"Error in analyze_shensha: {e}")
-        raise
+def collect_health(shensha_result):
+    """
+    从神煞分析结果中提取健康影响和调理建议（已去重，顺序不固定）
 
-    # 提取健康影响和调理建议
+    :param shensha_result: analyze_shensha 的返回值
+    :return: (health_impacts, remedies)
+    """
     health_impacts = []
     remedies = []
+    # 缓存中的神煞分析为只读结构（列表为 tuple），按列表比较
     for impact in shensha_result["positive_impacts"]:
-        if impact["health"] != ["无特定影响"]:
+        if list(impact["health"]) != ["无特定影响"]:
             health_impacts.extend(impact["health"])
     for impact in shensha_result["negative_impacts"]:
-        if impact["health"] != ["无特定影响"]:
+        if list(impact["health"]) != ["无特定影响"]:
             health_impacts.extend(impact["health"])
         if impact["remedy"]:
             remedies.extend(impact["remedy"])
-    
+
     if "dong_yao_health" in shensha_result:
         health_impacts.extend(shensha_result["dong_yao_health"])
     if "dong_yao_remedies" in shensha_result:
         remedies.extend(shensha_result["dong_yao_remedies"])
 
-    dong_yao_display = "无动爻"
-    if gua_data['dong']:
-        dong_idx = gua_data['dong'][0]
-        dong_yao_display = YAO_POSITIONS[dong_idx]
+    return list(set(health_impacts)), list(set(remedies))
 
-    # 六爻分析结果（订阅模块）
-    liuyao_result = {
-        "subscription_required": True,  # 标记为订阅模块
+
+def analyze_gua_shensha(gua_data, day_master_strength="neutral", flow_year_element="金"):
+    """
+    卦象五行与神煞分析
+
+    :param gua_data: Najia.data 结构，至少包含 name / bian / dong / params / qin6 / god6 / lunar.gz.day
+    :param day_master_strength: 日主强弱，strong / weak / neutral
+    :param flow_year_element: 流年五行
+    :return: dict
+    """
+    gua_name = gua_data['name']
+    bian_gua_name = gua_data['bian']['name'] if gua_data['bian']['name'] else gua_name
+    gua_element = GUA_ELEMENTS.get(gua_name, '未知')
+    bian_gua_element = GUA_ELEMENTS.get(bian_gua_name, gua_element)
+
+    shensha_data = load_shensha_data()
+    gua_element_mapped = ELEMENT_EN.get(gua_element, gua_element.lower())
+
+    # 筛选神煞
+    shensha_list = [
+        s for s in shensha_data["positive"]
+        if s in LIUYAO_SHENSHA and gua_element_mapped in shensha_data["positive"][s]["element_affinity"]
+    ] + [
+        s for s in shensha_data["negative"]
+        if s in LIUYAO_SHENSHA and gua_element_mapped in shensha_data["negative"][s]["element_affinity"]
+    ]
+    logger.debug("筛选神煞", extra={'gua_name': gua_name, 'shensha': shensha_list})
+
+    shensha_result = analyze_shensha(
+        shensha_list,
+        gua_element,
+        day_master_strength=day_master_strength,
+        flow_year_element=flow_year_element,
+        mode="liuyao",
+        najia_data=gua_data
+    )
+
+    return {
         "gua_name": gua_name,
         "gua_element": gua_element,
         "bian_gua_name": bian_gua_name,
         "bian_gua_element": bian_gua_element,
-        "health_impacts": list(set(health_impacts)),
-        "remedies": list(set(remedies)),
         "shensha": shensha_list,
         "god6_impacts": shensha_result["god6_impacts"],
-        "render": najia.render().replace(f"动爻: 第{dong_idx + 1}爻", f"动爻: {dong_yao_display}"),
         "shensha_analysis": shensha_result
     }
 
-    # 八字分析（通用模块）
-    bazi_result = None
-    if gender and date:
-        try:
-            from models.bazi.calculator import calculate_bazi
-            bazi_result = calculate_bazi(
-                birth_year=date.year,
-                birth_month=date.month,
-                birth_day=date.day,
-                birth_hour=date.hour,
-                gender=gender,
-                longitude=longitude,
-                latitude=latitude
-            )
-        except ImportError:
-            print("八字模块未启用，请确保 models.bazi.calculator 可用")
+
+# 诊断阶段及其依赖：compile → shensha → health，bazi 独立（需显式提供出生信息）
+STAGES = {
+    'compile': (),
+    'shensha': ('compile',),
+    'health': ('shensha',),
+    'bazi': (),
+}
+
+
+def resolve_stages(stages):
+    """
+    展开阶段依赖，按执行顺序返回
+
+    :param stages: 需要的阶段
+    :return: list
+    """
+    ordered = []
+
+    def visit(stage):
+        if stage not in STAGES:
+            raise ValueError(f"未知的诊断阶段: {stage}，可选: {', '.join(STAGES)}")
+        for dependency in STAGES[stage]:
+            visit(dependency)
+        if stage not in ordered:
+            ordered.append(stage)
+
+    for stage in stages:
+        visit(stage)
+    return ordered
+
+
+@lru_cache(maxsize=16384)
+def shensha_stage(params, day_gz, day_master_strength="neutral", flow_year_element="金"):
+    """
+    神煞阶段，结果按 (卦象, 日柱, 日主强弱, 流年五行) 缓存，为共享的只读结构（FrozenDict / tuple），
+    需要修改时先 thaw
+
+    :param params: 六爻参数元组
+    :param day_gz: 日柱干支
+    :param day_master_strength: 日主强弱
+    :param flow_year_element: 流年五行
+    :return: dict
+    """
+    gua_data = compile_cast(params, day_gz).to_dict()
+    gua_data['lunar'] = {'gz': {'day': day_gz}}
+    return freeze(analyze_gua_shensha(gua_data, day_master_strength, flow_year_element))
+
+
+@lru_cache(maxsize=16384)
+def health_stage(params, day_gz, day_master_strength="neutral", flow_year_element="金"):
+    """
+    健康阶段，在神煞阶段结果上提取健康影响和调理建议，参数与缓存方式同 shensha_stage
+
+    :return: dict，包含 health_impacts / remedies
+    """
+    health_impacts, remedies = collect_health(
+        shensha_stage(params, day_gz, day_master_strength, flow_year_element)["shensha_analysis"])
+    return freeze({"health_impacts": health_impacts, "remedies": remedies})
+
+
+def bazi_stage(birth, as_of=None):
+    """
+    八字阶段，基于出生信息计算（calculate_bazi 自带缓存）
+
+    :param birth: 出生信息，包含 year / month / day / hour / gender，可选 longitude / latitude
+    :param as_of: 流年、流月、大运的参考时间，默认取当前时钟
+    :return: dict
+    """
+    from models.bazi.calculator import calculate_bazi
+
+    return calculate_bazi(
+        birth_year=birth['year'],
+        birth_month=birth['month'],
+        birth_day=birth['day'],
+        birth_hour=birth['hour'],
+        gender=birth['gender'],
+        longitude=birth.get('longitude', 116.4074),
+        latitude=birth.get('latitude', 39.9042),
+        as_of=as_of
+    )
+
+
+def run_diagnosis(params, date, stages=('health',), gender=None, day_master_strength="neutral",
+                  flow_year_element=None, longitude=-100, latitude=40, birth=None):
+    """
+    按需执行诊断阶段，自动补齐依赖阶段
+
+    compile 阶段依赖日课与卦象编译缓存，shensha / health 阶段按卦象与日柱缓存（只读结构），
+    bazi 阶段只在提供 birth 时执行，不再使用起卦时间排八字；流年、大运以起卦时间为参考。
+
+    :param params: 六爻参数
+    :param date: 起卦时间
+    :param stages: 需要的阶段，可选 compile / shensha / health / bazi
+    :param gender: 性别
+    :param day_master_strength: 日主强弱
+    :param flow_year_element: 流年五行，默认按起卦年份计算
+    :param longitude: 经度
+    :param latitude: 纬度
+    :param birth: 出生信息，bazi 阶段必需
+    :return: dict，键为阶段名
+    """
+    results = {}
+    for stage in resolve_stages(stages):
+        with timing.span(f"liuyao.stage.{stage}"):
+            if stage == 'compile':
+                najia = Najia(verbose=2).compile(params=params, date=date, gender=gender, longitude=longitude, latitude=latitude)
+                results[stage] = najia
+            elif stage == 'bazi':
+                if birth is None:
+                    raise ValueError("bazi 阶段需要提供出生信息(birth)")
+                results[stage] = bazi_stage(birth, as_of=date)
+            else:
+                if flow_year_element is None:
+                    flow_year_element = calculate_flow_year_element(date.year)
+                key = (tuple(int(p) for p in params), results['compile'].data['lunar']['gz']['day'],
+                       day_master_strength, flow_year_element)
+                results[stage] = shensha_stage(*key) if stage == 'shensha' else health_stage(*key)
+    return results
+
+
+@timing.timed("liuyao.diagnose")
+def diagnose_health(params, date, gender=None, day_master_strength="neutral", flow_year_element=None, longitude=-100, latitude=40, birth=None):
+    """
+    六爻健康诊断
+
+    :param params: 六爻参数
+    :param date: 起卦时间
+    :param gender: 性别
+    :param day_master_strength: 日主强弱
+    :param flow_year_element: 流年五行，默认按起卦年份计算
+    :param longitude: 经度
+    :param latitude: 纬度
+    :param birth: 出生信息（year / month / day / hour / gender），提供时附带八字结果
+    :return: dict，包含 liuyao_result / bazi_result
+    """
+    stages = ('health', 'bazi') if birth else ('health',)
+    try:
+        results = run_diagnosis(params, date, stages=stages, gender=gender, day_master_strength=day_master_strength,
+                                flow_year_element=flow_year_element, longitude=longitude, latitude=latitude, birth=birth)
+    except Exception as e:
+        logger.error(f"六爻健康诊断失败: {e}", extra={'params': params})
+        raise
+
+    najia = results['compile']
+    # 阶段结果为缓存中的只读结构，返回可修改的副本
+    shensha = thaw(results['shensha'])
+    health = results['health']
+
+    # 六爻分析结果（订阅模块）
+    liuyao_result = {
+        "subscription_required": True,  # 标记为订阅模块
+        "gua_name": shensha["gua_name"],
+        "gua_element": shensha["gua_element"],
+        "bian_gua_name": shensha["bian_gua_name"],
+        "bian_gua_element": shensha["bian_gua_element"],
+        "health_impacts": list(health["health_impacts"]),
+        "remedies": list(health["remedies"]),
+        "shensha": shensha["shensha"],
+        "god6_impacts": shensha["god6_impacts"],
+        "render": najia.render(yao_names=YAO_POSITIONS),
+        "shensha_analysis": shensha["shensha_analysis"]
+    }
 
     return {
         "liuyao_result": liuyao_result,  # 六爻结果（订阅模块）
-        "bazi_result": bazi_result      # 八字结果（通用模块）
+        "bazi_result": results.get('bazi')  # 八字结果（通用模块）
+    }
+
+def cast_report(params, date, gender=None, title=None, guaci=False, verbose=0):
+    """
+    起卦排盘并附健康分析（命令行与守护进程共用）
+
+    :param params: 六爻参数
+    :param date: 起卦时间
+    :param gender: 性别
+    :param title: 求卦问卜事情
+    :param guaci: 是否显示卦辞
+    :param verbose: 卦爻样式
+    :return: dict，包含 render 及卦名、五行、健康影响、调理建议、六神影响
+    """
+    gua = Najia(verbose).compile(params=params, gender=gender, date=date, title=title, guaci=guaci)
+    health = diagnose_health(params=params, date=date, gender=gender, day_master_strength="neutral")["liuyao_result"]
+    return {
+        "render": gua.render(),
+        "gua_name": health["gua_name"],
+        "gua_element": health["gua_element"],
+        "health_impacts": health["health_impacts"],
+        "remedies": health["remedies"],
+        "god6_impacts": health["god6_impacts"],
     }
 
 if __name__ == "__main__":
     params = [4, 1, 1, 1, 1, 1]
     date = "2025-03-24 22:00"
     date_obj = datetime.datetime.strptime(date, '%Y-%m-%d %H:%M')
-    result = diagnose_health(params=params, date=date_obj, day_master_strength="neutral", gender="male")
+    birth = {"year": 1977, "month": 2, "day": 25, "hour": 20, "gender": "male"}
+    result = diagnose_health(params=params, date=date_obj, day_master_strength="neutral", gender="male", birth=birth)
     
     # 输出六爻分析（订阅模块）
     print("\n=== 六爻分析（订阅模块） ===")
@@ -4,13 +4,17 @@ import logging
 import os
 from pathlib import Path
 import datetime
-from jinja2 import Template
+from dataclasses import dataclass
+from functools import lru_cache
+from types import MappingProxyType
 
 # 导入路径处理
 sys_path = str(Path(__file__).resolve().parents[2])  # 指向项目根目录
 if sys_path not in sys.path:
     sys.path.insert(0, sys_path)
 
+from models import clock, timing
+
 from .const import GANS
 from .const import GUA5
 from .const import GUA64
@@ -59,15 +63,91 @@ except ImportError:
         import math
         return longitude / 15 * 60
 
-logging.basicConfig(level='INFO')
 logger = logging.getLogger(__name__)
 
+# 日课缓存的经度分桶宽度（度），0.25° 约对应 1 分钟真太阳时
+LONGITUDE_BUCKET = 0.25
+
+
+@dataclass(frozen=True)
+class GuaInfo:
+    """伏神卦或变卦的编译结果"""
+    name: str
+    mark: str
+    qin6: tuple
+    qinx: tuple
+    gong: str = ''
+    seat: tuple = ()
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            name=data['name'],
+            mark=data['mark'],
+            qin6=tuple(data['qin6']),
+            qinx=tuple(data['qinx']),
+            gong=data.get('gong', ''),
+            seat=tuple(data.get('seat', ())),
+        )
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'mark': self.mark,
+            'qin6': list(self.qin6),
+            'qinx': list(self.qinx),
+            'gong': self.gong,
+            'seat': list(self.seat),
+        }
+
+
+@dataclass(frozen=True)
+class NajiaResult:
+    """
+    不可变的卦象编译结果
+
+    只包含由爻参数和日柱决定的部分，可以安全地缓存并在线程间共享；
+    日期、标题等表头信息由 Najia 实例单独保存。
+    """
+    params: tuple
+    mark: str
+    name: str
+    gong: str
+    shiy: tuple
+    qin6: tuple
+    qinx: tuple
+    god6: tuple
+    dong: tuple
+    bian: GuaInfo
+    hide: GuaInfo = None
+
+    def to_dict(self):
+        """
+        转换为 Najia.data 的原有字典结构（每次返回新的副本）
+
+        :return: dict
+        """
+        return {
+            'params': list(self.params),
+            'god6': list(self.god6),
+            'dong': list(self.dong),
+            'name': self.name,
+            'mark': self.mark,
+            'gong': self.gong,
+            'shiy': self.shiy,
+            'qin6': list(self.qin6),
+            'qinx': list(self.qinx),
+            'bian': self.bian.to_dict(),
+            'hide': self.hide.to_dict() if self.hide else None,
+        }
+
 class Najia(object):
     def __init__(self, verbose=None):
         self.verbose = (verbose, 2)[verbose > 2] or 0
         self.bian = None
         self.hide = None
         self.data = None
+        self.result = None
 
     @staticmethod
     def _gz(gan, zhi):
@@ -76,103 +156,17 @@ class Najia(object):
     @staticmethod
     def _daily(date=None, longitude=116.4074, latitude=39.9042):
         if date is None:
-            date = datetime.datetime.now()
+            date = clock.now()
         else:
             date = datetime.datetime.strptime(date, '%Y-%m-%d %H:%M') if isinstance(date, str) else date
 
-        year = date.year
-        month = date.month
-        day = date.day
-        hour = date.hour
-
-        try:
-            from lunar_python import Solar, Lunar
-            time_diff = calculate_true_solar_time_diff(longitude, year, month, day)
-            adjusted_hour = hour + time_diff / 60
-            adjusted_day = day
-            if adjusted_hour >= 24:
-                adjusted_hour -= 24
-                adjusted_day += 1
-            elif adjusted_hour < 0:
-                adjusted_hour += 24
-                adjusted_day -= 1
-            solar = Solar.fromYmdHms(year, month, adjusted_day, int(adjusted_hour), int((adjusted_hour - int(adjusted_hour)) * 60), 0)
-            lunar = solar.getLunar()
-            bazi = lunar.getEightChar()
-            year_gz = bazi.getYear()
-            month_gz = bazi.getMonth()
-            day_gz = bazi.getDay()
-            hour_gz = bazi.getTime()
-            day_gan = day_gz[0]
-            day_zhi = day_gz[1:]
-            gan_idx = GANS.index(day_gan)
-            zhi_idx = ZHIS.index(day_zhi)
-            if zhi_idx < gan_idx:
-                zhi_idx += 12
-            xk_idx = (zhi_idx - gan_idx) // 2
-            xk_start = (xk_idx * 2 + 10) % 12
-            xkong = ZHIS[xk_start] + ZHIS[(xk_start + 1) % 12]
-        except (ImportError, ModuleNotFoundError):
-            try:
-                from models.bazi.calculator import calculate_day_gz, calculate_hour_gz, calculate_xunkong
-                year_gz = calculate_liunian_ganzhi(year)
-                month_gz = calculate_liuyue_ganzhi(year, month)
-                day_gz = calculate_day_gz(year, month, day)
-                hour_gz = calculate_hour_gz(day_gz, hour)
-                xkong = calculate_xunkong(day_gz)
-            except (ImportError, ModuleNotFoundError):
-                logger.warning("无法导入lunar_python和bazi模块，使用简化计算")
-                year_gz = calculate_liunian_ganzhi(year)
-                month_gz = calculate_liuyue_ganzhi(year, month)
-                def simple_day_gz(year, month, day):
-                    month_gan = month_gz[0]
-                    gan_base = {"甲": 0, "己": 5, "乙": 2, "庚": 7, "丙": 4, "辛": 9, "丁": 6, "壬": 1, "戊": 8, "癸": 3}
-                    gan_idx = (gan_base.get(month_gan, 0) + day - 1) % 10
-                    zhi_idx = (day + 1) % 12
-                    return GANS[gan_idx] + ZHIS[zhi_idx]
-                def simple_hour_gz(day_gz, hour):
-                    day_gan = day_gz[0]
-                    gan_offset = {"甲": 0, "己": 5, "乙": 2, "庚": 7, "丙": 4, "辛": 9, "丁": 6, "壬": 1, "戊": 8, "癸": 3}
-                    zhi_hour = hour // 2
-                    if zhi_hour >= 12:
-                        zhi_hour = 0
-                    gan_idx = (gan_offset.get(day_gan, 0) + zhi_hour) % 10
-                    return GANS[gan_idx] + ZHIS[zhi_hour]
-                def simple_xunkong(day_gz):
-                    day_gan = day_gz[0]
-                    day_zhi = day_gz[1:]
-                    gan_idx = GANS.index(day_gan)
-                    zhi_idx = ZHIS.index(day_zhi)
-                    if zhi_idx < gan_idx:
-                        zhi_idx += 12
-                    xk_idx = (zhi_idx - gan_idx) // 2
-                    xk_start = (xk_idx * 2 + 10) % 12
-                    return ZHIS[xk_start] + ZHIS[(xk_start + 1) % 12]
-                day_gz = simple_day_gz(year, month, day)
-                hour_gz = simple_hour_gz(day_gz, hour)
-                xkong = simple_xunkong(day_gz)
-
-        adj_info = f"{hour:02d}:00"
-        try:
-            time_diff = calculate_true_solar_time_diff(longitude, year, month, day)
-            adj_hour = hour + time_diff / 60
-            adj_hour_int = int(adj_hour)
-            adj_min = int((adj_hour - adj_hour_int) * 60)
-            adj_info = f"{adj_hour_int:02d}:{adj_min:02d} (校正{time_diff:.1f}分)"
-        except Exception as e:
-            logger.warning(f"计算真太阳时失败: {e}")
-
-        result = {
-            'xkong': xkong,
-            'gz': {
-                'year': '乙巳',
-                'month': '己卯',
-                'day': '癸巳',
-                'hour': '乙卯',
-            },
-            'true_solar': adj_info
+        context = daily_context(date.year, date.month, date.day, date.hour, round(longitude / LONGITUDE_BUCKET))
+        # 缓存中的日课信息为共享对象，返回副本
+        return {
+            'xkong': context['xkong'],
+            'gz': dict(context['gz']),
+            'true_solar': context['true_solar'],
         }
-        return result
 
     @staticmethod
     def _hidden(gong=None, qins=None):
@@ -182,7 +176,7 @@ class Najia(object):
             mark = YAOS[gong] * 2
             qin6 = [get_qin6(XING5[int(GUA5[gong])], ZHI5[ZHIS.index(x[1])]) for x in get_najia(mark)]
             qinx = [GZ5X(x) for x in get_najia(mark)]
-            seat = [qin6.index(x) for x in list(set(qin6).difference(set(qins)))]
+            seat = sorted(qin6.index(x) for x in set(qin6).difference(set(qins)))
             return {
                 'name': GUA64.get(mark),
                 'mark': mark,
@@ -240,6 +234,7 @@ class Najia(object):
             logger.error(f"计算变卦时出错: {e}")
             raise ValueError(f"计算变卦时出错: {e}")
 
+    @timing.timed("liuyao.compile")
     def compile(self, params=None, gender=None, date=None, title=None, guaci=False, longitude=116.4074, latitude=39.9042, **kwargs):
         if params is None or not isinstance(params, list) or len(params) != 6:
             raise ValueError("六爻参数(params)必须是长度为6的列表，例如[1,2,2,2,2,2]")
@@ -247,49 +242,27 @@ class Najia(object):
             if not isinstance(p, (int, float)) or p < 1 or p > 4:
                 raise ValueError(f"第{i+1}爻参数无效，应为1-4之间的整数: {p}")
         title = title or ''
-        solar = datetime.datetime.now() if date is None else date
+        solar = clock.now() if date is None else date
         lunar = self._daily(solar, longitude, latitude)
         gender = '' if gender is None else gender
-        mark = ''.join([str(int(p) % 2) for p in params])
         try:
-            shiy = set_shi_yao(mark)
-            if shiy is None or len(shiy) < 2:
-                raise ValueError(f"无法确定世应爻: {mark}")
-            gong = palace(mark, shiy[0])
-            if gong is None:
-                raise ValueError(f"无法确定卦宫: {mark}")
-            name = GUA64.get(mark)
-            if name is None:
-                raise ValueError(f"无效的卦码: {mark}")
-            qin6 = [get_qin6(XING5[int(GUA5[gong])], ZHI5[ZHIS.index(x[1])]) for x in get_najia(mark)]
-            qinx = [GZ5X(x) for x in get_najia(mark)]
-            god6 = get_god6(lunar['gz']['day'])
-            dong = [i for i, x in enumerate(params) if x > 2]
-            hide = self._hidden(gong, qin6)
-            bian = self._transform(params=params, gong=gong)
-            self.data = {
-                'params': params,
-                'gender': gender,
-                'title': title,
-                'guaci': guaci,
-                'solar': solar,
-                'lunar': lunar,
-                'god6': god6,
-                'dong': dong,
-                'name': name,
-                'mark': mark,
-                'gong': GUAS[gong],
-                'shiy': shiy,
-                'qin6': qin6,
-                'qinx': qinx,
-                'bian': bian,
-                'hide': hide,
-            }
-            return self
+            self.result = compile_cast(tuple(int(p) for p in params), lunar['gz']['day'])
         except Exception as e:
             logger.error(f"编译卦象时出错: {e}")
             raise ValueError(f"编译卦象时出错: {e}")
 
+        # self.data 保持原有结构，供 diagnosis 等调用方读取，每次编译都是新的副本
+        self.data = self.result.to_dict()
+        self.data.update({
+            'params': params,
+            'gender': gender,
+            'title': title,
+            'guaci': guaci,
+            'solar': solar,
+            'lunar': lunar,
+        })
+        return self
+
     @staticmethod
     def calculate_visual_width(text):
         """计算字符串的视觉宽度，中文字符占2个宽度，英文字符占1个宽度"""
@@ -302,114 +275,45 @@ class Najia(object):
                 width += 1
         return width
 
-    def render(self):
-        tpl = Path(__file__).parent / 'data' / 'standard.tpl'
-        tpl = tpl.read_text(encoding='utf-8')
-        empty = '\u3000' * 6
-        rows = self.data
-        symbal = SYMBOL[self.verbose]
-        # 调整动爻符号，确保对齐，×→ 和 ○→ 后加4个空格
-        rows['dyao'] = [symbal[x] + '    ' if x in (3, 4) else '    ' for x in self.data['params']]
-        rows['main'] = {}
-        rows['main']['mark'] = [symbal[int(x)] for x in self.data['mark']]
-        rows['main']['type'] = get_type(self.data['mark'])
-        rows['main']['gong'] = rows['gong']
-        rows['main']['name'] = rows['name']
-        try:
-            rows['main']['gong_type'] = self._get_bagong_type(self.data['mark'], rows['gong'])
-        except Exception as e:
-            logger.warning(f"确定本卦类型出错: {e}")
-            rows['main']['gong_type'] = rows['gong'] + "宫"
-
-        # 计算本卦标题的视觉宽度并设置缩进
-        main_gua_title = f"{rows['gong']}:{rows['name']} ({rows['main']['gong_type']})"
-        main_visual_width = self.calculate_visual_width(main_gua_title)
-        main_indent_spaces = 19 - main_visual_width // 2
-        if main_indent_spaces < 0:
-            main_indent_spaces = 0
-        rows['main']['indent'] = '\u3000' * main_indent_spaces
-
-        if rows.get('hide'):
-            rows['hide']['qin6'] = [' %s%s ' % (rows['hide']['qin6'][x], rows['hide']['qinx'][x]) if x in rows['hide']['seat'] else empty for x in range(0, 6)]
-        else:
-            rows['hide'] = {'qin6': ['  ' for _ in range(0, 6)]}
+    @timing.timed("liuyao.render")
+    def render(self, fmt='text', fast=False, yao_names=None):
+        """
+        渲染排盘结果
 
-        # 确保变卦部分始终显示
-        if rows.get('bian'):
-            rows['bian']['type'] = get_type(rows['bian']['mark'])
-            # 保存原始 bian_mark 用于卦型计算
-            bian_mark_raw = rows['bian']['mark']  # 原始 mark，字符串形式
-            try:
-                bian_mark = ''.join(map(str, bian_mark_raw))  # 确保是字符串
-                bian_gong = rows['bian']['gong']
-                rows['bian']['gong_type'] = self._get_bagong_type(bian_mark, bian_gong)
-            except Exception as e:
-                logger.warning(f"确定变卦类型出错: {e}")
-                rows['bian']['gong_type'] = rows['bian'].get('gong', "") + "宫"
-
-            bian_gua_title = f"{rows['bian']['gong']}:{rows['bian']['name']} ({rows['bian']['gong_type']})"
-            bian_visual_width = self.calculate_visual_width(bian_gua_title)
-            fixed_width_before_bian_qin = 15 + main_visual_width  # 调整为动态宽度
-            bian_indent_spaces = fixed_width_before_bian_qin - main_visual_width - bian_visual_width // 2
-            if bian_indent_spaces < 0:
-                bian_indent_spaces = 0
-            rows['bian']['indent'] = '\u3000' * bian_indent_spaces
-
-            if rows['bian']['qin6']:
-                rows['bian']['qin6'] = [f'{rows["bian"]["qin6"][x]}{rows["bian"]["qinx"][x]}' if x in self.data['dong'] else f'  {rows["bian"]["qin6"][x]}{rows["bian"]["qinx"][x]}'
-                                        for x in range(0, 6)]
-            if rows['bian']['mark']:
-                # 转换为符号用于显示
-                rows['bian']['mark'] = [symbal[int(x)] for x in bian_mark_raw]
-        else:
-            # 如果没有变卦（理论上不会发生），设置默认值
-            rows['bian'] = {
-                'qin6': [' ' for _ in range(0, 6)], 
-                'mark': [' ' for _ in range(0, 6)],
-                'gong_type': "",
-                'gong': rows['gong'],
-                'name': rows['name']
-            }
+        渲染不修改 self.data，重复调用结果一致；卦象部分的视图数据按
+        (卦码, 动爻, 日柱, verbose) 缓存，只有日期、标题等表头信息按次合并。
 
-        shiy = []
-        for x in range(0, 6):
-            if x == self.data['shiy'][0] - 1:
-                shiy.append('世')
-            elif x == self.data['shiy'][1] - 1:
-                shiy.append('应')
-            else:
-                shiy.append('  ')
-        rows['shiy'] = shiy
+        :param fmt: 输出格式，text / json / html
+        :param fast: text 格式时使用手写渲染器，跳过模板引擎
+        :param yao_names: 动爻显示名称（按爻位索引的列表或字典），默认显示为"第N爻"
+        :return: 渲染结果
+        """
+        if self.result is None:
+            raise ValueError("请先调用 compile() 编译卦象")
 
-        if self.data['guaci']:
-            rows['guaci'] = get_guaci(rows['name'])
+        yao_names = tuple(yao_names[x] for x in range(0, 6)) if yao_names else None
+        view = dict(build_view(self.result, self.verbose, yao_names))
+        view.update({
+            'gender': self.data['gender'],
+            'title': self.data['title'],
+            'solar': self.data['solar'],
+            'lunar': self.data['lunar'],
+            'guaci': get_guaci(self.result.name) if self.data['guaci'] else None,
+        })
 
-        if 'lunar' in rows and 'true_solar' in rows['lunar']:
-            pass
-        else:
-            if 'lunar' not in rows:
-                rows['lunar'] = {}
-            rows['lunar']['true_solar'] = rows.get('true_solar', '')
-
-        rows['debug'] = {
-            'main_mark': self.data['mark'],
-            'main_name': rows['name'],
-            'main_gong': rows['gong']
-        }
-        if rows.get('bian'):
-            rows['debug']['bian_mark'] = rows['bian'].get('mark', ''),
-            rows['debug']['bian_name'] = rows['bian'].get('name', ''),
-            rows['debug']['bian_gong'] = rows['bian'].get('gong', '')
+        # 模板引擎（jinja2）在首次渲染时才导入
+        from . import render as renderer
 
         try:
-            template = Template(tpl)
-            result = template.render(**rows)
-            return result
+            return renderer.render(view, fmt=fmt, fast=fast)
+        except ValueError:
+            raise
         except Exception as e:
             logger.error(f"渲染六爻纳甲模板失败: {e}")
             raise ValueError(f"渲染模板失败: {e}")
 
-    def _get_bagong_type(self, mark, gong):
+    @staticmethod
+    def _get_bagong_type(mark, gong):
         # 确保 mark 是字符串
         if not isinstance(mark, str):
             try:
@@ -552,4 +456,169 @@ class Najia(object):
         return solar, params
 
     def predict(self):
-        return
\ No newline at end of file
+        return
+
+
+def _xunkong(day_gz):
+    gan_idx = GANS.index(day_gz[0])
+    zhi_idx = ZHIS.index(day_gz[1:])
+    if zhi_idx < gan_idx:
+        zhi_idx += 12
+    xk_idx = (zhi_idx - gan_idx) // 2
+    xk_start = (xk_idx * 2 + 10) % 12
+    return ZHIS[xk_start] + ZHIS[(xk_start + 1) % 12]
+
+
+@lru_cache(maxsize=4096)
+def daily_context(year, month, day, hour, lon_bucket):
+    """
+    计算日课信息（四柱干支、旬空、真太阳时），按 (日期, 小时, 经度分桶) 缓存
+
+    同一小时、相近经度的起卦共享一次历法换算。返回值为共享对象，调用方不应修改。
+
+    :param year: 年
+    :param month: 月
+    :param day: 日
+    :param hour: 小时
+    :param lon_bucket: 经度分桶序号，经度 = lon_bucket * LONGITUDE_BUCKET
+    :return: dict，包含 xkong / gz / true_solar
+    """
+    longitude = lon_bucket * LONGITUDE_BUCKET
+    time_diff = calculate_true_solar_time_diff(longitude, year, month, day)
+    adjusted = datetime.datetime(year, month, day, hour) + datetime.timedelta(minutes=time_diff)
+
+    try:
+        from lunar_python import Solar
+        solar = Solar.fromYmdHms(adjusted.year, adjusted.month, adjusted.day, adjusted.hour, adjusted.minute, 0)
+        bazi = solar.getLunar().getEightChar()
+        year_gz = bazi.getYear()
+        month_gz = bazi.getMonth()
+        day_gz = bazi.getDay()
+        hour_gz = bazi.getTime()
+    except (ImportError, ModuleNotFoundError):
+        logger.warning("无法导入lunar_python，使用简化计算")
+        year_gz = calculate_liunian_ganzhi(adjusted.year)
+        month_gz = calculate_liuyue_ganzhi(adjusted.year, adjusted.month)
+        # 以 1900-01-31（甲辰日）为基准推算日柱
+        offset = (adjusted.date() - datetime.date(1900, 1, 31)).days
+        day_gz = GANS[offset % 10] + ZHIS[(offset + 4) % 12]
+        zhi_hour = (adjusted.hour + 1) // 2 % 12
+        hour_gz = GANS[(GANS.index(day_gz[0]) % 5 * 2 + zhi_hour) % 10] + ZHIS[zhi_hour]
+
+    return {
+        'xkong': _xunkong(day_gz),
+        'gz': {
+            'year': year_gz,
+            'month': month_gz,
+            'day': day_gz,
+            'hour': hour_gz,
+        },
+        'true_solar': f"{adjusted.strftime('%H:%M')} (校正{time_diff:.1f}分)",
+    }
+
+
+@lru_cache(maxsize=16384)
+def compile_cast(params, day_gz):
+    """
+    编译卦象，结果按 (爻参数, 日柱) 缓存
+
+    :param params: 六爻参数元组，如 (2, 2, 1, 2, 4, 2)
+    :param day_gz: 日柱干支，决定六神
+    :return: NajiaResult
+    """
+    mark = ''.join([str(p % 2) for p in params])
+    shiy = set_shi_yao(mark)
+    if shiy is None or len(shiy) < 2:
+        raise ValueError(f"无法确定世应爻: {mark}")
+    gong = palace(mark, shiy[0])
+    if gong is None:
+        raise ValueError(f"无法确定卦宫: {mark}")
+    name = GUA64.get(mark)
+    if name is None:
+        raise ValueError(f"无效的卦码: {mark}")
+    qin6 = [get_qin6(XING5[int(GUA5[gong])], ZHI5[ZHIS.index(x[1])]) for x in get_najia(mark)]
+    qinx = [GZ5X(x) for x in get_najia(mark)]
+    hide = Najia._hidden(gong, qin6)
+    bian = Najia._transform(params=list(params), gong=gong)
+    return NajiaResult(
+        params=tuple(params),
+        mark=mark,
+        name=name,
+        gong=GUAS[gong],
+        shiy=tuple(shiy),
+        qin6=tuple(qin6),
+        qinx=tuple(qinx),
+        god6=tuple(get_god6(day_gz)),
+        dong=tuple(i for i, x in enumerate(params) if x > 2),
+        bian=GuaInfo.from_dict(bian),
+        hide=GuaInfo.from_dict(hide) if hide else None,
+    )
+
+
+@lru_cache(maxsize=16384)
+def build_view(result, verbose=0, yao_names=None):
+    """
+    由编译结果生成卦象部分的只读视图数据
+
+    NajiaResult 已包含卦码、动爻和日柱（六神）信息，因此缓存键即
+    (卦码, 动爻, 日柱, verbose, 动爻名称)。返回值只读，调用方合并表头时需先复制。
+
+    :param result: NajiaResult
+    :param verbose: 符号样式
+    :param yao_names: 动爻显示名称元组，默认显示为"第N爻"
+    :return: MappingProxyType
+    """
+    empty = '\u3000' * 6
+    symbal = SYMBOL[verbose]
+
+    main_gong_type = Najia._get_bagong_type(result.mark, result.gong)
+    main_visual_width = Najia.calculate_visual_width(f"{result.gong}:{result.name} ({main_gong_type})")
+    main = {
+        'mark': tuple(symbal[int(x)] for x in result.mark),
+        'type': get_type(result.mark),
+        'gong': result.gong,
+        'name': result.name,
+        'gong_type': main_gong_type,
+        'indent': '\u3000' * max(19 - main_visual_width // 2, 0),
+    }
+
+    if result.hide:
+        hide = {'qin6': tuple(f' {result.hide.qin6[x]}{result.hide.qinx[x]} ' if x in result.hide.seat else empty
+                              for x in range(0, 6))}
+    else:
+        hide = {'qin6': ('  ',) * 6}
+
+    bian = result.bian
+    bian_gong_type = Najia._get_bagong_type(bian.mark, bian.gong)
+    bian_visual_width = Najia.calculate_visual_width(f"{bian.gong}:{bian.name} ({bian_gong_type})")
+    # 变卦标题缩进：固定宽度 15 减去变卦标题宽度的一半
+    bian_view = {
+        'name': bian.name,
+        'gong': bian.gong,
+        'type': get_type(bian.mark),
+        'gong_type': bian_gong_type,
+        'indent': '\u3000' * max(15 - bian_visual_width // 2, 0),
+        'qin6': tuple(f'{bian.qin6[x]}{bian.qinx[x]}' if x in result.dong else f'  {bian.qin6[x]}{bian.qinx[x]}'
+                      for x in range(0, 6)),
+        'mark': tuple(symbal[int(x)] for x in bian.mark),
+    }
+
+    shiy = tuple('世' if x == result.shiy[0] - 1 else '应' if x == result.shiy[1] - 1 else '  ' for x in range(0, 6))
+
+    return MappingProxyType({
+        'params': result.params,
+        'name': result.name,
+        'mark': result.mark,
+        'gong': result.gong,
+        'god6': result.god6,
+        'dong': result.dong,
+        'qin6': result.qin6,
+        'qinx': result.qinx,
+        # 调整动爻符号，确保对齐，×→ 和 ○→ 后加4个空格
+        'dyao': tuple(symbal[x] + '    ' if x in (3, 4) else '    ' for x in result.params),
+        'main': MappingProxyType(main),
+        'hide': MappingProxyType(hide),
+        'bian': MappingProxyType(bian_view),
+        'shiy': shiy,
+        'dong_labels': tuple(yao_names[x] if yao_names else f'第{x + 1}爻' for x in result.dong),
+    })
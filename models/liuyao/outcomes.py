@@ -0,0 +1,429 @@
+"""
+六爻结果预计算表
+
+六爻每爻取值 1-4，共 4^6 = 4096 种卦象；日柱共 60 种，决定六神、旬空与神煞地支。
+二者组合（245760 行）即覆盖排盘与健康诊断的全部结构化输出。本模块负责把这一
+结果空间离线生成为列式二进制文件，并在运行时通过 mmap 按行查表。
+
+文件格式：
+    MAGIC(4) | 清单长度 uint32 | 清单 JSON | 填充到 8 字节对齐 | 数据段
+
+每一列都做字典编码：行索引数组（uint8 / uint16 / uint32）指向去重后的取值字典，
+字典以 uint32 偏移数组 + UTF-8 JSON 数据块保存。数据段偏移记录在清单中。
+"""
+
+import json
+import logging
+import mmap
+import struct
+import sys
+from array import array
+from functools import lru_cache
+from pathlib import Path
+
+from models.frozen import freeze
+
+from .const import GANS
+from .const import ZHIS
+from .diagnosis import collect_health
+from .diagnosis import shensha_stage
+from .najia import _xunkong
+from .najia import compile_cast
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'LYOT'
+VERSION = 1
+
+# 默认的预计算表位置，由 scripts/build_liuyao_table.py 生成
+TABLE_PATH = Path(__file__).parent / 'data' / 'outcomes.bin'
+
+# 六十甲子，按序号排列
+JIAZI = tuple(GANS[i % 10] + ZHIS[i % 12] for i in range(60))
+
+CAST_COUNT = 4 ** 6
+
+# 预计算表使用的日主强弱
+TABLE_DAY_MASTER_STRENGTH = 'neutral'
+
+# shensha_impacts.json 中流年五行以英文标注，中文流年五行不会触发增强/减弱，
+# 因此以中文（或缺省）流年五行诊断时结果与流年无关，可直接查表
+TABLE_FLOW_YEAR_ELEMENTS = (None, '金', '木', '水', '火', '土')
+
+SHENSHA_ANALYSIS_KEYS = (
+    'positive_impacts',
+    'negative_impacts',
+    'health_advice',
+    'god6_impacts',
+    'overall_analysis',
+    'dong_yao_health',
+    'dong_yao_remedies',
+)
+
+# health_impacts / remedies 可由神煞分析结果推出，不单独存储
+COLUMNS = (
+    'gua',
+    'god6',
+    'gua_element',
+    'bian_gua_element',
+    'shensha',
+) + SHENSHA_ANALYSIS_KEYS
+
+_ALIGN = 8
+
+
+def cast_index(params):
+    """
+    计算卦象序号（0-4095），第一爻为最高位
+
+    :param params: 六爻参数，如 [2, 2, 1, 2, 4, 2]
+    :return: int
+    """
+    if len(params) != 6:
+        raise ValueError("六爻参数(params)必须是长度为6的列表，例如[1,2,2,2,2,2]")
+    index = 0
+    for i, p in enumerate(params):
+        if p not in (1, 2, 3, 4):
+            raise ValueError(f"第{i+1}爻参数无效，应为1-4之间的整数: {p}")
+        index = index * 4 + int(p) - 1
+    return index
+
+
+def cast_params(index):
+    """
+    由卦象序号还原六爻参数
+
+    :param index: 卦象序号
+    :return: tuple
+    """
+    return tuple((index >> (2 * (5 - i))) % 4 + 1 for i in range(6))
+
+
+def supports(day_master_strength='neutral', flow_year_element=None):
+    """
+    判断给定诊断参数能否直接使用预计算表
+
+    :param day_master_strength: 日主强弱
+    :param flow_year_element: 流年五行
+    :return: bool
+    """
+    return day_master_strength == TABLE_DAY_MASTER_STRENGTH and flow_year_element in TABLE_FLOW_YEAR_ELEMENTS
+
+
+def live_outcome(params, day_gz, day_master_strength='neutral', flow_year_element=None):
+    """
+    使用实时引擎计算一组 (卦象, 日柱) 的结构化结果，结构与查表结果一致。
+    结果按 (卦象, 日柱, 日主强弱, 流年五行) 缓存，为共享的只读结构（FrozenDict / tuple）
+
+    :param params: 六爻参数
+    :param day_gz: 日柱干支
+    :param day_master_strength: 日主强弱
+    :param flow_year_element: 流年五行，缺省时按中文五行处理
+    :return: dict
+    """
+    return _live_outcome(tuple(int(p) for p in params), day_gz, day_master_strength, flow_year_element)
+
+
+@lru_cache(maxsize=16384)
+def _live_outcome(params, day_gz, day_master_strength, flow_year_element):
+    result = compile_cast(params, day_gz)
+    structure = shensha_stage(params, day_gz, day_master_strength, flow_year_element or '金')
+
+    gua = result.to_dict()
+    gua['shiy'] = list(result.shiy)
+    del gua['god6']
+    outcome = {
+        'params': list(result.params),
+        'day_gz': day_gz,
+        'xkong': _xunkong(day_gz),
+        'gua': gua,
+        'god6': list(result.god6),
+    }
+    for name in COLUMNS[2:5]:
+        outcome[name] = structure[name]
+    outcome['shensha_analysis'] = {key: structure['shensha_analysis'][key] for key in SHENSHA_ANALYSIS_KEYS}
+    return _with_health(outcome)
+
+
+def _with_health(outcome):
+    # 健康影响与调理建议在诊断中经 set 去重，顺序不固定，统一排序
+    health_impacts, remedies = collect_health(outcome['shensha_analysis'])
+    outcome['health_impacts'] = sorted(health_impacts)
+    outcome['remedies'] = sorted(remedies)
+    # 结果被缓存并原样放入各条起卦结果，冻结后调用方无法改动共享部分
+    return freeze(outcome)
+
+
+def _encode(value):
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def _index_typecode(count):
+    if count <= 0xFF:
+        return 'B'
+    if count <= 0xFFFF:
+        return 'H'
+    return 'I'
+
+
+def _padding(size):
+    return -size % _ALIGN
+
+
+def build_table(path=TABLE_PATH, casts=None, days=None, progress=None):
+    """
+    生成预计算表
+
+    :param path: 输出文件路径
+    :param casts: 卦象序号列表，默认全部 4096 种
+    :param days: 日柱干支列表，默认全部六十甲子
+    :param progress: 进度回调，参数为已完成的卦象数
+    :return: 写入的行数
+    """
+    cast_ids = list(range(CAST_COUNT)) if casts is None else sorted(set(casts))
+    days = list(JIAZI) if days is None else list(days)
+    for day_gz in days:
+        if day_gz not in JIAZI:
+            raise ValueError(f"无效的日柱: {day_gz}")
+
+    dictionaries = {name: {} for name in COLUMNS}
+    indexes = {name: [] for name in COLUMNS}
+
+    def put(name, value):
+        encoded = _encode(value)
+        ids = dictionaries[name]
+        value_id = ids.get(encoded)
+        if value_id is None:
+            value_id = ids[encoded] = len(ids)
+        indexes[name].append(value_id)
+
+    for n, cast_id in enumerate(cast_ids):
+        params = cast_params(cast_id)
+        for day_gz in days:
+            outcome = live_outcome(params, day_gz)
+            for name in COLUMNS[:5]:
+                put(name, outcome[name])
+            for name in SHENSHA_ANALYSIS_KEYS:
+                put(name, outcome['shensha_analysis'][name])
+        if progress:
+            progress(n + 1)
+
+    rows = len(cast_ids) * len(days)
+    segments = []
+    offset = 0
+    columns = []
+
+    def add_segment(data):
+        nonlocal offset
+        start = offset
+        segments.append(data)
+        segments.append(b'\0' * _padding(len(data)))
+        offset += len(data) + _padding(len(data))
+        return start
+
+    for name in COLUMNS:
+        values = list(dictionaries[name])
+        typecode = _index_typecode(len(values))
+        index_start = add_segment(array(typecode, indexes[name]).tobytes())
+        offsets = array('I', [0])
+        for value in values:
+            offsets.append(offsets[-1] + len(value))
+        offsets_start = add_segment(offsets.tobytes())
+        blob_start = add_segment(b''.join(values))
+        columns.append({
+            'name': name,
+            'count': len(values),
+            'typecode': typecode,
+            'index': index_start,
+            'offsets': offsets_start,
+            'blob': blob_start,
+        })
+
+    manifest = _encode({
+        'version': VERSION,
+        'byteorder': sys.byteorder,
+        'rows': rows,
+        'casts': None if casts is None else cast_ids,
+        'days': days,
+        'day_master_strength': TABLE_DAY_MASTER_STRENGTH,
+        'columns': columns,
+    })
+    header = MAGIC + struct.pack('<I', len(manifest)) + manifest
+    header += b'\0' * _padding(len(header))
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(path.suffix + '.tmp')
+    with open(tmp_path, 'wb') as f:
+        f.write(header)
+        for segment in segments:
+            f.write(segment)
+    tmp_path.replace(path)
+    logger.info(f"预计算表已生成: {path}，共 {rows} 行")
+    return rows
+
+
+class _Column(object):
+    def __init__(self, view, base, rows, meta):
+        self.name = meta['name']
+        self.count = meta['count']
+        itemsize = array(meta['typecode']).itemsize
+        start = base + meta['index']
+        self.index = view[start:start + rows * itemsize].cast(meta['typecode'])
+        start = base + meta['offsets']
+        self.offsets = view[start:start + (self.count + 1) * 4].cast('I')
+        self.blob = base + meta['blob']
+
+    def release(self):
+        self.index.release()
+        self.offsets.release()
+
+
+class OutcomeTable(object):
+    """
+    mmap 方式加载的预计算表，多进程可共享同一份页缓存
+    """
+
+    def __init__(self, path=TABLE_PATH):
+        self.path = Path(path)
+        self._file = open(self.path, 'rb')
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self._file.close()
+            raise
+
+        magic, size = struct.unpack_from('<4sI', self._mmap, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"不是六爻预计算表文件: {self.path}")
+        manifest = json.loads(self._mmap[8:8 + size].decode('utf-8'))
+        if manifest['version'] != VERSION or manifest['byteorder'] != sys.byteorder:
+            self.close()
+            raise ValueError(f"预计算表版本或字节序不匹配，请重新生成: {self.path}")
+
+        self.rows = manifest['rows']
+        self.days = manifest['days']
+        self.casts = manifest['casts']
+        self._day_pos = {day_gz: i for i, day_gz in enumerate(self.days)}
+        self._cast_pos = None if self.casts is None else {c: i for i, c in enumerate(self.casts)}
+
+        base = 8 + size + _padding(8 + size)
+        self._view = memoryview(self._mmap)
+        self._columns = {meta['name']: _Column(self._view, base, self.rows, meta) for meta in manifest['columns']}
+        self._value = lru_cache(maxsize=65536)(self._decode)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self):
+        return self.rows
+
+    def close(self):
+        for column in getattr(self, '_columns', {}).values():
+            column.release()
+        if getattr(self, '_view', None) is not None:
+            self._view.release()
+            self._view = None
+        if getattr(self, '_mmap', None) is not None:
+            self._mmap.close()
+            self._mmap = None
+        self._file.close()
+
+    def _decode(self, name, value_id):
+        column = self._columns[name]
+        start = column.blob + column.offsets[value_id]
+        end = column.blob + column.offsets[value_id + 1]
+        return freeze(json.loads(self._mmap[start:end].decode('utf-8')))
+
+    def row(self, params, day_gz):
+        """
+        计算 (卦象, 日柱) 对应的行号
+
+        :param params: 六爻参数
+        :param day_gz: 日柱干支
+        :return: int
+        """
+        cast_id = cast_index(params)
+        if day_gz not in self._day_pos:
+            raise KeyError(f"预计算表不包含日柱: {day_gz}")
+        if self._cast_pos is None:
+            cast_pos = cast_id
+        elif cast_id in self._cast_pos:
+            cast_pos = self._cast_pos[cast_id]
+        else:
+            raise KeyError(f"预计算表不包含卦象: {list(params)}")
+        return cast_pos * len(self.days) + self._day_pos[day_gz]
+
+    def get(self, name, row):
+        """
+        读取单列取值，解码结果按字典编号缓存，为共享的只读结构（FrozenDict / tuple）
+
+        :param name: 列名
+        :param row: 行号
+        :return: 解码后的取值
+        """
+        return self._value(name, self._columns[name].index[row])
+
+    def lookup(self, params, day_gz):
+        """
+        查表获取结构化结果，结构与 live_outcome 一致，各列取值为共享的只读结构
+
+        :param params: 六爻参数
+        :param day_gz: 日柱干支
+        :return: dict
+        """
+        row = self.row(params, day_gz)
+        outcome = {
+            'params': list(params),
+            'day_gz': day_gz,
+            'xkong': _xunkong(day_gz),
+        }
+        for name in COLUMNS[:5]:
+            outcome[name] = self.get(name, row)
+        outcome['shensha_analysis'] = {key: self.get(key, row) for key in SHENSHA_ANALYSIS_KEYS}
+        return _with_health(outcome)
+
+
+_table = None
+
+
+def get_table(path=TABLE_PATH):
+    """
+    获取默认预计算表（首次调用时加载），文件不存在时返回 None
+
+    :param path: 预计算表路径
+    :return: OutcomeTable 或 None
+    """
+    global _table
+
+    if _table is None or _table.path != Path(path):
+        if not Path(path).exists():
+            return None
+        _table = OutcomeTable(path)
+
+    return _table
+
+
+def lookup_outcome(params, day_gz, day_master_strength='neutral', flow_year_element=None, table=None):
+    """
+    获取 (卦象, 日柱) 的结构化结果：能查表时查表，否则回退到实时引擎
+
+    :param params: 六爻参数
+    :param day_gz: 日柱干支
+    :param day_master_strength: 日主强弱
+    :param flow_year_element: 流年五行
+    :param table: 指定的预计算表，默认使用 get_table()
+    :return: dict
+    """
+    if supports(day_master_strength, flow_year_element):
+        table = table or get_table()
+        if table is not None:
+            try:
+                return table.lookup(params, day_gz)
+            except KeyError as e:
+                logger.debug(f"预计算表未命中，使用实时计算: {e}")
+    return live_outcome(params, day_gz, day_master_strength, flow_year_element)
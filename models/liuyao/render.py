@@ -0,0 +1,200 @@
+"""
+六爻排盘渲染模块
+
+模板只在进程内编译一次：模块级 Jinja ``Environment`` 负责加载和缓存已编译模板，
+并通过字节码缓存让新进程跳过模板解析。除 Jinja 模板外，还提供与
+``standard.tpl`` 输出逐字一致的手写字符串拼接渲染器，以及 JSON / HTML 输出，
+所有格式都基于同一份视图数据（view）。
+"""
+
+import datetime
+import json
+import logging
+from pathlib import Path
+
+from jinja2 import Environment
+from jinja2 import FileSystemBytecodeCache
+from jinja2 import FileSystemLoader
+from jinja2 import select_autoescape
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_DIR = Path(__file__).parent / 'data'
+
+# 标准排盘模板
+TEXT_TEMPLATE = 'standard.tpl'
+HTML_TEMPLATE = 'standard.html'
+
+# 支持的输出格式
+FORMATS = ('text', 'json', 'html')
+
+_env = None
+
+
+def get_environment():
+    """
+    获取模块级模板环境（首次调用时创建）
+
+    :return: jinja2.Environment
+    """
+    global _env
+
+    if _env is None:
+        _env = Environment(
+            loader=FileSystemLoader(str(TEMPLATE_DIR)),
+            bytecode_cache=FileSystemBytecodeCache(pattern='__liuyao_%s.cache'),
+            autoescape=select_autoescape(enabled_extensions=('html',), default_for_string=False),
+            auto_reload=False,
+        )
+
+    return _env
+
+
+def get_template(name=TEXT_TEMPLATE):
+    """
+    获取已编译的模板，Environment 内部会缓存编译结果
+
+    :param name: 模板文件名
+    :return: jinja2.Template
+    """
+    return get_environment().get_template(name)
+
+
+def render_template(view, name=TEXT_TEMPLATE):
+    """
+    使用已编译的 Jinja 模板渲染
+
+    :param view: 视图数据
+    :param name: 模板文件名
+    :return: 渲染结果
+    """
+    return get_template(name).render(**view)
+
+
+def render_text(view):
+    """
+    手写的标准排盘渲染器，输出与 standard.tpl 完全一致，但不经过模板引擎
+
+    :param view: 视图数据
+    :return: 渲染结果
+    """
+    out = []
+    lunar = view.get('lunar')
+    main = view['main']
+    bian = view['bian']
+
+    if lunar and lunar.get('gz'):
+        gz = lunar['gz']
+        out.append('\n')
+        out.append(f"阳历: {view['solar'].strftime('%Y年%m月%d日 %H时')}\n")
+        out.append(f"干支: {gz['year']}年 {gz['month']}月 {gz['day']}日 {gz['hour']}时 （旬空：{lunar['xkong']}）\n")
+        out.append(f"真太阳时: {lunar['true_solar']}\n")
+    out.append('\n')
+
+    if view.get('title'):
+        out.append(f"\n标题: {view['title']}\n")
+    out.append('\n\n')
+
+    out.append(f"{main['indent']}{main['gong']}:{main['name']} ({main['gong_type']}){bian['indent']}")
+    if bian.get('name'):
+        out.append(f"{bian['gong']}:{bian['name']} ({bian['gong_type']})")
+    out.append('\n\n')
+
+    god6, hide, qin6, qinx = view['god6'], view['hide'], view['qin6'], view['qinx']
+    shiy, dyao = view['shiy'], view['dyao']
+    for x in range(5, -1, -1):
+        out.append(f"{god6[x]}　{hide['qin6'][x]}　{qin6[x]}{qinx[x]} {main['mark'][x]} {shiy[x]}  "
+                   f"{dyao[x]}  {bian['qin6'][x]} {bian['mark'][x]}\n")
+
+    if bian and bian.get('name') and view['dong']:
+        out.append('\n动爻:' + ''.join(f' {label}' for label in view['dong_labels']) + '\n')
+    else:
+        out.append('\n动爻: 无动爻\n')
+    out.append('\n')
+
+    if view.get('guaci'):
+        out.append(f"\n卦辞: {view['guaci']}\n")
+
+    return ''.join(out)
+
+
+def render_html(view):
+    """
+    使用 HTML 模板渲染
+
+    :param view: 视图数据
+    :return: HTML 片段
+    """
+    return render_template(view, HTML_TEMPLATE)
+
+
+def to_json_dict(view):
+    """
+    将视图数据转换为可 JSON 序列化的结构
+
+    :param view: 视图数据
+    :return: dict
+    """
+    lunar = view.get('lunar') or {}
+    solar = view.get('solar')
+    if isinstance(solar, (datetime.date, datetime.datetime)):
+        solar = solar.isoformat()
+
+    def yao(x):
+        hide_line = view['hide'].get('qin6', [])
+        return {
+            'index': x,
+            'god6': view['god6'][x],
+            'qin6': view['qin6'][x],
+            'qinx': view['qinx'][x],
+            'hide': hide_line[x].strip() if x < len(hide_line) else '',
+            'mark': view['main']['mark'][x],
+            'shiy': view['shiy'][x].strip(),
+            'dong': x in view['dong'],
+            'bian': view['bian']['qin6'][x].strip(),
+            'bian_mark': view['bian']['mark'][x],
+        }
+
+    return {
+        'solar': solar,
+        'lunar': {
+            'gz': dict(lunar.get('gz', {})),
+            'xkong': lunar.get('xkong', ''),
+            'true_solar': lunar.get('true_solar', ''),
+        },
+        'title': view.get('title', ''),
+        'main': {key: view['main'][key] for key in ('name', 'gong', 'gong_type', 'type')},
+        'bian': {key: view['bian'].get(key, '') for key in ('name', 'gong', 'gong_type', 'type')},
+        'dong': list(view['dong']),
+        'dong_labels': list(view['dong_labels']),
+        'yaos': [yao(x) for x in range(0, 6)],
+        'guaci': view.get('guaci'),
+    }
+
+
+def render_json(view):
+    """
+    渲染为 JSON 字符串
+
+    :param view: 视图数据
+    :return: JSON 字符串
+    """
+    return json.dumps(to_json_dict(view), ensure_ascii=False)
+
+
+def render(view, fmt='text', fast=False):
+    """
+    按指定格式渲染视图数据
+
+    :param view: 视图数据
+    :param fmt: 输出格式，text / json / html
+    :param fast: text 格式时是否使用手写渲染器（跳过模板引擎）
+    :return: 渲染结果
+    """
+    if fmt == 'text':
+        return render_text(view) if fast else render_template(view)
+    if fmt == 'json':
+        return render_json(view)
+    if fmt == 'html':
+        return render_html(view)
+    raise ValueError(f"不支持的输出格式: {fmt}，可选: {', '.join(FORMATS)}")
@@ -1,6 +1,9 @@
 import json
+from functools import lru_cache
 from pathlib import Path
 
+from models import timing
+
 # 五行生克关系
 WUXING_RELATIONS = {
     "金": {"generates": "水", "restricts": "木"},
@@ -58,6 +61,7 @@ ZHI_ELEMENTS = {
     "丑": "土", "未": "土"
 }
 
+@lru_cache(maxsize=1)
 def load_shensha_data():
     data_file = Path(__file__).parent.parent.parent / "data" / "shensha_impacts.json"
     try:
@@ -158,6 +162,7 @@ def calculate_shensha_zhi(shensha_name, day_gan, day_zhi):
         return diaoke.get(day_zhi, [])
     return []
 
+@timing.timed("liuyao.shensha")
 def analyze_shensha(shensha_list, gua_element, day_master_strength="neutral", flow_year_element="金", mode="liuyao", najia_data=None):
     shensha_data = load_shensha_data()
     positive_impacts = []
@@ -1,10 +1,10 @@
 import logging
 import math
+from functools import lru_cache
 from pathlib import Path
 
 from . import const
 
-logging.basicConfig(level='INFO')
 logger = logging.getLogger(__name__)
 
 
@@ -296,14 +296,21 @@ def get_qin6(w1, w2):
     return q6
 
 
-def get_guaci(name=None):
+@lru_cache(maxsize=1)
+def _load_guaci():
+    """
+    加载卦辞数据，进程内只读取一次
+
+    :return: dict
+    """
     import pickle
 
-    try:
-        result = Path(__file__).parent / 'data' / 'guaci.pkl'
-        result = pickle.loads(result.read_bytes())
-        result = result.get(name)
+    path = Path(__file__).parent / 'data' / 'guaci.pkl'
+    return pickle.loads(path.read_bytes())
+
 
-        return result
+def get_guaci(name=None):
+    try:
+        return _load_guaci().get(name)
     except Exception as ex:
         logger.exception(ex)
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+阶段计时模块
+为计算流程的各阶段计时（span 上下文管理器 / timed 装饰器），按阶段汇总为直方图，
+可导出为 Prometheus 文本格式（/metrics）或单次请求的 Server-Timing 响应头。
+
+计时默认关闭，关闭时 span 返回共享的空上下文、timed 直接调用原函数，几乎没有开销；
+服务启动时通过 enable() 开启。
+"""
+
+import contextlib
+import contextvars
+import functools
+import threading
+import time
+
+# 直方图分桶上界（秒）
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+# Prometheus 指标名
+METRIC_SECONDS = "curecipher_stage_duration_seconds"
+METRIC_ERRORS = "curecipher_stage_errors_total"
+
+_enabled = False
+_lock = threading.Lock()
+_stats = {}
+
+# 当前请求收集的 (阶段, 耗时) 列表，None 表示不收集
+_collector = contextvars.ContextVar("timing_collector", default=None)
+
+_NOOP = contextlib.nullcontext()
+
+
+class StageStats:
+    """单个阶段的累计耗时直方图"""
+
+    __slots__ = ("buckets", "count", "total", "errors")
+
+    def __init__(self):
+        self.buckets = [0] * len(BUCKETS)
+        self.count = 0
+        self.total = 0.0
+        self.errors = 0
+
+    def observe(self, seconds, error=False):
+        for index, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                self.buckets[index] += 1
+                break
+        self.count += 1
+        self.total += seconds
+        if error:
+            self.errors += 1
+
+
+def enable(flag=True):
+    """
+    开启或关闭计时
+
+    参数:
+        flag (bool): 是否开启
+    """
+    global _enabled
+    _enabled = bool(flag)
+
+
+def is_enabled():
+    """
+    计时是否开启
+
+    返回:
+        bool: 是否开启
+    """
+    return _enabled
+
+
+def reset():
+    """清空已汇总的阶段耗时"""
+    with _lock:
+        _stats.clear()
+
+
+def record(name, seconds, error=False):
+    """
+    记录一次阶段耗时
+
+    参数:
+        name (str): 阶段名，如 bazi.dayun
+        seconds (float): 耗时（秒）
+        error (bool): 阶段是否以异常结束
+    """
+    with _lock:
+        stats = _stats.get(name)
+        if stats is None:
+            stats = _stats[name] = StageStats()
+        stats.observe(seconds, error)
+    spans = _collector.get()
+    if spans is not None:
+        spans.append((name, seconds))
+
+
+class Span:
+    """计时上下文，退出时记录耗时（异常会计入该阶段的错误数，但不会被吞掉）"""
+
+    __slots__ = ("name", "start", "duration")
+
+    def __init__(self, name):
+        self.name = name
+        self.start = None
+        self.duration = None
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.duration = time.perf_counter() - self.start
+        record(self.name, self.duration, error=exc_type is not None)
+        return False
+
+
+def span(name):
+    """
+    阶段计时上下文管理器
+
+        with timing.span("bazi.dayun"):
+            ...
+
+    参数:
+        name (str): 阶段名
+
+    返回:
+        Span / nullcontext: 计时关闭时为共享的空上下文
+    """
+    if not _enabled:
+        return _NOOP
+    return Span(name)
+
+
+def timed(name):
+    """
+    阶段计时装饰器，计时关闭时直接调用原函数
+
+    参数:
+        name (str): 阶段名
+    """
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with Span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+@contextlib.contextmanager
+def collect():
+    """
+    在上下文中收集各阶段耗时（用于单次请求的 Server-Timing）
+
+    上下文内（包括复制了上下文的线程池任务）记录的阶段都会追加到返回的列表。
+
+    返回:
+        list: (阶段名, 耗时秒数) 列表
+    """
+    spans = []
+    token = _collector.set(spans)
+    try:
+        yield spans
+    finally:
+        _collector.reset(token)
+
+
+def server_timing(spans, total=None):
+    """
+    生成 Server-Timing 响应头的值，同名阶段耗时合并
+
+    参数:
+        spans (list): collect() 收集的 (阶段名, 耗时) 列表
+        total (float, optional): 请求总耗时（秒）
+
+    返回:
+        str: 如 'bazi.lunar;dur=1.2, bazi.dayun;dur=3.4, total;dur=9.8'
+    """
+    merged = {}
+    for name, seconds in spans:
+        merged[name] = merged.get(name, 0.0) + seconds
+    entries = [f"{name};dur={seconds * 1000:.3f}" for name, seconds in merged.items()]
+    if total is not None:
+        entries.append(f"total;dur={total * 1000:.3f}")
+    return ", ".join(entries)
+
+
+def snapshot():
+    """
+    各阶段汇总的副本
+
+    返回:
+        dict: 阶段名 -> {count, total, errors, buckets}
+    """
+    with _lock:
+        return {
+            name: {"count": s.count, "total": s.total, "errors": s.errors, "buckets": list(s.buckets)}
+            for name, s in _stats.items()
+        }
+
+
+def _label(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def render_metrics():
+    """
+    以 Prometheus 文本格式导出各阶段耗时直方图与错误数
+
+    返回:
+        str: 指标文本
+    """
+    stats = snapshot()
+    lines = [
+        f"# HELP {METRIC_SECONDS} 各计算阶段耗时（秒）",
+        f"# TYPE {METRIC_SECONDS} histogram",
+    ]
+    for name in sorted(stats):
+        item = stats[name]
+        stage = _label(name)
+        cumulative = 0
+        for bound, count in zip(BUCKETS, item["buckets"]):
+            cumulative += count
+            lines.append(f'{METRIC_SECONDS}_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+        lines.append(f'{METRIC_SECONDS}_bucket{{stage="{stage}",le="+Inf"}} {item["count"]}')
+        lines.append(f'{METRIC_SECONDS}_sum{{stage="{stage}"}} {item["total"]:.6f}')
+        lines.append(f'{METRIC_SECONDS}_count{{stage="{stage}"}} {item["count"]}')
+    lines.append(f"# HELP {METRIC_ERRORS} 各计算阶段以异常结束的次数")
+    lines.append(f"# TYPE {METRIC_ERRORS} counter")
+    for name in sorted(stats):
+        lines.append(f'{METRIC_ERRORS}{{stage="{_label(name)}"}} {stats[name]["errors"]}')
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,51 @@
+"""
+六爻预计算表生成工具
+
+离线计算全部 4096 种卦象 × 60 日柱的排盘与健康诊断结构化结果，
+生成供运行时 mmap 查表的列式二进制文件
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+
+# 添加项目根目录到系统路径，以便导入项目模块
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from models.liuyao.outcomes import CAST_COUNT, JIAZI, TABLE_PATH, build_table
+
+
+def parse_arguments():
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description='六爻预计算表生成工具')
+    parser.add_argument('-o', '--output', default=str(TABLE_PATH), help='输出文件路径')
+    parser.add_argument('-d', '--days', nargs='+', default=None, help='只生成指定日柱（默认全部六十甲子）')
+    parser.add_argument('-n', '--casts', type=int, default=None, help='只生成前 N 种卦象（用于调试）')
+
+    return parser.parse_args()
+
+
+def main():
+    """主函数"""
+    args = parse_arguments()
+    casts = None if args.casts is None else range(min(args.casts, CAST_COUNT))
+    total = CAST_COUNT if casts is None else len(casts)
+    days = args.days or JIAZI
+
+    print(f"生成六爻预计算表: {total} 种卦象 × {len(days)} 个日柱 -> {args.output}")
+    start_time = time.time()
+
+    def progress(done):
+        if done % 256 == 0 or done == total:
+            print(f"  已完成 {done}/{total} 种卦象，耗时 {time.time() - start_time:.1f}秒")
+
+    rows = build_table(args.output, casts=casts, days=args.days, progress=progress)
+    size = Path(args.output).stat().st_size
+
+    print(f"完成: {rows} 行，文件大小 {size / 1024 / 1024:.1f}MB，总耗时 {time.time() - start_time:.1f}秒")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,11 @@
 八字计算工具
 
 命令行工具，用于计算特定出生日期的八字及相关分析
+
+批量计算（CSV / JSONL 输入，多进程，可断点续算）：
+$ python scripts/calculate_bazi.py --input records.csv --output results.jsonl
+
+输出文件后缀为 .cbin 时写出紧凑二进制编码（见 models/bazi/codec.py），体积约为 JSON 的四分之一。
 """
 
 import sys
@@ -15,23 +20,34 @@ from pathlib import Path
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
+from models import errors
+from models.bazi import codec
 from models.bazi.calculator import calculate_bazi
 from models.bazi.five_elements import analyze_five_elements
 from models.bazi.shensha import analyze_shensha
+from models.bazi.bulk import DEFAULT_BATCH_SIZE, run_bulk
 
 def parse_arguments():
     """解析命令行参数"""
     parser = argparse.ArgumentParser(description='八字计算工具')
-    parser.add_argument('-y', '--year', type=int, required=True, help='出生年份')
-    parser.add_argument('-m', '--month', type=int, required=True, help='出生月份')
-    parser.add_argument('-d', '--day', type=int, required=True, help='出生日期')
-    parser.add_argument('-H', '--hour', type=int, required=True, help='出生小时（24小时制）')
+    parser.add_argument('-y', '--year', type=int, help='出生年份')
+    parser.add_argument('-m', '--month', type=int, help='出生月份')
+    parser.add_argument('-d', '--day', type=int, help='出生日期')
+    parser.add_argument('-H', '--hour', type=int, help='出生小时（24小时制）')
     parser.add_argument('-M', '--minute', type=int, default=0, help='出生分钟')
-    parser.add_argument('-g', '--gender', choices=['male', 'female'], required=True, help='性别（male/female）')
+    parser.add_argument('-g', '--gender', choices=['male', 'female'], help='性别（male/female）')
     parser.add_argument('-c', '--city', default='Beijing', help='出生城市（默认为北京）')
-    parser.add_argument('-o', '--output', default=None, help='输出文件路径')
-    
-    return parser.parse_args()
+    parser.add_argument('-o', '--output', default=None, help='输出文件路径（.cbin 为紧凑二进制；批量模式为 .jsonl / .cbin 文件或 .parquet 目录）')
+    parser.add_argument('-i', '--input', default=None,
+                        help='批量模式：输入文件（.csv 带表头 / .jsonl），字段 id,year,month,day,hour,minute,gender,city')
+    parser.add_argument('-w', '--workers', type=int, default=None, help='批量模式：进程数（默认为CPU核数）')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f'批量模式：每批记录数，每批写出后保存检查点（默认为{DEFAULT_BATCH_SIZE}）')
+    
+    args = parser.parse_args()
+    if not args.input and None in (args.year, args.month, args.day, args.hour, args.gender):
+        parser.error('需要提供 -y -m -d -H -g，或使用 --input 批量计算')
+    return args
 
 def round_hour(hour, minute):
     """四舍五入小时"""
@@ -43,17 +59,21 @@ def round_hour(hour, minute):
     
     return hour
 
-def main():
-    """主函数"""
-    args = parse_arguments()
+def build_full_result(record):
+    """
+    计算单条记录的完整结果
     
+    record 包含 year, month, day, hour, minute, gender, city；计算失败时抛出 ChartError
+    """
     # 四舍五入小时
-    hour = round_hour(args.hour, args.minute)
+    hour = round_hour(record["hour"], record["minute"])
     
-    print(f"计算 {args.year}年{args.month}月{args.day}日 {hour}时 {args.gender} {args.city} 的八字...")
-    
-    # 计算八字
-    bazi_result = calculate_bazi(args.year, args.month, args.day, hour, args.gender, args.city)
+    # 计算八字，取出 calculate_bazi 返回的 result（整体失败时为错误字典）
+    chart = calculate_bazi(record["year"], record["month"], record["day"], hour, record["gender"], city=record["city"])
+    if "error" in chart:
+        error = errors.InvalidBirthData if chart.get("error_type") == "InvalidBirthData" else errors.ChartError
+        raise error(chart["message"])
+    bazi_result = chart["result"]
     
     # 分析五行
     elements_result = analyze_five_elements(bazi_result)
@@ -62,21 +82,41 @@ def main():
     shensha_result = analyze_shensha(bazi_result.get("shensha", []), bazi_result["bazi"]["day_master_element"])
     
     # 构建完整结果
-    full_result = {
+    return {
         "input": {
-            "birth_year": args.year,
-            "birth_month": args.month,
-            "birth_day": args.day,
-            "birth_hour": args.hour,
-            "birth_minute": args.minute,
+            "birth_year": record["year"],
+            "birth_month": record["month"],
+            "birth_day": record["day"],
+            "birth_hour": record["hour"],
+            "birth_minute": record["minute"],
             "rounded_hour": hour,
-            "gender": args.gender,
-            "city": args.city
+            "gender": record["gender"],
+            "city": record["city"]
         },
         "bazi_result": bazi_result,
         "elements_result": elements_result,
         "shensha_result": shensha_result
     }
+
+def main():
+    """主函数"""
+    args = parse_arguments()
+    
+    if args.input:
+        # 批量模式：每条一行写出，检查点存在时从上次中断处继续
+        output = args.output or str(Path(args.input).with_suffix("")) + ".results.jsonl"
+        run_bulk(build_full_result, args.input, output, workers=args.workers, batch_size=args.batch_size)
+        return
+    
+    hour = round_hour(args.hour, args.minute)
+    print(f"计算 {args.year}年{args.month}月{args.day}日 {hour}时 {args.gender} {args.city} 的八字...")
+    
+    full_result = build_full_result({
+        "year": args.year, "month": args.month, "day": args.day, "hour": args.hour,
+        "minute": args.minute, "gender": args.gender, "city": args.city
+    })
+    bazi_result = full_result["bazi_result"]
+    elements_result = full_result["elements_result"]
     
     # 保存结果
     if args.output:
@@ -89,8 +129,12 @@ def main():
         timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
         output_path = output_dir / f"bazi_{args.year}{args.month:02d}{args.day:02d}_{timestamp}.json"
     
-    with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(full_result, f, ensure_ascii=False, indent=2)
+    if output_path.suffix.lower() == ".cbin":
+        with open(output_path, "wb") as f:
+            f.write(codec.encode(full_result))
+    else:
+        with open(output_path, "w", encoding="utf-8") as f:
+            json.dump(full_result, f, ensure_ascii=False, indent=2)
     
     print(f"计算完成，结果已保存到 {output_path}")
     
@@ -2,9 +2,16 @@
 CureCipher API 包初始化文件
 """
 
+import os
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from models import timing
+from . import responses
+from .middleware import ProfilerMiddleware, ServerTimingMiddleware
+from .profiler import ProfilerConfig
+
 def create_app():
     """创建并配置FastAPI应用"""
     app = FastAPI(
@@ -21,5 +28,19 @@ def create_app():
         allow_methods=["*"],
         allow_headers=["*"],
     )
+
+    # 阶段计时：/metrics 汇总，CURECIPHER_TIMING=0 时关闭；
+    # Server-Timing 响应头按请求（X-Server-Timing 请求头）或全局（CURECIPHER_SERVER_TIMING=1）开启
+    timing.enable(os.environ.get("CURECIPHER_TIMING", "1") != "0")
+    app.add_middleware(ServerTimingMiddleware, always=os.environ.get("CURECIPHER_SERVER_TIMING") == "1")
+
+    # 采样分析：按 CURECIPHER_PROFILE_RATE 抽样或捕获超过 CURECIPHER_PROFILE_SLOW_MS 的请求，
+    # 记录见 /admin/profiles
+    profile_config = ProfilerConfig.from_env()
+    if profile_config.enabled:
+        app.add_middleware(ProfilerMiddleware, config=profile_config)
+
+    # 原样模式：CURECIPHER_RAW_RESPONSES=1 时计算结果直接以 orjson 渲染，跳过响应模型校验
+    responses.enable_raw(os.environ.get("CURECIPHER_RAW_RESPONSES") == "1")
     
     return app
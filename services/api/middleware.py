@@ -0,0 +1,114 @@
+"""
+API 中间件
+
+ServerTimingMiddleware 在请求期间收集各计算阶段耗时（models.timing），写入
+Server-Timing 响应头，便于在浏览器开发者工具中查看单次请求的阶段耗时。
+ProfilerMiddleware 对抽样请求和慢请求采集调用栈，记录到 profiler.store。
+"""
+
+import random
+import time
+
+from models import timing
+from . import profiler
+
+# 请求携带该头（任意非空值）时返回 Server-Timing
+REQUEST_HEADER = b"x-server-timing"
+
+
+class ServerTimingMiddleware:
+    """
+    按请求附加 Server-Timing 响应头的 ASGI 中间件
+
+    计时关闭时直接透传；always 为 False 时只对携带 X-Server-Timing 请求头的请求生效。
+    流式响应只包含响应头发送前完成的阶段。
+    """
+
+    def __init__(self, app, always=False):
+        self.app = app
+        self.always = always
+
+    def _wanted(self, scope):
+        if self.always:
+            return True
+        return any(name == REQUEST_HEADER and value for name, value in scope.get("headers", ()))
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not timing.is_enabled() or not self._wanted(scope):
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        with timing.collect() as spans:
+            async def send_with_timing(message):
+                if message["type"] == "http.response.start":
+                    value = timing.server_timing(spans, total=time.perf_counter() - start)
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", value.encode("latin-1")))
+                    message = dict(message, headers=headers)
+                await send(message)
+
+            await self.app(scope, receive, send_with_timing)
+
+
+class ProfilerMiddleware:
+    """
+    抽样与慢请求采样分析的 ASGI 中间件
+
+    抽样请求从开始即采样；慢请求在处理时间超过阈值后开始采样，结束时若总耗时达到
+    阈值则记录。管理接口（/admin）本身不分析。
+    """
+
+    def __init__(self, app, config, store=None):
+        self.app = app
+        self.config = config
+        self.store = profiler.store if store is None else store
+        self.store.resize(config.keep)
+        self.sampler = profiler.StackSampler(config.interval_ms / 1000)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith("/admin"):
+            await self.app(scope, receive, send)
+            return
+
+        sampled = self.config.rate > 0 and random.random() < self.config.rate
+        slow = self.config.slow_ms / 1000 if self.config.slow_ms > 0 else None
+        if not sampled and slow is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        key = self.sampler.start(start if sampled else start + slow)
+        body = bytearray()
+        status = None
+
+        async def receive_with_copy():
+            message = await receive()
+            if message["type"] == "http.request" and len(body) < profiler.MAX_BODY:
+                body.extend(message.get("body", b"")[:profiler.MAX_BODY - len(body)])
+            return message
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive_with_copy, send_with_status)
+        finally:
+            duration = time.perf_counter() - start
+            capture = self.sampler.stop(key)
+            reasons = []
+            if sampled:
+                reasons.append("sampled")
+            if slow is not None and duration >= slow:
+                reasons.append("slow")
+            if reasons:
+                headers = dict(scope.get("headers", ()))
+                request_input = profiler.normalize_input(
+                    profiler.parse_input(scope.get("query_string", b""), bytes(body),
+                                         headers.get(b"content-type", b"").decode("latin-1")),
+                    self.config.salt)
+                self.store.add(profiler.build_entry(
+                    capture, duration, reasons, scope, status or 500, request_input, self.sampler.interval))
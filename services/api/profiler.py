@@ -0,0 +1,323 @@
+"""
+请求采样分析
+
+按比例抽样的请求、以及耗时超过阈值的请求，在处理期间由后台线程定时采集各线程的
+调用栈（同步接口在线程池中执行，cProfile 只能分析当前线程，因此采用栈采样），
+结束后连同规范化的请求参数（出生信息哈希化）写入环形缓冲区，供管理接口查看。
+
+配置（环境变量）：
+    CURECIPHER_PROFILE_RATE        抽样比例 0~1，默认 0
+    CURECIPHER_PROFILE_SLOW_MS     慢请求阈值（毫秒），默认 0 表示不捕获
+    CURECIPHER_PROFILE_KEEP        保留的最近记录数，默认 50
+    CURECIPHER_PROFILE_INTERVAL_MS 栈采样间隔（毫秒），默认 5
+    CURECIPHER_PROFILE_SALT        出生信息哈希的盐，默认每个进程随机生成
+"""
+
+import collections
+import datetime
+import hashlib
+import itertools
+import json
+import os
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from urllib.parse import parse_qsl
+
+# 项目根目录
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 只有正在执行这些包中代码的线程栈会被采集（排除空闲的事件循环等线程）
+PROJECT_DIRS = tuple(os.path.join(ROOT_DIR, name) + os.sep for name in ("models", "services"))
+
+# 出生信息字段（哈希后不再保留原值）
+BIRTH_FIELDS = ("birth_year", "birth_month", "birth_day", "birth_hour", "birth_minute")
+BIRTH_KEYS = ("year", "month", "day", "hour", "minute")
+
+# 读取请求体的上限（字节），超过部分不记录
+MAX_BODY = 64 * 1024
+
+# 单个调用栈的最大深度
+MAX_DEPTH = 64
+
+# 报告中保留的调用栈 / 函数数量
+TOP_STACKS = 20
+TOP_FUNCTIONS = 20
+
+
+@dataclass
+class ProfilerConfig:
+    """采样分析配置"""
+    rate: float = 0.0
+    slow_ms: float = 0.0
+    keep: int = 50
+    interval_ms: float = 5.0
+    salt: bytes = field(default_factory=lambda: os.urandom(16))
+
+    @property
+    def enabled(self):
+        return self.rate > 0 or self.slow_ms > 0
+
+    @classmethod
+    def from_env(cls, environ=None):
+        """
+        从环境变量读取配置
+
+        :param environ: 环境变量字典，默认 os.environ
+        :return: ProfilerConfig
+        """
+        environ = os.environ if environ is None else environ
+        config = cls(
+            rate=min(1.0, max(0.0, float(environ.get("CURECIPHER_PROFILE_RATE", 0) or 0))),
+            slow_ms=max(0.0, float(environ.get("CURECIPHER_PROFILE_SLOW_MS", 0) or 0)),
+            keep=max(1, int(environ.get("CURECIPHER_PROFILE_KEEP", 50) or 50)),
+            interval_ms=max(0.5, float(environ.get("CURECIPHER_PROFILE_INTERVAL_MS", 5) or 5)),
+        )
+        if environ.get("CURECIPHER_PROFILE_SALT"):
+            config.salt = environ["CURECIPHER_PROFILE_SALT"].encode("utf-8")
+        return config
+
+
+def hash_birth(values, salt):
+    """
+    出生信息的哈希（相同出生时间得到相同结果，便于聚合与比对）
+
+    :param values: 年、月、日、时、分（缺失为 None）
+    :param salt: 盐
+    :return: 16 位十六进制字符串
+    """
+    text = "|".join("" if value is None else str(value) for value in values)
+    return hashlib.sha256(salt + text.encode("utf-8")).hexdigest()[:16]
+
+
+def normalize_input(data, salt):
+    """
+    规范化请求参数：出生年月日时分替换为 birth_hash，其余字段原样保留（如城市、性别）
+
+    :param data: 解析后的请求体或查询参数
+    :param salt: 哈希的盐
+    :return: 规范化后的副本
+    """
+    if isinstance(data, list):
+        return [normalize_input(item, salt) for item in data]
+    if not isinstance(data, dict):
+        return data
+
+    result = {}
+    if any(key in data for key in BIRTH_FIELDS):
+        result["birth_hash"] = hash_birth([data.get(key) for key in BIRTH_FIELDS], salt)
+    for key, value in data.items():
+        if key in BIRTH_FIELDS:
+            continue
+        if key == "birth" and isinstance(value, dict):
+            birth = {k: v for k, v in value.items() if k not in BIRTH_KEYS}
+            birth["birth_hash"] = hash_birth([value.get(k) for k in BIRTH_KEYS], salt)
+            result[key] = birth
+        else:
+            result[key] = normalize_input(value, salt)
+    return result
+
+
+def parse_input(query_string, body, content_type=""):
+    """
+    解析请求的查询参数与请求体
+
+    :param query_string: 查询字符串（bytes）
+    :param body: 请求体（bytes，可能被截断）
+    :param content_type: 请求体类型
+    :return: dict，包含 query / body
+    """
+    parsed = {}
+    if query_string:
+        parsed["query"] = dict(parse_qsl(query_string.decode("latin-1")))
+    if body:
+        if "json" in content_type and len(body) < MAX_BODY:
+            try:
+                parsed["body"] = json.loads(body)
+            except ValueError:
+                parsed["body"] = {"unparsed_bytes": len(body)}
+        else:
+            parsed["body"] = {"unparsed_bytes": len(body)}
+    return parsed
+
+
+def _is_project(filename):
+    return filename.startswith(PROJECT_DIRS)
+
+
+def _frame_name(frame):
+    filename = frame.f_code.co_filename
+    if filename.startswith(ROOT_DIR + os.sep):
+        filename = os.path.relpath(filename, ROOT_DIR)
+    else:
+        filename = os.path.basename(filename)
+    return f"{filename}:{frame.f_code.co_name}"
+
+
+def collapse(frame):
+    """
+    把线程的当前栈折叠为 "根;...;叶" 格式
+
+    :param frame: 线程当前执行的栈帧
+    :return: (折叠栈, 最深的项目函数)，栈中没有项目代码时返回 None
+    """
+    names = []
+    project_leaf = None
+    while frame is not None and len(names) < MAX_DEPTH:
+        name = _frame_name(frame)
+        if project_leaf is None and _is_project(frame.f_code.co_filename):
+            project_leaf = name
+        names.append(name)
+        frame = frame.f_back
+    if project_leaf is None:
+        return None
+    return ";".join(reversed(names)), project_leaf
+
+
+class Capture:
+    """一次被分析请求的采样状态"""
+
+    __slots__ = ("start", "sample_after", "stacks", "functions", "samples", "concurrent")
+
+    def __init__(self, start, sample_after):
+        self.start = start
+        self.sample_after = sample_after
+        self.stacks = collections.Counter()
+        self.functions = collections.Counter()
+        self.samples = 0
+        self.concurrent = 1
+
+
+class StackSampler:
+    """
+    后台栈采样线程
+
+    只在有请求到达采样时间时采样；同一时刻有多个请求在采样时，样本同时计入这些
+    请求（报告中的 concurrent 为采样期间同时被分析的最大请求数）。
+    """
+
+    def __init__(self, interval):
+        self.interval = interval
+        self._active = {}
+        self._ids = itertools.count(1)
+        self._cond = threading.Condition()
+        self._thread = None
+
+    def start(self, sample_after):
+        """
+        登记一个请求
+
+        :param sample_after: 开始采样的时刻（perf_counter）
+        :return: 登记编号
+        """
+        with self._cond:
+            key = next(self._ids)
+            self._active[key] = Capture(time.perf_counter(), sample_after)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="curecipher-profiler", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+        return key
+
+    def stop(self, key):
+        """
+        注销请求
+
+        :return: Capture
+        """
+        with self._cond:
+            return self._active.pop(key)
+
+    def _run(self):
+        own = threading.get_ident()
+        while True:
+            with self._cond:
+                while not self._active:
+                    self._cond.wait()
+                now = time.perf_counter()
+                due = [c for c in self._active.values() if c.sample_after <= now]
+                if not due:
+                    wait = min(c.sample_after for c in self._active.values()) - now
+                    self._cond.wait(min(wait, 1.0))
+                    continue
+                for thread_id, frame in sys._current_frames().items():
+                    if thread_id == own:
+                        continue
+                    collapsed = collapse(frame)
+                    if collapsed is None:
+                        continue
+                    stack, leaf = collapsed
+                    for capture in due:
+                        capture.stacks[stack] += 1
+                        capture.functions[leaf] += 1
+                for capture in due:
+                    capture.samples += 1
+                    capture.concurrent = max(capture.concurrent, len(due))
+            time.sleep(self.interval)
+
+
+class ProfileStore:
+    """最近 N 条分析记录的环形缓冲区"""
+
+    def __init__(self, keep=50):
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._entries = collections.deque(maxlen=keep)
+
+    def resize(self, keep):
+        with self._lock:
+            self._entries = collections.deque(self._entries, maxlen=keep)
+
+    def add(self, entry):
+        with self._lock:
+            entry = dict(entry, id=next(self._ids))
+            self._entries.append(entry)
+        return entry
+
+    def list(self):
+        """记录摘要，最新的在前"""
+        with self._lock:
+            entries = list(self._entries)
+        return [{key: value for key, value in entry.items() if key not in ("stacks", "functions", "input")}
+                for entry in reversed(entries)]
+
+    def get(self, entry_id):
+        with self._lock:
+            for entry in self._entries:
+                if entry["id"] == entry_id:
+                    return entry
+        return None
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+# 进程内共享的记录缓冲区（管理接口读取）
+store = ProfileStore()
+
+
+def build_entry(capture, duration, reasons, scope, status, request_input, interval):
+    """
+    生成一条分析记录
+
+    :return: dict
+    """
+    sampled_ms = max(0.0, (capture.sample_after - capture.start) * 1000)
+    return {
+        "time": datetime.datetime.fromtimestamp(time.time()).isoformat(timespec="milliseconds"),
+        "method": scope.get("method"),
+        "path": scope.get("path"),
+        "status": status,
+        "duration_ms": round(duration * 1000, 3),
+        "reasons": reasons,
+        "input": request_input,
+        "sampling_started_ms": round(sampled_ms, 3),
+        "interval_ms": round(interval * 1000, 3),
+        "samples": capture.samples,
+        "concurrent": capture.concurrent,
+        "stacks": [{"stack": stack, "count": count} for stack, count in capture.stacks.most_common(TOP_STACKS)],
+        "functions": [{"function": name, "count": count}
+                      for name, count in capture.functions.most_common(TOP_FUNCTIONS)],
+    }
@@ -0,0 +1,86 @@
+"""
+API 响应序列化
+
+FastJSONResponse 使用 orjson 渲染 JSON（未安装时退回标准库 json，中文不转义），
+支持只读字典、tuple、numpy 数值与日期。
+
+原样模式（CURECIPHER_RAW_RESPONSES=1）：计算引擎的输出视为可信，路由直接返回渲染好的
+响应，跳过 FastAPI 按响应模型的再次校验；默认关闭，此时按响应模型校验后序列化。
+"""
+
+import datetime
+import json
+from collections.abc import Mapping
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # orjson 为可选依赖
+    orjson = None
+
+_raw = False
+
+
+def _default(value):
+    if isinstance(value, Mapping):
+        return dict(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    # numpy 标量与数组（标准库 json 不支持）
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    raise TypeError(f"无法序列化的类型: {type(value).__name__}")
+
+
+def dumps(content):
+    """
+    序列化为 JSON
+
+    :param content: 可 JSON 序列化的数据
+    :return: UTF-8 编码的 JSON（紧凑格式，中文不转义）
+    """
+    if orjson is not None:
+        return orjson.dumps(content, default=_default,
+                            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":"), default=_default).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """使用 orjson 渲染的 JSON 响应"""
+
+    def render(self, content):
+        return dumps(content)
+
+
+def enable_raw(flag=True):
+    """
+    开启或关闭原样模式
+
+    :param flag: 是否开启
+    """
+    global _raw
+    _raw = bool(flag)
+
+
+def is_raw():
+    """
+    原样模式是否开启
+
+    :return: bool
+    """
+    return _raw
+
+
+def respond(content):
+    """
+    路由的返回值：原样模式下直接渲染为响应（跳过响应模型校验），否则原样交给 FastAPI 校验
+
+    :param content: 计算引擎的输出
+    :return: FastJSONResponse 或 content
+    """
+    if _raw:
+        return FastJSONResponse(content)
+    return content
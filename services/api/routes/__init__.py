@@ -3,15 +3,22 @@ API 路由包初始化文件
 """
 
 from fastapi import APIRouter
+from .admin_routes import router as admin_router
 from .bazi_routes import router as bazi_router
+from .job_routes import router as job_router
+from .liuyao_routes import router as liuyao_router
+from .metrics_routes import router as metrics_router
 
 # 创建主路由
 api_router = APIRouter()
 
 # 注册子路由
 api_router.include_router(bazi_router)
+api_router.include_router(liuyao_router)
+api_router.include_router(job_router)
+api_router.include_router(metrics_router)
+api_router.include_router(admin_router)
 
 # 后续可以添加更多路由
 # api_router.include_router(health_router)
-# api_router.include_router(liuyao_router)
 # 等等
@@ -0,0 +1,65 @@
+"""
+管理API路由
+
+查看采样分析记录（抽样请求与慢请求的调用栈和规范化参数）。需要设置环境变量
+CURECIPHER_ADMIN_TOKEN，并在请求头 X-Admin-Token 中携带相同的值。
+"""
+
+import hmac
+import os
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import PlainTextResponse
+
+from services.api import profiler
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """校验管理令牌，未配置令牌时管理接口不可用"""
+    expected = os.environ.get("CURECIPHER_ADMIN_TOKEN")
+    if not expected:
+        raise HTTPException(status_code=404, detail="管理接口未启用")
+    if not x_admin_token or not hmac.compare_digest(x_admin_token.encode("utf-8"), expected.encode("utf-8")):
+        raise HTTPException(status_code=403, detail="管理令牌无效")
+
+
+# 创建路由
+router = APIRouter(
+    prefix="/admin",
+    tags=["admin"],
+    dependencies=[Depends(require_admin)],
+)
+
+
+def _get_profile(profile_id):
+    entry = profiler.store.get(profile_id)
+    if entry is None:
+        raise HTTPException(status_code=404, detail=f"分析记录不存在: {profile_id}")
+    return entry
+
+
+@router.get("/profiles", summary="最近的采样分析记录")
+async def list_profiles():
+    """最近的分析记录摘要，最新的在前"""
+    profiles = profiler.store.list()
+    return {"count": len(profiles), "profiles": profiles}
+
+
+@router.get("/profiles/{profile_id}", summary="采样分析记录详情")
+async def get_profile(profile_id: int):
+    """单条分析记录，包含规范化参数、调用栈与热点函数"""
+    return _get_profile(profile_id)
+
+
+@router.get("/profiles/{profile_id}/folded", response_class=PlainTextResponse, summary="折叠调用栈")
+async def get_profile_folded(profile_id: int):
+    """折叠调用栈文本（每行 "栈 次数"），可直接用于生成火焰图"""
+    entry = _get_profile(profile_id)
+    return "".join(f"{item['stack']} {item['count']}\n" for item in entry["stacks"])
+
+
+@router.delete("/profiles", summary="清空采样分析记录")
+async def clear_profiles():
+    profiler.store.clear()
+    return {"status": "ok"}
@@ -5,13 +5,19 @@
 """
 
 from fastapi import APIRouter, HTTPException, Query, Depends
-from pydantic import BaseModel, Field
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional, List, Dict, Any
 import datetime
 
+from models import clock
+from models.bazi import bazi_calculator
 from models.bazi.calculator import calculate_bazi
 from models.bazi.five_elements import analyze_five_elements
+from models.bazi.report import MEDIA_TYPES, stream_report
 from models.bazi.shensha import analyze_shensha
+from ..responses import respond
+from ..schemas import BaziChart, ElementsAnalysis, HealthRisk, ShenshaAnalysis
 
 # 创建路由
 router = APIRouter(
@@ -30,56 +36,54 @@ class BaziRequest(BaseModel):
     gender: str = Field(..., description="性别，male或female")
     city: Optional[str] = Field(None, description="出生城市")
     
-    class Config:
-        schema_extra = {
-            "example": {
-                "birth_year": 1977,
-                "birth_month": 2,
-                "birth_day": 25,
-                "birth_hour": 20,
-                "birth_minute": 50,
-                "gender": "male",
-                "city": "Beijing"
-            }
+    model_config = ConfigDict(json_schema_extra={
+        "example": {
+            "birth_year": 1977,
+            "birth_month": 2,
+            "birth_day": 25,
+            "birth_hour": 20,
+            "birth_minute": 50,
+            "gender": "male",
+            "city": "Beijing"
         }
+    })
 
-# 响应模型
+# 响应模型（字段类型见 services/api/schemas.py，与计算引擎的输出结构对应）
 class BaziResponse(BaseModel):
-    bazi_result: Dict[str, Any]
-    elements_result: Dict[str, Any]
-    shensha_result: Dict[str, Any]
+    bazi_result: BaziChart
+    elements_result: ElementsAnalysis
+    shensha_result: ShenshaAnalysis
     
-    class Config:
-        schema_extra = {
-            "example": {
-                "bazi_result": {
-                    "bazi": {
-                        "year": "丁巳",
-                        "month": "丙寅",
-                        "day": "癸巳",
-                        "hour": "辛亥"
-                    }
-                },
-                "elements_result": {
-                    "element_percentages": {
-                        "木": 12.5,
-                        "火": 31.25,
-                        "土": 12.5,
-                        "金": 12.5,
-                        "水": 31.25
-                    }
-                },
-                "shensha_result": {
-                    "positive_impacts": [
-                        {"name": "天乙"},
-                        {"name": "文昌"}
-                    ],
-                    "negative_impacts": [
-                        {"name": "劫煞"}
-                    ]
+    model_config = ConfigDict(json_schema_extra={
+        "example": {
+            "bazi_result": {
+                "bazi": {
+                    "year": "丁巳",
+                    "month": "丙寅",
+                    "day": "癸巳",
+                    "hour": "辛亥"
+                }
+            },
+            "elements_result": {
+                "element_percentages": {
+                    "木": 12.5,
+                    "火": 31.25,
+                    "土": 12.5,
+                    "金": 12.5,
+                    "水": 31.25
                 }
+            },
+            "shensha_result": {
+                "positive_impacts": [
+                    {"name": "天乙"},
+                    {"name": "文昌"}
+                ],
+                "negative_impacts": [
+                    {"name": "劫煞"}
+                ]
             }
         }
+    })
 
 class BaziSummaryResponse(BaseModel):
     four_pillars: str
@@ -87,15 +91,39 @@ class BaziSummaryResponse(BaseModel):
     element_balance: str
     health_advice: str
     
-    class Config:
-        schema_extra = {
-            "example": {
-                "four_pillars": "丁巳 丙寅 癸巳 辛亥",
-                "day_master": "癸水",
-                "element_balance": "火水偏旺，土金木偏弱",
-                "health_advice": "注意肾脏和泌尿系统健康，保持充足的睡眠，避免过度劳累，补充足够水分。"
-            }
+    model_config = ConfigDict(json_schema_extra={
+        "example": {
+            "four_pillars": "丁巳 丙寅 癸巳 辛亥",
+            "day_master": "癸水",
+            "element_balance": "火水偏旺，土金木偏弱",
+            "health_advice": "注意肾脏和泌尿系统健康，保持充足的睡眠，避免过度劳累，补充足够水分。"
         }
+    })
+
+class DietRecommendations(BaseModel):
+    recommended_flavors: List[str]
+    foods_to_avoid: List[str]
+    seasonal_recipes: List[str]
+
+class HealthAdviceResponse(BaseModel):
+    general_advice: str
+    seasonal_advice: str
+    health_risks: List[HealthRisk]
+    diet_recommendations: DietRecommendations
+    exercise_recommendations: List[str]
+    frequency_advice: str
+
+def chart_or_raise(bazi_result):
+    """
+    取出 calculate_bazi 的结果，整体计算失败时转为 HTTP 错误（出生信息无效为 422，其余为 500）
+    """
+    if isinstance(bazi_result, dict):
+        if 'error' in bazi_result:
+            status_code = 422 if bazi_result.get('error_type') == 'InvalidBirthData' else 500
+            raise HTTPException(status_code=status_code, detail=bazi_result.get('message', bazi_result['error']))
+        if 'result' in bazi_result:
+            return bazi_result['result']
+    return bazi_result
 
 @router.post("/calculate", response_model=BaziResponse, summary="计算八字并分析")
 async def calc_bazi(request: BaziRequest):
@@ -132,13 +160,7 @@ async def calc_bazi(request: BaziRequest):
         )
         
         # 处理返回结果
-        if isinstance(bazi_result, dict):
-            if 'error' in bazi_result:
-                # 如果出错，直接抛出异常
-                raise HTTPException(status_code=500, detail=bazi_result['message'] if 'message' in bazi_result else bazi_result['error'])
-            elif 'result' in bazi_result:
-                # 提取结果数据
-                bazi_result = bazi_result['result']
+        bazi_result = chart_or_raise(bazi_result)
         
         # 分析五行
         elements_result = analyze_five_elements(bazi_result)
@@ -149,12 +171,14 @@ async def calc_bazi(request: BaziRequest):
             bazi_result["bazi"]["day_master_element"]
         )
         
-        return {
+        return respond({
             "bazi_result": bazi_result,
             "elements_result": elements_result,
             "shensha_result": shensha_result
-        }
+        })
     
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"计算八字时出错: {str(e)}")
 
@@ -193,13 +217,7 @@ async def get_bazi_summary(request: BaziRequest):
         )
         
         # 处理返回结果
-        if isinstance(bazi_result, dict):
-            if 'error' in bazi_result:
-                # 如果出错，直接抛出异常
-                raise HTTPException(status_code=500, detail=bazi_result['message'] if 'message' in bazi_result else bazi_result['error'])
-            elif 'result' in bazi_result:
-                # 提取结果数据
-                bazi_result = bazi_result['result']
+        bazi_result = chart_or_raise(bazi_result)
         
         # 分析五行
         elements_result = analyze_five_elements(bazi_result)
@@ -216,25 +234,28 @@ async def get_bazi_summary(request: BaziRequest):
         # 提取健康建议
         health_advice = elements_result['health_advice']['general_advice']
         
-        return {
+        return respond({
             "four_pillars": four_pillars,
             "day_master": day_master,
             "element_balance": element_balance,
             "health_advice": health_advice
-        }
+        })
     
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"获取八字简要分析时出错: {str(e)}")
 
-@router.get("/health_advice", summary="获取基于八字的健康建议")
+@router.get("/health_advice", response_model=HealthAdviceResponse, summary="获取基于八字的健康建议")
 async def get_health_advice(
     birth_year: int = Query(..., gt=1900, lt=2100, description="出生年份"),
     birth_month: int = Query(..., ge=1, le=12, description="出生月份"),
     birth_day: int = Query(..., ge=1, le=31, description="出生日期"),
     birth_hour: int = Query(..., ge=0, le=23, description="出生小时（24小时制）"),
     birth_minute: int = Query(0, ge=0, le=59, description="出生分钟"),
-    gender: str = Query(..., regex="^(male|female)$", description="性别，male或female"),
-    city: Optional[str] = Query(None, description="出生城市")
+    gender: str = Query(..., pattern="^(male|female)$", description="性别，male或female"),
+    city: Optional[str] = Query(None, description="出生城市"),
+    locale: str = Query("zh", pattern="^(zh|en|es)$", description="建议文案语言，zh/en/es")
 ):
     """
     获取基于八字的健康建议
@@ -246,6 +267,7 @@ async def get_health_advice(
     - **birth_minute**: 出生分钟（可选，默认为0）
     - **gender**: 性别（male/female）
     - **city**: 出生城市（可选，默认为Beijing）
+    - **locale**: 建议文案语言（可选，默认为zh）
     
     返回基于八字的健康建议，包括饮食和运动指导。
     """
@@ -269,16 +291,10 @@ async def get_health_advice(
         )
         
         # 处理返回结果
-        if isinstance(bazi_result, dict):
-            if 'error' in bazi_result:
-                # 如果出错，直接抛出异常
-                raise HTTPException(status_code=500, detail=bazi_result['message'] if 'message' in bazi_result else bazi_result['error'])
-            elif 'result' in bazi_result:
-                # 提取结果数据
-                bazi_result = bazi_result['result']
+        bazi_result = chart_or_raise(bazi_result)
         
         # 分析五行
-        elements_result = analyze_five_elements(bazi_result)
+        elements_result = analyze_five_elements(bazi_result, locale=locale)
         
         # 提取健康建议
         health_advice = elements_result['health_advice']
@@ -307,7 +323,47 @@ async def get_health_advice(
             "frequency_advice": exercise_advice['frequency_advice']
         }
         
-        return result
+        return respond(result)
     
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"获取健康建议时出错: {str(e)}")
+
+@router.post("/report/stream", summary="流式获取八字命盘报告")
+async def stream_bazi_report(
+    request: BaziRequest,
+    format: str = Query("text", pattern="^(text|markdown|html)$", description="报告格式，text/markdown/html"),
+    timeline: bool = Query(True, description="是否包含大运评分与流年流月章节")
+):
+    """
+    流式返回八字命盘报告
+    
+    先返回四柱命盘网格，再逐章返回命盘分析、大运、流年等内容，
+    客户端无需等待整份报告生成即可开始显示。
+    
+    - **format**: 报告格式（text/markdown/html，默认为text）
+    - **timeline**: 是否包含大运评分与流年流月章节（默认包含）
+    """
+    # 四舍五入小时
+    rounded_hour = request.birth_hour
+    if request.birth_minute >= 30:
+        rounded_hour += 1
+    
+    if rounded_hour >= 24:
+        rounded_hour = 0
+    
+    # 八字在开始输出前计算，出错时仍可返回错误状态码
+    bazi_result = bazi_calculator.calculate_bazi(
+        request.birth_year,
+        request.birth_month,
+        request.birth_day,
+        rounded_hour,
+        request.gender,
+        city=request.city
+    )
+    chart_or_raise(bazi_result)
+    
+    # 参考时间在请求时确定，流式输出在线程池中进行
+    chunks = stream_report(bazi_result, format=format, as_of=clock.as_of(), timeline=timeline)
+    return StreamingResponse(chunks, media_type=MEDIA_TYPES[format])
@@ -0,0 +1,122 @@
+"""
+后台任务API路由
+
+完整报告提交为后台任务，立即返回任务 id；客户端查询任务状态、取回结果，
+可用 wait 参数等待任务完成（长轮询）。任务由 python -m services.jobs 启动的 worker 执行。
+"""
+
+import asyncio
+import datetime
+import functools
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, Response
+
+from models import clock
+from services.jobs import DONE, FAILED, open_broker
+
+from .bazi_routes import BaziRequest
+
+# 长轮询的最长等待秒数与查询间隔
+MAX_WAIT = 60
+WAIT_INTERVAL = 0.1
+
+# 创建路由
+router = APIRouter(
+    prefix="/api/jobs",
+    tags=["jobs"],
+    responses={404: {"description": "Not found"}},
+)
+
+
+@functools.lru_cache(maxsize=1)
+def get_broker():
+    """任务队列（地址取环境变量 CURECIPHER_JOB_BROKER，默认为本地 SQLite 文件）"""
+    return open_broker()
+
+
+async def _wait_for(broker, job_id, wait):
+    """查询任务，wait 秒内等待其完成；任务不存在或结果已过期时为 404"""
+    deadline = asyncio.get_running_loop().time() + wait
+    while True:
+        job = await run_in_threadpool(broker.get, job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail=f"任务不存在或结果已过期: {job_id}")
+        if job.finished or asyncio.get_running_loop().time() >= deadline:
+            return job
+        await asyncio.sleep(WAIT_INTERVAL)
+
+
+@router.post("/bazi/report", status_code=202, summary="提交八字完整报告任务")
+async def submit_bazi_report(
+    request: BaziRequest,
+    format: str = Query("html", pattern="^(text|markdown|html)$", description="报告格式，text/markdown/html"),
+    locale: str = Query("zh", pattern="^(zh|en|es)$", description="命盘网格与调养建议的语言，zh/en/es"),
+    timeline: bool = Query(True, description="是否包含大运评分与流年流月章节"),
+    broker=Depends(get_broker)
+):
+    """
+    提交完整报告任务（命盘网格、命盘分析、大运评分、流年流月、饮食运动调养），立即返回任务 id
+
+    结果通过 GET /api/jobs/{job_id}/result 取回。
+    """
+    try:
+        datetime.date(request.birth_year, request.birth_month, request.birth_day)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=f"出生日期无效: {e}")
+
+    # 四舍五入小时
+    rounded_hour = request.birth_hour
+    if request.birth_minute >= 30:
+        rounded_hour += 1
+
+    if rounded_hour >= 24:
+        rounded_hour = 0
+
+    # 参考时间在提交时确定，与任务何时执行无关
+    job = await run_in_threadpool(broker.submit, "bazi.report", {
+        "year": request.birth_year,
+        "month": request.birth_month,
+        "day": request.birth_day,
+        "hour": rounded_hour,
+        "gender": request.gender,
+        "city": request.city,
+        "format": format,
+        "locale": locale,
+        "timeline": timeline,
+        "as_of": clock.as_of().isoformat(),
+    })
+    return JSONResponse(job.to_dict(), status_code=202, headers={"Location": f"{router.prefix}/{job.id}"})
+
+
+@router.get("/{job_id}", summary="查询任务状态")
+async def get_job(
+    job_id: str,
+    wait: float = Query(0, ge=0, le=MAX_WAIT, description="任务未完成时最多等待的秒数"),
+    broker=Depends(get_broker)
+):
+    """任务状态：queued / running / done / failed，失败时包含错误信息"""
+    job = await _wait_for(broker, job_id, wait)
+    return job.to_dict()
+
+
+@router.get("/{job_id}/result", summary="取回任务结果")
+async def get_job_result(
+    job_id: str,
+    wait: float = Query(0, ge=0, le=MAX_WAIT, description="任务未完成时最多等待的秒数"),
+    broker=Depends(get_broker)
+):
+    """
+    任务完成时返回报告内容（Content-Type 与报告格式对应）；
+    未完成时返回 202 与任务状态；失败时返回错误信息，
+    输入错误（出生信息无效、格式不支持等）为 422，其余为 500。
+    """
+    job = await _wait_for(broker, job_id, wait)
+    if job.status == DONE:
+        return Response(job.result["content"], media_type=job.result["media_type"])
+    if job.status == FAILED:
+        error = job.error or {}
+        status_code = 422 if error.get("permanent") else 500
+        raise HTTPException(status_code=status_code, detail=f"任务执行失败: {error.get('message', '')}")
+    return JSONResponse(job.to_dict(), status_code=202)
@@ -0,0 +1,96 @@
+"""
+六爻API路由
+
+提供六爻起卦、排盘与健康诊断的REST API端点
+"""
+
+from fastapi import APIRouter, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Optional, List, Dict, Any, Literal
+from typing_extensions import Annotated
+import datetime
+
+from models import clock
+from models.liuyao.batch import cast, cast_batch
+from ..responses import respond
+
+# 单次批量请求的最大起卦数
+MAX_BATCH_SIZE = 10000
+
+# 创建路由
+router = APIRouter(
+    prefix="/api/liuyao",
+    tags=["liuyao"],
+    responses={404: {"description": "Not found"}},
+)
+
+# 请求模型
+class CastRequest(BaseModel):
+    params: List[Annotated[int, Field(ge=1, le=4)]] = Field(..., min_length=6, max_length=6, description="六爻参数（初爻到上爻），1少阳 2少阴 3老阳 4老阴")
+    date: Optional[datetime.datetime] = Field(None, description="起卦时间，默认为当前时间")
+    longitude: float = Field(116.4074, ge=-180, le=180, description="经度")
+    latitude: float = Field(39.9042, ge=-90, le=90, description="纬度")
+    title: Optional[str] = Field(None, description="标题")
+    render: Optional[Literal["text", "html"]] = Field(None, description="附带排盘文本的格式")
+    day_master_strength: Literal["strong", "weak", "neutral"] = Field("neutral", description="日主强弱")
+    flow_year_element: Optional[str] = Field(None, description="流年五行，默认按起卦年份计算")
+
+    model_config = ConfigDict(json_schema_extra={
+        "example": {
+            "params": [2, 2, 1, 2, 4, 2],
+            "date": "2019-12-25T00:20:00",
+            "title": "健康",
+            "render": "text"
+        }
+    })
+
+class CastBatchRequest(BaseModel):
+    items: List[CastRequest] = Field(..., min_length=1, max_length=MAX_BATCH_SIZE, description="起卦请求列表")
+
+# 响应模型
+class CastBatchResponse(BaseModel):
+    count: int
+    results: List[Dict[str, Any]]
+
+def _to_kwargs(request: CastRequest) -> Dict[str, Any]:
+    kwargs = request.model_dump()
+    if kwargs["date"] is None:
+        kwargs["date"] = clock.now()
+    elif kwargs["date"].tzinfo is not None:
+        # 引擎使用本地时间，带时区的时间先换算为本地时间
+        kwargs["date"] = kwargs["date"].astimezone().replace(tzinfo=None)
+    return kwargs
+
+@router.post("/cast", response_model=Dict[str, Any], summary="六爻起卦并分析")
+async def cast_gua(request: CastRequest):
+    """
+    六爻起卦，返回排盘与健康诊断的结构化结果
+
+    - **params**: 六爻参数（初爻到上爻），取值1-4
+    - **date**: 起卦时间（可选，默认为当前时间）
+    - **longitude** / **latitude**: 起卦地点经纬度（可选，默认北京）
+    - **title**: 标题（可选）
+    - **render**: 附带排盘文本的格式（可选，text或html）
+    """
+    try:
+        return respond(cast(**_to_kwargs(request)))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"六爻起卦时出错: {str(e)}")
+
+@router.post("/cast_batch", response_model=CastBatchResponse, summary="六爻批量起卦")
+async def cast_gua_batch(request: CastBatchRequest):
+    """
+    批量起卦，结果顺序与请求顺序一致
+
+    同一小时、相近经度的请求共享日课换算，批量较大时使用进程池并行计算。
+    """
+    try:
+        results = await run_in_threadpool(cast_batch, [_to_kwargs(item) for item in request.items])
+        return respond({"count": len(results), "results": results})
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"六爻批量起卦时出错: {str(e)}")
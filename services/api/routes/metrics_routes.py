@@ -0,0 +1,26 @@
+"""
+监控指标API路由
+
+以 Prometheus 文本格式导出各计算阶段的耗时直方图与错误数，以及命盘计算中记录的错误与警告次数
+"""
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from models import errors, timing
+
+# Prometheus 文本格式的内容类型
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# 创建路由
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/metrics", response_class=PlainTextResponse, summary="各计算阶段耗时指标")
+async def metrics():
+    """
+    Prometheus 格式的阶段耗时指标
+
+    计时关闭（CURECIPHER_TIMING=0）时阶段耗时只有指标说明，没有数据。
+    """
+    return PlainTextResponse(timing.render_metrics() + errors.render_metrics(), media_type=CONTENT_TYPE)
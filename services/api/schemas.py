@@ -0,0 +1,262 @@
+"""
+八字计算结果的响应模型
+
+与计算引擎（models.bazi.calculator / five_elements / shensha）返回的结构逐字段对应，
+FastAPI 按类型校验后由 pydantic-core 直接序列化，不必对 Dict[str, Any] 逐层做通用处理。
+引擎新增而模型尚未声明的字段原样保留（extra="allow"），不会从响应中丢失。
+"""
+
+from typing import Any, Dict, List, Optional, Union
+
+from pydantic import BaseModel, ConfigDict
+
+# 引擎输出中整数与小数都可能出现的数值（按原类型输出）
+Number = Union[int, float]
+
+
+class EngineModel(BaseModel):
+    """计算引擎输出的模型基类"""
+    model_config = ConfigDict(extra="allow")
+
+
+# ---- calculator.calculate_bazi ----
+
+class Pillars(EngineModel):
+    year: str
+    month: str
+    day: str
+    hour: str
+    day_master: str
+    day_master_element: str
+    formatted: str
+
+
+class PillarElements(EngineModel):
+    year: str
+    month: str
+    day: str
+    hour: str
+    percentages: Dict[str, Number]
+
+
+class DayMasterStrength(EngineModel):
+    status: str
+    en: str
+    es: str
+
+
+class YongShen(EngineModel):
+    element: str
+    en: str
+    es: str
+
+
+class CurrentLuck(EngineModel):
+    as_of: str
+    liunian: str
+    liunian_element: str
+    liuyue: str
+    liuyue_element: str
+
+
+class Dayun(EngineModel):
+    ganzhi: str
+    element: str
+    start_age: Number
+    end_age: Number
+
+
+class Xiaoyun(EngineModel):
+    ganzhi: str
+    element: str
+
+
+class Location(EngineModel):
+    city: Optional[str]
+    latitude: Number
+    longitude: Number
+
+
+class TrueSolarTime(EngineModel):
+    original: str
+    adjusted: str
+    diff_minutes: Number
+
+
+class Issue(EngineModel):
+    section: str
+    kind: str
+    message: str
+    severity: str
+
+
+class Issues(EngineModel):
+    errors: List[Issue]
+    warnings: List[Issue]
+    degraded: List[str]
+
+
+class BaziChart(EngineModel):
+    """calculator.calculate_bazi 的 result"""
+    bazi: Pillars
+    elements: PillarElements
+    day_master_strength: DayMasterStrength
+    yong_shen: YongShen
+    nayin: Dict[str, str]
+    current: CurrentLuck
+    dayun: Dayun
+    xiaoyun: Xiaoyun
+    shensha: List[Any]
+    liuyao: Dict[str, Any]
+    location: Location
+    true_solar_time: TrueSolarTime
+    issues: Issues
+
+
+# ---- five_elements.analyze_five_elements ----
+
+class BalanceAnalysis(EngineModel):
+    balance_state: str
+    description: str
+    std_deviation: Number
+    strongest: str
+    strongest_percentage: Number
+    weakest: str
+    weakest_percentage: Number
+
+
+class DayMasterAnalysis(EngineModel):
+    day_master: str
+    strength: Number
+    strength_state: str
+    advice: str
+    relationships: Dict[str, str]
+
+
+class RelatedElement(EngineModel):
+    element: str
+    strength: Number
+
+
+class ElementRelation(EngineModel):
+    percentage: Number
+    sheng_by: RelatedElement
+    sheng: RelatedElement
+    ke_by: RelatedElement
+    ke: RelatedElement
+
+
+class KeyRelation(EngineModel):
+    type: str
+    description: str
+    health_impact: str
+
+
+class RelationsAnalysis(EngineModel):
+    detailed_relations: Dict[str, ElementRelation]
+    key_relations: List[KeyRelation]
+
+
+class HealthRisk(EngineModel):
+    element: str
+    affected_systems: List[str]
+    diseases: List[str]
+    risk_type: str
+    description: str
+
+
+class HealthAdvice(EngineModel):
+    general_advice: str
+    seasonal_advice: str
+    health_risks: List[HealthRisk]
+    balance_recommendation: str
+    specific_recommendations: List[str]
+
+
+class RecommendedFlavor(EngineModel):
+    element: str
+    flavor: str
+    effect: str
+    nutrients: List[str]
+    reason: str
+
+
+class AvoidFlavor(EngineModel):
+    element: str
+    flavor: str
+    reason: str
+
+
+class Recipe(EngineModel):
+    name: str
+    ingredients: List[str]
+    effect: str
+
+
+class DietAdvice(EngineModel):
+    recommended_flavors: List[RecommendedFlavor]
+    avoid_flavors: List[AvoidFlavor]
+    seasonal_recipes: List[Recipe]
+    general_advice: str
+
+
+class Exercise(EngineModel):
+    element: str
+    exercise_types: List[str]
+    effect: str
+    reason: str
+
+
+class ExerciseAdvice(EngineModel):
+    recommended_exercises: List[Exercise]
+    general_advice: str
+    frequency_advice: str
+
+
+class ElementsAnalysis(EngineModel):
+    """five_elements.analyze_five_elements 的返回结果"""
+    element_counts: Dict[str, Number]
+    element_percentages: Dict[str, Number]
+    balance_analysis: BalanceAnalysis
+    day_master_analysis: DayMasterAnalysis
+    relations_analysis: RelationsAnalysis
+    health_advice: HealthAdvice
+    diet_advice: DietAdvice
+    exercise_advice: ExerciseAdvice
+
+
+# ---- shensha.analyze_shensha ----
+
+class ShenshaImpact(EngineModel):
+    name: str
+    description: str
+    zhi: List[str]
+    matched_yao: List[Dict[str, Any]]
+    health: List[str]
+    flow_year_effect: str
+    remedy: List[str]
+
+
+class God6Impact(EngineModel):
+    name: str
+    effect: str
+    health: str
+
+
+class ShenshaOverall(EngineModel):
+    dong_yao: List[Any]
+    bian_gua_effect: str
+    positive_count: int
+    negative_count: int
+    health_status: str
+
+
+class ShenshaAnalysis(EngineModel):
+    """shensha.analyze_shensha 的返回结果"""
+    positive_impacts: List[ShenshaImpact]
+    negative_impacts: List[ShenshaImpact]
+    health_advice: List[str]
+    god6_impacts: List[God6Impact]
+    overall_analysis: ShenshaOverall
+    dong_yao_health: List[Any]
+    dong_yao_remedies: List[Any]
@@ -0,0 +1,12 @@
+"""
+CureCipher 本地守护进程
+
+常驻进程保持已导入的计算模块与缓存，命令行工具通过 Unix socket
+（每行一个 JSON 请求 / 响应）调用，免去每次启动的导入与建表开销。
+
+启动: python -m services.daemon [--socket PATH]
+"""
+
+from .client import DaemonError, DaemonUnavailable, call, socket_path
+
+__all__ = ['DaemonError', 'DaemonUnavailable', 'call', 'socket_path']
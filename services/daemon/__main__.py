@@ -0,0 +1,25 @@
+"""
+启动守护进程
+
+$ python -m services.daemon [--socket PATH] [--no-warm-up]
+"""
+
+import argparse
+import logging
+import os
+
+from .server import serve
+
+
+def main():
+    parser = argparse.ArgumentParser(description='CureCipher 本地守护进程')
+    parser.add_argument('-s', '--socket', default=None, help='Unix socket 路径（默认取 CURECIPHER_SOCKET 环境变量）')
+    parser.add_argument('--no-warm-up', action='store_true', help='启动时不预热计算缓存')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=os.environ.get("CURECIPHER_LOG_LEVEL", "INFO").upper())
+    serve(args.socket, warm=not args.no_warm_up)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+守护进程客户端
+
+只依赖标准库，命令行工具导入本模块不会加载计算模块。
+"""
+
+import json
+import os
+import socket
+import tempfile
+
+# 默认 socket 路径可用环境变量 CURECIPHER_SOCKET 覆盖
+SOCKET_ENV = "CURECIPHER_SOCKET"
+
+DEFAULT_TIMEOUT = 30
+
+
+class DaemonUnavailable(ConnectionError):
+    """守护进程未运行或无法连接"""
+
+
+class DaemonError(RuntimeError):
+    """守护进程执行请求出错"""
+
+    def __init__(self, error):
+        self.type = error.get("type", "Error")
+        super().__init__(error.get("message", ""))
+
+
+def socket_path(path=None):
+    """
+    守护进程 socket 路径
+
+    :param path: 指定路径，默认取环境变量 CURECIPHER_SOCKET，
+                 否则为 $XDG_RUNTIME_DIR（或临时目录）下的 curecipher-<uid>.sock
+    :return: str
+    """
+    if path:
+        return path
+    if os.environ.get(SOCKET_ENV):
+        return os.environ[SOCKET_ENV]
+    base = os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    return os.path.join(base, f"curecipher-{os.getuid()}.sock")
+
+
+def call(op, params=None, path=None, timeout=DEFAULT_TIMEOUT):
+    """
+    向守护进程发送一次请求
+
+    :param op: 操作名，如 bazi.report / liuyao.cast / ping
+    :param params: 操作参数（可 JSON 序列化的 dict）
+    :param path: socket 路径，默认见 socket_path
+    :param timeout: 超时秒数
+    :return: 操作结果
+    :raises DaemonUnavailable: 守护进程未运行、无法连接、超时或连接中断
+    :raises DaemonError: 守护进程返回错误
+    """
+    try:
+        conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        conn.settimeout(timeout)
+        conn.connect(socket_path(path))
+    except (FileNotFoundError, ConnectionRefusedError) as e:
+        raise DaemonUnavailable(f"守护进程未运行: {socket_path(path)}") from e
+    except OSError as e:
+        # 无权限访问 socket、连接超时等，调用方同样回退到本地计算
+        raise DaemonUnavailable(f"无法连接守护进程 {socket_path(path)}: {e}") from e
+
+    try:
+        with conn, conn.makefile("rwb") as stream:
+            request = {"id": 1, "op": op, "params": params or {}}
+            stream.write(json.dumps(request, ensure_ascii=False).encode("utf-8") + b"\n")
+            stream.flush()
+            line = stream.readline()
+    except OSError as e:
+        # 超时（socket.timeout）、连接被重置等
+        raise DaemonUnavailable(f"与守护进程通信失败: {e}") from e
+    if not line:
+        raise DaemonUnavailable("守护进程关闭了连接")
+
+    response = json.loads(line)
+    if not response.get("ok"):
+        raise DaemonError(response.get("error") or {})
+    return response["result"]
@@ -0,0 +1,182 @@
+"""
+守护进程服务端
+
+Unix socket 上的行分隔 JSON 协议：
+    请求: {"id": ..., "op": "bazi.report", "params": {...}}
+    响应: {"id": ..., "ok": true, "result": ...}
+          {"id": ..., "ok": false, "error": {"type": ..., "message": ...}}
+同一连接可以连续发送多个请求，按顺序逐行响应。
+"""
+
+import datetime
+import json
+import logging
+import os
+import signal
+import socketserver
+import threading
+import time
+
+from models import clock
+from models.bazi.bazi_calculator import calculate_bazi, generate_bazi_report
+from models.liuyao.diagnosis import cast_report
+
+from .client import DaemonUnavailable, call, socket_path
+
+logger = logging.getLogger(__name__)
+
+# 操作名 -> 处理函数
+HANDLERS = {}
+
+# 运行统计
+STATS = {"started": time.time(), "requests": 0, "errors": 0}
+_stats_lock = threading.Lock()
+
+
+def handler(op):
+    """注册操作处理函数"""
+    def register(func):
+        HANDLERS[op] = func
+        return func
+    return register
+
+
+@handler("ping")
+def ping(params):
+    """守护进程状态"""
+    return {
+        "pid": os.getpid(),
+        "uptime": round(time.time() - STATS["started"], 3),
+        "requests": STATS["requests"],
+        "errors": STATS["errors"],
+        "ops": sorted(HANDLERS),
+    }
+
+
+@handler("bazi.report")
+def bazi_report(params):
+    """
+    八字报告（与 bazi_cli.py 单次计算的 JSON 输出相同）
+
+    :param params: year / month / day / hour / gender / city
+    """
+    bazi_result = calculate_bazi(
+        int(params["year"]), int(params["month"]), int(params["day"]), int(params["hour"]),
+        params.get("gender", "male"), params.get("city")
+    )
+    return generate_bazi_report(bazi_result)
+
+
+@handler("liuyao.cast")
+def liuyao_cast(params):
+    """
+    六爻排盘与健康分析（与 python -m models.liuyao 的输出内容相同）
+
+    :param params: params（六爻参数）/ gender / date（YYYY-MM-DD hh:mm，默认当前时间）/ title / guaci / verbose
+    """
+    date = params.get("date")
+    return cast_report(
+        [int(x) for x in params["params"]],
+        datetime.datetime.strptime(date, '%Y-%m-%d %H:%M') if date else clock.now(),
+        gender=params.get("gender") or None,
+        title=params.get("title") or None,
+        guaci=bool(params.get("guaci")),
+        verbose=int(params.get("verbose", 0))
+    )
+
+
+def dispatch(request):
+    """
+    执行一个请求
+
+    :param request: 请求 dict
+    :return: 响应 dict
+    """
+    request_id = request.get("id") if isinstance(request, dict) else None
+    try:
+        if not isinstance(request, dict) or request.get("op") not in HANDLERS:
+            raise ValueError(f"未知操作: {request.get('op') if isinstance(request, dict) else request!r}")
+        result = HANDLERS[request["op"]](request.get("params") or {})
+        response = {"id": request_id, "ok": True, "result": result}
+    except Exception as e:
+        logger.warning(f"守护进程请求失败: {e}")
+        with _stats_lock:
+            STATS["errors"] += 1
+        response = {"id": request_id, "ok": False, "error": {"type": type(e).__name__, "message": str(e)}}
+    with _stats_lock:
+        STATS["requests"] += 1
+    return response
+
+
+class LineHandler(socketserver.StreamRequestHandler):
+    """逐行读取请求并写回响应"""
+
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+            except ValueError as e:
+                response = {"id": None, "ok": False, "error": {"type": "ValueError", "message": f"请求不是合法的 JSON: {e}"}}
+            else:
+                response = dispatch(request)
+            self.wfile.write(json.dumps(response, ensure_ascii=False, default=str).encode("utf-8") + b"\n")
+            self.wfile.flush()
+
+
+class DaemonServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def warm_up():
+    """预先计算一次，填充节气表、六十甲子表与模板缓存"""
+    bazi_report({"year": 1990, "month": 5, "day": 15, "hour": 12})
+    liuyao_cast({"params": [1, 2, 3, 4, 1, 2], "date": "2024-03-15 10:30"})
+
+
+def create_server(path=None):
+    """
+    创建守护进程服务（不开始监听循环）
+
+    :param path: socket 路径
+    :return: DaemonServer
+    :raises RuntimeError: 该路径上已有守护进程在运行
+    """
+    path = socket_path(path)
+    if os.path.exists(path):
+        try:
+            call("ping", path=path, timeout=1)
+        except (DaemonUnavailable, OSError):
+            # 上次异常退出遗留的 socket 文件
+            os.unlink(path)
+        else:
+            raise RuntimeError(f"守护进程已在运行: {path}")
+    server = DaemonServer(path, LineHandler)
+    os.chmod(path, 0o600)
+    return server
+
+
+def serve(path=None, warm=True):
+    """
+    启动守护进程并阻塞，收到 SIGTERM / SIGINT 后退出并删除 socket 文件
+
+    :param path: socket 路径
+    :param warm: 是否预热
+    """
+    server = create_server(path)
+    if warm:
+        warm_up()
+
+    def stop(signum, frame):
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    logger.info(f"守护进程已启动: {server.server_address} (pid {os.getpid()})")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        if os.path.exists(server.server_address):
+            os.unlink(server.server_address)
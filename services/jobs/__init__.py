@@ -0,0 +1,19 @@
+"""
+CureCipher 后台任务
+
+耗时的完整报告（大运流年、HTML 命盘、饮食运动调养）由 API 提交到任务队列后立即返回
+任务 id，由常驻的 worker 进程执行，客户端轮询或等待结果，API 的响应时间与报告大小无关。
+
+启动 worker: python -m services.jobs [--broker URL] [--processes N]
+"""
+
+from .broker import (
+    DONE, FAILED, QUEUED, RUNNING, Broker, Job, RedisBroker, SQLiteBroker, default_url, open_broker
+)
+from .tasks import TASKS, task
+from .worker import Worker, serve
+
+__all__ = [
+    'DONE', 'FAILED', 'QUEUED', 'RUNNING', 'Broker', 'Job', 'RedisBroker', 'SQLiteBroker',
+    'default_url', 'open_broker', 'TASKS', 'task', 'Worker', 'serve',
+]
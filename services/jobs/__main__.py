@@ -0,0 +1,28 @@
+"""
+启动任务 worker
+
+$ python -m services.jobs [--broker URL] [--processes N] [--no-warm-up]
+"""
+
+import argparse
+import logging
+import os
+
+from .worker import DEFAULT_LEASE, serve
+
+
+def main():
+    parser = argparse.ArgumentParser(description='CureCipher 后台任务 worker')
+    parser.add_argument('-b', '--broker', default=None,
+                        help='任务队列地址，sqlite:///PATH 或 redis://HOST:PORT/DB（默认取 CURECIPHER_JOB_BROKER 环境变量）')
+    parser.add_argument('-p', '--processes', type=int, default=None, help='worker 进程数（默认为 CPU 核数）')
+    parser.add_argument('--lease', type=float, default=DEFAULT_LEASE, help='任务租约秒数，超时未完成的任务会被重新执行')
+    parser.add_argument('--no-warm-up', action='store_true', help='启动时不预热计算缓存')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=os.environ.get("CURECIPHER_LOG_LEVEL", "INFO").upper())
+    serve(args.broker, processes=args.processes, warm=not args.no_warm_up, lease=args.lease)
+
+
+if __name__ == "__main__":
+    main()
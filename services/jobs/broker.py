@@ -0,0 +1,480 @@
+"""
+任务队列的存储（broker）
+
+任务状态: queued（排队，含等待重试）→ running（已被 worker 领取）→ done / failed。
+worker 领取任务时获得租约（lease），租约到期仍未完成（worker 异常退出）的任务可被重新领取；
+完成与失败只对当前领取者（按 attempts 区分）生效，过期领取者的写入被忽略。
+结果保存 result_ttl 秒后过期，过期任务视为不存在，由 purge 清理。
+
+两种实现：
+    SQLiteBroker  本地 SQLite 文件，同机多进程共享（测试与单机部署）
+    RedisBroker   Redis（需要安装 redis），多机部署
+"""
+
+import contextlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from typing import Any, Optional
+from urllib.parse import urlparse
+
+# 默认 broker 地址可用环境变量 CURECIPHER_JOB_BROKER 覆盖
+BROKER_ENV = "CURECIPHER_JOB_BROKER"
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+# 结果默认保留时间（秒）
+DEFAULT_RESULT_TTL = 3600
+
+# 默认最多执行次数（含首次）
+DEFAULT_MAX_ATTEMPTS = 3
+
+
+@dataclass
+class Job:
+    """一个任务"""
+    id: str
+    op: str
+    params: dict
+    status: str = QUEUED
+    attempts: int = 0
+    max_attempts: int = DEFAULT_MAX_ATTEMPTS
+    result: Any = None
+    error: Optional[dict] = None
+    created: float = 0.0
+    updated: float = 0.0
+    # 排队任务最早可领取的时间 / 运行中任务的租约到期时间
+    available_at: float = 0.0
+    # 结果过期时间，完成或失败后设置
+    expires_at: Optional[float] = None
+    worker: Optional[str] = field(default=None, repr=False)
+
+    @property
+    def finished(self):
+        return self.status in (DONE, FAILED)
+
+    def to_dict(self, with_result=False):
+        """
+        API 返回的任务状态
+
+        :param with_result: 是否包含结果
+        :return: dict
+        """
+        data = {
+            "job_id": self.id,
+            "op": self.op,
+            "status": self.status,
+            "attempts": self.attempts,
+            "max_attempts": self.max_attempts,
+            "error": self.error,
+            "created": self.created,
+            "updated": self.updated,
+            "expires_at": self.expires_at,
+        }
+        if with_result:
+            data["result"] = self.result
+        return data
+
+
+def _error(exc):
+    return {"type": type(exc).__name__, "message": str(exc)} if isinstance(exc, BaseException) else exc
+
+
+class Broker:
+    """broker 接口，时间取自 clock（测试可替换）"""
+
+    def __init__(self, result_ttl=DEFAULT_RESULT_TTL, clock=time.time):
+        self.result_ttl = result_ttl
+        self.clock = clock
+
+    def submit(self, op, params, max_attempts=DEFAULT_MAX_ATTEMPTS):
+        """
+        提交任务
+
+        :param op: 操作名，见 tasks.TASKS
+        :param params: 操作参数（可 JSON 序列化的 dict）
+        :param max_attempts: 最多执行次数
+        :return: Job
+        """
+        now = self.clock()
+        job = Job(id=uuid.uuid4().hex, op=op, params=params, max_attempts=max(1, int(max_attempts)),
+                  created=now, updated=now, available_at=now)
+        self._insert(job)
+        return job
+
+    def get(self, job_id):
+        """
+        查询任务
+
+        :param job_id: 任务 id
+        :return: Job，不存在或结果已过期时为 None
+        """
+        job = self._load(job_id)
+        if job is None or (job.expires_at is not None and job.expires_at <= self.clock()):
+            return None
+        return job
+
+    def claim(self, worker, lease):
+        """
+        领取一个可执行的任务（排队且已到可领取时间，或租约已过期），attempts 加一
+
+        :param worker: worker 名称
+        :param lease: 租约秒数
+        :return: Job，没有可执行的任务时为 None
+        """
+        raise NotImplementedError
+
+    def complete(self, job, result):
+        """
+        记录任务结果
+
+        :param job: claim 返回的 Job
+        :param result: 可 JSON 序列化的结果
+        :return: bool，领取已失效（租约过期后被重新领取）时为 False
+        """
+        return self._finish(job, DONE, result=result)
+
+    def fail(self, job, error, permanent=False):
+        """
+        任务失败，不再重试
+
+        :param job: claim 返回的 Job
+        :param error: 异常或 {"type", "message"}
+        :param permanent: 是否为输入错误（错误信息中记为 permanent）
+        :return: bool
+        """
+        error = _error(error)
+        if permanent:
+            error = dict(error, permanent=True)
+        return self._finish(job, FAILED, error=error)
+
+    def retry(self, job, error, delay):
+        """
+        任务失败，delay 秒后重新排队
+
+        :param job: claim 返回的 Job
+        :param error: 异常或 {"type", "message"}
+        :param delay: 重试前等待的秒数
+        :return: bool
+        """
+        now = self.clock()
+        return self._update(job, status=QUEUED, error=_error(error), updated=now, available_at=now + delay, worker=None)
+
+    def purge(self):
+        """
+        删除结果已过期的任务；租约过期且次数用尽的任务记为失败
+
+        :return: 删除的任务数
+        """
+        raise NotImplementedError
+
+    def stats(self):
+        """
+        各状态的任务数
+
+        :return: dict
+        """
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def _finish(self, job, status, result=None, error=None):
+        now = self.clock()
+        return self._update(job, status=status, result=result, error=error, updated=now,
+                            expires_at=now + self.result_ttl, worker=None)
+
+    def _insert(self, job):
+        raise NotImplementedError
+
+    def _load(self, job_id):
+        raise NotImplementedError
+
+    def _update(self, job, **changes):
+        """当前领取仍有效（状态为 running 且 attempts 未变）时更新任务"""
+        raise NotImplementedError
+
+
+class SQLiteBroker(Broker):
+    """
+    SQLite 任务队列
+
+    每个线程（进程）使用各自的连接，可在多线程、多进程（同一文件）间共享；领取任务在
+    BEGIN IMMEDIATE 事务中完成，同一任务不会被两个 worker 同时领取。
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS jobs (
+            id TEXT PRIMARY KEY,
+            op TEXT NOT NULL,
+            params TEXT NOT NULL,
+            status TEXT NOT NULL,
+            attempts INTEGER NOT NULL,
+            max_attempts INTEGER NOT NULL,
+            result TEXT,
+            error TEXT,
+            created REAL NOT NULL,
+            updated REAL NOT NULL,
+            available_at REAL NOT NULL,
+            expires_at REAL,
+            worker TEXT
+        );
+        CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (status, available_at);
+        CREATE INDEX IF NOT EXISTS jobs_expires ON jobs (expires_at);
+    """
+
+    COLUMNS = ("id", "op", "params", "status", "attempts", "max_attempts", "result", "error",
+               "created", "updated", "available_at", "expires_at", "worker")
+
+    # 以 JSON 文本保存的字段
+    JSON_COLUMNS = ("params", "result", "error")
+
+    def __init__(self, path, result_ttl=DEFAULT_RESULT_TTL, clock=time.time):
+        super().__init__(result_ttl, clock)
+        self.path = str(path)
+        self._local = threading.local()
+        self._connections = []
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(self.SCHEMA)
+
+    @contextlib.contextmanager
+    def _connect(self):
+        """当前线程的连接（fork 出的子进程重新连接）"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            # WAL 模式下 NORMAL 不会损坏数据库，只在断电时可能丢失最近提交的任务，省去每次提交的 fsync
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn, self._local.pid = conn, os.getpid()
+            self._connections.append(conn)
+        yield conn
+
+    def close(self):
+        for conn in self._connections:
+            conn.close()
+        self._connections.clear()
+        self._local = threading.local()
+
+    def _row(self, job):
+        data = asdict(job)
+        for column in self.JSON_COLUMNS:
+            data[column] = json.dumps(data[column], ensure_ascii=False, default=str)
+        return data
+
+    def _job(self, row):
+        data = dict(row)
+        for column in self.JSON_COLUMNS:
+            data[column] = json.loads(data[column]) if data[column] is not None else None
+        return Job(**data)
+
+    def _insert(self, job):
+        columns = ", ".join(self.COLUMNS)
+        values = ", ".join(f":{column}" for column in self.COLUMNS)
+        with self._connect() as conn:
+            conn.execute(f"INSERT INTO jobs ({columns}) VALUES ({values})", self._row(job))
+
+    def _load(self, job_id):
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._job(row) if row is not None else None
+
+    def _update(self, job, **changes):
+        for column in self.JSON_COLUMNS:
+            if column in changes:
+                changes[column] = json.dumps(changes[column], ensure_ascii=False, default=str)
+        assignments = ", ".join(f"{column} = :{column}" for column in changes)
+        with self._connect() as conn:
+            cursor = conn.execute(
+                f"UPDATE jobs SET {assignments} WHERE id = :job_id AND status = :running AND attempts = :attempts",
+                dict(changes, job_id=job.id, running=RUNNING, attempts=job.attempts)
+            )
+        return cursor.rowcount == 1
+
+    def claim(self, worker, lease):
+        now = self.clock()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "SELECT * FROM jobs WHERE status IN (?, ?) AND available_at <= ? AND attempts < max_attempts "
+                    "ORDER BY available_at, created LIMIT 1",
+                    (QUEUED, RUNNING, now)
+                ).fetchone()
+                if row is None:
+                    conn.execute("COMMIT")
+                    return None
+                job = self._job(row)
+                job.status, job.attempts, job.updated, job.available_at, job.worker = (
+                    RUNNING, job.attempts + 1, now, now + lease, worker
+                )
+                conn.execute(
+                    "UPDATE jobs SET status = ?, attempts = ?, updated = ?, available_at = ?, worker = ? WHERE id = ?",
+                    (job.status, job.attempts, job.updated, job.available_at, job.worker, job.id)
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return job
+
+    def purge(self):
+        now = self.clock()
+        error = json.dumps({"type": "WorkerLost", "message": "执行任务的 worker 未在租约内完成"}, ensure_ascii=False)
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, updated = ?, expires_at = ?, worker = NULL "
+                "WHERE status = ? AND available_at <= ? AND attempts >= max_attempts",
+                (FAILED, error, now, now + self.result_ttl, RUNNING, now)
+            )
+            return conn.execute("DELETE FROM jobs WHERE expires_at <= ?", (now,)).rowcount
+
+    def stats(self):
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT status, COUNT(*) FROM jobs WHERE expires_at IS NULL OR expires_at > ? GROUP BY status",
+                (self.clock(),)
+            ).fetchall()
+        counts = dict.fromkeys((QUEUED, RUNNING, DONE, FAILED), 0)
+        counts.update(rows)
+        return counts
+
+
+class RedisBroker(Broker):
+    """
+    Redis 任务队列
+
+    键（prefix 默认 curecipher:jobs）:
+        {prefix}:job:{id}   任务 JSON，完成或失败后按 result_ttl 过期
+        {prefix}:queue      可领取的任务 id（列表）
+        {prefix}:delayed    等待重试的任务 id，分数为可领取时间（有序集合）
+        {prefix}:running    运行中的任务 id，分数为租约到期时间（有序集合）
+    """
+
+    def __init__(self, url, result_ttl=DEFAULT_RESULT_TTL, clock=time.time, prefix="curecipher:jobs"):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("使用 Redis 任务队列需要安装 redis（pip install redis）") from e
+        super().__init__(result_ttl, clock)
+        self.redis = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def _key(self, name):
+        return f"{self.prefix}:{name}"
+
+    def _save(self, job, pipe=None):
+        ttl = max(1, int(job.expires_at - self.clock())) if job.expires_at is not None else None
+        (pipe or self.redis).set(self._key(f"job:{job.id}"), json.dumps(asdict(job), ensure_ascii=False, default=str),
+                                 ex=ttl)
+
+    def _insert(self, job):
+        pipe = self.redis.pipeline()
+        self._save(job, pipe)
+        pipe.rpush(self._key("queue"), job.id)
+        pipe.execute()
+
+    def _load(self, job_id):
+        data = self.redis.get(self._key(f"job:{job_id}"))
+        return Job(**json.loads(data)) if data is not None else None
+
+    def _requeue(self, name, now):
+        """把到期的等待重试任务、租约过期的运行中任务移回队列"""
+        for job_id in self.redis.zrangebyscore(self._key(name), "-inf", now):
+            # ZREM 成功的进程负责移回，避免重复入队
+            if self.redis.zrem(self._key(name), job_id):
+                self.redis.rpush(self._key("queue"), job_id)
+
+    def claim(self, worker, lease):
+        now = self.clock()
+        self._requeue("delayed", now)
+        self._requeue("running", now)
+        while True:
+            job_id = self.redis.lpop(self._key("queue"))
+            if job_id is None:
+                return None
+            job = self._load(job_id.decode("utf-8"))
+            if job is None or job.finished:
+                continue
+            if job.attempts >= job.max_attempts:
+                job.status, job.error = FAILED, {"type": "WorkerLost", "message": "执行任务的 worker 未在租约内完成"}
+                job.updated, job.expires_at, job.worker = now, now + self.result_ttl, None
+                self._save(job)
+                continue
+            job.status, job.attempts, job.updated, job.available_at, job.worker = (
+                RUNNING, job.attempts + 1, now, now + lease, worker
+            )
+            pipe = self.redis.pipeline()
+            self._save(job, pipe)
+            pipe.zadd(self._key("running"), {job.id: job.available_at})
+            pipe.execute()
+            return job
+
+    def _update(self, job, **changes):
+        current = self._load(job.id)
+        if current is None or current.status != RUNNING or current.attempts != job.attempts:
+            return False
+        for name, value in changes.items():
+            setattr(current, name, value)
+        pipe = self.redis.pipeline()
+        self._save(current, pipe)
+        pipe.zrem(self._key("running"), job.id)
+        if current.status == QUEUED:
+            pipe.zadd(self._key("delayed"), {job.id: current.available_at})
+        pipe.execute()
+        return True
+
+    def purge(self):
+        # 任务键按 TTL 自动过期，这里只处理租约过期的任务
+        self._requeue("running", self.clock())
+        return 0
+
+    def stats(self):
+        counts = dict.fromkeys((QUEUED, RUNNING, DONE, FAILED), 0)
+        for key in self.redis.scan_iter(self._key("job:*")):
+            job = self._load(key.decode("utf-8").rsplit(":", 1)[1])
+            if job is not None:
+                counts[job.status] += 1
+        return counts
+
+    def close(self):
+        self.redis.close()
+
+
+def default_url():
+    """
+    默认 broker 地址：环境变量 CURECIPHER_JOB_BROKER，否则为临时目录下的 SQLite 文件
+
+    :return: str
+    """
+    if os.environ.get(BROKER_ENV):
+        return os.environ[BROKER_ENV]
+    return "sqlite:///" + os.path.join(tempfile.gettempdir(), f"curecipher-jobs-{os.getuid()}.db")
+
+
+def open_broker(url=None, result_ttl=DEFAULT_RESULT_TTL):
+    """
+    按地址打开 broker
+
+    :param url: sqlite:///相对路径、sqlite:////绝对路径（与 SQLAlchemy 相同）或 redis://host:port/db
+                （如 config.settings.REDIS_URL），默认见 default_url
+    :param result_ttl: 结果保留秒数
+    :return: Broker
+    :raises ValueError: 不支持的地址
+    """
+    url = url or default_url()
+    scheme = urlparse(url).scheme
+    if scheme == "sqlite" and url.startswith("sqlite:///") and len(url) > len("sqlite:///"):
+        return SQLiteBroker(url[len("sqlite:///"):], result_ttl=result_ttl)
+    if scheme in ("redis", "rediss", "unix"):
+        return RedisBroker(url, result_ttl=result_ttl)
+    raise ValueError(f"不支持的任务队列地址: {url}")
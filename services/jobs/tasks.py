@@ -0,0 +1,69 @@
+"""
+任务处理函数
+
+与守护进程的 HANDLERS 相同，按操作名注册；参数与结果均可 JSON 序列化。
+"""
+
+import datetime
+
+from models.bazi import bazi_calculator
+from models.bazi.calculator import calculate_bazi
+from models.bazi.five_elements import analyze_five_elements
+from models.bazi.report import MEDIA_TYPES, stream_report
+
+# 操作名 -> 处理函数
+TASKS = {}
+
+# 由输入决定、重试也不会成功的错误，直接记为失败
+PERMANENT_ERRORS = (ValueError, KeyError, TypeError)
+
+
+def task(op):
+    """注册任务处理函数"""
+    def register(func):
+        TASKS[op] = func
+        return func
+    return register
+
+
+def _chart(result):
+    """取出计算结果，整体计算失败时抛出异常（出生信息无效为 ValueError，不重试）"""
+    if isinstance(result, dict) and 'error' in result:
+        error_type = ValueError if result.get('error_type') == 'InvalidBirthData' else RuntimeError
+        raise error_type(result.get('message', result['error']))
+    return result.get('result', result) if isinstance(result, dict) else result
+
+
+@task("bazi.report")
+def bazi_report(params):
+    """
+    完整八字报告：命盘网格、命盘分析、大运评分、流年流月与饮食运动调养
+
+    :param params: year / month / day / hour / gender / city / format（text/markdown/html）/
+                   locale / as_of（YYYY-MM-DD，流年与季节建议的参考日期）/ timeline
+    :return: {"format", "media_type", "content"}
+    """
+    format = params.get("format", "text")
+    if format not in MEDIA_TYPES:
+        raise ValueError(f"不支持的报告格式: {format}")
+    as_of = datetime.date.fromisoformat(params["as_of"]) if params.get("as_of") else None
+    birth = (int(params["year"]), int(params["month"]), int(params["day"]), int(params["hour"]),
+             params.get("gender", "male"))
+    city = params.get("city")
+    locale = params.get("locale", "zh")
+
+    # 两份命盘使用同一出生地点（未指定时均按北京经纬度），报告与调养建议保持一致
+    bazi_result = _chart(bazi_calculator.calculate_bazi(*birth, city=city))
+    chart = _chart(calculate_bazi(*birth, city=city, as_of=as_of))
+    health = analyze_five_elements(chart, locale=locale, as_of=as_of)
+    content = "".join(stream_report(
+        bazi_result, format=format, as_of=as_of, timeline=bool(params.get("timeline", True)),
+        locale=locale, health=health
+    ))
+    return {"format": format, "media_type": MEDIA_TYPES[format], "content": content}
+
+
+def warm_up():
+    """预先执行一次，填充节气表、六十甲子表、模板与报告缓存"""
+    for format in MEDIA_TYPES:
+        bazi_report({"year": 1990, "month": 5, "day": 15, "hour": 12, "format": format})
@@ -0,0 +1,153 @@
+"""
+任务执行进程
+
+每个 worker 进程启动时预热一次计算缓存，之后常驻并循环领取任务，报告生成的耗时
+不再占用 API 进程；失败的任务按指数退避重试，输入错误（PERMANENT_ERRORS）不重试。
+"""
+
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+import time
+
+from .broker import open_broker
+from .tasks import PERMANENT_ERRORS, TASKS, warm_up
+
+logger = logging.getLogger(__name__)
+
+# 租约秒数：超过该时间未完成的任务视为 worker 已退出，可被重新领取
+DEFAULT_LEASE = 300
+
+# 队列为空时的轮询间隔（秒）
+DEFAULT_POLL_INTERVAL = 0.5
+
+# 首次重试前等待的秒数，之后每次加倍
+DEFAULT_RETRY_DELAY = 1.0
+
+# 清理过期任务的间隔（秒）
+PURGE_INTERVAL = 60
+
+
+class Worker:
+    """循环领取并执行任务"""
+
+    def __init__(self, broker, tasks=None, name=None, lease=DEFAULT_LEASE,
+                 poll_interval=DEFAULT_POLL_INTERVAL, retry_delay=DEFAULT_RETRY_DELAY):
+        self.broker = broker
+        self.tasks = TASKS if tasks is None else tasks
+        self.name = name or f"{socket.gethostname()}:{os.getpid()}"
+        self.lease = lease
+        self.poll_interval = poll_interval
+        self.retry_delay = retry_delay
+        self.stats = {"done": 0, "failed": 0, "retried": 0}
+
+    def run_once(self):
+        """
+        领取并执行一个任务
+
+        :return: 执行的 Job，没有可执行的任务时为 None
+        """
+        job = self.broker.claim(self.name, self.lease)
+        if job is None:
+            return None
+        try:
+            handler = self.tasks.get(job.op)
+            if handler is None:
+                raise ValueError(f"未知操作: {job.op}")
+            result = handler(job.params)
+        except Exception as e:
+            permanent = isinstance(e, PERMANENT_ERRORS)
+            if permanent or job.attempts >= job.max_attempts:
+                logger.warning(f"任务 {job.id}（{job.op}）失败: {e}")
+                self.broker.fail(job, e, permanent=permanent)
+                self.stats["failed"] += 1
+            else:
+                delay = self.retry_delay * 2 ** (job.attempts - 1)
+                logger.info(f"任务 {job.id}（{job.op}）第 {job.attempts} 次执行失败，{delay:g} 秒后重试: {e}")
+                self.broker.retry(job, e, delay)
+                self.stats["retried"] += 1
+        else:
+            if not self.broker.complete(job, result):
+                logger.warning(f"任务 {job.id} 的租约已过期，结果被丢弃")
+            self.stats["done"] += 1
+        return job
+
+    def run(self, stop=None):
+        """
+        循环执行任务，直到 stop 被设置
+
+        :param stop: 停止标志（threading.Event 或提供 is_set / wait 的对象），默认不停止
+        """
+        stop = stop or threading.Event()
+        purged = 0.0
+        while not stop.is_set():
+            now = self.broker.clock()
+            if now - purged >= PURGE_INTERVAL:
+                self.broker.purge()
+                purged = now
+            if self.run_once() is None:
+                stop.wait(self.poll_interval)
+
+
+class _StopFlag:
+    """由信号处理函数设置的停止标志（处理函数中只赋值，不获取锁）"""
+
+    def __init__(self):
+        self.stopped = False
+
+    def set(self, *args):
+        self.stopped = True
+
+    def is_set(self):
+        return self.stopped
+
+    def wait(self, timeout):
+        time.sleep(timeout)
+
+
+def _worker_main(url, warm, options):
+    # 收到 SIGTERM 后完成当前任务再退出；Ctrl+C 由主进程转为 SIGTERM
+    stop = _StopFlag()
+    signal.signal(signal.SIGTERM, stop.set)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    if warm:
+        warm_up()
+    broker = open_broker(url)
+    try:
+        Worker(broker, **options).run(stop)
+    finally:
+        broker.close()
+
+
+def serve(url=None, processes=None, warm=True, **options):
+    """
+    启动 worker 进程并阻塞，收到 SIGTERM / SIGINT 后等待各进程完成当前任务再退出
+
+    :param url: broker 地址，见 broker.open_broker
+    :param processes: worker 进程数，默认为 CPU 核数
+    :param warm: 各进程是否预热
+    :param options: 传给 Worker 的参数（lease / poll_interval / retry_delay）
+    """
+    processes = processes or os.cpu_count() or 1
+    # 先在主进程中建表，避免各进程同时初始化
+    open_broker(url).close()
+    workers = [
+        multiprocessing.Process(target=_worker_main, args=(url, warm, options), name=f"curecipher-worker-{i}")
+        for i in range(processes)
+    ]
+    for process in workers:
+        process.start()
+
+    def shutdown(signum, frame):
+        for process in workers:
+            if process.pid is not None and process.exitcode is None:
+                os.kill(process.pid, signal.SIGTERM)
+
+    signal.signal(signal.SIGTERM, shutdown)
+    signal.signal(signal.SIGINT, shutdown)
+    logger.info(f"已启动 {processes} 个 worker 进程 (pid {os.getpid()})")
+    for process in workers:
+        process.join()
@@ -0,0 +1,113 @@
+"""
+守护进程集成测试
+"""
+import json
+import os
+import socket
+import sys
+import threading
+
+import pytest
+
+# 确保可以导入项目模块
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from models.bazi.bazi_calculator import calculate_bazi, generate_bazi_report
+from services.daemon import DaemonError, DaemonUnavailable, call
+from services.daemon.server import create_server
+
+
+@pytest.fixture
+def daemon(tmp_path):
+    """在后台线程中运行守护进程，返回 socket 路径"""
+    path = str(tmp_path / "d.sock")
+    server = create_server(path)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield path
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+class TestDaemon:
+    def test_ping(self, daemon):
+        """测试守护进程状态"""
+        result = call("ping", path=daemon)
+        assert result["pid"] == os.getpid()
+        assert {"bazi.report", "liuyao.cast"} <= set(result["ops"])
+
+    def test_bazi_report_matches_local(self, daemon):
+        """测试守护进程计算的八字报告与本地计算一致"""
+        params = {"year": 1990, "month": 5, "day": 15, "hour": 12, "gender": "male", "city": None}
+        remote = call("bazi.report", params, path=daemon)
+        local = generate_bazi_report(calculate_bazi(1990, 5, 15, 12, "male", None))
+        assert remote == json.loads(json.dumps(local, ensure_ascii=False, default=str))
+
+    def test_liuyao_cast(self, daemon):
+        """测试六爻排盘"""
+        result = call("liuyao.cast", {"params": [1, 2, 3, 4, 1, 2], "date": "2024-03-15 10:30"}, path=daemon)
+        assert "2024年03月15日" in result["render"]
+        assert result["gua_name"]
+
+    def test_errors(self, daemon):
+        """测试未知操作与计算出错时返回错误"""
+        with pytest.raises(DaemonError) as error:
+            call("unknown", path=daemon)
+        assert error.value.type == "ValueError"
+
+        with pytest.raises(DaemonError):
+            call("bazi.report", {"year": 1990}, path=daemon)
+
+    def test_multiple_requests_per_connection(self, daemon):
+        """测试同一连接上逐行请求、逐行响应"""
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+            conn.connect(daemon)
+            stream = conn.makefile("rwb")
+            stream.write(b'{"id": 1, "op": "ping"}\nnot json\n{"id": 3, "op": "ping"}\n')
+            stream.flush()
+            responses = [json.loads(stream.readline()) for _ in range(3)]
+        assert [(r["id"], r["ok"]) for r in responses] == [(1, True), (None, False), (3, True)]
+
+    def test_unavailable(self, tmp_path):
+        """测试守护进程未运行"""
+        with pytest.raises(DaemonUnavailable):
+            call("ping", path=str(tmp_path / "missing.sock"))
+
+    def test_unresponsive_daemon(self, tmp_path):
+        """测试守护进程超时不响应或重置连接时视为不可用"""
+        path = str(tmp_path / "hung.sock")
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.bind(path)
+            sock.listen(1)
+            with pytest.raises(DaemonUnavailable):
+                call("ping", path=path, timeout=0.2)
+
+        def reset(sock):
+            conn, _ = sock.accept()
+            conn.recv(1024)
+            conn.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, b"\x01\0\0\0\0\0\0\0")
+            conn.close()
+
+        path = str(tmp_path / "reset.sock")
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.bind(path)
+            sock.listen(1)
+            thread = threading.Thread(target=reset, args=(sock,))
+            thread.start()
+            with pytest.raises(DaemonUnavailable):
+                call("ping", path=path, timeout=5)
+            thread.join()
+
+    def test_stale_socket_and_running_daemon(self, daemon, tmp_path):
+        """测试清理遗留的 socket 文件，且不抢占正在运行的守护进程"""
+        with pytest.raises(RuntimeError):
+            create_server(daemon)
+
+        stale = str(tmp_path / "stale.sock")
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.bind(stale)
+        server = create_server(stale)
+        server.server_close()
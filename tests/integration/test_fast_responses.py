@@ -0,0 +1,99 @@
+"""
+响应序列化集成测试：类型化响应模型、orjson 渲染与原样模式
+"""
+import datetime
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from models.frozen import freeze
+from services.api import create_app, responses
+from services.api.routes import api_router
+
+BAZI_REQUEST = {"birth_year": 1977, "birth_month": 2, "birth_day": 25, "birth_hour": 20, "gender": "male"}
+HEALTH_QUERY = dict(BAZI_REQUEST, locale="en")
+CAST_REQUEST = {"params": [2, 2, 1, 2, 4, 2], "date": "2024-03-15T10:30:00", "render": "text"}
+
+ROUTES = [
+    ("POST", "/api/bazi/calculate", {"json": BAZI_REQUEST}),
+    ("POST", "/api/bazi/summary", {"json": BAZI_REQUEST}),
+    ("GET", "/api/bazi/health_advice", {"params": HEALTH_QUERY}),
+    ("POST", "/api/liuyao/cast", {"json": CAST_REQUEST}),
+    ("POST", "/api/liuyao/cast_batch", {"json": {"items": [CAST_REQUEST] * 3}}),
+]
+
+
+@pytest.fixture(scope="module")
+def client():
+    app = create_app()
+    app.include_router(api_router)
+    return TestClient(app)
+
+
+@pytest.fixture
+def raw_mode():
+    responses.enable_raw(True)
+    yield
+    responses.enable_raw(False)
+
+
+class TestFastResponses:
+    @pytest.mark.parametrize("method, url, kwargs", ROUTES)
+    def test_raw_mode_matches_validated(self, client, method, url, kwargs):
+        """测试原样模式与按响应模型校验的响应内容（含字段顺序）一致"""
+        validated = client.request(method, url, **kwargs)
+        assert validated.status_code == 200
+
+        responses.enable_raw(True)
+        try:
+            raw = client.request(method, url, **kwargs)
+        finally:
+            responses.enable_raw(False)
+        assert raw.status_code == 200
+        assert raw.headers["content-type"] == "application/json"
+        assert list(raw.json()) == list(validated.json())
+        assert json.dumps(raw.json(), ensure_ascii=False) == json.dumps(validated.json(), ensure_ascii=False)
+
+    def test_typed_schema(self, client):
+        """测试 OpenAPI 中的响应模型为具体类型"""
+        schemas = client.get("/openapi.json").json()["components"]["schemas"]
+        assert schemas["BaziResponse"]["properties"]["bazi_result"] == {"$ref": "#/components/schemas/BaziChart"}
+        assert "percentages" in schemas["PillarElements"]["properties"]
+        assert "HealthAdviceResponse" in schemas
+
+    def test_invalid_input_in_raw_mode(self, client, raw_mode):
+        """测试原样模式下出生信息无效仍返回 422"""
+        response = client.post("/api/bazi/calculate", json=dict(BAZI_REQUEST, birth_month=2, birth_day=30))
+        assert response.status_code == 422
+
+    def test_extra_fields_are_kept(self):
+        """测试引擎输出中模型未声明的字段原样保留"""
+        from services.api.schemas import Issues
+
+        issues = {"errors": [], "warnings": [], "degraded": [], "note": "新增字段"}
+        assert Issues.model_validate(issues).model_dump() == issues
+
+
+class TestDumps:
+    CONTENT = {"四柱": ("甲子", "乙丑"), "advice": freeze({"items": [1, 2.5]}), 1: None,
+               "date": datetime.date(2024, 3, 15)}
+    EXPECTED = {"四柱": ["甲子", "乙丑"], "advice": {"items": [1, 2.5]}, "1": None, "date": "2024-03-15"}
+
+    def test_dumps(self):
+        """测试 orjson 渲染：中文不转义，支持只读字典、tuple、非字符串键与日期"""
+        data = responses.dumps(self.CONTENT)
+        assert "甲子".encode("utf-8") in data
+        assert json.loads(data) == self.EXPECTED
+
+    def test_dumps_without_orjson(self, monkeypatch):
+        """测试未安装 orjson 时退回标准库 json，结果相同"""
+        monkeypatch.setattr(responses, "orjson", None)
+        data = responses.dumps(self.CONTENT)
+        assert "甲子".encode("utf-8") in data
+        assert json.loads(data) == self.EXPECTED
+
+    def test_unsupported_type(self):
+        """测试无法序列化的类型抛出 TypeError"""
+        with pytest.raises(TypeError):
+            responses.dumps({"value": object()})
@@ -0,0 +1,94 @@
+"""
+后台任务接口集成测试
+"""
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+from services.api import create_app
+from services.api.routes import api_router
+from services.api.routes.job_routes import get_broker
+from services.jobs import SQLiteBroker, Worker
+
+BAZI_REQUEST = {"birth_year": 1990, "birth_month": 5, "birth_day": 15, "birth_hour": 11, "birth_minute": 40,
+                "gender": "male"}
+
+
+@pytest.fixture
+def broker(tmp_path):
+    return SQLiteBroker(tmp_path / "jobs.db")
+
+
+@pytest.fixture
+def client(broker):
+    app = create_app()
+    app.include_router(api_router)
+    app.dependency_overrides[get_broker] = lambda: broker
+    return TestClient(app)
+
+
+class TestJobsApi:
+    def test_submit_and_fetch(self, client, broker):
+        """测试提交后立即返回任务 id，worker 执行后取回报告"""
+        response = client.post("/api/jobs/bazi/report", json=BAZI_REQUEST, params={"format": "markdown"})
+        assert response.status_code == 202
+        job = response.json()
+        assert job["status"] == "queued"
+        assert response.headers["location"] == f"/api/jobs/{job['job_id']}"
+        # 分钟四舍五入到小时，参考时间在提交时确定
+        assert broker.get(job["job_id"]).params["hour"] == 12
+        assert "as_of" in broker.get(job["job_id"]).params
+
+        pending = client.get(f"/api/jobs/{job['job_id']}/result")
+        assert pending.status_code == 202 and pending.json()["status"] == "queued"
+
+        Worker(broker).run_once()
+        assert client.get(f"/api/jobs/{job['job_id']}").json()["status"] == "done"
+        result = client.get(f"/api/jobs/{job['job_id']}/result")
+        assert result.status_code == 200
+        assert result.headers["content-type"] == "text/markdown; charset=utf-8"
+        assert "### 饮食调养" in result.text
+
+    def test_wait_for_result(self, client, broker):
+        """测试 wait 参数等待 worker 完成任务"""
+        job_id = client.post("/api/jobs/bazi/report", json=BAZI_REQUEST).json()["job_id"]
+        stop = threading.Event()
+        worker = threading.Thread(target=Worker(broker, poll_interval=0.01).run, args=(stop,))
+        worker.start()
+        try:
+            result = client.get(f"/api/jobs/{job_id}/result", params={"wait": 30})
+        finally:
+            stop.set()
+            worker.join()
+        assert result.status_code == 200
+        assert result.text.startswith("<!DOCTYPE html>")
+
+    def test_failed_job(self, client, broker):
+        """测试输入错误导致任务失败时状态包含错误信息，取结果返回 422"""
+        job = broker.submit("bazi.report", {"year": 1990})
+        Worker(broker).run_once()
+        status = client.get(f"/api/jobs/{job.id}").json()
+        assert status["status"] == "failed" and status["error"]["type"] == "KeyError"
+        assert client.get(f"/api/jobs/{job.id}/result").status_code == 422
+
+    def test_worker_failure(self, client, broker):
+        """测试执行出错且重试用尽时取结果返回 500"""
+        def crash(params):
+            raise RuntimeError("引擎错误")
+
+        job = broker.submit("bazi.report", {}, max_attempts=1)
+        Worker(broker, tasks={"bazi.report": crash}).run_once()
+        assert client.get(f"/api/jobs/{job.id}").json()["status"] == "failed"
+        response = client.get(f"/api/jobs/{job.id}/result")
+        assert response.status_code == 500 and "引擎错误" in response.json()["detail"]
+
+    def test_invalid_request(self, client):
+        """测试出生日期无效或格式不支持时提交即返回 422"""
+        assert client.post("/api/jobs/bazi/report", json=dict(BAZI_REQUEST, birth_month=2, birth_day=30)).status_code == 422
+        assert client.post("/api/jobs/bazi/report", json=BAZI_REQUEST, params={"format": "pdf"}).status_code == 422
+
+    def test_unknown_job(self, client):
+        """测试任务不存在时返回 404"""
+        assert client.get("/api/jobs/missing").status_code == 404
+        assert client.get("/api/jobs/missing/result").status_code == 404
@@ -0,0 +1,130 @@
+"""
+六爻API与批量起卦集成测试
+"""
+import datetime
+import itertools
+
+import pytest
+from fastapi.testclient import TestClient
+
+from models.liuyao.batch import cast, cast_batch, group_by_day
+from models.liuyao.diagnosis import diagnose_health
+from services.api import create_app
+from services.api.routes import api_router
+
+
+@pytest.fixture(scope="module")
+def client():
+    app = create_app()
+    app.include_router(api_router)
+    return TestClient(app)
+
+
+class TestLiuyaoBatch:
+    def test_cast_matches_diagnose_health(self):
+        """测试单次起卦与 diagnose_health 结果一致"""
+        date = datetime.datetime(2025, 3, 24, 22, 0)
+        result = cast([4, 1, 1, 1, 1, 1], date, longitude=-100, latitude=40, render='text')
+        live = diagnose_health([4, 1, 1, 1, 1, 1], date)['liuyao_result']
+
+        assert result['gua']['name'] == live['gua_name']
+        assert result['diagnosis']['gua_element'] == live['gua_element']
+        assert list(result['diagnosis']['health_impacts']) == sorted(live['health_impacts'])
+        assert result['render'] == live['render']
+
+    def test_group_by_day(self):
+        """测试按日课分组"""
+        date = datetime.datetime(2024, 3, 15, 10, 0)
+        items = [
+            {'params': [1, 2, 1, 2, 1, 2], 'date': date},
+            {'params': [2, 2, 2, 2, 2, 2], 'date': date + datetime.timedelta(hours=1)},
+            {'params': [3, 2, 1, 2, 1, 2], 'date': date + datetime.timedelta(minutes=30)},
+        ]
+        groups = group_by_day(items)
+        assert [[index for index, _ in group] for group in groups] == [[0, 2], [1]]
+
+    def test_batch_preserves_order(self):
+        """测试批量结果顺序与单次起卦一致"""
+        start = datetime.datetime(2024, 3, 15, 10, 0)
+        casts = list(itertools.islice(itertools.product((1, 2, 3, 4), repeat=6), 0, 4096, 41))
+        items = [{'params': list(p), 'date': start + datetime.timedelta(hours=i % 5)} for i, p in enumerate(casts)]
+
+        results = cast_batch(items, processes=1)
+        assert len(results) == len(items)
+        for item, result in zip(items, results):
+            assert result == cast(**item)
+
+    def test_batch_process_pool(self):
+        """测试进程池批量起卦与单进程结果一致"""
+        start = datetime.datetime(2024, 3, 15, 10, 0)
+        casts = list(itertools.product((1, 2, 3, 4), repeat=6))[:600]
+        items = [{'params': list(p), 'date': start + datetime.timedelta(hours=i % 7)} for i, p in enumerate(casts)]
+
+        assert cast_batch(items, processes=2, process_threshold=100) == cast_batch(items, processes=1)
+
+    def test_results_do_not_share_cached_objects(self):
+        """测试返回结果中与缓存共享的部分为只读，修改结果不影响之后的起卦"""
+        item = {'params': [2, 2, 1, 2, 4, 2], 'date': '2024-03-15 10:30'}
+        expected = cast(**item)
+        for result in cast_batch([item, item], processes=1) + [cast(**item)]:
+            with pytest.raises(TypeError):
+                result['diagnosis']['shensha_analysis']['positive_impacts'][0]['health'][0] = 'x'
+            with pytest.raises(TypeError):
+                result['gua']['name'] = 'x'
+            with pytest.raises(TypeError):
+                result['lunar']['gz'].clear()
+            # 顶层字典为每次起卦新建，可以修改
+            result['title'] = 'x'
+            result['diagnosis'] = {}
+        assert cast(**item) == expected
+
+
+class TestLiuyaoAPI:
+    def test_cast(self, client):
+        """测试单次起卦接口"""
+        response = client.post("/api/liuyao/cast", json={
+            "params": [2, 2, 1, 2, 4, 2],
+            "date": "2019-12-25T00:20:00",
+            "render": "text"
+        })
+        assert response.status_code == 200
+        data = response.json()
+        assert data["gua"]["name"] == "地山谦"
+        assert data["gua"]["bian"]["name"] == "水山蹇"
+        assert "动爻: 五爻" in data["render"]
+        assert data["diagnosis"]["gua_element"] == "金"
+
+    def test_cast_timezone(self, client):
+        """测试带时区的起卦时间换算为本地时间"""
+        date = datetime.datetime.fromisoformat("2024-03-15T10:30:00+08:00")
+        response = client.post("/api/liuyao/cast", json={"params": [2, 2, 1, 2, 4, 2], "date": date.isoformat()})
+        assert response.status_code == 200
+        local = date.astimezone().replace(tzinfo=None)
+        assert response.json()["solar"] == local.isoformat()
+        assert response.json()["lunar"]["gz"] == cast([2, 2, 1, 2, 4, 2], local)["lunar"]["gz"]
+
+    def test_cast_invalid_params(self, client):
+        """测试无效的六爻参数"""
+        response = client.post("/api/liuyao/cast", json={"params": [1, 2, 5, 2, 1, 2]})
+        assert response.status_code == 422
+        response = client.post("/api/liuyao/cast", json={"params": [1, 2, 1]})
+        assert response.status_code == 422
+
+    def test_cast_validates_params(self):
+        """测试直接调用时校验六爻参数"""
+        with pytest.raises(ValueError):
+            cast([1, 2, 5, 2, 1, 2], datetime.datetime(2024, 3, 15, 10, 0))
+
+    def test_cast_batch(self, client):
+        """测试批量起卦接口"""
+        items = [
+            {"params": [2, 2, 1, 2, 4, 2], "date": "2019-12-25T00:20:00"},
+            {"params": [1, 1, 1, 1, 1, 1], "date": "2019-12-25T00:40:00"},
+            {"params": [2, 2, 1, 2, 4, 2], "date": "2020-01-01T12:00:00", "render": "html"},
+        ]
+        response = client.post("/api/liuyao/cast_batch", json={"items": items})
+        assert response.status_code == 200
+        data = response.json()
+        assert data["count"] == 3
+        assert [r["gua"]["name"] for r in data["results"]] == ["地山谦", "乾为天", "地山谦"]
+        assert data["results"][2]["render"].startswith('<div class="liuyao">')
@@ -0,0 +1,50 @@
+"""
+监控指标与 Server-Timing 集成测试
+"""
+import pytest
+from fastapi.testclient import TestClient
+
+from models import timing
+from services.api import create_app
+from services.api.routes import api_router
+
+CAST_REQUEST = {"params": [2, 2, 1, 2, 4, 2], "date": "2024-03-15T10:30:00", "render": "text"}
+
+
+@pytest.fixture(scope="module")
+def client():
+    app = create_app()
+    app.include_router(api_router)
+    return TestClient(app)
+
+
+class TestMetricsApi:
+    def test_metrics(self, client):
+        """测试 /metrics 导出请求涉及的阶段"""
+        assert client.post("/api/liuyao/cast", json=CAST_REQUEST).status_code == 200
+        response = client.get("/metrics")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        assert 'curecipher_stage_duration_seconds_count{stage="liuyao.cast"}' in response.text
+
+    def test_server_timing_opt_in(self, client):
+        """测试只有携带 X-Server-Timing 的请求返回 Server-Timing"""
+        plain = client.post("/api/liuyao/cast", json=CAST_REQUEST)
+        assert "server-timing" not in plain.headers
+
+        timed = client.post("/api/liuyao/cast", json=CAST_REQUEST, headers={"X-Server-Timing": "1"})
+        entries = [entry.split(";")[0] for entry in timed.headers["server-timing"].split(", ")]
+        assert "liuyao.cast" in entries
+        assert "liuyao.render" in entries
+        assert entries[-1] == "total"
+
+    def test_disabled(self, client):
+        """测试计时关闭时不返回 Server-Timing"""
+        timing.enable(False)
+        try:
+            response = client.post("/api/liuyao/cast", json=CAST_REQUEST, headers={"X-Server-Timing": "1"})
+        finally:
+            timing.enable()
+        assert response.status_code == 200
+        assert "server-timing" not in response.headers
@@ -0,0 +1,65 @@
+"""
+采样分析中间件与管理接口集成测试
+"""
+import pytest
+from fastapi.testclient import TestClient
+
+from services.api import create_app, profiler
+from services.api.routes import api_router
+
+CAST_REQUEST = {"params": [2, 2, 1, 2, 4, 2], "date": "2024-03-15T10:30:00", "render": "text"}
+TOKEN = "secret"
+ADMIN = {"X-Admin-Token": TOKEN}
+
+
+def make_client(monkeypatch, **env):
+    for key, value in env.items():
+        monkeypatch.setenv(key, value)
+    monkeypatch.setenv("CURECIPHER_ADMIN_TOKEN", TOKEN)
+    app = create_app()
+    app.include_router(api_router)
+    profiler.store.clear()
+    return TestClient(app)
+
+
+class TestProfilerApi:
+    def test_sampled_requests(self, monkeypatch):
+        """测试抽样请求被记录，出生信息哈希化"""
+        client = make_client(monkeypatch, CURECIPHER_PROFILE_RATE="1", CURECIPHER_PROFILE_KEEP="2",
+                             CURECIPHER_PROFILE_SALT="s")
+        for _ in range(3):
+            assert client.post("/api/liuyao/cast", json=CAST_REQUEST).status_code == 200
+        response = client.get("/api/bazi/health_advice", params={"birth_year": 1990, "birth_month": 5, "birth_day": 15,
+                                                                 "birth_hour": 12, "gender": "male"})
+
+        listed = client.get("/admin/profiles", headers=ADMIN).json()
+        assert listed["count"] == 2
+        latest = listed["profiles"][0]
+        assert latest["path"] == "/api/bazi/health_advice"
+        assert latest["status"] == response.status_code
+        assert latest["reasons"] == ["sampled"]
+
+        entry = client.get(f"/admin/profiles/{latest['id']}", headers=ADMIN).json()
+        assert entry["input"]["query"] == {"birth_hash": profiler.hash_birth(["1990", "5", "15", "12", None], b"s"),
+                                           "gender": "male"}
+        assert listed["profiles"][1]["path"] == "/api/liuyao/cast"
+
+        folded = client.get(f"/admin/profiles/{latest['id']}/folded", headers=ADMIN)
+        assert folded.status_code == 200
+
+    def test_slow_threshold(self, monkeypatch):
+        """测试只记录超过阈值的请求"""
+        client = make_client(monkeypatch, CURECIPHER_PROFILE_SLOW_MS="60000")
+        assert client.post("/api/liuyao/cast", json=CAST_REQUEST).status_code == 200
+        assert client.get("/admin/profiles", headers=ADMIN).json()["count"] == 0
+
+    def test_admin_auth(self, monkeypatch):
+        """测试管理令牌校验"""
+        client = make_client(monkeypatch, CURECIPHER_PROFILE_RATE="1")
+        assert client.get("/admin/profiles").status_code == 403
+        assert client.get("/admin/profiles", headers={"X-Admin-Token": "wrong"}).status_code == 403
+        assert client.get("/admin/profiles/999", headers=ADMIN).status_code == 404
+        assert client.delete("/admin/profiles", headers=ADMIN).json() == {"status": "ok"}
+
+        monkeypatch.delenv("CURECIPHER_ADMIN_TOKEN")
+        assert client.get("/admin/profiles", headers=ADMIN).status_code == 404
@@ -0,0 +1,99 @@
+"""
+流式命盘报告集成测试
+"""
+import datetime
+import io
+
+import pytest
+from fastapi.testclient import TestClient
+
+from models import clock
+from models.bazi.bazi_calculator import calculate_bazi, generate_bazi_report
+from models.bazi.bazi_visual import generate_visual_report
+from models.bazi.report import REPORT_KEYS, iter_report, stream_report, write_report
+from services.api import create_app
+from services.api.routes import api_router
+
+AS_OF = datetime.date(2025, 6, 1)
+
+
+@pytest.fixture(scope="module")
+def bazi_result():
+    with clock.use_clock(datetime.datetime(2025, 6, 1, 12, 0)):
+        return calculate_bazi(1990, 5, 15, 12, "male")
+
+
+@pytest.fixture(scope="module")
+def client():
+    app = create_app()
+    app.include_router(api_router)
+    return TestClient(app)
+
+
+class TestReportStream:
+    def test_iter_report(self, bazi_result):
+        """测试逐章生成的报告与完整报告一致"""
+        report = generate_bazi_report(bazi_result)
+        sections = list(iter_report(bazi_result))
+        assert [key for key, _ in sections] == list(REPORT_KEYS)
+        assert dict(sections) == {key: report[key] for key in REPORT_KEYS}
+
+    @pytest.mark.parametrize("format", ["text", "markdown", "html"])
+    def test_grid_first(self, bazi_result, format):
+        """测试命盘网格作为第一段输出"""
+        report = generate_bazi_report(bazi_result)
+        chunks = stream_report(bazi_result, format=format, as_of=AS_OF)
+        first = next(chunks)
+        if format == "html":
+            assert first.startswith("<!DOCTYPE html>")
+            first = next(chunks)
+        assert first == generate_visual_report(report, format=format) + "\n\n"
+
+        rest = "".join(chunks)
+        assert "命盘分析" in rest
+        assert "2025年流年流月" in rest
+        if format == "html":
+            assert rest.endswith("</html>\n")
+
+    def test_sections_are_lazy(self, bazi_result, monkeypatch):
+        """测试大运流年章节在网格输出之后才计算"""
+        from models.bazi import liunian_analysis
+
+        calls = []
+        original = liunian_analysis.analyze_liunian
+        monkeypatch.setattr(liunian_analysis, "analyze_liunian",
+                            lambda *args, **kwargs: calls.append(args) or original(*args, **kwargs))
+        chunks = stream_report(bazi_result, as_of=AS_OF)
+        next(chunks)
+        assert calls == []
+        list(chunks)
+        assert len(calls) == 1
+
+    def test_write_report(self, bazi_result):
+        """测试逐段写入文件"""
+        buffer = io.StringIO()
+        written = write_report(bazi_result, buffer, format="markdown", as_of=AS_OF, timeline=False)
+        assert written == len(buffer.getvalue())
+        assert "大运评分" not in buffer.getvalue()
+        with pytest.raises(ValueError):
+            next(stream_report(bazi_result, format="pdf"))
+
+    def test_streaming_endpoint(self, client):
+        """测试流式报告接口"""
+        payload = {"birth_year": 1990, "birth_month": 5, "birth_day": 15, "birth_hour": 12, "gender": "male"}
+        response = client.post("/api/bazi/report/stream?format=markdown", json=payload)
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/markdown")
+        assert response.text.startswith("## 八字命盘")
+        assert "流年流月" in response.text
+
+        response = client.post("/api/bazi/report/stream?format=pdf", json=payload)
+        assert response.status_code == 422
+
+    def test_invalid_birth_date(self, client):
+        """测试不存在的出生日期返回 422"""
+        payload = {"birth_year": 2021, "birth_month": 2, "birth_day": 30, "birth_hour": 12, "gender": "male"}
+        for url in ("/api/bazi/report/stream", "/api/bazi/calculate", "/api/bazi/summary"):
+            response = client.post(url, json=payload)
+            assert response.status_code == 422
+            assert "日期" in response.json()["detail"]
@@ -0,0 +1,113 @@
+"""
+基准测试框架测试：全部基准可在离线环境下运行，基线对比与结果文件正确
+"""
+import os
+import socket
+import sys
+
+import pytest
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, ROOT_DIR)
+
+import benchmarks
+from benchmarks import __main__ as cli
+from benchmarks.offline import NetworkDisabled, offline
+
+
+def _result(**medians):
+    return {"results": {name: {"median": value} for name, value in medians.items()}}
+
+
+class TestBenchmarkSuite:
+    """注册的基准"""
+
+    def test_registered_groups(self):
+        """micro 与 macro 两组均已注册"""
+        registry = benchmarks.load_benchmarks()
+        groups = {bench.group for bench in registry.values()}
+        assert groups == {"micro", "macro"}
+        assert "bazi.calculate" in registry
+        assert "api.bazi.calculate" in registry
+
+    def test_all_benchmarks_run(self):
+        """全部基准以 warm / cold 两种方式运行成功"""
+        benchmarks.load_benchmarks()
+        with benchmarks.environment():
+            results = benchmarks.run(benchmarks.select(), rounds=2, min_time=0.0)
+        expected = {f"{bench.name}[{variant}]" for bench in benchmarks.select() for variant in bench.variants}
+        assert set(results["results"]) == expected
+        for result in results["results"].values():
+            assert result["rounds"] == 2
+            assert 0 < result["min"] <= result["median"] <= result["p95"]
+
+    def test_select(self):
+        """按通配符与分组筛选"""
+        benchmarks.load_benchmarks()
+        names = [bench.name for bench in benchmarks.select(["liuyao.*"])]
+        assert names and all(name.startswith("liuyao.") for name in names)
+        assert all(bench.group == "macro" for bench in benchmarks.select(groups=["macro"]))
+
+
+class TestCompare:
+    """基线对比"""
+
+    def test_statuses(self):
+        """退化、改善、持平与新增"""
+        baseline = _result(a=1.0, b=1.0, c=1.0)
+        current = _result(a=1.5, b=0.5, c=1.1, d=2.0)
+        statuses = {row["name"]: row["status"] for row in benchmarks.compare(current, baseline, threshold=0.25)}
+        assert statuses == {"a": "regression", "b": "improved", "c": "ok", "d": "new"}
+
+    def test_cli_exit_code(self, tmp_path):
+        """对比出现退化时返回码为 1"""
+        baseline_path = tmp_path / "baseline.json"
+        output_path = tmp_path / "results.json"
+        args = ["-k", "bazi.relations", "--variant", "warm", "-r", "2", "--min-time", "0"]
+
+        assert cli.main(args + ["-o", str(output_path)]) == 0
+        results = benchmarks.load(output_path)
+        assert list(results["results"]) == ["bazi.relations[warm]"]
+
+        # 基线快到不可能达到时判为退化
+        results["results"]["bazi.relations[warm]"]["median"] = 1e-9
+        benchmarks.save(results, baseline_path)
+        assert cli.main(args + ["--compare", str(baseline_path)]) == 1
+
+    def test_save_load_round_trip(self, tmp_path):
+        """结果文件读写"""
+        path = tmp_path / "results.json"
+        results = dict(_result(a=1.25), version=benchmarks.core.RESULT_VERSION)
+        benchmarks.save(results, path)
+        assert benchmarks.load(path) == results
+
+
+class TestOffline:
+    """离线环境"""
+
+    def test_geocode_table(self):
+        """地理编码使用固定坐标表"""
+        from models.bazi import calculator
+
+        original = calculator.geocode_city
+        with offline():
+            location = calculator.geocode_city("Beijing")
+            assert (location.latitude, location.longitude) == (39.9042, 116.4074)
+            assert calculator.geocode_city("不存在的城市") is None
+        assert calculator.geocode_city is original
+
+    def test_network_blocked(self):
+        """禁止 IPv4 连接，退出后恢复"""
+        original = socket.socket.connect
+        with offline():
+            with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+                with pytest.raises(NetworkDisabled):
+                    sock.connect(("127.0.0.1", 9))
+        assert socket.socket.connect is original
+
+    def test_fixed_clock(self):
+        """运行环境固定当前时间"""
+        from models import clock
+
+        with benchmarks.environment():
+            assert clock.now() == benchmarks.FIXED_NOW
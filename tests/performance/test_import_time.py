@@ -0,0 +1,77 @@
+"""
+模块导入性能测试
+
+每个用例在独立的子进程中导入模块，避免受当前测试进程已加载模块的影响。
+"""
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+# 只在实际使用时才应导入的重量级依赖
+HEAVY_MODULES = ('requests', 'geopy', 'cryptography', 'jinja2')
+
+PROBE = """
+import json, logging, os, sys, time
+before = set(os.listdir('.'))
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{
+    'elapsed': elapsed,
+    'modules': sorted(sys.modules),
+    'handlers': len(logging.getLogger().handlers),
+    'root_level': logging.getLogger().level,
+    'created': sorted(set(os.listdir('.')) - before),
+}}))
+"""
+
+
+def probe_import(module, cwd):
+    """在子进程中导入模块，返回耗时、已加载模块、日志配置与新建文件"""
+    env = dict(os.environ, PYTHONPATH=ROOT_DIR, PYTHONDONTWRITEBYTECODE='1')
+    output = subprocess.run(
+        [sys.executable, '-c', PROBE.format(module=module)],
+        cwd=cwd, env=env, capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+class TestImportTime:
+    @pytest.mark.parametrize('module', ['models.bazi.bazi_calculator', 'models.liuyao.najia'])
+    def test_no_heavy_dependencies(self, module, tmp_path):
+        """测试导入计算模块时不加载网络、加密与模板依赖"""
+        result = probe_import(module, tmp_path)
+
+        loaded = [name for name in HEAVY_MODULES if name in result['modules']]
+        assert loaded == [], f"导入 {module} 时加载了 {loaded}"
+
+    @pytest.mark.parametrize('module', [
+        'models.bazi.calculator', 'models.bazi.bazi_calculator',
+        'models.liuyao.utils', 'models.liuyao.najia',
+    ])
+    def test_no_side_effects(self, module, tmp_path):
+        """测试导入模块不配置全局日志、不写文件"""
+        result = probe_import(module, tmp_path)
+
+        assert result['handlers'] == 0, f"导入 {module} 时配置了根日志处理器"
+        assert result['root_level'] == 30, f"导入 {module} 时修改了根日志级别"
+        assert result['created'] == [], f"导入 {module} 时写入了文件 {result['created']}"
+
+    def test_import_time(self, tmp_path):
+        """测试计算模块的冷启动导入耗时"""
+        timings = {
+            module: probe_import(module, tmp_path)['elapsed']
+            for module in ('models.bazi.bazi_calculator', 'models.liuyao.najia')
+        }
+
+        print("\n模块导入耗时:")
+        for module, elapsed in timings.items():
+            print(f"{module}: {elapsed*1000:.1f}毫秒")
+
+        for module, elapsed in timings.items():
+            assert elapsed < 1.0, f"{module} 导入耗时过长: {elapsed*1000:.1f} 毫秒"
@@ -0,0 +1,63 @@
+"""
+六爻排盘性能测试
+"""
+import datetime
+import itertools
+import time
+
+from models.liuyao.najia import Najia, compile_cast, daily_context
+
+DATE = datetime.datetime(2024, 3, 15, 10, 30)
+CASTS = [list(p) for p in itertools.product((1, 2, 3, 4), repeat=6)]
+
+
+class TestLiuyaoPerformance:
+    def test_daily_context_shared_within_hour(self):
+        """测试同一小时内的起卦共享一次日课换算"""
+        daily_context.cache_clear()
+
+        for i, params in enumerate(CASTS[:500]):
+            Najia(2).compile(params=params, date=DATE + datetime.timedelta(minutes=i % 30))
+
+        info = daily_context.cache_info()
+        assert info.misses == 1
+        assert info.hits == 499
+
+    def test_cast_performance(self):
+        """测试日课缓存前后的单次起卦耗时"""
+        iterations = 200
+
+        # 未命中日课缓存：每次起卦换一个小时
+        daily_context.cache_clear()
+        compile_cast.cache_clear()
+        start_time = time.time()
+        for i in range(iterations):
+            Najia(2).compile(params=CASTS[i], date=DATE + datetime.timedelta(hours=i))
+        cold = (time.time() - start_time) / iterations
+
+        # 命中日课缓存：同一小时内起卦
+        compile_cast.cache_clear()
+        start_time = time.time()
+        for i in range(iterations):
+            Najia(2).compile(params=CASTS[i], date=DATE)
+        warm = (time.time() - start_time) / iterations
+
+        print(f"\n六爻起卦性能测试结果:")
+        print(f"未命中日课缓存平均每次: {cold*1000:.3f}毫秒")
+        print(f"命中日课缓存平均每次: {warm*1000:.3f}毫秒")
+
+        assert warm < cold, f"日课缓存未生效，命中 {warm*1000:.3f} 毫秒 / 未命中 {cold*1000:.3f} 毫秒"
+        assert warm < 0.01, f"起卦性能不足，平均耗时 {warm*1000:.2f} 毫秒"
+
+    def test_render_performance(self):
+        """测试全部 4096 种卦象编译并渲染的耗时"""
+        start_time = time.time()
+        for params in CASTS:
+            Najia(2).compile(params=params, date=DATE).render(fast=True)
+        elapsed = time.time() - start_time
+
+        print(f"\n六爻渲染性能测试结果:")
+        print(f"总耗时: {elapsed:.2f}秒")
+        print(f"平均每次: {elapsed/len(CASTS)*1000:.3f}毫秒")
+
+        assert elapsed / len(CASTS) < 0.01, f"渲染性能不足，平均耗时 {elapsed/len(CASTS)*1000:.2f} 毫秒"
@@ -0,0 +1,103 @@
+"""
+五行建议索引单元测试
+"""
+import copy
+import datetime
+import json
+import os
+import sys
+
+import pytest
+
+# 确保可以导入项目模块
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from models.bazi.advice_index import current_season, get_advice_index, load_json_data
+from models.bazi.five_elements import (
+    analyze_balance, generate_diet_advice, generate_exercise_advice, generate_health_advice
+)
+from models.frozen import FrozenDict, thaw
+
+PERCENTAGES = {"木": 30.0, "火": 27.0, "土": 20.0, "金": 8.0, "水": 15.0}
+
+
+class TestAdviceIndex:
+    def test_index_size(self):
+        """测试索引覆盖全部组合"""
+        index = get_advice_index()
+        assert len(index.diet) == 20 * 6 * 4
+        assert len(index.exercise) == 20 * 3
+
+    def test_diet_advice(self):
+        """测试饮食建议按最弱、最强五行和季节查表"""
+        advice = generate_diet_advice(PERCENTAGES, season="autumn")
+        assert [f["element"] for f in advice["recommended_flavors"]] == ["金", "水"]
+        assert [f["element"] for f in advice["avoid_flavors"]] == ["火", "木"]
+
+        recipes = load_json_data("diet_recipes.json")["autumn"]
+        expected = [r["name"] for r in recipes if {"metal", "water"} & set(r["suitable_elements"])][:3]
+        assert [r["name"] for r in advice["seasonal_recipes"]] == expected
+
+    def test_exercise_advice(self):
+        """测试运动建议"""
+        advice = generate_exercise_advice(PERCENTAGES)
+        assert [e["element"] for e in advice["recommended_exercises"]] == ["金", "水", "土"]
+        assert advice["recommended_exercises"][2]["reason"] == "保持土五行平衡"
+
+    def test_health_advice(self):
+        """测试健康建议"""
+        balance = analyze_balance(PERCENTAGES)
+        advice = generate_health_advice("水", PERCENTAGES, balance, season="winter")
+        assert advice["seasonal_advice"].startswith("冬季")
+        assert [(r["element"], r["risk_type"]) for r in advice["health_risks"]] == \
+            [("木", "过盛"), ("火", "过盛"), ("金", "不足")]
+        assert advice["balance_recommendation"] == balance["description"]
+        assert advice["specific_recommendations"] == ("增强金的相关功能", "适当控制木的过度表现")
+
+    def test_shared_readonly(self):
+        """测试返回共享的只读结构"""
+        first = generate_diet_advice(PERCENTAGES, season="spring")
+        assert generate_diet_advice(dict(PERCENTAGES), season="spring") is first
+        with pytest.raises(TypeError):
+            first["general_advice"] = ""
+        with pytest.raises(TypeError):
+            first["recommended_flavors"][0].update(reason="")
+        assert copy.deepcopy(first) is first
+
+        mutable = thaw(first)
+        mutable["recommended_flavors"].clear()
+        assert first["recommended_flavors"]
+        assert json.loads(json.dumps(first, ensure_ascii=False)) == thaw(first)
+
+    def test_locale(self):
+        """测试多语言建议"""
+        balance = analyze_balance(PERCENTAGES)
+        advice = generate_health_advice("木", PERCENTAGES, balance, season="spring", locale="en")
+        assert advice["general_advice"].startswith("Protect your liver")
+        assert advice["specific_recommendations"][0] == "Strengthen functions related to Metal"
+        assert advice["health_risks"][0]["element"] == "木"
+
+        diet = generate_diet_advice(PERCENTAGES, season="spring", locale="es")
+        assert diet["recommended_flavors"][0]["reason"] == "Fortalecer Metal"
+        assert isinstance(diet, FrozenDict)
+
+        # 平衡描述与健康建议使用同一语言
+        for locale in ("en", "es"):
+            balance = analyze_balance(PERCENTAGES, locale=locale)
+            assert balance["balance_state"] == analyze_balance(PERCENTAGES)["balance_state"]
+            assert balance["description"] != analyze_balance(PERCENTAGES)["description"]
+            advice = generate_health_advice("木", PERCENTAGES, balance, season="spring", locale=locale)
+            assert advice["balance_recommendation"] == balance["description"]
+        assert analyze_balance(PERCENTAGES, locale="en")["description"].startswith("The five elements")
+
+        with pytest.raises(ValueError):
+            get_advice_index("xx")
+
+    def test_current_season(self):
+        """测试季节判断"""
+        assert current_season(datetime.date(2024, 3, 1)) == "spring"
+        assert current_season(datetime.date(2024, 8, 31)) == "summer"
+        assert current_season(datetime.date(2024, 11, 30)) == "autumn"
+        assert current_season(datetime.date(2024, 2, 29)) == "winter"
@@ -0,0 +1,111 @@
+"""
+八字命盘可视化单元测试
+"""
+import copy
+import os
+import sys
+import zipfile
+
+import pytest
+
+# 确保可以导入项目模块
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from models.bazi import bazi_visual
+from models.bazi.bazi_visual import (
+    CSS_NAME, chart_hash, generate_html_grid, generate_markdown_grid, generate_text_grid,
+    generate_visual_report, render_bulk
+)
+
+REPORT = {
+    'basic_info': {'four_pillars': '甲子 乙丑 丙寅 丁卯', 'gans': '甲 乙 丙 丁', 'zhis': '子 丑 寅 卯', 'day_master': '丙(火)'},
+    'ten_gods': {'gans': ['偏印', '正印', '', '伤官'], 'zhis': ['正印', '偏财', '比肩', '伤官']},
+    'five_elements': {'scores': {'木': 25.5, '火': 15.0, '土': 10.0, '金': 5.0, '水': 20.0}},
+    'nayin': {'year': '海中金', 'month': '海中金', 'day': '炉中火', 'hour': '大林木木'},
+    'relations': {'empties': [False, True, False, False]},
+    'pattern_analysis': {'day_master_strength': '中和', 'day_master_percentage': 25.0, 'yong_shen': '木 (生身)'},
+    'special': {'ming_gong': '酉', 'tai_yuan': '丙午'}
+}
+
+
+def make_report(i):
+    report = copy.deepcopy(REPORT)
+    report['special']['tai_yuan'] = f"丙午{i}"
+    return report
+
+
+class TestGrids:
+    def test_text_grid(self):
+        """测试文本网格"""
+        lines = generate_text_grid(REPORT).split("\n")
+        assert lines[1] == "┃   年柱   ┃   月柱   ┃   日柱   ┃   时柱   ┃"
+        assert lines[3] == "┃ 甲  (偏印) ┃ 乙  (正印) ┃ 丙       ┃ 丁  (伤官) ┃"
+        assert lines[5].endswith("┃ 大林木木     ┃")
+        assert lines[6] == "┃          ┃ 空亡       ┃          ┃          ┃"
+        assert lines[-1] == "命宫: 酉   胎元: 丙午"
+
+    def test_markdown_grid(self):
+        """测试 Markdown 网格"""
+        text = generate_markdown_grid(REPORT)
+        assert text.startswith("## 八字命盘\n\n| 年柱 | 月柱 | 日柱 | 时柱 |\n|------|------|------|------|\n")
+        assert "| 甲 (偏印) | 乙 (正印) | 丙  | 丁 (伤官) |" in text
+        assert "- 木: 25.5\n- 火: 15.0" in text
+
+    def test_html_grid(self):
+        """测试 HTML 网格使用共享样式并转义内容"""
+        html = generate_html_grid(REPORT)
+        assert html.startswith("<style>\n.bazi-table {")
+        assert "<div class='score-item wood'>木: 25.5</div>" in html
+        assert "<tr class='empty'>" in html
+
+        linked = generate_html_grid(REPORT, css_url="/static/css/bazi_grid.css")
+        assert linked.startswith('<link rel="stylesheet" href="/static/css/bazi_grid.css">')
+        assert "<style>" not in linked
+
+        report = copy.deepcopy(REPORT)
+        report['special']['ming_gong'] = "<b>"
+        assert "&lt;b&gt;" in generate_html_grid(report)
+
+    def test_locale(self):
+        """测试多语言文案"""
+        text = generate_text_grid(REPORT, locale="en")
+        assert "Year" in text and "Five Elements Scores:" in text and "Wood: 25.5" in text
+        assert "Día" in generate_markdown_grid(REPORT, locale="es")
+        with pytest.raises(ValueError):
+            generate_text_grid(REPORT, locale="xx")
+
+    def test_render_cache(self):
+        """测试渲染结果按命盘内容与语言缓存"""
+        bazi_visual._render_cached.cache_clear()
+        first = generate_visual_report(REPORT, "html")
+        assert generate_visual_report(copy.deepcopy(REPORT), "html") is first
+        generate_visual_report(REPORT, "html", locale="en")
+        info = bazi_visual._render_cached.cache_info()
+        assert (info.hits, info.misses) == (1, 2)
+        assert chart_hash(copy.deepcopy(REPORT)) == chart_hash(REPORT) != chart_hash(make_report(1))
+
+
+class TestRenderBulk:
+    def test_directory(self, tmp_path):
+        """测试批量写入目录，HTML 共用一份样式表"""
+        names = render_bulk([make_report(i) for i in range(5)], tmp_path / "out")
+        assert names[0] == CSS_NAME
+        assert len(set(names)) == 6
+        page = (tmp_path / "out" / names[1]).read_text(encoding="utf-8")
+        assert page.startswith(f'<link rel="stylesheet" href="{CSS_NAME}">')
+
+    def test_zip(self, tmp_path):
+        """测试批量写入 zip，可指定文件名"""
+        target = tmp_path / "charts.zip"
+        names = render_bulk(((f"chart{i}", make_report(i)) for i in range(3)), target, format="text")
+        assert names == ["chart0.txt", "chart1.txt", "chart2.txt"]
+        with zipfile.ZipFile(target) as archive:
+            assert archive.namelist() == names
+            assert archive.read("chart2.txt").decode("utf-8") == generate_text_grid(make_report(2))
+
+    def test_invalid_format(self, tmp_path):
+        """测试不支持的格式"""
+        with pytest.raises(ValueError):
+            render_bulk([REPORT], tmp_path, format="pdf")
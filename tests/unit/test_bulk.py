@@ -0,0 +1,182 @@
+"""
+八字批量计算单元测试
+"""
+import json
+import os
+import sys
+
+import pytest
+
+# 确保可以导入项目模块
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from models.bazi.bazi_calculator import calculate_bazi
+from models.bazi.bulk import load_checkpoint, read_records, read_results, run_bulk
+from models.errors import InvalidBirthData
+from scripts.calculate_bazi import build_full_result
+
+CSV = """id,year,month,day,hour,gender,city
+a,1990,5,15,12,male,
+b,1985,1,2,3,female,
+c,2000,8,8,20,male,
+d,1977,2,25,20,male,
+e,2012,12,21,0,female,
+"""
+
+
+def compute_pillars(record):
+    """批量计算函数：返回四柱"""
+    result = calculate_bazi(record["year"], record["month"], record["day"], record["hour"], record["gender"])
+    return [result["bazi"][key] for key in ("year", "month", "day", "hour")]
+
+
+def interrupt_at_d(record):
+    """模拟在记录 d 处中断"""
+    if record["id"] == "d":
+        raise KeyboardInterrupt
+    return compute_pillars(record)
+
+
+def fail_on_b(record):
+    """记录 b 计算出错"""
+    if record["id"] == "b":
+        raise ValueError("bad record")
+    return record["year"]
+
+
+def read_output(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+@pytest.fixture
+def records_csv(tmp_path):
+    path = tmp_path / "records.csv"
+    path.write_text(CSV, encoding="utf-8")
+    return path
+
+
+class TestBulk:
+    def test_read_records(self, tmp_path, records_csv):
+        """测试 CSV 与 JSONL 输入"""
+        records = list(read_records(records_csv))
+        assert [r["id"] for r in records] == ["a", "b", "c", "d", "e"]
+        assert records[0] == {"id": "a", "year": 1990, "month": 5, "day": 15, "hour": 12,
+                              "minute": 0, "gender": "male", "city": None}
+
+        jsonl = tmp_path / "records.jsonl"
+        jsonl.write_text('{"year": 1990, "month": 5, "day": 15, "hour": 12}\n\n', encoding="utf-8")
+        assert list(read_records(jsonl))[0]["id"] == "1"
+
+        with pytest.raises(ValueError):
+            list(read_records(tmp_path / "records.txt"))
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_run_bulk(self, tmp_path, records_csv, workers):
+        """测试多进程计算结果按输入顺序写出"""
+        output = tmp_path / "out.jsonl"
+        assert run_bulk(compute_pillars, records_csv, output, workers=workers, batch_size=2, progress=None) == 5
+
+        rows = read_output(output)
+        assert [row["id"] for row in rows] == ["a", "b", "c", "d", "e"]
+        assert rows[0]["result"] == ["庚午", "辛巳", "庚辰", "壬午"]
+
+    def test_encoded_output(self, tmp_path, records_csv):
+        """测试 .cbin 紧凑二进制输出与断点续算"""
+        output = tmp_path / "out.cbin"
+        with pytest.raises(KeyboardInterrupt):
+            run_bulk(interrupt_at_d, records_csv, output, workers=1, batch_size=2, progress=None)
+        assert [row["id"] for row in read_results(output)] == ["a", "b"]
+
+        assert run_bulk(compute_pillars, records_csv, output, workers=1, batch_size=2, progress=None) == 5
+        rows = list(read_results(output))
+        assert [row["id"] for row in rows] == ["a", "b", "c", "d", "e"]
+        assert rows[0]["result"] == ["庚午", "辛巳", "庚辰", "壬午"]
+
+        # 与 JSONL 输出内容相同
+        jsonl = tmp_path / "out.jsonl"
+        run_bulk(compute_pillars, records_csv, jsonl, workers=1, progress=None)
+        assert rows == list(read_results(jsonl))
+
+    def test_errors_are_recorded(self, tmp_path, records_csv):
+        """测试单条记录出错时写入错误信息并继续"""
+        output = tmp_path / "out.jsonl"
+        run_bulk(fail_on_b, records_csv, output, workers=1, progress=None)
+
+        rows = read_output(output)
+        assert len(rows) == 5
+        assert rows[1] == {"id": "b", "error": "ValueError: bad record"}
+        assert rows[2]["result"] == 2000
+
+    def test_malformed_records_are_recorded(self, tmp_path):
+        """测试无法解析的输入记录写入错误信息，其余记录照常计算"""
+        csv_path = tmp_path / "records.csv"
+        csv_path.write_text("id,year,month,day,hour,gender\na,1990,5,15,12,male\nb,abc,1,2,3,female\n"
+                            "c,2000,8,8,,male\nd,2000,8,8,20,male\n", encoding="utf-8")
+        output = tmp_path / "out.jsonl"
+        assert run_bulk(compute_pillars, csv_path, output, workers=1, progress=None) == 4
+
+        rows = read_output(output)
+        assert [row["id"] for row in rows] == ["a", "b", "c", "d"]
+        assert rows[1]["error"].startswith("ValueError: ") and "result" not in rows[1]
+        assert rows[2] == {"id": "c", "error": "ValueError: 第 3 条记录缺少字段 hour"}
+        assert rows[3]["result"] == ["庚辰", "甲申", "戊戌", "壬戌"]
+
+        jsonl = tmp_path / "records.jsonl"
+        jsonl.write_text('{"year": 1990, "month": 5, "day": 15, "hour": 12}\n{"year": \n[1]\n', encoding="utf-8")
+        assert [set(row) for row in read_records(jsonl)][1:] == [{"id", "error"}, {"id", "error"}]
+
+    @pytest.mark.parametrize("damage", ["delete", "truncate"])
+    def test_resume_with_damaged_output(self, tmp_path, records_csv, damage):
+        """测试检查点之前的输出被删除或截断时从头重新计算"""
+        output = tmp_path / "out.jsonl"
+        with pytest.raises(KeyboardInterrupt):
+            run_bulk(interrupt_at_d, records_csv, output, workers=1, batch_size=2, progress=None)
+        assert load_checkpoint(output, records_csv)["done"] == 2
+        if damage == "delete":
+            output.unlink()
+        else:
+            output.write_bytes(output.read_bytes()[:10])
+        assert load_checkpoint(output, records_csv)["done"] == 0
+
+        assert run_bulk(compute_pillars, records_csv, output, workers=1, batch_size=2, progress=None) == 5
+        rows = read_output(output)
+        assert [row["id"] for row in rows] == ["a", "b", "c", "d", "e"]
+        assert rows[0]["result"] == ["庚午", "辛巳", "庚辰", "壬午"]
+
+    def test_build_full_result(self, tmp_path, records_csv):
+        """测试命令行批量模式的完整结果计算"""
+        record = {"id": "a", "year": 1977, "month": 2, "day": 25, "hour": 20, "minute": 50,
+                  "gender": "male", "city": None}
+        result = build_full_result(record)
+        assert result["input"]["rounded_hour"] == 21
+        assert result["bazi_result"]["bazi"]["formatted"].startswith("丁巳 壬寅")
+        assert set(result["elements_result"]["element_percentages"]) == {"木", "火", "土", "金", "水"}
+        assert "shensha_result" in result
+
+        with pytest.raises(InvalidBirthData):
+            build_full_result(dict(record, month=2, day=30))
+
+        output = tmp_path / "out.jsonl"
+        run_bulk(build_full_result, records_csv, output, workers=1, progress=None)
+        rows = read_output(output)
+        assert [row["id"] for row in rows] == ["a", "b", "c", "d", "e"]
+        assert all("error" not in row for row in rows)
+        assert rows[0]["result"]["bazi_result"]["bazi"]["year"] == "庚午"
+
+    def test_resume_from_checkpoint(self, tmp_path, records_csv):
+        """测试中断后从检查点继续，不重复也不遗漏"""
+        output = tmp_path / "out.jsonl"
+        with pytest.raises(KeyboardInterrupt):
+            run_bulk(interrupt_at_d, records_csv, output, workers=1, batch_size=2, progress=None)
+        assert load_checkpoint(output, records_csv)["done"] == 2
+        assert [row["id"] for row in read_output(output)] == ["a", "b"]
+
+        assert run_bulk(compute_pillars, records_csv, output, workers=1, batch_size=2, progress=None) == 5
+        assert [row["id"] for row in read_output(output)] == ["a", "b", "c", "d", "e"]
+
+        # 已全部完成时再次运行不重复计算
+        assert run_bulk(compute_pillars, records_csv, output, workers=1, progress=None) == 5
+        assert len(read_output(output)) == 5
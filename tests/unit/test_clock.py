@@ -0,0 +1,67 @@
+"""
+时钟与参考时间单元测试
+"""
+import datetime
+import os
+import sys
+
+import pytest
+
+# 确保可以导入项目模块
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from models import clock
+from models.bazi import calculator
+from models.bazi.advice_index import current_season
+from models.bazi.five_elements import analyze_five_elements
+
+
+class TestClock:
+    def test_use_clock(self):
+        """测试在上下文中替换时钟"""
+        fixed = datetime.datetime(2024, 7, 1, 8, 30)
+        with clock.use_clock(fixed):
+            assert clock.now() == fixed
+            assert current_season() == "summer"
+        assert isinstance(clock.get_clock(), clock.SystemClock)
+
+    def test_as_of(self):
+        """测试按粒度截断参考时间"""
+        value = datetime.datetime(2024, 7, 15, 23, 59)
+        assert clock.as_of(value) == datetime.date(2024, 7, 15)
+        assert clock.as_of(value, clock.MONTH) == datetime.date(2024, 7, 1)
+        assert clock.as_of(value, clock.YEAR) == datetime.date(2024, 1, 1)
+        assert clock.as_of("2024-07-15", clock.MONTH) == datetime.date(2024, 7, 1)
+        with clock.use_clock(value):
+            assert clock.as_of(granularity=clock.MONTH) == datetime.date(2024, 7, 1)
+        with pytest.raises(ValueError):
+            clock.as_of(value, "hour")
+
+
+class TestBaziAsOf:
+    def test_flow_pillars_follow_as_of(self):
+        """测试流年流月取决于参考时间，而不是系统时间"""
+        first = calculator.calculate_bazi(1990, 5, 15, 8, "male", as_of=datetime.date(2020, 6, 10))["result"]
+        second = calculator.calculate_bazi(1990, 5, 15, 8, "male", as_of=datetime.date(2024, 6, 10))["result"]
+        assert first["current"]["as_of"] == "2020-06-01"
+        assert first["current"]["liunian"] == "庚子"
+        assert second["current"]["liunian"] == "甲辰"
+
+        with clock.use_clock(datetime.datetime(2020, 6, 20, 12, 0)):
+            assert calculator.calculate_bazi(1990, 5, 15, 8, "male")["result"] == first
+
+    def test_cache_key_is_month(self):
+        """测试同月内的计算命中缓存"""
+        calculator.calculate_bazi(1985, 3, 2, 14, "female", as_of=datetime.date(2023, 2, 1))
+        hits = calculator._calculate_bazi.cache_info().hits
+        calculator.calculate_bazi(1985, 3, 2, 14, "female", as_of=datetime.date(2023, 2, 27))
+        assert calculator._calculate_bazi.cache_info().hits == hits + 1
+
+    def test_season_follows_chart(self):
+        """测试五行季节建议取八字结果的参考时间"""
+        result = calculator.calculate_bazi(1990, 5, 15, 8, "male", as_of=datetime.date(2020, 1, 10))["result"]
+        with clock.use_clock(datetime.datetime(2024, 7, 1)):
+            advice = analyze_five_elements(result)["health_advice"]
+        assert advice["seasonal_advice"].startswith("冬季")
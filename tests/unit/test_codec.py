@@ -0,0 +1,104 @@
+"""
+命盘紧凑二进制编码单元测试
+"""
+import datetime
+import io
+import json
+import os
+import sys
+
+import pytest
+
+# 确保可以导入项目模块
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from models.bazi import calculator, codec
+from models.bazi.bazi_calculator import calculate_bazi
+from models.frozen import freeze
+
+
+@pytest.fixture(scope="module")
+def chart():
+    return calculate_bazi(1990, 5, 15, 12, "male")
+
+
+class TestCodec:
+    def test_vocabulary(self):
+        """测试词表无重复，五行、十神、六十甲子的序号"""
+        assert len(set(codec.VOCABULARY)) == len(codec.VOCABULARY)
+        assert codec.VOCABULARY[:5] == codec.ELEMENTS
+        assert codec.GANZHI[0] == "甲子" and codec.GANZHI[59] == "癸亥"
+        assert all(codec.VOCABULARY.index(word) < codec.DIRECT for word in codec.TEN_GODS + codec.ZHIS)
+
+    def test_format_is_stable(self):
+        """测试编码格式固定（已写出的数据需要能被以后的版本解码）"""
+        # year 与 scores 为单字节词表序号，甲子的词表序号为 194，15.5 为定点小数
+        assert codec.encode({"year": "甲子", "scores": [1, 15.5, None, True]}) == (
+            b"CCB\x01\xca\x02\x39\xc3\x02\x51\xc9\x04\xd1\xc5\xf0\xf5\x12\xc0\xc2"
+        )
+
+    def test_round_trip_chart(self, chart):
+        """测试完整计算结果编码后解码与原结果相同，体积明显小于 JSON"""
+        data = codec.encode(chart)
+        assert codec.decode(data) == chart
+        assert len(data) * 3 < len(json.dumps(chart, ensure_ascii=False).encode("utf-8"))
+
+    @pytest.mark.parametrize("value", [
+        0, 47, 48, -1, 2 ** 70, -(2 ** 70), 0.1, -68.18, 39.9042, 1e-9, 1e300, float("inf"),
+        "", "未在词表的文字" * 30, ["重复", "重复", {"重复": "重复"}], {1: "a", None: [True, False]},
+    ])
+    def test_round_trip_values(self, value):
+        """测试各类取值"""
+        assert codec.decode(codec.encode(value)) == value
+
+    def test_types(self):
+        """测试 tuple 与只读字典按 list / dict 编码，其他类型需要 default"""
+        assert codec.decode(codec.encode(freeze({"a": [1, (2, 3)]}))) == {"a": [1, [2, 3]]}
+        with pytest.raises(TypeError):
+            codec.encode({"when": datetime.date(2024, 1, 1)})
+        assert codec.decode(codec.encode({"when": datetime.date(2024, 1, 1)}, default=str)) == {"when": "2024-01-01"}
+
+    def test_invalid_data(self, chart):
+        """测试非编码数据、截断与版本不支持"""
+        data = codec.encode(chart)
+        assert codec.is_encoded(data) and not codec.is_encoded(b"{}")
+        with pytest.raises(ValueError):
+            codec.decode(b'{"a": 1}')
+        with pytest.raises(ValueError):
+            codec.decode(data[:-10])
+        with pytest.raises(ValueError):
+            codec.decode(data + b"\x00")
+        with pytest.raises(ValueError):
+            codec.decode(codec.MAGIC + bytes([codec.VERSION + 1]) + data[4:])
+
+    def test_buffer_types(self, chart):
+        """测试 bytearray 与 memoryview 输入"""
+        data = codec.encode(chart)
+        for buffer in (bytearray(data), memoryview(data), memoryview(b"xx" + data)[2:]):
+            assert codec.is_encoded(buffer)
+            assert codec.decode(buffer) == chart
+        with pytest.raises(ValueError):
+            codec.decode(memoryview(data)[:-10])
+
+    def test_frames(self):
+        """测试连续写入与逐条读取，末尾帧不完整时报错"""
+        buffer = io.BytesIO()
+        rows = [{"id": str(i), "result": ["甲子"] * i} for i in range(200)]
+        for row in rows:
+            codec.dump(row, buffer)
+        assert list(codec.iter_load(io.BytesIO(buffer.getvalue()))) == rows
+        with pytest.raises(ValueError):
+            list(codec.iter_load(io.BytesIO(buffer.getvalue()[:-1])))
+
+    def test_encrypt_round_trip(self, chart):
+        """测试加密内容使用紧凑编码，且兼容加密内容为 JSON 的旧数据"""
+        pytest.importorskip("cryptography")
+        from cryptography.fernet import Fernet
+
+        encrypted = calculator.encrypt_data(chart)
+        assert calculator.decrypt_data(encrypted) == chart
+
+        legacy = Fernet(calculator.get_encryption_key()).encrypt(json.dumps({"a": 1}).encode()).decode()
+        assert calculator.decrypt_data(legacy) == {"a": 1}
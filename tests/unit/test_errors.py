@@ -0,0 +1,142 @@
+"""
+错误与警告通道单元测试
+"""
+import os
+import sys
+
+import pytest
+
+# 确保可以导入项目模块
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from models import errors
+from models.bazi import bazi_calculator, calculator
+from models.bazi.lunar_extension import LunarExtension
+
+
+@pytest.fixture(autouse=True)
+def fresh_counts():
+    errors.reset_counts()
+    yield
+    errors.reset_counts()
+
+
+def _fail(*args, **kwargs):
+    raise RuntimeError("boom")
+
+
+class TestIssues:
+    def test_guard_and_warn(self):
+        """测试章节异常被记录而不抛出，警告与降级标记"""
+        issues = errors.Issues()
+        with issues.guard("dayun"):
+            raise KeyError("x")
+        issues.warn("location", "找不到城市", kind="CityNotFound", degraded=True)
+        issues.warn("note", "仅提示")
+
+        result = issues.to_dict()
+        assert result["errors"] == [{"section": "dayun", "kind": "KeyError", "message": "'x'", "severity": "error"}]
+        assert [w["kind"] for w in result["warnings"]] == ["CityNotFound", "warning"]
+        assert result["degraded"] == ["dayun", "location"]
+        assert errors.counts()[("dayun", "KeyError", "error")] == 1
+
+    def test_error_result(self):
+        """测试整体失败的错误字典"""
+        invalid = errors.error_result(errors.InvalidBirthData("出生日期无效"))
+        assert invalid["error_type"] == "InvalidBirthData"
+        assert invalid["message"] == "出生日期无效"
+        assert invalid["issues"]["degraded"] == ["chart"]
+
+        other = errors.error_result(RuntimeError("boom"))
+        assert other["error"] == "boom"
+        assert other["message"] == errors.DEFAULT_MESSAGE
+
+    def test_render_metrics(self):
+        """测试 Prometheus 计数导出"""
+        errors.count("shensha", "ValueError", errors.WARNING)
+        errors.count("shensha", "ValueError", errors.WARNING)
+        text = errors.render_metrics()
+        assert '# TYPE curecipher_chart_issues_total counter' in text
+        assert 'curecipher_chart_issues_total{section="shensha",kind="ValueError",severity="warning"} 2' in text
+
+
+class TestChartPipeline:
+    def test_invalid_birth_date(self):
+        """测试不存在的日期返回类型化错误"""
+        for args in [(2021, 2, 30, 12), (2021, 4, 31, 12), (2021, 1, 1, 25)]:
+            result = bazi_calculator.calculate_bazi(*args, "male")
+            assert result["error_type"] == "InvalidBirthData"
+            assert "日期" in result["message"]
+
+            cached = calculator.calculate_bazi(*args, "male")
+            assert cached["error_type"] == "InvalidBirthData"
+
+    def test_degraded_sections(self, monkeypatch, capsys):
+        """测试大运、神煞、命宫失败时返回部分结果，不输出到控制台"""
+        monkeypatch.setattr(LunarExtension, "get_day_un", _fail)
+        monkeypatch.setattr(LunarExtension, "get_shen_sha", _fail)
+        monkeypatch.setattr(LunarExtension, "get_ming_gong", _fail)
+
+        result = bazi_calculator.calculate_bazi(1990, 5, 15, 12, "male")
+
+        assert result["bazi"]["day"]
+        assert result["dayuns"] == []
+        assert result["special"]["ming_gong"] == ""
+        assert result["special"]["tai_yuan"]
+        assert result["issues"]["degraded"] == ["dayun", "shensha", "ming_gong"]
+        # 神煞有传统算法兜底，记为警告
+        assert [w["section"] for w in result["issues"]["warnings"]] == ["shensha"]
+        assert {e["section"] for e in result["issues"]["errors"]} == {"dayun", "ming_gong"}
+        assert capsys.readouterr().out == ""
+
+    def test_geocoder_failure_degrades_location(self, monkeypatch):
+        """测试地理编码服务不可用时使用默认位置"""
+        monkeypatch.setattr(bazi_calculator, "geocode_city", _fail)
+        result = bazi_calculator.calculate_bazi(1990, 5, 15, 12, "male", "某城市")
+
+        assert "bazi" in result
+        assert result["issues"]["degraded"] == ["location"]
+        assert result["issues"]["warnings"][0]["kind"] == "RuntimeError"
+
+    def test_city_not_found(self, monkeypatch):
+        """测试找不到城市时记为警告"""
+        monkeypatch.setattr(calculator, "geocode_city", lambda city: None)
+        calculator._calculate_bazi.cache_clear()
+        result = calculator.calculate_bazi(1990, 5, 15, 12, "male", city="不存在的城市")["result"]
+
+        assert result["location"]["longitude"] == 116.4074
+        assert result["issues"]["warnings"][0]["kind"] == "CityNotFound"
+        calculator._calculate_bazi.cache_clear()
+
+    def test_geocoder_failure_is_not_cached(self, monkeypatch):
+        """测试地理编码服务临时出错时记为错误、使用默认位置，且结果不缓存"""
+        calls = []
+
+        def flaky(city):
+            calls.append(city)
+            if len(calls) == 1:
+                raise ConnectionError("geocoder unavailable")
+            return type("Location", (), {"latitude": 31.2304, "longitude": 121.4737})()
+
+        monkeypatch.setattr(calculator, "geocode_city", flaky)
+        calculator._calculate_bazi.cache_clear()
+        first = calculator.calculate_bazi(1990, 5, 15, 12, "male", city="上海")["result"]
+        assert first["location"]["longitude"] == 116.4074
+        assert first["issues"]["degraded"] == ["location"]
+        assert first["issues"]["errors"][0]["kind"] == "ConnectionError"
+        assert first["issues"]["warnings"] == []
+
+        second = calculator.calculate_bazi(1990, 5, 15, 12, "male", city="上海")["result"]
+        assert second["location"]["longitude"] == 121.4737
+        assert second["issues"]["degraded"] == []
+        # 成功的结果照常缓存
+        assert calculator.calculate_bazi(1990, 5, 15, 12, "male", city="上海")["result"] is second
+        assert len(calls) == 2
+        calculator._calculate_bazi.cache_clear()
+
+    def test_clean_result(self):
+        """测试正常计算时没有问题记录"""
+        result = bazi_calculator.calculate_bazi(1990, 5, 15, 12, "male")
+        assert result["issues"] == {"errors": [], "warnings": [], "degraded": []}
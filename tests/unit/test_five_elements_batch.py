@@ -0,0 +1,99 @@
+"""
+五行批量分析单元测试
+"""
+import os
+import random
+import sys
+
+import numpy as np
+import pytest
+
+# 确保可以导入项目模块
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from models.bazi.five_elements import (
+    BALANCE_STATES, ELEMENTS, analyze_five_elements, analyze_five_elements_batch, element_weight_matrix
+)
+
+NAYIN = ["海中金", "炉中火", "大林木", "路旁土", "剑锋金", "山头火", "涧下水", "城头土", "白蜡金", "杨柳木", "泉中水"]
+
+
+def make_chart(rnd):
+    chart = {
+        "bazi": {"day_master_element": rnd.choice(ELEMENTS)},
+        "elements": {key: rnd.choice(ELEMENTS) for key in ("year", "month", "day", "hour")},
+        "nayin": {key: rnd.choice(NAYIN) for key in ("year", "month", "day", "hour")},
+        "current": {"liunian_element": rnd.choice(ELEMENTS), "liuyue_element": rnd.choice(ELEMENTS)},
+    }
+    if rnd.random() < 0.8:
+        chart["dayun"] = {"element": rnd.choice(ELEMENTS + ("",))}
+    if rnd.random() < 0.5:
+        chart["xiaoyun"] = {"element": rnd.choice(ELEMENTS)}
+    return chart
+
+
+@pytest.fixture(scope="module")
+def charts():
+    rnd = random.Random(20250324)
+    return [make_chart(rnd) for _ in range(300)]
+
+
+class TestFiveElementsBatch:
+    def test_matches_single_chart(self, charts):
+        """测试批量结果与逐个八字分析一致"""
+        batch = analyze_five_elements_batch(charts)
+        for row, chart in enumerate(charts):
+            single = analyze_five_elements(chart)
+            balance = single["balance_analysis"]
+            assert batch["element_counts"][row].tolist() == [single["element_counts"][e] for e in ELEMENTS]
+            assert batch["element_percentages"][row].tolist() == [single["element_percentages"][e] for e in ELEMENTS]
+            assert batch["std_deviation"][row] == pytest.approx(balance["std_deviation"])
+            assert batch["balance_state"][row] == balance["balance_state"]
+            assert BALANCE_STATES[batch["balance_code"][row]] == balance["balance_state"]
+            assert ELEMENTS[batch["strongest"][row]] == balance["strongest"]
+            assert ELEMENTS[batch["weakest"][row]] == balance["weakest"]
+
+    def test_ranks(self, charts):
+        """测试强弱排序与 sorted() 一致"""
+        batch = analyze_five_elements_batch(charts)
+        for row, chart in enumerate(charts):
+            percentages = analyze_five_elements(chart)["element_percentages"]
+            expected = [e for e, _ in sorted(percentages.items(), key=lambda x: x[1])]
+            assert [ELEMENTS[i] for i in batch["ranks"][row]] == expected
+
+    def test_advice_only_for_requested_rows(self, charts):
+        """测试只为指定行生成建议"""
+        assert analyze_five_elements_batch(charts)["advice"] == {}
+
+        batch = analyze_five_elements_batch(charts, with_advice=[3, 7, -1])
+        assert sorted(batch["advice"]) == [3, 7, len(charts) - 1]
+        for row, advice in batch["advice"].items():
+            assert advice == analyze_five_elements(charts[row])
+
+        mask = np.zeros(len(charts), dtype=bool)
+        mask[[0, 5]] = True
+        assert sorted(analyze_five_elements_batch(charts, with_advice=mask)["advice"]) == [0, 5]
+
+    def test_invalid_advice_rows(self, charts):
+        """测试无效的建议行参数"""
+        with pytest.raises(IndexError):
+            analyze_five_elements_batch(charts, with_advice=[len(charts)])
+        with pytest.raises(ValueError):
+            analyze_five_elements_batch(charts, with_advice=np.ones(3, dtype=bool))
+
+    def test_weight_matrix(self):
+        """测试五行权重矩阵"""
+        chart = {
+            "bazi": {"day_master_element": "木"},
+            "elements": {"year": "木", "month": "火", "day": "木", "hour": "水"},
+            "nayin": {"year": "山下火", "month": "大林木", "day": "大林木", "hour": "海中金"},
+            "current": {"liunian_element": "金", "liuyue_element": "土"},
+            "dayun": {"element": "火"},
+            "xiaoyun": {"element": "水"},
+        }
+        matrix = element_weight_matrix([chart])
+        assert matrix.shape == (1, 5)
+        assert matrix[0].tolist() == [3.0, 3.5, 1.5, 2.0, 2.0]
+        assert element_weight_matrix([]).shape == (0, 5)
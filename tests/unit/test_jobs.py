@@ -0,0 +1,198 @@
+"""
+后台任务队列单元测试
+"""
+import importlib.util
+import os
+import sys
+import threading
+
+import pytest
+
+# 确保可以导入项目模块
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from services.jobs import DONE, FAILED, QUEUED, RUNNING, SQLiteBroker, Worker, open_broker
+from services.jobs.tasks import bazi_report
+
+REPORT_PARAMS = {"year": 1990, "month": 5, "day": 15, "hour": 12, "gender": "male",
+                 "format": "markdown", "as_of": "2024-03-15"}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def broker(tmp_path, clock):
+    return SQLiteBroker(tmp_path / "jobs.db", result_ttl=60, clock=clock)
+
+
+class TestBroker:
+    def test_submit_claim_complete(self, broker):
+        """测试提交、领取、完成与查询"""
+        job = broker.submit("echo", {"名字": "甲子"})
+        assert broker.get(job.id).status == QUEUED
+
+        claimed = broker.claim("w1", lease=10)
+        assert (claimed.id, claimed.status, claimed.attempts, claimed.params) == (job.id, RUNNING, 1, {"名字": "甲子"})
+        assert broker.claim("w2", lease=10) is None
+
+        assert broker.complete(claimed, {"content": "报告"})
+        done = broker.get(job.id)
+        assert (done.status, done.result) == (DONE, {"content": "报告"})
+        assert broker.stats() == {QUEUED: 0, RUNNING: 0, DONE: 1, FAILED: 0}
+
+    def test_fifo(self, broker, clock):
+        """测试按提交顺序领取"""
+        ids = []
+        for i in range(3):
+            ids.append(broker.submit("echo", {"i": i}).id)
+            clock.now += 1
+        assert [broker.claim("w", lease=10).id for _ in ids] == ids
+
+    def test_retry_delay(self, broker, clock):
+        """测试重试任务在等待时间到达前不可领取"""
+        broker.submit("echo", {})
+        job = broker.claim("w", lease=10)
+        assert broker.retry(job, RuntimeError("暂时失败"), delay=5)
+        assert broker.get(job.id).error == {"type": "RuntimeError", "message": "暂时失败"}
+        assert broker.claim("w", lease=10) is None
+        clock.now += 5
+        assert broker.claim("w", lease=10).attempts == 2
+
+    def test_expired_lease(self, broker, clock):
+        """测试租约过期的任务被重新领取，原领取者的结果被忽略"""
+        broker.submit("echo", {}, max_attempts=2)
+        first = broker.claim("w1", lease=10)
+        clock.now += 11
+        second = broker.claim("w2", lease=10)
+        assert second.id == first.id and second.attempts == 2
+        assert not broker.complete(first, "过期的结果")
+        assert broker.complete(second, "结果")
+        assert broker.get(first.id).result == "结果"
+
+    def test_lost_job_fails_after_max_attempts(self, broker, clock):
+        """测试次数用尽且租约过期的任务在清理时记为失败"""
+        job = broker.submit("echo", {}, max_attempts=1)
+        broker.claim("w", lease=10)
+        clock.now += 11
+        assert broker.claim("w", lease=10) is None
+        broker.purge()
+        assert broker.get(job.id).status == FAILED
+        assert broker.get(job.id).error["type"] == "WorkerLost"
+
+    def test_result_ttl(self, broker, clock):
+        """测试结果过期后查询不到，并由清理删除"""
+        job = broker.submit("echo", {})
+        broker.complete(broker.claim("w", lease=10), 1)
+        clock.now += 59
+        assert broker.get(job.id) is not None
+        clock.now += 1
+        assert broker.get(job.id) is None
+        assert broker.purge() == 1
+
+    def test_concurrent_claims(self, broker):
+        """测试多个线程同时领取时每个任务只被领取一次"""
+        for i in range(50):
+            broker.submit("echo", {"i": i})
+        claimed = []
+
+        def claim_all():
+            while (job := broker.claim(threading.current_thread().name, lease=10)) is not None:
+                claimed.append(job.id)
+
+        threads = [threading.Thread(target=claim_all) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(claimed) == len(set(claimed)) == 50
+
+    def test_open_broker(self, tmp_path):
+        """测试按地址打开 broker"""
+        broker = open_broker(f"sqlite:///{tmp_path / 'jobs.db'}")
+        assert isinstance(broker, SQLiteBroker) and broker.path == str(tmp_path / "jobs.db")
+        with pytest.raises(ValueError):
+            open_broker("amqp://localhost")
+        if importlib.util.find_spec("redis") is None:
+            with pytest.raises(RuntimeError):
+                open_broker("redis://localhost:6379/0")
+
+
+class TestWorker:
+    def test_run_once(self, broker):
+        """测试执行任务并保存结果，队列为空时返回 None"""
+        job = broker.submit("echo", {"value": 1})
+        worker = Worker(broker, tasks={"echo": lambda params: params["value"] + 1})
+        assert worker.run_once().id == job.id
+        assert broker.get(job.id).result == 2
+        assert worker.run_once() is None
+
+    def test_retry_with_backoff(self, broker, clock):
+        """测试失败后按指数退避重试，次数用尽后记为失败"""
+        calls = []
+
+        def flaky(params):
+            calls.append(clock.now)
+            raise RuntimeError("服务暂时不可用")
+
+        job = broker.submit("flaky", {}, max_attempts=3)
+        worker = Worker(broker, tasks={"flaky": flaky}, retry_delay=2)
+        worker.run_once()
+        clock.now += 2
+        worker.run_once()
+        clock.now += 3
+        assert worker.run_once() is None
+        clock.now += 1
+        worker.run_once()
+        assert calls == [1000.0, 1002.0, 1006.0]
+        assert broker.get(job.id).status == FAILED and "permanent" not in broker.get(job.id).error
+        assert worker.stats == {"done": 0, "failed": 1, "retried": 2}
+
+    def test_permanent_error(self, broker):
+        """测试输入错误与未知操作不重试"""
+        bad = broker.submit("bazi.report", dict(REPORT_PARAMS, format="pdf"))
+        unknown = broker.submit("unknown", {})
+        worker = Worker(broker)
+        worker.run_once()
+        worker.run_once()
+        assert broker.get(bad.id).status == FAILED and broker.get(bad.id).attempts == 1
+        assert broker.get(unknown.id).error == {"type": "ValueError", "message": "未知操作: unknown", "permanent": True}
+
+    def test_run_until_stopped(self, broker):
+        """测试循环执行直到 stop 被设置"""
+        stop = threading.Event()
+        jobs = [broker.submit("echo", {"value": i}) for i in range(3)]
+
+        def echo(params):
+            if params["value"] == 2:
+                stop.set()
+            return params["value"]
+
+        Worker(broker, tasks={"echo": echo}, poll_interval=0.01).run(stop)
+        assert [broker.get(job.id).result for job in jobs] == [0, 1, 2]
+
+
+class TestTasks:
+    def test_bazi_report(self):
+        """测试完整报告包含大运、流年流月与饮食运动调养章节"""
+        result = bazi_report(REPORT_PARAMS)
+        assert result["media_type"] == "text/markdown; charset=utf-8"
+        for title in ("### 大运评分", "### 2024年流年流月", "### 饮食调养", "### 运动调养"):
+            assert title in result["content"]
+
+    def test_invalid_birth_data(self):
+        """测试出生日期无效时抛出 ValueError（不重试）"""
+        with pytest.raises(ValueError):
+            bazi_report(dict(REPORT_PARAMS, month=2, day=30))
@@ -0,0 +1,89 @@
+"""
+六爻诊断流程单元测试
+"""
+import datetime
+import os
+import sys
+
+import pytest
+
+# 确保可以导入项目模块
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+import models.bazi.calculator as calculator
+from models.liuyao.diagnosis import (
+    diagnose_health, health_stage, resolve_stages, run_diagnosis, shensha_stage
+)
+
+DATE = datetime.datetime(2025, 3, 24, 22, 0)
+PARAMS = [4, 1, 1, 1, 1, 1]
+
+
+class TestDiagnosisStages:
+    def test_resolve_stages(self):
+        """测试阶段依赖展开"""
+        assert resolve_stages(['health']) == ['compile', 'shensha', 'health']
+        assert resolve_stages(['bazi', 'shensha']) == ['bazi', 'compile', 'shensha']
+        with pytest.raises(ValueError):
+            resolve_stages(['unknown'])
+
+    def test_run_single_stage(self):
+        """测试只执行需要的阶段"""
+        results = run_diagnosis(PARAMS, DATE, stages=['compile'])
+        assert list(results) == ['compile']
+        results = run_diagnosis(PARAMS, DATE, stages=['shensha'])
+        assert list(results) == ['compile', 'shensha']
+        assert results['shensha']['gua_name'] == results['compile'].data['name']
+
+    def test_bazi_stage_requires_birth(self):
+        """测试 bazi 阶段必须提供出生信息"""
+        with pytest.raises(ValueError):
+            run_diagnosis(PARAMS, DATE, stages=['bazi'])
+
+    def test_stage_cache(self):
+        """测试神煞与健康阶段结果缓存"""
+        run_diagnosis(PARAMS, DATE, stages=['health'])
+        shensha_hits = shensha_stage.cache_info().hits
+        health_hits = health_stage.cache_info().hits
+        run_diagnosis(PARAMS, DATE + datetime.timedelta(minutes=10), stages=['health'])
+        assert shensha_stage.cache_info().hits > shensha_hits
+        assert health_stage.cache_info().hits > health_hits
+
+
+class TestDiagnoseHealth:
+    def test_no_bazi_without_birth(self, monkeypatch):
+        """测试未提供出生信息时不计算八字"""
+        def fail(*args, **kwargs):
+            raise AssertionError("不应计算八字")
+
+        monkeypatch.setattr(calculator, "calculate_bazi", fail)
+        result = diagnose_health(PARAMS, DATE, gender="male")
+        assert result["bazi_result"] is None
+        assert result["liuyao_result"]["gua_name"]
+
+    def test_bazi_with_birth(self, monkeypatch):
+        """测试提供出生信息时按出生时间计算八字"""
+        calls = []
+        monkeypatch.setattr(calculator, "calculate_bazi", lambda **kwargs: calls.append(kwargs) or {"result": {}})
+        birth = {"year": 1977, "month": 2, "day": 25, "hour": 20, "gender": "male"}
+        result = diagnose_health(PARAMS, DATE, gender="male", birth=birth)
+        assert result["bazi_result"] == {"result": {}}
+        assert calls[0]["birth_year"] == 1977
+        assert calls[0]["birth_hour"] == 20
+
+    def test_no_console_output(self, capsys):
+        """测试诊断过程不输出到控制台"""
+        diagnose_health(PARAMS, DATE)
+        captured = capsys.readouterr()
+        assert captured.out == ""
+
+    def test_result_is_independent_copy(self):
+        """测试返回结果修改不影响缓存"""
+        first = diagnose_health(PARAMS, DATE)["liuyao_result"]
+        first["shensha_analysis"]["positive_impacts"].clear()
+        first["shensha"].append("改动")
+        second = diagnose_health(PARAMS, DATE)["liuyao_result"]
+        assert second["shensha_analysis"]["positive_impacts"]
+        assert "改动" not in second["shensha"]
@@ -0,0 +1,116 @@
+"""
+流月分析单元测试
+"""
+import datetime
+import os
+import sys
+
+from lunar_python import Solar
+
+# 确保可以导入项目模块
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from models.bazi.liunian_analysis import (
+    analyze_liunian, analyze_liuyue, identify_key_periods, jieqi_month_bounds, stream_liuyue
+)
+from models.bazi.timeline import build_timeline
+
+DAYUNS = ['庚辰', '己卯', '戊寅', '丁丑', '丙子', '乙亥', '甲戌', '癸酉']
+
+
+def make_report():
+    return {
+        'basic_info': {'day_master': '甲 (木)', 'solar_date': '1990年5月15日 12时'},
+        'pattern_analysis': {'day_master_strength': '弱', 'yong_shen': '水 (用神)'},
+        'dayun_analysis': [{'ganzhi': gz, 'age_range': f'{3 + 10 * i}-{12 + 10 * i}'} for i, gz in enumerate(DAYUNS)],
+        'current_dayun': {'ganzhi': '丁丑'},
+    }
+
+
+def make_months(scores):
+    return [{"month": i + 1, "ganzhi": f"m{i + 1}", "score": s,
+             "start_date": f"s{i + 1}", "end_date": f"e{i + 1}"} for i, s in enumerate(scores)]
+
+
+class TestLiuyue:
+    def test_jieqi_bounds(self):
+        """测试节气月交节日期"""
+        bounds = jieqi_month_bounds(2025)
+        assert len(bounds) == 13
+        assert bounds[0] == datetime.date(2025, 2, 3)
+        assert bounds[11] == datetime.date(2026, 1, 5)
+        assert bounds[12] == datetime.date(2026, 2, 4)
+        assert list(bounds) == sorted(bounds)
+
+    def test_months_follow_calendar(self):
+        """测试每个流月的干支与交节日的月柱一致"""
+        months = analyze_liuyue(2025, "乙巳", "甲", "木", "水", 60, dayun_ganzhi="丁丑", strength="弱")
+        assert len(months) == 12
+        for month in months:
+            start = datetime.date.fromisoformat(month['start_date'])
+            solar = Solar.fromYmdHms(start.year, start.month, start.day, 23, 59, 0)
+            assert solar.getLunar().getMonthInGanZhiExact() == month['ganzhi']
+            assert month['end_date'] > month['start_date']
+
+    def test_scores_match_timeline(self):
+        """测试流月评分与时间轴一致"""
+        timeline = build_timeline(make_report())
+        row = timeline.index(2025)
+        months = analyze_liuyue(2025, "乙巳", "甲", "木", "水", int(timeline.year_scores[row]),
+                                dayun_ganzhi="丁丑", strength="弱")
+        assert [m['score'] for m in months] == timeline.month_scores[row].tolist()
+
+    def test_key_periods(self):
+        """测试按阈值合并连续的高峰、低谷月份"""
+        periods = identify_key_periods(2025, "乙巳", "甲", {}, 50,
+                                       make_months([61, 70, 60, 40, 20, 50, 90, 50, 50, 50, 41, 30]))
+        assert [(p['type'], p['start_month'], p['end_month']) for p in periods] == \
+            [("高峰", 1, 2), ("低谷", 4, 5), ("高峰", 7, 7), ("低谷", 12, 12)]
+        assert periods[0]['start_date'] == "s1"
+        assert periods[0]['end_date'] == "e2"
+        assert identify_key_periods(2025, "乙巳", "甲", {}, 50, []) == []
+
+    def test_analyze_liunian(self):
+        """测试流年分析始终识别关键时期，流月明细仅在详细模式返回"""
+        brief = analyze_liunian(make_report(), year=2025)
+        detailed = analyze_liunian(make_report(), year=2025, details_level=2)
+        assert brief['months'] == []
+        assert len(detailed['months']) == 12
+        assert brief['key_periods'] == detailed['key_periods']
+
+    def test_liunian_matches_stream(self):
+        """测试流年分析与流式生成的流年、流月评分一致，且计入五行生克"""
+        report = make_report()
+        for year in (1991, 2024, 2025):
+            liunian = analyze_liunian(report, year=year, details_level=2)
+            streamed = next(stream_liuyue(report, year))
+            assert liunian['score'] == streamed['score']
+            assert [m['score'] for m in liunian['months']] == [m['score'] for m in streamed['months']]
+            assert liunian['key_periods'] == streamed['key_periods']
+
+        liunian = analyze_liunian(report, year=2024)
+        assert liunian['relation_with_day_master'] == "比助"
+        assert liunian['relation_with_yong_shen'] == "被生"
+        assert liunian['dayun_liunian_relation'] == "被生"
+
+    def test_liunian_without_timeline(self):
+        """测试报告缺少出生年份时按当前大运逐项计算，规则与时间轴一致"""
+        report = make_report()
+        report['basic_info'] = {'day_master': '甲 (木)'}
+        liunian = analyze_liunian(report, year=2025, details_level=2)
+        expected = next(stream_liuyue(make_report(), 2025))
+        assert liunian['score'] == expected['score']
+        assert [m['score'] for m in liunian['months']] == [m['score'] for m in expected['months']]
+
+    def test_stream_range(self):
+        """测试按年份范围流式生成"""
+        stream = stream_liuyue(make_report(), 2024, 2026)
+        first = next(stream)
+        assert first['year'] == 2024
+        assert first['ganzhi'] == "甲辰"
+        rest = list(stream)
+        assert [r['year'] for r in rest] == [2025, 2026]
+        assert all(len(r['months']) == 12 for r in rest)
+        assert list(stream_liuyue(make_report(), 2026, 2025)) == []
@@ -0,0 +1,105 @@
+"""
+六爻排盘渲染单元测试
+"""
+import copy
+import dataclasses
+import datetime
+import itertools
+import json
+import os
+import sys
+
+import pytest
+
+# 确保可以导入项目模块
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from models.liuyao.najia import Najia, build_view
+from models.liuyao import render as renderer
+
+DATE = datetime.datetime(2019, 12, 25, 0, 20)
+
+
+def compile_najia(params, **kwargs):
+    return Najia(2).compile(params=list(params), date=DATE, **kwargs)
+
+
+class TestNajiaRender:
+    @pytest.mark.parametrize("params", list(itertools.islice(itertools.product((1, 2, 3, 4), repeat=6), 0, 4096, 37)))
+    def test_fast_text_matches_template(self, params):
+        """测试手写渲染器与 Jinja 模板输出逐字一致"""
+        expected = compile_najia(params).render()
+        actual = compile_najia(params).render(fast=True)
+        assert actual == expected
+
+    def test_fast_text_with_title_and_guaci(self):
+        """测试带标题和卦辞时手写渲染器与模板一致"""
+        params = [2, 2, 1, 2, 4, 2]
+        expected = compile_najia(params, title='测试', guaci=True).render()
+        actual = compile_najia(params, title='测试', guaci=True).render(fast=True)
+        assert actual == expected
+
+    def test_yao_names(self):
+        """测试动爻名称映射，多个动爻全部显示"""
+        names = ['初爻', '二爻', '三爻', '四爻', '五爻', '上爻']
+        result = compile_najia([2, 3, 1, 2, 4, 2]).render(yao_names=names)
+        assert '动爻: 二爻 五爻' in result
+        result = compile_najia([2, 3, 1, 2, 4, 2]).render(yao_names=dict(enumerate(names)))
+        assert '动爻: 二爻 五爻' in result
+
+    def test_json_format(self):
+        """测试 JSON 输出"""
+        data = json.loads(compile_najia([2, 2, 1, 2, 4, 2]).render(fmt='json'))
+        assert data['dong'] == [4]
+        assert len(data['yaos']) == 6
+        assert data['main']['name'] == '地山谦'
+
+    def test_html_format(self):
+        """测试 HTML 输出对标题转义"""
+        html = compile_najia([2, 2, 1, 2, 4, 2], title='<b>').render(fmt='html')
+        assert html.count('<tr') == 7
+        assert '&lt;b&gt;' in html
+
+    def test_unknown_format(self):
+        """测试不支持的输出格式"""
+        with pytest.raises(ValueError):
+            compile_najia([2, 2, 1, 2, 4, 2]).render(fmt='pdf')
+
+    def test_template_compiled_once(self):
+        """测试模板只编译一次"""
+        assert renderer.get_template() is renderer.get_template()
+
+
+class TestNajiaResult:
+    def test_render_is_idempotent(self):
+        """测试重复渲染结果一致且不修改 data"""
+        najia = compile_najia([2, 3, 1, 2, 4, 2], guaci=True)
+        before = copy.deepcopy(najia.data)
+        first = najia.render()
+        assert najia.render() == first
+        assert najia.render(fmt='html')
+        assert najia.data == before
+
+    def test_result_is_frozen(self):
+        """测试编译结果不可变"""
+        result = compile_najia([2, 2, 1, 2, 4, 2]).result
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            result.name = '乾为天'
+
+    def test_compile_cache_shared(self):
+        """测试相同卦象和日柱复用同一编译结果与视图"""
+        a = compile_najia([2, 2, 1, 2, 4, 2])
+        b = compile_najia([2, 2, 1, 2, 4, 2], title='另一个标题')
+        assert a.result is b.result
+        assert build_view(a.result, a.verbose) is build_view(b.result, b.verbose)
+        assert '另一个标题' in b.render()
+        assert '另一个标题' not in a.render()
+
+    def test_data_is_independent_copy(self):
+        """测试 data 修改不会影响缓存结果"""
+        a = compile_najia([2, 2, 1, 2, 4, 2])
+        a.data['bian']['name'] = '改动'
+        b = compile_najia([2, 2, 1, 2, 4, 2])
+        assert b.data['bian']['name'] != '改动'
@@ -0,0 +1,123 @@
+"""
+请求采样分析单元测试
+"""
+import os
+import sys
+import threading
+import time
+
+# 确保可以导入项目模块
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from services.api import profiler
+
+SALT = b"test"
+
+
+class TestNormalizeInput:
+    def test_birth_fields_hashed(self):
+        """测试出生年月日时替换为哈希，其余字段保留"""
+        data = {"birth_year": 1990, "birth_month": 5, "birth_day": 15, "birth_hour": 12,
+                "gender": "male", "city": "北京"}
+        normalized = profiler.normalize_input(data, SALT)
+
+        assert set(normalized) == {"birth_hash", "gender", "city"}
+        assert normalized["city"] == "北京"
+        assert normalized["birth_hash"] == profiler.hash_birth([1990, 5, 15, 12, None], SALT)
+
+    def test_same_birth_same_hash(self):
+        """测试相同出生时间得到相同哈希，盐不同则不同"""
+        data = {"birth_year": 1990, "birth_month": 5, "birth_day": 15, "birth_hour": 12}
+        assert profiler.normalize_input(data, SALT) == profiler.normalize_input(dict(data), SALT)
+        assert profiler.normalize_input(data, SALT) != profiler.normalize_input(data, b"other")
+
+    def test_nested_birth(self):
+        """测试嵌套的 birth 字段与列表"""
+        data = {"items": [{"params": [1, 2, 1, 2, 1, 2], "birth": {"year": 1990, "month": 5, "day": 15,
+                                                                  "hour": 12, "gender": "female"}}]}
+        item = profiler.normalize_input(data, SALT)["items"][0]
+        assert item["params"] == [1, 2, 1, 2, 1, 2]
+        assert item["birth"] == {"gender": "female",
+                                 "birth_hash": profiler.hash_birth([1990, 5, 15, 12, None], SALT)}
+
+    def test_parse_input(self):
+        """测试解析查询参数与请求体"""
+        parsed = profiler.parse_input(b"birth_year=1990&gender=male", b'{"a": 1}', "application/json")
+        assert parsed == {"query": {"birth_year": "1990", "gender": "male"}, "body": {"a": 1}}
+        assert profiler.parse_input(b"", b"abc", "text/plain") == {"body": {"unparsed_bytes": 3}}
+
+
+class TestSampler:
+    def test_collapse_project_frames(self):
+        """测试折叠调用栈，只识别项目包中的代码"""
+        assert profiler.collapse(sys._getframe()) is None
+
+        stack, leaf = profiler.collapse(_project_frame())
+        assert leaf == "services/api/profiler.py:normalize_input"
+        assert stack.endswith("services/api/profiler.py:normalize_input")
+
+    def test_samples_busy_thread(self):
+        """测试采样线程采集到正在执行项目代码的线程"""
+        sampler = profiler.StackSampler(0.001)
+        stop = threading.Event()
+
+        def busy():
+            while not stop.is_set():
+                profiler.normalize_input({"birth_year": 1990, "items": list(range(50))}, SALT)
+
+        worker = threading.Thread(target=busy)
+        worker.start()
+        key = sampler.start(time.perf_counter())
+        time.sleep(0.1)
+        capture = sampler.stop(key)
+        stop.set()
+        worker.join()
+
+        assert capture.samples > 0
+        assert any(name.startswith("services/api/profiler.py:") for name in capture.functions)
+
+
+def _project_frame():
+    # 在 normalize_input 内部取得其栈帧
+    frames = []
+    original = profiler.hash_birth
+
+    def capture(values, salt):
+        frames.append(sys._getframe(1))
+        return original(values, salt)
+
+    profiler.hash_birth = capture
+    try:
+        profiler.normalize_input({"birth_year": 1990}, SALT)
+    finally:
+        profiler.hash_birth = original
+    return frames[0]
+
+
+class TestProfileStore:
+    def test_ring_buffer(self):
+        """测试只保留最近 N 条，列表最新在前且不含详情"""
+        store = profiler.ProfileStore(keep=3)
+        for index in range(5):
+            store.add({"path": f"/p{index}", "stacks": [], "functions": [], "input": {}})
+
+        listed = store.list()
+        assert [entry["path"] for entry in listed] == ["/p4", "/p3", "/p2"]
+        assert "stacks" not in listed[0]
+        assert store.get(listed[0]["id"])["path"] == "/p4"
+        assert store.get(1) is None
+
+        store.resize(1)
+        assert [entry["path"] for entry in store.list()] == ["/p4"]
+        store.clear()
+        assert store.list() == []
+
+    def test_config_from_env(self):
+        """测试环境变量配置"""
+        config = profiler.ProfilerConfig.from_env({"CURECIPHER_PROFILE_RATE": "2", "CURECIPHER_PROFILE_KEEP": "5",
+                                                   "CURECIPHER_PROFILE_SALT": "s"})
+        assert config.rate == 1.0 and config.keep == 5 and config.salt == b"s"
+        assert config.enabled
+        assert not profiler.ProfilerConfig.from_env({}).enabled
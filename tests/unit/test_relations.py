@@ -0,0 +1,88 @@
+"""
+干支关系（位掩码）单元测试
+"""
+import os
+import sys
+
+# 确保可以导入项目模块
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from models.bazi.bazi_calculator import analyze_special_patterns, check_sanhe
+from models.bazi.relations import (
+    EMPTY_MASKS, ZHI_BIT, duplicate_mask, find_relations, is_empty, mask_of
+)
+
+
+def names(relations, kind):
+    return [item["name"] for item in relations[kind]]
+
+
+class TestMasks:
+    def test_mask_of(self):
+        """测试地支掩码与重复地支掩码"""
+        assert mask_of(["子", "丑"]) == 0b11
+        assert mask_of(["子", "子", "x"]) == 0b1
+        assert duplicate_mask(["午", "子", "午"]) == ZHI_BIT["午"]
+        assert duplicate_mask(["午", "子"]) == 0
+
+    def test_empty_masks(self):
+        """测试六旬空亡"""
+        assert len(EMPTY_MASKS) == 60
+        expected = {"甲子": "戌亥", "甲戌": "申酉", "甲申": "午未", "甲午": "辰巳", "甲辰": "寅卯", "甲寅": "子丑"}
+        for day_gz, empties in expected.items():
+            assert EMPTY_MASKS[day_gz] == mask_of(empties)
+        # 同旬各日空亡相同
+        assert EMPTY_MASKS["癸酉"] == EMPTY_MASKS["甲子"]
+        assert is_empty("癸亥", "子") and is_empty("癸亥", "丑")
+        assert not is_empty("未知", "子")
+
+
+class TestFindRelations:
+    def test_natal_relations(self):
+        """测试四柱内的合冲刑害"""
+        relations = find_relations(["甲子", "己午", "丙寅", "辛亥"])
+        assert names(relations, "gan_he") == ["甲己合", "丙辛合"]
+        assert names(relations, "liu_he") == ["寅亥合"]
+        assert names(relations, "liu_chong") == ["子午冲"]
+        assert names(relations, "liu_hai") == []
+        # 丙寅日属甲子旬，空戌亥
+        assert [item["positions"] for item in relations["kong_wang"]] == [["时"]]
+
+    def test_self_xing_requires_duplicate(self):
+        """测试自刑需同一地支出现两次"""
+        assert names(find_relations(["甲午", "乙丑", "丙寅", "丁卯"]), "xing") == []
+        relations = find_relations(["甲午", "乙丑", "丙午", "丁卯"])
+        assert names(relations, "xing") == ["午自刑"]
+        assert relations["xing"][0]["positions"] == ["年", "日"]
+
+    def test_flow_pillars(self):
+        """测试叠加大运、流年后的关系及位置"""
+        pillars = ["庚午", "辛巳", "庚辰", "壬午", "乙酉", "丙午"]
+        relations = find_relations(pillars)
+        he = relations["liu_he"][0]
+        assert he["name"] == "辰酉合"
+        assert he["positions"] == ["日", "大运"]
+        assert "流年" in relations["san_hui"][0]["positions"]
+
+        # 只保留涉及流年的关系
+        focused = find_relations(pillars, involving=[5])
+        assert names(focused, "liu_he") == []
+        assert names(focused, "gan_he") == ["丙辛合"]
+        assert all("流年" in item["positions"] for kind in focused.values() for item in kind)
+
+
+class TestCompatibility:
+    def test_duplicate_branch_is_not_half_combination(self):
+        """测试同一地支重复出现不构成半合"""
+        assert analyze_special_patterns(["戌", "戌", "申"])["san_he"] == []
+        assert check_sanhe(["戌", "戌", "申"]) == ""
+
+    def test_special_patterns_keys(self):
+        """测试特殊格局包含冲、合、刑、害"""
+        patterns = analyze_special_patterns(["子", "午", "丑", "未"])
+        assert [p["name"] for p in patterns["chong"]] == ["子午冲", "丑未冲"]
+        assert [p["name"] for p in patterns["he"]] == ["子丑合", "午未合"]
+        assert [p["name"] for p in patterns["hai"]] == ["子未害", "丑午害"]
+        assert [p["name"] for p in patterns["xing"]] == ["恃势之刑"]
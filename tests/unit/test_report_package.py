@@ -0,0 +1,83 @@
+"""
+命盘报告包单元测试
+"""
+import copy
+import datetime
+import os
+import sys
+
+import pytest
+
+# 确保可以导入项目模块
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from models import clock
+from models.bazi import bazi_calculator, bazi_report, report
+from models.bazi.bazi_calculator import calculate_bazi
+from models.bazi.report import Chart, as_chart, build_report, generate_bazi_report, render_report
+
+
+@pytest.fixture(scope="module")
+def bazi_result():
+    with clock.use_clock(datetime.datetime(2025, 6, 1, 12, 0)):
+        return calculate_bazi(1990, 5, 15, 12, "male")
+
+
+class TestChart:
+    def test_hash_and_equality(self, bazi_result):
+        """测试命盘按内容哈希比较"""
+        chart = Chart.from_result(bazi_result)
+        same = Chart.from_result(copy.deepcopy(bazi_result))
+        assert chart == same and hash(chart) == hash(same)
+        assert as_chart(chart) is chart
+
+        changed = copy.deepcopy(bazi_result)
+        changed['special']['ming_gong'] = "子"
+        assert Chart.from_result(changed) != chart
+
+    def test_readonly(self, bazi_result):
+        """测试命盘为只读结构，可转换回字典"""
+        chart = Chart.from_result(bazi_result)
+        assert chart['bazi']['day_master'] == bazi_result['bazi']['day_master']
+        with pytest.raises(TypeError):
+            chart['bazi']['day_master'] = "甲"
+        with pytest.raises(KeyError):
+            chart['unknown']
+        assert chart.to_dict()['dayuns'] == bazi_result['dayuns']
+
+    def test_invalid_result(self, bazi_result):
+        """测试错误结果与缺少字段"""
+        with pytest.raises(ValueError):
+            Chart.from_result({"error": "x", "message": "计算八字时出错"})
+        incomplete = dict(bazi_result)
+        del incomplete['pattern']
+        with pytest.raises(KeyError):
+            Chart.from_result(incomplete)
+
+
+class TestReportBuilder:
+    def test_single_implementation(self):
+        """测试旧模块的导入路径指向同一实现"""
+        assert bazi_calculator.generate_bazi_report is report.generate_bazi_report
+        assert bazi_report.generate_bazi_report is report.generate_bazi_report
+        assert bazi_report.generate_text_report is report.generate_text_report
+
+    def test_report_cached(self, bazi_result):
+        """测试报告按命盘缓存，返回可修改的副本"""
+        first = generate_bazi_report(bazi_result)
+        first['basic_info']['day_master'] = ""
+        second = generate_bazi_report(copy.deepcopy(bazi_result))
+        assert second['basic_info']['day_master'] != ""
+        assert build_report(as_chart(bazi_result)) is build_report(Chart.from_result(bazi_result))
+        assert second['text_report'].startswith("===== 八字命盘解读 =====")
+
+    def test_render_cached(self, bazi_result):
+        """测试渲染结果按 (命盘哈希, 格式, 语言) 缓存"""
+        chart = Chart.from_result(bazi_result)
+        text = render_report(chart, "markdown")
+        assert render_report(Chart.from_result(bazi_result), "markdown") is text
+        assert render_report(chart, "markdown", "en") != text
+        assert "大运评分" not in text
+        assert "| Year | Month | Day | Hour |" in render_report(chart, "markdown", "en")
@@ -0,0 +1,119 @@
+"""
+运势时间轴单元测试
+"""
+import os
+import sys
+
+import pytest
+from lunar_python import Solar
+
+# 确保可以导入项目模块
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from models.bazi.dayun_analysis import calculate_dayun_score
+from models.bazi.liunian_analysis import analyze_relation, calculate_liunian_ganzhi, calculate_liunian_score
+from models.bazi.timeline import ELEMENTS_EN, JIAZI, JIAZI_ELEMENT, build_timeline, month_pillars
+
+DAYUNS = ['庚辰', '己卯', '戊寅', '丁丑', '丙子', '乙亥', '甲戌', '癸酉']
+
+
+def make_report(day_master="甲", element="木", strength="弱", yong_shen="水 (用神)"):
+    return {
+        'basic_info': {'day_master': f'{day_master} ({element})', 'solar_date': '1990年5月15日 12时'},
+        'pattern_analysis': {'day_master_strength': strength, 'yong_shen': yong_shen},
+        'dayun_analysis': [{'ganzhi': gz, 'age_range': f'{3 + 10 * i}-{12 + 10 * i}'} for i, gz in enumerate(DAYUNS)],
+    }
+
+
+def element_en(pillar):
+    return ELEMENTS_EN[JIAZI_ELEMENT[pillar]]
+
+
+class TestTimeline:
+    def test_pillars(self):
+        """测试流年、流月干支与历法一致"""
+        timeline = build_timeline(make_report())
+        assert len(timeline) == 80
+        for year, pillar in zip(timeline.years.tolist(), timeline.year_pillars.tolist()):
+            assert JIAZI[pillar] == calculate_liunian_ganzhi(year)
+
+        for year in (1990, 2000, 2024, 2025):
+            months = month_pillars([year])[0]
+            for month in range(12):
+                # 每个节气月中旬的月柱
+                solar_month = month + 2
+                solar = Solar.fromYmd(year + (solar_month > 12), (solar_month - 1) % 12 + 1, 20)
+                assert JIAZI[months[month]] == solar.getLunar().getMonthInGanZhiExact()
+
+    @pytest.mark.parametrize("strength", ["旺", "弱", "中和", "偏弱"])
+    def test_scores_match_scalar_rules(self, strength):
+        """测试评分与逐项计算规则一致"""
+        timeline = build_timeline(make_report(strength=strength))
+        day_master_element, yong_shen = "wood", "water"
+
+        for i, pillar in enumerate(timeline.dayun_pillars.tolist()):
+            entry = timeline.dayun(i)
+            expected = calculate_dayun_score(
+                analyze_relation(element_en(pillar), day_master_element),
+                analyze_relation(element_en(pillar), yong_shen),
+                strength, entry['gan_shen'], entry['zhi_shen'], None
+            )
+            assert entry['score'] == expected
+
+        for row, year in enumerate(timeline.years.tolist()):
+            pillar = int(timeline.year_pillars[row])
+            dayun = int(timeline.dayun_of_year[row])
+            relation_dy = analyze_relation(element_en(timeline.dayun_pillars[dayun]), element_en(pillar)) if dayun >= 0 else ""
+            expected = calculate_liunian_score(
+                analyze_relation(element_en(pillar), day_master_element),
+                analyze_relation(element_en(pillar), yong_shen),
+                relation_dy, strength, timeline.year(year)['gan_shen']
+            )
+            assert timeline.year_scores[row] == expected
+
+    def test_dayun_of_year(self):
+        """测试流年所在大运"""
+        timeline = build_timeline(make_report())
+        assert timeline.year(1992)['dayun'] == ""
+        assert timeline.year(1993)['dayun'] == "庚辰"
+        assert timeline.year(2025)['dayun'] == "丁丑"
+        assert timeline.year(2069)['dayun'] == "癸酉"
+
+    def test_lazy_entries(self):
+        """测试按需生成的年、月、大运信息"""
+        timeline = build_timeline(make_report())
+        year = timeline.year(2025)
+        assert year['ganzhi'] == "乙巳"
+        assert year['age'] == 35
+        assert year['description'].startswith("2025年乙巳")
+        month = timeline.month(2025, 1)
+        assert month['ganzhi'] == "戊寅"
+        assert month['score'] == timeline.month_scores[timeline.index(2025), 0]
+        with pytest.raises(KeyError):
+            timeline.year(2100)
+        with pytest.raises(KeyError):
+            timeline.month(2025, 13)
+
+        data = timeline.to_dict(months=True)
+        assert len(data['years']) == 80
+        assert len(data['years'][0]['months']) == 12
+        assert [d['ganzhi'] for d in data['dayuns']] == DAYUNS
+
+    def test_shared_readonly(self):
+        """测试时间轴缓存且数组只读"""
+        timeline = build_timeline(make_report())
+        assert build_timeline(make_report()) is timeline
+        with pytest.raises(ValueError):
+            timeline.year_scores[0] = 0
+
+    def test_invalid_report(self):
+        """测试无效的日主或缺少出生年份"""
+        with pytest.raises(ValueError):
+            build_timeline(make_report(day_master="X"))
+        report = make_report()
+        report['basic_info']['solar_date'] = ''
+        with pytest.raises(ValueError):
+            build_timeline(report)
+        assert build_timeline(report, birth_year=1990).birth_year == 1990
@@ -0,0 +1,118 @@
+"""
+阶段计时单元测试
+"""
+import datetime
+import os
+import sys
+
+import pytest
+
+# 确保可以导入项目模块
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from models import timing
+from models.bazi import calculator as chart_calculator
+from models.bazi.bazi_calculator import calculate_bazi
+from models.liuyao.diagnosis import diagnose_health
+
+
+@pytest.fixture
+def enabled():
+    """开启计时并清空汇总，结束后恢复"""
+    previous = timing.is_enabled()
+    timing.reset()
+    timing.enable()
+    yield
+    timing.enable(previous)
+    timing.reset()
+
+
+class TestTiming:
+    def test_disabled_is_noop(self):
+        """测试计时关闭时不记录"""
+        previous = timing.is_enabled()
+        timing.enable(False)
+        timing.reset()
+        try:
+            with timing.span("test.noop"):
+                pass
+            assert timing.timed("test.noop")(lambda: 1)() == 1
+            assert timing.snapshot() == {}
+        finally:
+            timing.enable(previous)
+
+    def test_span_and_timed(self, enabled):
+        """测试上下文管理器与装饰器"""
+        @timing.timed("test.func")
+        def func(value):
+            return value * 2
+
+        with timing.span("test.block") as span:
+            assert func(2) == 4
+        assert span.duration >= 0
+
+        stats = timing.snapshot()
+        assert stats["test.func"]["count"] == 1
+        assert stats["test.block"]["count"] == 1
+        assert stats["test.block"]["total"] >= stats["test.func"]["total"]
+
+    def test_errors_counted_and_raised(self, enabled):
+        """测试异常计入错误数且继续抛出"""
+        with pytest.raises(ValueError):
+            with timing.span("test.error"):
+                raise ValueError("boom")
+        assert timing.snapshot()["test.error"]["errors"] == 1
+
+    def test_collect_and_server_timing(self, enabled):
+        """测试按上下文收集并生成 Server-Timing"""
+        with timing.collect() as spans:
+            timing.record("a", 0.001)
+            timing.record("b", 0.002)
+            timing.record("a", 0.003)
+        timing.record("c", 0.1)
+
+        assert [name for name, _ in spans] == ["a", "b", "a"]
+        assert timing.server_timing(spans, total=0.01) == "a;dur=4.000, b;dur=2.000, total;dur=10.000"
+
+    def test_render_metrics(self, enabled):
+        """测试 Prometheus 文本格式"""
+        timing.record("x", 0.002)
+        timing.record("x", 0.2, error=True)
+        text = timing.render_metrics()
+
+        assert '# TYPE curecipher_stage_duration_seconds histogram' in text
+        assert 'curecipher_stage_duration_seconds_bucket{stage="x",le="0.0025"} 1' in text
+        assert 'curecipher_stage_duration_seconds_bucket{stage="x",le="0.25"} 2' in text
+        assert 'curecipher_stage_duration_seconds_bucket{stage="x",le="+Inf"} 2' in text
+        assert 'curecipher_stage_duration_seconds_count{stage="x"} 2' in text
+        assert 'curecipher_stage_errors_total{stage="x"} 1' in text
+
+
+class TestStageInstrumentation:
+    def test_calculate_bazi_stages(self, enabled):
+        """测试八字计算记录各阶段"""
+        with timing.collect() as spans:
+            calculate_bazi(1990, 5, 15, 12, "male", None)
+        names = {name for name, _ in spans}
+        assert {"bazi.calculate", "bazi.geocode", "bazi.lunar", "bazi.ten_gods", "bazi.dayun",
+                "bazi.liunian", "bazi.shensha", "bazi.pattern", "bazi.relations"} <= names
+
+    def test_chart_stages(self, enabled):
+        """测试 calculator 模块的八字计算使用独立的 chart.* 阶段名"""
+        chart_calculator._calculate_bazi.cache_clear()
+        with timing.collect() as spans:
+            chart_calculator.calculate_bazi(1990, 5, 15, 12, "male")
+        names = {name for name, _ in spans}
+        assert {"chart.calculate", "chart.geocode", "chart.lunar", "chart.dayun", "chart.liunian",
+                "chart.shensha"} <= names
+        assert not names & {"bazi.geocode", "bazi.lunar", "bazi.dayun", "bazi.liunian", "bazi.shensha"}
+
+    def test_diagnose_health_stages(self, enabled):
+        """测试六爻诊断记录各阶段"""
+        with timing.collect() as spans:
+            diagnose_health([2, 2, 1, 2, 4, 2], datetime.datetime(2024, 3, 15, 10, 30))
+        names = [name for name, _ in spans]
+        assert {"liuyao.compile", "liuyao.render", "liuyao.stage.compile", "liuyao.stage.health"} <= set(names)
+        assert names[-1] == "liuyao.diagnose"
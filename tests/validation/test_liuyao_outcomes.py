@@ -0,0 +1,99 @@
+"""
+六爻预计算表与实时引擎的一致性验证
+"""
+import datetime
+import random
+
+import pytest
+
+from models.frozen import thaw
+from models.liuyao.diagnosis import diagnose_health
+from models.liuyao.najia import Najia
+from models.liuyao.outcomes import (
+    JIAZI, OutcomeTable, build_table, cast_index, cast_params, live_outcome, lookup_outcome
+)
+
+CASTS = list(range(0, 4096, 17))
+DAYS = list(JIAZI[::5])
+
+
+@pytest.fixture(scope="module")
+def table(tmp_path_factory):
+    path = tmp_path_factory.mktemp("liuyao") / "outcomes.bin"
+    build_table(path, casts=CASTS, days=DAYS)
+    with OutcomeTable(path) as t:
+        yield t
+
+
+class TestLiuyaoOutcomes:
+    def test_cast_index_roundtrip(self):
+        """测试卦象序号与六爻参数互相转换"""
+        for index in range(4096):
+            assert cast_index(cast_params(index)) == index
+        assert cast_index([1, 1, 1, 1, 1, 1]) == 0
+        assert cast_index([4, 4, 4, 4, 4, 4]) == 4095
+
+    def test_invalid_params(self):
+        """测试无效的六爻参数"""
+        with pytest.raises(ValueError):
+            cast_index([1, 2, 3])
+        with pytest.raises(ValueError):
+            cast_index([0, 1, 1, 1, 1, 1])
+
+    def test_table_size(self, table):
+        """测试表的行数"""
+        assert len(table) == len(CASTS) * len(DAYS)
+
+    def test_lookup_matches_live(self, table):
+        """测试全部已生成的行与实时引擎一致"""
+        for cast_id in CASTS:
+            params = cast_params(cast_id)
+            for day_gz in DAYS:
+                assert table.lookup(params, day_gz) == live_outcome(params, day_gz)
+
+    def test_lookup_matches_diagnose_health(self, table):
+        """测试查表结果与 diagnose_health 的结构化输出一致"""
+        rnd = random.Random(20240315)
+        start = datetime.datetime(2024, 1, 1, 8, 0)
+        checked = 0
+        while checked < 20:
+            date = start + datetime.timedelta(days=rnd.randrange(3650), hours=rnd.randrange(24))
+            day_gz = Najia._daily(date, -100)['gz']['day']
+            if day_gz not in DAYS:
+                continue
+            params = list(cast_params(rnd.choice(CASTS)))
+            live = diagnose_health(params, date)['liuyao_result']
+            outcome = table.lookup(params, day_gz)
+
+            assert outcome['gua']['name'] == live['gua_name']
+            assert outcome['gua']['bian']['name'] == live['bian_gua_name']
+            assert outcome['gua_element'] == live['gua_element']
+            assert outcome['bian_gua_element'] == live['bian_gua_element']
+            # 查表结果为只读结构（列表为 tuple），diagnose_health 返回可修改的副本
+            assert list(outcome['shensha']) == live['shensha']
+            assert list(outcome['health_impacts']) == sorted(live['health_impacts'])
+            assert list(outcome['remedies']) == sorted(live['remedies'])
+            assert thaw(outcome['shensha_analysis']['god6_impacts']) == live['god6_impacts']
+            for key, value in outcome['shensha_analysis'].items():
+                assert thaw(value) == live['shensha_analysis'][key]
+            checked += 1
+
+    def test_missing_rows_fall_back(self, table):
+        """测试未包含的卦象、日柱或参数回退到实时计算"""
+        params = cast_params(1)
+        with pytest.raises(KeyError):
+            table.lookup(params, DAYS[0])
+        with pytest.raises(KeyError):
+            table.lookup(cast_params(CASTS[0]), JIAZI[1])
+
+        assert lookup_outcome(params, DAYS[0], table=table) == live_outcome(params, DAYS[0])
+        params = cast_params(CASTS[1])
+        assert lookup_outcome(params, DAYS[0], day_master_strength='strong', table=table) == \
+            live_outcome(params, DAYS[0], day_master_strength='strong')
+
+    def test_invalid_file(self, tmp_path):
+        """测试非预计算表文件"""
+        path = tmp_path / "invalid.bin"
+        path.write_bytes(b"not a table" * 10)
+        with pytest.raises(ValueError):
+            OutcomeTable(path)